@@ -18,6 +18,12 @@ class Settings(BaseSettings):
     DEFAULT_DOCKER_TAG: str = "default:latest"
 
     DEFAULT_MAX_CONTAINERS_PER_HOUR: int
+    RATE_LIMIT_CACHE_SIZE: int = 10000
+    RATE_LIMIT_CACHE_TTL_SECONDS: int = 30
+
+    GIT_MIRROR_PATH: str = "git_mirrors"
+    GIT_MIRROR_MAX_REPOS: int = 20
+    GIT_MIRROR_MAX_SIZE_MB: int = 5120
 
     class Config:
         env_file = ".env"
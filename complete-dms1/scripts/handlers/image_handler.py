@@ -12,6 +12,7 @@ from scripts.models.jwt_model import TokenData
 from fastapi.security import OAuth2PasswordBearer
 from scripts.constants.app_configuration import settings
 from scripts.utils.jwt_utils import get_current_user_from_token
+from scripts.utils.git_mirror_utils import git_mirror_cache
 
 
 try:
@@ -76,17 +77,20 @@ class ImageHandler:
 
     @staticmethod
     def build_image_from_github(data: ImageGithubBuildRequest, current_user: TokenData):
+        temp_dir = tempfile.mkdtemp()
         try:
-            temp_dir = tempfile.mkdtemp()
             repo_url = data.github_url
             dockerfile_path = data.dockerfile_path
+            checkout_dir = os.path.join(temp_dir, "repo")
 
             try:
-                git.Repo.clone_from(repo_url, temp_dir)
+                git_mirror_cache.checkout(repo_url, data.git_ref, checkout_dir)
             except git.exc.GitCommandError as e:
                 raise HTTPException(status_code=400, detail=f"Git clone failed: {str(e)}")
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
-            dockerfile_full_path = os.path.join(temp_dir, dockerfile_path)
+            dockerfile_full_path = os.path.join(checkout_dir, dockerfile_path)
             if not os.path.exists(dockerfile_full_path):
                 raise HTTPException(status_code=400, detail=f"Dockerfile not found at: {dockerfile_path}")
 
@@ -99,8 +103,6 @@ class ImageHandler:
                 tag=data.tag
             )
 
-            shutil.rmtree(temp_dir)
-
             return {
                 "message": IMAGE_BUILD_SUCCESS.format(tag=data.tag),
                 "id": image.id,
@@ -111,6 +113,8 @@ class ImageHandler:
             raise HTTPException(status_code=400, detail=f"Git error: {str(e)}")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"{IMAGE_BUILD_FAILURE}: {str(e)}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
     @staticmethod
     def list_images(name: str = None, all: bool = False, current_user: TokenData=None):
@@ -4,6 +4,7 @@ from scripts.models.rate_limit_model import RateLimitConfig
 from scripts.logging.logger import logger
 from datetime import datetime
 from scripts.models.jwt_model import TokenData
+from scripts.utils.rate_limit_utils import invalidate_user_limit
 
 mongodb = MongoDBConnection()
 
@@ -41,6 +42,7 @@ def set_rate_limit_handler(user_id: str, limit: int, time_window: int, current_u
         "created_at": now
     })
 
+    invalidate_user_limit(user_id)
     logger.info(f"Set new rate limit for user '{user_id}' to {limit}")
     return {"message": "Rate limit set successfully"}
 
@@ -65,5 +67,6 @@ def update_rate_limit_handler(user_id: str, limit: int, time_window: int, curren
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rate limit configuration not found")
 
+    invalidate_user_limit(user_id)
     logger.info(f"Updated rate limit for user '{user_id}'")
     return {"message": "Rate limit updated successfully"}
@@ -3,6 +3,7 @@ from typing import Optional, Union, Any, Dict, List
 
 class ImageGithubBuildRequest(BaseModel):
     github_url: str
+    git_ref: Optional[str] = None
     dockerfile_path: Optional[str] = "Dockerfile"
     tag: Optional[str] = "default:latest"
 
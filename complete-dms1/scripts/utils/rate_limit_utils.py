@@ -1,5 +1,10 @@
+import math
+import threading
+import time
 from fastapi import HTTPException
-from datetime import datetime, timedelta
+from datetime import datetime
+from cachetools import TTLCache
+from pymongo import ReturnDocument
 from scripts.utils.mongo_utils import MongoDBConnection
 from scripts.constants.app_configuration import settings
 from scripts.constants.app_constants import RATE_LIMIT_EXCEEDED
@@ -8,29 +13,120 @@ from scripts.logging.logger import logger
 mongo = MongoDBConnection()
 
 MAX_CONTAINERS_PER_HOUR = settings.DEFAULT_MAX_CONTAINERS_PER_HOUR
+DEFAULT_TIME_WINDOW_SECONDS = 3600
 
-def check_rate_limit(user_id: str) -> bool:
+# Per-user limits change rarely, so they are kept in process for a short while instead of being read per request
+_limit_cache = TTLCache(maxsize=settings.RATE_LIMIT_CACHE_SIZE, ttl=settings.RATE_LIMIT_CACHE_TTL_SECONDS)
+_limit_cache_lock = threading.Lock()
+
+try:
+    mongo.get_collection("rate_limits").create_index("user_id", unique=True)
+except Exception as e:
+    logger.warning(f"Could not ensure index on rate_limits: {e}")
+
+
+def get_user_limit(user_id: str) -> tuple:
+    with _limit_cache_lock:
+        cached = _limit_cache.get(user_id)
+    if cached:
+        return cached
+
+    user_limit = mongo.get_collection("rate_limits").find_one(
+        {"user_id": user_id}, {"limit": 1, "time_window": 1}
+    )
+    if user_limit and user_limit.get("time_window", 0) > 0:
+        limit = (user_limit["limit"], user_limit["time_window"])
+    else:
+        limit = (MAX_CONTAINERS_PER_HOUR, DEFAULT_TIME_WINDOW_SECONDS)
+
+    with _limit_cache_lock:
+        _limit_cache[user_id] = limit
+    return limit
+
+
+def invalidate_user_limit(user_id: str):
+    with _limit_cache_lock:
+        _limit_cache.pop(user_id, None)
 
-    try:
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        containers_collection = mongo.get_collection("user_containers")
 
-        container_count = containers_collection.count_documents({
-            "user_id": user_id,
-            "created_time": {"$gte": one_hour_ago}
-        })
+def retry_after_seconds(limit: int, window_ms: int, elapsed_ms: int, previous: int, current: int) -> int:
+    if current < limit and previous > 0:
+        # The estimate drops below the limit once enough of the previous window has slid out
+        wait_ms = window_ms * (1 - (limit - current) / previous) - elapsed_ms
+    else:
+        # Only once the current window has become the previous one and partly slid out
+        wait_ms = (window_ms - elapsed_ms) + window_ms * (1 - limit / max(current, 1))
+    return max(1, math.ceil(wait_ms / 1000))
 
-        logger.debug(f"User {user_id} has created {container_count} containers in the last hour.")
 
-        if container_count >= MAX_CONTAINERS_PER_HOUR:
-            logger.warning(f"Rate limit exceeded for user {user_id}. Limit: {MAX_CONTAINERS_PER_HOUR} per hour.")
+def check_rate_limit(user_id: str) -> bool:
+    """
+    Sliding-window counter: the count of the previous fixed window, weighted by how much of it still overlaps the
+    sliding window, plus the count of the current one. The counters live in a single document per user and are
+    checked and incremented in one atomic update, so the cost per request is one indexed write.
+    """
+    try:
+        limit, time_window = get_user_limit(user_id)
+        window_ms = time_window * 1000
+        now_ms = int(time.time() * 1000)
+        window_start_ms = now_ms - now_ms % window_ms
+        window_start = datetime.utcfromtimestamp(window_start_ms / 1000)
+        previous_window_start = datetime.utcfromtimestamp((window_start_ms - window_ms) / 1000)
+        elapsed_ms = now_ms - window_start_ms
+        previous_weight = 1 - elapsed_ms / window_ms
+
+        counters = mongo.get_collection("rate_limit_counters").find_one_and_update(
+            {"_id": user_id},
+            [
+                {"$set": {
+                    "previous": {"$switch": {
+                        "branches": [
+                            {"case": {"$eq": ["$window_start", window_start]}, "then": "$previous"},
+                            {"case": {"$eq": ["$window_start", previous_window_start]}, "then": "$current"}
+                        ],
+                        "default": 0
+                    }},
+                    "current": {"$cond": [{"$eq": ["$window_start", window_start]}, "$current", 0]},
+                    "window_start": window_start,
+                    "time_window": time_window
+                }},
+                {"$set": {
+                    "allowed": {"$lt": [
+                        {"$add": [{"$multiply": ["$previous", previous_weight]}, "$current"]},
+                        limit
+                    ]}
+                }},
+                {"$set": {"current": {"$cond": ["$allowed", {"$add": ["$current", 1]}, "$current"]}}}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if not counters["allowed"]:
+            retry_after = retry_after_seconds(limit, window_ms, elapsed_ms, counters["previous"], counters["current"])
+            logger.warning(f"Rate limit exceeded for user {user_id}. Limit: {limit} per {time_window} seconds.")
             raise HTTPException(
                 status_code=429,
-                detail=RATE_LIMIT_EXCEEDED.format(limit=MAX_CONTAINERS_PER_HOUR)
+                detail=RATE_LIMIT_EXCEEDED.format(limit=limit),
+                headers={"Retry-After": str(retry_after)}
             )
 
+        logger.debug(f"User {user_id} is within the rate limit of {limit} per {time_window} seconds.")
         return True
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error checking rate limit for user {user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+def release_rate_limit(user_id: str):
+    """Gives back the slot taken by a request that did not end up creating a container."""
+    try:
+        mongo.get_collection("rate_limit_counters").update_one(
+            {"_id": user_id, "current": {"$gt": 0}},
+            {"$inc": {"current": -1}}
+        )
+    except Exception as e:
+        logger.error(f"Error releasing rate limit slot for user {user_id}: {str(e)}")
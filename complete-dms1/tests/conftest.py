@@ -0,0 +1,22 @@
+import os
+
+import mongomock
+
+# The settings are read and MongoDB is pinged when the app modules are imported, the tests run against mongomock
+for name, value in {
+    "API_HOST": "127.0.0.1",
+    "API_PORT": "8000",
+    "DOCKER_SOCK": "unix:///var/run/docker.sock",
+    "DOCKER_CLIENT_TIMEOUT": "5",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "MONGODB_DATABASE": "dms",
+    "JWT_SECRET": "test-secret",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "5",
+    "DEFAULT_MAX_CONTAINERS_PER_HOUR": "3",
+}.items():
+    os.environ.setdefault(name, value)
+
+with mongomock.patch(servers=(("localhost", 27017),)):
+    import scripts.utils.mongo_utils  # noqa: F401
+    import scripts.utils.rate_limit_utils  # noqa: F401
@@ -27,7 +27,7 @@ from scripts.utils.jwt_utils import get_current_user_from_token
 from datetime import datetime
 from scripts.logging.logger import logger
 from scripts.models.jwt_model import TokenData
-from scripts.utils.rate_limit_utils import check_rate_limit
+from scripts.utils.rate_limit_utils import check_rate_limit, release_rate_limit
 from scripts.constants.api_endpoints import Endpoints
 from docker.errors import DockerException
 
@@ -50,7 +50,13 @@ def run_container_advanced(data: ContainerRunAdvancedRequest, current_user: Toke
         user_id = current_user.username
 
         check_rate_limit(user_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unhandled error: {e}")
+        raise HTTPException(status_code=500, detail=f"{CONTAINER_CREATE_FAILURE}: {str(e)}")
 
+    try:
         for mem_field in ["mem_limit", "mem_reservation", "memswap_limit", "shm_size"]:
             if mem_field in kwargs and kwargs[mem_field] == "":
                 kwargs.pop(mem_field)
@@ -91,9 +97,11 @@ def run_container_advanced(data: ContainerRunAdvancedRequest, current_user: Toke
 
     except DockerException as e:
         logger.error(f"Docker error: {e}")
+        release_rate_limit(user_id)
         raise HTTPException(status_code=500, detail=f"{CONTAINER_CREATE_FAILURE}: {str(e)}")
     except Exception as e:
         logger.error(f"Unhandled error: {e}")
+        release_rate_limit(user_id)
         raise HTTPException(status_code=500, detail=f"{CONTAINER_CREATE_FAILURE}: {str(e)}")
 
 
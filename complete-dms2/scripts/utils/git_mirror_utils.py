@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import git
+
+from scripts.constants.app_configuration import settings
+from scripts.logging.logger import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+COMMIT_SHA_PATTERN = re.compile(r"^[0-9a-f]{7,40}$")
+FETCH_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class GitMirrorCache:
+    """
+    Bare mirrors of the repositories images are built from, keyed by repository URL.
+    Each build fetches only new refs and checks out a hardlinked local clone instead of cloning the remote again.
+    """
+
+    def __init__(self, cache_path: str, max_repos: int, max_size_mb: int):
+        self.cache_path = Path(cache_path)
+        self.max_repos = max_repos
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def public_url(repo_url: str) -> str:
+        parts = urlsplit(repo_url)
+        if not parts.netloc:
+            return repo_url
+        return urlunsplit(parts._replace(netloc=parts.netloc.rsplit("@", 1)[-1]))
+
+    def mirror_path(self, repo_url: str) -> Path:
+        normalised = self.public_url(repo_url).rstrip("/").removesuffix(".git").lower()
+        return self.cache_path / f"{hashlib.sha256(normalised.encode()).hexdigest()[:24]}.git"
+
+    @contextmanager
+    def repo_lock(self, mirror_path: Path, blocking: bool = True):
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(mirror_path.name, threading.Lock())
+        if not thread_lock.acquire(blocking):
+            yield False
+            return
+        try:
+            self.cache_path.mkdir(parents=True, exist_ok=True)
+            with open(mirror_path.with_suffix(".lock"), "w") as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        yield False
+                        return
+                yield True
+        finally:
+            thread_lock.release()
+
+    def checkout(self, repo_url: str, ref: str, dest: str):
+        mirror_path = self.mirror_path(repo_url)
+        with self.repo_lock(mirror_path):
+            if not mirror_path.exists():
+                logger.info(f"Creating git mirror for {self.public_url(repo_url)}")
+                try:
+                    mirror = git.Repo.clone_from(repo_url, mirror_path, bare=True)
+                    mirror.remotes.origin.set_url(self.public_url(repo_url))
+                except Exception:
+                    shutil.rmtree(mirror_path, ignore_errors=True)
+                    raise
+            elif not (ref and COMMIT_SHA_PATTERN.match(ref) and self._has_commit(git.Repo(mirror_path), ref)):
+                logger.info(f"Fetching new refs into git mirror {mirror_path.name}")
+                git.Repo(mirror_path).git.fetch(repo_url, *FETCH_REFSPECS, "--prune")
+            repo = self._clone_from_mirror(mirror_path, dest, ref)
+            repo.remotes.origin.set_url(self.public_url(repo_url))
+            os.utime(mirror_path)
+        self.evict(keep=mirror_path)
+        return repo
+
+    @staticmethod
+    def _has_commit(repo: git.Repo, ref: str) -> bool:
+        try:
+            repo.git.rev_parse("--verify", "--quiet", f"{ref}^{{commit}}")
+            return True
+        except git.exc.GitCommandError:
+            return False
+
+    def _clone_from_mirror(self, mirror_path: Path, dest: str, ref: str):
+        mirror = git.Repo(mirror_path)
+        if not ref:
+            return git.Repo.clone_from(str(mirror_path), dest)
+        if f"refs/heads/{ref}" in {head.path for head in mirror.heads}:
+            return git.Repo.clone_from(str(mirror_path), dest, branch=ref)
+        if not self._has_commit(mirror, ref):
+            raise ValueError(f"Git reference not found: {ref}")
+        repo = git.Repo.clone_from(str(mirror_path), dest, no_checkout=True)
+        repo.git.checkout(ref)
+        return repo
+
+    def evict(self, keep: Path | None = None):
+        if not self.cache_path.exists():
+            return
+        mirrors = sorted(self.cache_path.glob("*.git"), key=lambda path: path.stat().st_mtime)
+        sizes = {mirror: sum(f.stat().st_size for f in mirror.rglob("*") if f.is_file()) for mirror in mirrors}
+        total_size = sum(sizes.values())
+        remaining = len(mirrors)
+        for mirror in mirrors:
+            if remaining <= self.max_repos and total_size <= self.max_size_bytes:
+                break
+            if mirror == keep:
+                continue
+            with self.repo_lock(mirror, blocking=False) as acquired:
+                if not acquired:
+                    continue
+                logger.info(f"Evicting git mirror {mirror.name}")
+                shutil.rmtree(mirror, ignore_errors=True)
+            remaining -= 1
+            total_size -= sizes[mirror]
+
+
+git_mirror_cache = GitMirrorCache(
+    cache_path=settings.GIT_MIRROR_PATH,
+    max_repos=settings.GIT_MIRROR_MAX_REPOS,
+    max_size_mb=settings.GIT_MIRROR_MAX_SIZE_MB,
+)
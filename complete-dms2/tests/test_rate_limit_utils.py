@@ -0,0 +1,107 @@
+import pytest
+from fastapi import HTTPException
+
+from scripts.utils import rate_limit_utils
+from scripts.utils.rate_limit_utils import check_rate_limit, release_rate_limit, retry_after_seconds
+
+USER_ID = "user-1"
+WINDOW_SECONDS = 3600
+LIMIT = 3
+# Start of a fixed window, as the windows are aligned to multiples of their length
+WINDOW_START = 1_700_002_800
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(WINDOW_START)
+    monkeypatch.setattr(rate_limit_utils, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def fresh_counters():
+    rate_limit_utils.mongo.db.drop_collection("rate_limit_counters")
+    rate_limit_utils.mongo.db.drop_collection("rate_limits")
+    rate_limit_utils.invalidate_user_limit(USER_ID)
+    yield
+    rate_limit_utils.invalidate_user_limit(USER_ID)
+
+
+def exhaust(limit: int = LIMIT):
+    for _ in range(limit):
+        assert check_rate_limit(USER_ID) is True
+
+
+def retry_after_of_denied_request() -> int:
+    with pytest.raises(HTTPException) as denied:
+        check_rate_limit(USER_ID)
+    assert denied.value.status_code == 429
+    return int(denied.value.headers["Retry-After"])
+
+
+def test_retry_after_waits_for_the_previous_window_to_slide_out():
+    # 10 in the previous window and 5 in this one, 15 minutes in: the estimate drops to 9 after 30 minutes
+    assert retry_after_seconds(10, WINDOW_SECONDS * 1000, 900_000, previous=10, current=5) == 900
+
+
+def test_retry_after_waits_for_the_current_window_to_become_the_previous_one():
+    assert retry_after_seconds(10, WINDOW_SECONDS * 1000, 600_000, previous=0, current=10) == 3000
+    assert retry_after_seconds(10, WINDOW_SECONDS * 1000, 600_000, previous=4, current=20) == 4800
+
+
+def test_retry_after_is_at_least_a_second():
+    assert retry_after_seconds(10, WINDOW_SECONDS * 1000, 1_800_000, previous=10, current=5) == 1
+
+
+def test_requests_are_allowed_up_to_the_limit(clock):
+    exhaust()
+    clock.now += 600
+
+    assert retry_after_of_denied_request() == WINDOW_SECONDS - 600
+    # A denied request does not take a slot
+    counters = rate_limit_utils.mongo.get_collection("rate_limit_counters").find_one({"_id": USER_ID})
+    assert counters["current"] == LIMIT
+
+
+def test_previous_window_counts_by_its_remaining_overlap(clock):
+    exhaust()
+    clock.now = WINDOW_START + WINDOW_SECONDS + 60
+    # 3 requests weighted by the 59 of 60 minutes still overlapping leave room for one more
+    assert check_rate_limit(USER_ID) is True
+    # Until a third of the previous window has slid out
+    assert retry_after_of_denied_request() == pytest.approx(WINDOW_SECONDS // 3 - 60, abs=1)
+
+    clock.now = WINDOW_START + WINDOW_SECONDS + WINDOW_SECONDS // 2
+    assert check_rate_limit(USER_ID) is True
+    counters = rate_limit_utils.mongo.get_collection("rate_limit_counters").find_one({"_id": USER_ID})
+    assert (counters["previous"], counters["current"]) == (LIMIT, 2)
+
+
+def test_counters_reset_after_an_idle_window(clock):
+    exhaust()
+    clock.now = WINDOW_START + 2 * WINDOW_SECONDS
+    exhaust()
+    counters = rate_limit_utils.mongo.get_collection("rate_limit_counters").find_one({"_id": USER_ID})
+    assert (counters["previous"], counters["current"]) == (0, LIMIT)
+
+
+def test_user_limit_overrides_the_default(clock):
+    rate_limit_utils.mongo.get_collection("rate_limits").insert_one(
+        {"user_id": USER_ID, "limit": 1, "time_window": WINDOW_SECONDS}
+    )
+    exhaust(limit=1)
+    assert retry_after_of_denied_request() == WINDOW_SECONDS
+
+
+def test_released_slot_can_be_taken_again(clock):
+    exhaust()
+    release_rate_limit(USER_ID)
+    assert check_rate_limit(USER_ID) is True
@@ -4,7 +4,9 @@ import os
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from scripts.config import EnvConf
 from scripts.services import router
+from scripts.utils.kubernetes_util import start_resource_cache, stop_resource_cache
 
 health_router = APIRouter(tags=["Healthcheck"], include_in_schema=False)
 
@@ -36,5 +38,9 @@ app.add_middleware(
 app.include_router(router)
 app.include_router(health_router)
 
+if EnvConf.status_cache_enabled:
+    app.add_event_handler("startup", start_resource_cache)
+    app.add_event_handler("shutdown", stop_resource_cache)
+
 if os.environ.get("ENABLE_METRICS"):
     Instrumentator().instrument(app).expose(app)
@@ -13,6 +13,13 @@ class _EnvConf(BaseSettings):
     host_path: str = "/data2/ut-k8volumes/core-volumes"
     claim_name: str = "core-volumes-pvc"
     kubernetes_log_level: str = "ERROR"
+    status_cache_enabled: bool = True
+    cache_resync_seconds: int = 300
+    cache_watch_timeout_seconds: int = 240
+    cache_retry_seconds: int = 5
+    cache_stop_timeout_seconds: float = 5
+    status_watch_max_seconds: int = 60
+    status_watch_poll_seconds: int = 2
 
 
 class _Service(BaseSettings):
@@ -1,8 +1,7 @@
 from fastapi.encoders import jsonable_encoder
+import asyncio
 import time
-from kubernetes import client, config
 from kubernetes.client.rest import ApiException
-from kubernetes.dynamic import DynamicClient
 
 from scripts.config import EnvConf, IstioGateway
 from scripts.constants import ErrorMessages, IgnoreSecrets, VolumeMount
@@ -16,6 +15,7 @@ from scripts.exceptions import (
 )
 from scripts.logging import logger
 from scripts.schema import DeleteConfig, DeployConfig, PodStatus
+from scripts.utils.kubernetes_util import get_kubernetes_client, get_resource_cache
 
 
 class KubernetesHandler:
@@ -41,17 +41,8 @@ class KubernetesHandler:
         :return: None
         :doc-author: Sayed Imran
         """
-        try:
-            if EnvConf.env == "local":
-                config.load_kube_config(config_file="scripts/conf/k3s.yaml")
-                logger.info("Loading local kubernetes config")
-            else:
-                config.load_incluster_config()
-                logger.info("Loading in-cluster kubernetes config")
-        except Exception as e:
-            logger.error("Error loading Kubernetes config: %s", e)
-            raise e.args from e
-        self.k8s_client = client.ApiClient()
+        kubernetes_client = get_kubernetes_client()
+        self.k8s_client = kubernetes_client.api_client
         self.deploy_data = deploy_data or DeployConfig()
         self.app_name = self.deploy_data.app_name.replace("_", "-").lower()
         self.app_id = self.deploy_data.app_id.replace("_", "-").lower()
@@ -61,12 +52,11 @@ class KubernetesHandler:
         self.name = f"{self.app_name}-{self.app_id}"
         self.service = f"{self.name}.{self.namespace}.svc.cluster.local"
         self.path = f"/plugin/{self.project_id}/{self.app_name}/api/"
-        self.dynamic_client = DynamicClient(self.k8s_client)
-        self.deployment_resource = client.AppsV1Api(self.k8s_client)
-        self.api_v1_resource = client.CoreV1Api(self.k8s_client)
-        self.virtualservice_resource = self.dynamic_client.resources.get(
-            api_version="networking.istio.io/v1alpha3", kind="VirtualService"
-        )
+        self.dynamic_client = kubernetes_client.dynamic_client
+        self.deployment_resource = kubernetes_client.apps_v1
+        self.api_v1_resource = kubernetes_client.core_v1
+        self.virtualservice_resource = kubernetes_client.virtualservice_resource
+        self.resource_cache = get_resource_cache()
         self.plugin_state = PluginState(mongo_client=mongo_client)
         self.gateway_proxy = "/gateway"
         self.proxy = f"{self.gateway_proxy}{self.path}"
@@ -421,10 +411,8 @@ class KubernetesHandler:
         """
 
         try:
-            deployment = self.deployment_resource.read_namespaced_deployment(
-                name=f'{status_config.app_name.replace("_","-").lower()}-{status_config.app_id.replace("_","-").lower()}',
-                namespace=self.namespace,
-                pretty=True,
+            deployment = self.read_deployment(
+                name=f'{status_config.app_name.replace("_","-").lower()}-{status_config.app_id.replace("_","-").lower()}'
             )
             available_replicas = deployment.status.available_replicas
             desired_replicas = deployment.spec.replicas
@@ -468,19 +456,10 @@ class KubernetesHandler:
             statuses.append({"plugin": plugin, "status": "in_progress", "pods": []})
             deployment = plugin.replace("_", "-").lower()
             try:
-                deployment_status = self.deployment_resource.read_namespaced_deployment(
-                    name=deployment, namespace=self.namespace, pretty=True, async_req=True
-                ).get()
+                deployment_status = self.read_deployment(name=deployment)
                 statuses[index]["replicas"] = deployment_status.spec.replicas
-                labels = deployment_status.spec.template.metadata.labels
-                label_selector = ",".join([f"{key}={value}" for key, value in labels.items()])
-                pods = self.api_v1_resource.list_namespaced_pod(
-                    namespace=self.namespace,
-                    pretty=True,
-                    label_selector=label_selector,
-                    async_req=True,
-                ).get()
-                for npod, pod in enumerate(pods.items):
+                pods = self.list_pods(labels=deployment_status.spec.template.metadata.labels)
+                for npod, pod in enumerate(pods):
                     statuses[index]["pods"].append({"pod_name": pod.metadata.name, "containers": []})
                     for container in pod.status.container_statuses:
                         status = self.get_container_status(container)
@@ -512,6 +491,83 @@ class KubernetesHandler:
                 statuses[index]["status"] = "not_found"
         return statuses
 
+    async def watch_deployments_status(self, plugin_list: list[str], known: dict, timeout: float):
+        """
+        The watch_deployments_status function is a long-poll over deployments_status. It answers as soon as the
+        status of any plugin differs from the one the caller already knows, and otherwise when the timeout elapses.
+        While the resource cache is synced it wakes up on deployment and pod watch events instead of re-reading
+        the API server, so a waiting caller holds neither a thread nor API server requests.
+
+        :param self: Bind the method to an object
+        :param plugin_list: list[str]: Pass in a list of plugins
+        :param known: dict: Last status the caller has seen for each plugin
+        :param timeout: float: Seconds to wait for a change, capped by status_watch_max_seconds
+        :return: A list of dictionaries, as returned by deployments_status
+        :doc-author: Sayed Imran
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + min(max(timeout, 0), EnvConf.status_watch_max_seconds)
+        changed = asyncio.Event()
+
+        def on_change():
+            loop.call_soon_threadsafe(changed.set)
+
+        informers = []
+        if self.resource_cache:
+            informers = [self.resource_cache.deployments, self.resource_cache.pods]
+        for informer in informers:
+            informer.add_listener(on_change)
+        try:
+            while True:
+                changed.clear()
+                statuses = await self.deployments_status(plugin_list)
+                remaining = deadline - loop.time()
+                if remaining <= 0 or any(status["status"] != known.get(status["plugin"]) for status in statuses):
+                    return statuses
+                if informers and all(informer.is_synced() for informer in informers):
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(min(EnvConf.status_watch_poll_seconds, remaining))
+        finally:
+            for informer in informers:
+                informer.remove_listener(on_change)
+
+    def read_deployment(self, name: str):
+        """
+        The read_deployment function returns a deployment of the plugin namespace, answering from the
+        watch-backed resource cache when it is synced and from the API server otherwise.
+
+        :param self: Represent the instance of the class
+        :param name: str: Name of the deployment
+        :return: A V1Deployment object
+        :doc-author: Sayed Imran
+        """
+        if self.resource_cache and self.resource_cache.deployments.is_synced():
+            if deployment := self.resource_cache.deployments.get(name):
+                return deployment
+            raise ApiException(status=404, reason=f"Deployment {name} not found")
+        return self.deployment_resource.read_namespaced_deployment(name=name, namespace=self.namespace, pretty=True)
+
+    def list_pods(self, labels: dict):
+        """
+        The list_pods function returns the pods of the plugin namespace matching all the given labels,
+        answering from the watch-backed resource cache when it is synced and from the API server otherwise.
+
+        :param self: Represent the instance of the class
+        :param labels: dict: Labels the pods must carry
+        :return: A list of V1Pod objects
+        :doc-author: Sayed Imran
+        """
+        if self.resource_cache and self.resource_cache.pods.is_synced():
+            return self.resource_cache.pods.list(labels=labels)
+        label_selector = ",".join([f"{key}={value}" for key, value in labels.items()])
+        return self.api_v1_resource.list_namespaced_pod(
+            namespace=self.namespace, pretty=True, label_selector=label_selector
+        ).items
+
     def get_container_status(self, container):
         """
         The get_container_status function returns the status of a container.
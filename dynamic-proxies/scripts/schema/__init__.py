@@ -50,3 +50,8 @@ class PodStatus(BaseModel):
 
 class DeploymentStatus(BaseModel):
     plugin_list: list[str]
+
+
+class DeploymentStatusWatch(DeploymentStatus):
+    known: dict[str, str | None] = {}
+    timeout: float = 30
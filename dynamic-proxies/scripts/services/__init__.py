@@ -8,7 +8,7 @@ from scripts.exceptions import (
 )
 from scripts.handlers.kubernetes_handler import KubernetesHandler
 from scripts.logging import logger
-from scripts.schema import DeleteConfig, DeployConfig, DeploymentStatus, PodStatus
+from scripts.schema import DeleteConfig, DeployConfig, DeploymentStatus, DeploymentStatusWatch, PodStatus
 
 router = APIRouter()
 
@@ -132,6 +132,31 @@ async def deployments_status(deployments: DeploymentStatus):
         )
 
 
+@router.post("/deployment-status/watch")
+async def watch_deployments_status(watch: DeploymentStatusWatch):
+    try:
+        kubernetes_handler = KubernetesHandler()
+        status = await kubernetes_handler.watch_deployments_status(watch.plugin_list, watch.known, watch.timeout)
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Deployment statuses",
+                "status": "success",
+                "data": status,
+            },
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error while watching deployment statuses: {e}")
+        return JSONResponse(
+            status_code=404,
+            content={
+                "data": e.args,
+                "status": "failure",
+                "message": "Couldn't fetch deployment statuses",
+            },
+        )
+
+
 @router.post("/plugin-logs")
 def get_plugin_logs(plugin: str, lines: int = 100):
     try:
@@ -0,0 +1,301 @@
+import threading
+import time
+
+from kubernetes import client, config, watch
+from kubernetes.client.rest import ApiException
+from kubernetes.dynamic import DynamicClient
+
+from scripts.config import EnvConf
+from scripts.logging import logger
+
+HTTP_STATUS_GONE = 410
+
+
+class KubernetesClient:
+    def __init__(self):
+        """
+        Loads the kubernetes config and builds the API clients once for the lifetime of the worker process.
+        Discovery for the dynamic client is deferred until a dynamic resource is first needed.
+
+        :param self: Represent the instance of the class
+        :return: None
+        """
+        try:
+            if EnvConf.env == "local":
+                config.load_kube_config(config_file="scripts/conf/k3s.yaml")
+                logger.info("Loading local kubernetes config")
+            else:
+                config.load_incluster_config()
+                logger.info("Loading in-cluster kubernetes config")
+        except Exception as e:
+            logger.error("Error loading Kubernetes config: %s", e)
+            raise
+        self.api_client = client.ApiClient()
+        self.apps_v1 = client.AppsV1Api(self.api_client)
+        self.core_v1 = client.CoreV1Api(self.api_client)
+        self._dynamic_client = None
+        self._virtualservice_resource = None
+        self._lock = threading.Lock()
+
+    @property
+    def dynamic_client(self) -> DynamicClient:
+        if self._dynamic_client is None:
+            with self._lock:
+                if self._dynamic_client is None:
+                    self._dynamic_client = DynamicClient(self.api_client)
+        return self._dynamic_client
+
+    @property
+    def virtualservice_resource(self):
+        if self._virtualservice_resource is None:
+            resource = self.dynamic_client.resources.get(
+                api_version="networking.istio.io/v1alpha3", kind="VirtualService"
+            )
+            with self._lock:
+                self._virtualservice_resource = self._virtualservice_resource or resource
+        return self._virtualservice_resource
+
+
+class ResourceInformer:
+    def __init__(
+        self,
+        kind: str,
+        list_func,
+        namespace: str,
+        watch_factory=watch.Watch,
+        resync_seconds: int = EnvConf.cache_resync_seconds,
+        watch_timeout_seconds: int = EnvConf.cache_watch_timeout_seconds,
+        retry_seconds: int = EnvConf.cache_retry_seconds,
+    ):
+        """
+        Keeps an in-memory copy of one namespaced resource kind, fed by a list followed by a watch.
+        The watch resumes from the last seen resource version, relists when that version has expired (410)
+        or the resync interval has elapsed, and reconnects with a delay after any other failure.
+
+        :param kind: Resource kind, used for logging
+        :param list_func: Namespaced list function of the kubernetes client, e.g. AppsV1Api.list_namespaced_deployment
+        :param namespace: Namespace to watch
+        :param watch_factory: Callable returning a kubernetes.watch.Watch compatible object
+        :param resync_seconds: Interval after which the full list is fetched again
+        :param watch_timeout_seconds: Server side timeout of each watch request
+        :param retry_seconds: Delay before reconnecting after a failed list or watch
+        """
+        self.kind = kind
+        self.list_func = list_func
+        self.namespace = namespace
+        self.watch_factory = watch_factory
+        self.resync_seconds = resync_seconds
+        self.watch_timeout_seconds = watch_timeout_seconds
+        self.retry_seconds = retry_seconds
+        self.resource_version = None
+        self.last_resync = 0.0
+        self._items = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._watch = None
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name=f"{self.kind.lower()}-informer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stopped.set()
+        if self._watch is not None:
+            self._watch.stop()
+        self.join(timeout)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Waits for the informer thread to exit. A thread blocked in a watch only sees the stop on its next event,
+        so callers should bound the wait; the thread is a daemon and does not hold up process exit.
+
+        :return: Whether the thread has exited
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def is_synced(self) -> bool:
+        return self._synced.is_set()
+
+    def wait_for_sync(self, timeout: float | None = None) -> bool:
+        return self._synced.wait(timeout)
+
+    def get(self, name: str):
+        with self._lock:
+            return self._items.get(name)
+
+    def list(self, labels: dict | None = None) -> list:
+        with self._lock:
+            items = list(self._items.values())
+        if not labels:
+            return items
+        return [
+            item
+            for item in items
+            if all((item.metadata.labels or {}).get(key) == value for key, value in labels.items())
+        ]
+
+    def add_listener(self, listener):
+        """
+        Registers a callable invoked from the informer thread after every resync and watch event.
+        Listeners must not block; async consumers should hand the notification over with call_soon_threadsafe.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.warning("%s cache listener failed: %s", self.kind, e)
+
+    def resync(self):
+        resources = self.list_func(namespace=self.namespace)
+        with self._lock:
+            self._items = {item.metadata.name: item for item in resources.items}
+        self.resource_version = resources.metadata.resource_version
+        self.last_resync = time.monotonic()
+        self._synced.set()
+        logger.debug("%s cache resynced with %s objects", self.kind, len(resources.items))
+        self._notify()
+
+    def apply_event(self, event: dict):
+        obj = event["object"]
+        with self._lock:
+            if event["type"] == "DELETED":
+                self._items.pop(obj.metadata.name, None)
+            else:
+                self._items[obj.metadata.name] = obj
+        self.resource_version = obj.metadata.resource_version
+        self._notify()
+
+    def watch_once(self):
+        self._watch = self.watch_factory()
+        for event in self._watch.stream(
+            self.list_func,
+            namespace=self.namespace,
+            resource_version=self.resource_version,
+            timeout_seconds=self.watch_timeout_seconds,
+        ):
+            self.apply_event(event)
+            if self._stopped.is_set() or self._resync_due():
+                self._watch.stop()
+                break
+
+    def _resync_due(self) -> bool:
+        return time.monotonic() - self.last_resync >= self.resync_seconds
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                if self.resource_version is None or self._resync_due():
+                    self.resync()
+                self.watch_once()
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    logger.info("%s watch expired, relisting", self.kind)
+                    self.resource_version = None
+                    continue
+                self._handle_failure(e)
+            except Exception as e:
+                self._handle_failure(e)
+
+    def _handle_failure(self, error: Exception):
+        logger.warning("%s watch failed, reconnecting in %ss: %s", self.kind, self.retry_seconds, error)
+        self._synced.clear()
+        self.resource_version = None
+        self._stopped.wait(self.retry_seconds)
+
+
+class KubernetesResourceCache:
+    def __init__(self, kubernetes_client=None, namespace: str = EnvConf.namespace, watch_factory=watch.Watch):
+        """
+        Watch-backed cache of the Deployments, Services and Pods in the plugin namespace.
+
+        :param kubernetes_client: Object exposing apps_v1 and core_v1 APIs, defaults to the process-wide client
+        :param namespace: Namespace to watch
+        :param watch_factory: Callable returning a kubernetes.watch.Watch compatible object
+        """
+        kubernetes_client = kubernetes_client or get_kubernetes_client()
+        self.deployments = ResourceInformer(
+            "Deployment", kubernetes_client.apps_v1.list_namespaced_deployment, namespace, watch_factory
+        )
+        self.services = ResourceInformer(
+            "Service", kubernetes_client.core_v1.list_namespaced_service, namespace, watch_factory
+        )
+        self.pods = ResourceInformer("Pod", kubernetes_client.core_v1.list_namespaced_pod, namespace, watch_factory)
+        self.informers = [self.deployments, self.services, self.pods]
+
+    def start(self):
+        for informer in self.informers:
+            informer.start()
+
+    def stop(self, timeout: float | None = None):
+        """
+        Signals every informer before waiting for any of them, so the wait is bounded by timeout in total.
+
+        :param timeout: Seconds to wait for the informer threads, None waits until they exit
+        """
+        for informer in self.informers:
+            informer.stop(timeout=0)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for informer in self.informers:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not informer.join(remaining):
+                logger.warning(
+                    "%s informer still waiting on its watch, leaving it to exit with the process", informer.kind
+                )
+
+    def is_synced(self) -> bool:
+        return all(informer.is_synced() for informer in self.informers)
+
+
+_kubernetes_client: KubernetesClient | None = None
+_resource_cache: KubernetesResourceCache | None = None
+_client_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+
+def get_kubernetes_client() -> KubernetesClient:
+    global _kubernetes_client
+    if _kubernetes_client is None:
+        with _client_lock:
+            if _kubernetes_client is None:
+                _kubernetes_client = KubernetesClient()
+    return _kubernetes_client
+
+
+def start_resource_cache() -> KubernetesResourceCache:
+    global _resource_cache
+    with _cache_lock:
+        if _resource_cache is None:
+            _resource_cache = KubernetesResourceCache()
+    _resource_cache.start()
+    return _resource_cache
+
+
+def stop_resource_cache():
+    global _resource_cache
+    if _resource_cache is not None:
+        _resource_cache.stop(timeout=EnvConf.cache_stop_timeout_seconds)
+        _resource_cache = None
+
+
+def get_resource_cache() -> KubernetesResourceCache | None:
+    return _resource_cache
@@ -0,0 +1,258 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from scripts.exceptions import DeploymentException
+from scripts.handlers.kubernetes_handler import KubernetesHandler
+from scripts.schema import PodStatus
+from scripts.utils import kubernetes_util
+from scripts.utils.kubernetes_util import KubernetesResourceCache, ResourceInformer
+
+
+def k8s_object(name, resource_version="1", labels=None, **fields):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, resource_version=resource_version, labels=labels or {}), **fields
+    )
+
+
+class FakeListAPI:
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+        self.calls = 0
+
+    def __call__(self, namespace):
+        items, resource_version = self.snapshots[min(self.calls, len(self.snapshots) - 1)]
+        self.calls += 1
+        return SimpleNamespace(items=items, metadata=SimpleNamespace(resource_version=resource_version))
+
+
+class FakeWatch:
+    def __init__(self, events=(), error=None):
+        self.events = events
+        self.error = error
+        self.stream_kwargs = None
+
+    def stream(self, func, **kwargs):
+        self.stream_kwargs = kwargs
+        yield from self.events
+        if self.error:
+            raise self.error
+
+    def stop(self):
+        pass
+
+
+def watch_factory(informer, *watches):
+    pending = list(watches)
+
+    def factory():
+        if not pending:
+            informer._stopped.set()
+            return FakeWatch()
+        return pending.pop(0)
+
+    return factory
+
+
+def make_informer(list_api, retry_seconds=0):
+    return ResourceInformer("Deployment", list_api, "plugins", resync_seconds=3600, retry_seconds=retry_seconds)
+
+
+def test_informer_applies_watch_events_after_list():
+    informer = make_informer(FakeListAPI(([k8s_object("a"), k8s_object("b")], "10")))
+    first_watch = FakeWatch(
+        events=[
+            {"type": "ADDED", "object": k8s_object("c", "11")},
+            {"type": "MODIFIED", "object": k8s_object("a", "12", labels={"app": "a"})},
+            {"type": "DELETED", "object": k8s_object("b", "13")},
+        ]
+    )
+    informer.watch_factory = watch_factory(informer, first_watch)
+    informer.run()
+    assert informer.is_synced()
+    assert first_watch.stream_kwargs["resource_version"] == "10"
+    assert sorted(item.metadata.name for item in informer.list()) == ["a", "c"]
+    assert informer.list(labels={"app": "a"})[0].metadata.resource_version == "12"
+    assert informer.resource_version == "13"
+
+
+def test_informer_relists_when_resource_version_expires():
+    list_api = FakeListAPI(([k8s_object("a")], "10"), ([k8s_object("z")], "20"))
+    informer = make_informer(list_api)
+    informer.watch_factory = watch_factory(informer, FakeWatch(error=ApiException(status=410)), FakeWatch())
+    informer.run()
+    assert list_api.calls == 2
+    assert informer.get("a") is None
+    assert informer.get("z") is not None
+
+
+def test_informer_reconnects_after_failure():
+    list_api = FakeListAPI(([k8s_object("a")], "10"))
+    informer = make_informer(list_api)
+    failed_watch = FakeWatch(error=ConnectionError("connection reset"))
+    informer.watch_factory = watch_factory(informer, failed_watch)
+    original_handle_failure = informer._handle_failure
+    states = []
+
+    def handle_failure(error):
+        original_handle_failure(error)
+        states.append(informer.is_synced())
+
+    informer._handle_failure = handle_failure
+    informer.run()
+    assert states == [False]
+    assert list_api.calls == 2
+    assert informer.is_synced()
+
+
+def test_resource_cache_builds_informers_from_client():
+    kubernetes_client = MagicMock()
+    cache = KubernetesResourceCache(kubernetes_client=kubernetes_client, namespace="plugins", watch_factory=FakeWatch)
+    assert cache.deployments.list_func is kubernetes_client.apps_v1.list_namespaced_deployment
+    assert cache.services.list_func is kubernetes_client.core_v1.list_namespaced_service
+    assert cache.pods.list_func is kubernetes_client.core_v1.list_namespaced_pod
+    assert not cache.is_synced()
+
+
+class SilentWatch(FakeWatch):
+    """A watch on a namespace where nothing changes, stop() only takes effect after the next event"""
+
+    released = threading.Event()
+
+    def stream(self, func, **kwargs):
+        self.released.wait()
+        yield from ()
+
+
+def test_stop_resource_cache_does_not_wait_for_silent_watches():
+    cache = KubernetesResourceCache(kubernetes_client=MagicMock(), namespace="plugins", watch_factory=SilentWatch)
+    for informer in cache.informers:
+        informer.list_func = FakeListAPI(([], "1"))
+    cache.start()
+    assert all(informer.wait_for_sync(1) for informer in cache.informers)
+    try:
+        with (
+            patch.object(kubernetes_util, "_resource_cache", cache),
+            patch.object(kubernetes_util.EnvConf, "cache_stop_timeout_seconds", 0.2),
+        ):
+            started = time.monotonic()
+            kubernetes_util.stop_resource_cache()
+            assert time.monotonic() - started < 1
+            assert kubernetes_util.get_resource_cache() is None
+    finally:
+        SilentWatch.released.set()
+    assert all(informer.join(1) for informer in cache.informers)
+
+
+@pytest.fixture
+def cached_handler():
+    deployments = make_informer(
+        FakeListAPI(
+            (
+                [
+                    k8s_object(
+                        "my-app-id1",
+                        status=SimpleNamespace(
+                            available_replicas=1, conditions=[None, SimpleNamespace(message='ReplicaSet "my-app" has')]
+                        ),
+                        spec=SimpleNamespace(
+                            replicas=1, template=SimpleNamespace(metadata=SimpleNamespace(labels={"app": "my-app-id1"}))
+                        ),
+                    )
+                ],
+                "1",
+            )
+        )
+    )
+    deployments.resync()
+    handler = KubernetesHandler.__new__(KubernetesHandler)
+    handler.namespace = "plugins"
+    handler.deployment_resource = MagicMock()
+    handler.api_v1_resource = MagicMock()
+    handler.resource_cache = SimpleNamespace(deployments=deployments, pods=make_informer(FakeListAPI(([], "1"))))
+    return handler
+
+
+def test_deployment_status_answers_from_cache(cached_handler):
+    status = cached_handler.deployment_status(PodStatus(app_name="my_app", app_id="id1"))
+    assert status == "Pods are running for the deployment"
+    cached_handler.deployment_resource.read_namespaced_deployment.assert_not_called()
+
+
+def test_deployment_status_missing_from_cache(cached_handler):
+    with pytest.raises(DeploymentException):
+        cached_handler.deployment_status(PodStatus(app_name="unknown", app_id="id2"))
+
+
+def test_deployments_status_falls_back_to_api_until_synced(cached_handler):
+    cached_handler.api_v1_resource.list_namespaced_pod.return_value = SimpleNamespace(items=[])
+    statuses = asyncio.run(cached_handler.deployments_status(["my-app-id1"]))
+    assert statuses[0]["replicas"] == 1
+    cached_handler.api_v1_resource.list_namespaced_pod.assert_called_once()
+    cached_handler.deployment_resource.read_namespaced_deployment.assert_not_called()
+
+
+def test_informer_notifies_listeners():
+    informer = make_informer(FakeListAPI(([k8s_object("a")], "10")))
+    notifications = []
+    listener = lambda: notifications.append(informer.get("b") is not None)  # noqa: E731
+    informer.add_listener(listener)
+    informer.resync()
+    informer.apply_event({"type": "ADDED", "object": k8s_object("b", "11")})
+    informer.remove_listener(listener)
+    informer.apply_event({"type": "DELETED", "object": k8s_object("b", "12")})
+    assert notifications == [False, True]
+
+
+def test_watch_deployments_status_returns_on_known_change(cached_handler):
+    cached_handler.resource_cache.pods.resync()
+    statuses = asyncio.run(
+        cached_handler.watch_deployments_status(["my-app-id1"], known={"my-app-id1": "in_progress"}, timeout=5)
+    )
+    assert statuses[0]["status"] == "completed"
+
+
+def test_watch_deployments_status_wakes_up_on_watch_event(cached_handler):
+    pods = cached_handler.resource_cache.pods
+    pods.resync()
+    pod = k8s_object(
+        "my-app-id1-pod",
+        labels={"app": "my-app-id1"},
+        status=SimpleNamespace(
+            container_statuses=[
+                SimpleNamespace(
+                    name="app",
+                    image="app:1",
+                    state=SimpleNamespace(running=None, waiting=SimpleNamespace(reason="ContainerCreating")),
+                )
+            ]
+        ),
+    )
+
+    async def watch():
+        pods.apply_event({"type": "ADDED", "object": pod})
+        waiter = asyncio.create_task(
+            cached_handler.watch_deployments_status(["my-app-id1"], known={"my-app-id1": "in_progress"}, timeout=5)
+        )
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        pod.status.container_statuses[0].state = SimpleNamespace(running=True, waiting=None)
+        await asyncio.to_thread(pods.apply_event, {"type": "MODIFIED", "object": pod})
+        return await asyncio.wait_for(waiter, timeout=2)
+
+    statuses = asyncio.run(watch())
+    assert statuses[0]["status"] == "completed"
+    assert pods._listeners == []
+
+
+def test_watch_deployments_status_times_out(cached_handler):
+    cached_handler.resource_cache.pods.resync()
+    statuses = asyncio.run(
+        cached_handler.watch_deployments_status(["my-app-id1"], known={"my-app-id1": "completed"}, timeout=0.05)
+    )
+    assert statuses[0]["status"] == "completed"
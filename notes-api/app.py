@@ -1,5 +1,14 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from scripts.utils.mongo_utils import create_mongo_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One client per process: its connection pool is shared by every request
+    app.state.mongo_client = create_mongo_client()
+    yield
+    app.state.mongo_client.close()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Standalone Notes API")
+    app = FastAPI(title="Standalone Notes API", lifespan=lifespan)
     return app
@@ -2,7 +2,10 @@ class NotesAPIEndpoints:
     BASE = "/notes"
     LIST_NOTES = "/notes/list"
     CREATE_NOTE = "/notes/create"
-    GET_NOTE = "notes/{note_id}/get"
-    UPDATE_NOTE = "notes/{note_id}/update"
+    GET_NOTE = "/notes/{note_id}/get"
+    UPDATE_NOTE = "/notes/{note_id}/update"
     DELETE_NOTE = "/notes/{note_id}/delete"
     ANALYTICS = "/notes/analytics"
+
+class HealthAPIEndpoints:
+    READY = "/health/ready"
@@ -4,6 +4,11 @@ class AppConfig(BaseSettings):
     MONGO_URI: str
     MONGO_DB_NAME: str
     MONGO_COLLECTION_NAME: str
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 60000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
 
     class Config:
         env_file = ".env"
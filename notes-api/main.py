@@ -1,10 +1,12 @@
 import uvicorn
 from app import create_app
 from scripts.service.notes_service import router as notes_router
+from scripts.service.health_service import router as health_router
 
 app = create_app()
 
 app.include_router(notes_router, tags=["Notes Operations"])
+app.include_router(health_router, tags=["Health"])
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8001, reload=True)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from pymongo.collection import Collection
 from constants.api import NotesAPIEndpoints
 from scripts.handler import notes_handler
 from scripts.models.notes_model import (
@@ -8,17 +9,17 @@ from scripts.models.notes_model import (
     NotesListResponse,
     AnalyticsResponse,
 )
-from bson import ObjectId
+from scripts.utils.mongo_utils import get_notes_collection
 
 router = APIRouter()
 
 @router.get(NotesAPIEndpoints.ANALYTICS, response_model=AnalyticsResponse)
-async def get_analytics():
-    return notes_handler.get_note_analytics()
+def get_analytics(collection: Collection = Depends(get_notes_collection)):
+    return notes_handler.get_note_analytics(collection)
 
 @router.get(NotesAPIEndpoints.LIST_NOTES, response_model=NotesListResponse)
-async def list_notes(limit: int = 10, offset: int = 0):
-    notes = notes_handler.list_notes(limit, offset)
+def list_notes(limit: int = 10, offset: int = 0, collection: Collection = Depends(get_notes_collection)):
+    notes = notes_handler.list_notes(collection, limit, offset)
     formatted = []
     for note in notes:
         formatted.append(
@@ -35,14 +36,14 @@ async def list_notes(limit: int = 10, offset: int = 0):
 
 
 @router.post(NotesAPIEndpoints.CREATE_NOTE)
-async def create_note(payload: NoteCreateRequest):
-    result = notes_handler.create_note(payload.dict())
+def create_note(payload: NoteCreateRequest, collection: Collection = Depends(get_notes_collection)):
+    result = notes_handler.create_note(collection, payload.dict())
     return {"message": "Note created", "note_id": str(result.inserted_id)}
 
 
 @router.get(NotesAPIEndpoints.GET_NOTE, response_model=NoteResponse)
-async def get_note(note_id: str):
-    note = notes_handler.get_note_by_id(note_id)
+def get_note(note_id: str, collection: Collection = Depends(get_notes_collection)):
+    note = notes_handler.get_note_by_id(collection, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return NoteResponse(
@@ -56,16 +57,16 @@ async def get_note(note_id: str):
 
 
 @router.patch(NotesAPIEndpoints.UPDATE_NOTE)
-async def update_note(note_id: str, payload: NoteUpdateRequest):
-    result = notes_handler.update_note(note_id, payload.dict(exclude_unset=True))
+def update_note(note_id: str, payload: NoteUpdateRequest, collection: Collection = Depends(get_notes_collection)):
+    result = notes_handler.update_note(collection, note_id, payload.dict(exclude_unset=True))
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Note not found or nothing to update")
     return {"message": "Note updated"}
 
 
 @router.delete(NotesAPIEndpoints.DELETE_NOTE)
-async def delete_note(note_id: str):
-    result = notes_handler.delete_note(note_id)
+def delete_note(note_id: str, collection: Collection = Depends(get_notes_collection)):
+    result = notes_handler.delete_note(collection, note_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Note not found")
     return {"message": "Note deleted"}
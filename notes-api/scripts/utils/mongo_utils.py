@@ -1,10 +1,29 @@
+from fastapi import Request
 from pymongo import MongoClient
+from pymongo.collection import Collection
 from constants.app_configuration import config
 
-def get_mongo_client():
-    return MongoClient(config.MONGO_URI)
+def create_mongo_client() -> MongoClient:
+    return MongoClient(
+        config.MONGO_URI,
+        maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+        minPoolSize=config.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=config.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    )
 
-def get_notes_collection():
-    client = get_mongo_client()
+def get_mongo_client(request: Request) -> MongoClient:
+    return request.app.state.mongo_client
+
+def get_notes_collection(request: Request) -> Collection:
+    client = get_mongo_client(request)
     db = client[config.MONGO_DB_NAME]
     return db[config.MONGO_COLLECTION_NAME]
+
+def ping_mongo(client: MongoClient) -> bool:
+    try:
+        client.admin.command("ping")
+        return True
+    except Exception:
+        return False
@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo.errors import ServerSelectionTimeoutError
+
+from main import app
+from scripts.utils.mongo_utils import get_mongo_client, get_notes_collection
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient()["notes"]["notes"]
+
+
+@pytest.fixture
+def client(collection):
+    app.dependency_overrides[get_notes_collection] = lambda: collection
+    app.dependency_overrides[get_mongo_client] = lambda: collection.database.client
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def create_note(client, **fields) -> str:
+    response = client.post("/notes/create", json={"title": "Groceries", "content": "Milk", **fields})
+    assert response.status_code == 200
+    return response.json()["note_id"]
+
+
+def test_created_note_can_be_read_back(client, collection):
+    note_id = create_note(client, tags=["home"])
+    assert collection.count_documents({}) == 1
+
+    note = client.get(f"/notes/{note_id}/get").json()
+    assert note["id"] == note_id
+    assert (note["title"], note["content"], note["tags"]) == ("Groceries", "Milk", ["home"])
+    assert note["created_at"] == note["updated_at"]
+
+
+def test_missing_note_is_not_found(client):
+    assert client.get(f"/notes/{ObjectId()}/get").status_code == 404
+
+
+def test_notes_are_listed_with_limit_and_offset(client):
+    for index in range(3):
+        create_note(client, title=f"Note {index}")
+
+    assert len(client.get("/notes/list").json()["notes"]) == 3
+    page = client.get("/notes/list", params={"limit": 1, "offset": 2}).json()["notes"]
+    assert [note["title"] for note in page] == ["Note 2"]
+
+
+def test_update_changes_only_the_given_fields(client):
+    note_id = create_note(client)
+
+    response = client.patch(f"/notes/{note_id}/update", json={"content": "Oat milk"})
+    assert response.status_code == 200
+    note = client.get(f"/notes/{note_id}/get").json()
+    assert (note["title"], note["content"]) == ("Groceries", "Oat milk")
+    assert note["updated_at"] >= note["created_at"]
+
+    assert client.patch(f"/notes/{ObjectId()}/update", json={"content": "x"}).status_code == 404
+
+
+def test_delete_removes_the_note(client, collection):
+    note_id = create_note(client)
+
+    assert client.delete(f"/notes/{note_id}/delete").status_code == 200
+    assert collection.count_documents({}) == 0
+    assert client.delete(f"/notes/{note_id}/delete").status_code == 404
+
+
+def test_analytics_report_total_and_latest_note(client):
+    assert client.get("/notes/analytics").json() == {"total_notes": 0, "latest_created_at": None}
+    create_note(client)
+    note_id = create_note(client)
+
+    analytics = client.get("/notes/analytics").json()
+    assert analytics["total_notes"] == 2
+    assert analytics["latest_created_at"] == client.get(f"/notes/{note_id}/get").json()["created_at"]
+
+
+def test_ready_when_mongo_answers(client):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "mongo": "ok"}
+
+
+def test_not_ready_when_mongo_ping_fails(client):
+    unreachable = MagicMock()
+    unreachable.admin.command.side_effect = ServerSelectionTimeoutError("no servers")
+    app.dependency_overrides[get_mongo_client] = lambda: unreachable
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable", "mongo": "unreachable"}
+    unreachable.admin.command.assert_called_once_with("ping")
@@ -19,6 +19,9 @@ import __version__
 from scripts.config import Services as ServiceConf
 from scripts.services import router
 from scripts.utils import preflight
+from scripts.utils.deployment_tracker import deployment_tracker
+from scripts.utils.http_client import http_pool
+from scripts.utils.notification_dispatcher import notification_dispatcher
 
 app_config = FastAPIConfig(
     title="plugin manager",
@@ -36,3 +39,6 @@ app = generate_fastapi_app(
     routers=[router],
     project_name="plugin-manager",
 )
+app.add_event_handler("shutdown", http_pool.aclose)
+app.add_event_handler("shutdown", deployment_tracker.shutdown)
+app.add_event_handler("shutdown", notification_dispatcher.shutdown)
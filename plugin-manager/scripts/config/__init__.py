@@ -83,6 +83,69 @@ class _ExternalServices(BaseSettings):
     DCP_URL: str = Field(alias="DEVICE_CONTROL_PLANE_URL")
 
 
+class _HTTPClientConf(BaseSettings):
+    MAX_CONNECTIONS: int = 100
+    MAX_KEEPALIVE_CONNECTIONS: int = 20
+    KEEPALIVE_EXPIRY: float = 30
+    HTTP2_ENABLED: bool = True
+    RETRY_ATTEMPTS: int = 3
+    BACKOFF_BASE_SECONDS: float = 0.5
+    BACKOFF_MAX_SECONDS: float = 8
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30
+    TARGET_TIMEOUTS: dict = {}
+
+
+class _DeploymentTrackerConf(BaseSettings):
+    STATUS_WATCH_SECONDS: float = 30
+    STATUS_RETRY_SECONDS: float = 5
+    ROLLOUT_TIMEOUT_SECONDS: float = 1800
+    PLUGIN_SWITCH_TIMEOUT_SECONDS: float = 600
+
+
+class _GitMirrorConf(BaseSettings):
+    MIRROR_CACHE_ENABLED: bool = True
+    MIRROR_CACHE_PATH: str = os.path.join(_BasePathConf().CODE_STORE_PATH, "git_mirrors")
+    MIRROR_CACHE_MAX_REPOS: int = 20
+    MIRROR_CACHE_MAX_SIZE_MB: int = 10240
+
+
+class _BuildCacheConf(BaseSettings):
+    BUILD_CACHE_ENABLED: bool = True
+    BUILD_CACHE_TAG: str = "buildcache"
+
+
+class _QueryPlannerConf(BaseSettings):
+    QUERY_PLANNER_INDEX_TTL_SECONDS: float = 300
+    # "contains" filters on text indexed columns narrow the candidates with $text, which only matches whole words
+    QUERY_PLANNER_TEXT_SEARCH: bool = False
+    QUERY_PLANNER_EXPLAIN: bool = False
+    # How long the total of an unfiltered grid may be served from memory, 0 counts on every request
+    GRID_UNFILTERED_COUNT_TTL_SECONDS: float = 30
+
+
+class _CacheConf(BaseSettings):
+    DB_NAME_CACHE_SIZE: int = 1024
+    DB_NAME_CACHE_TTL_SECONDS: float = 300
+    # Follows writes to the project details DB, needs notify-keyspace-events to include K and g$ on Redis. Without
+    # them, cached database names only pick up a project's changes once DB_NAME_CACHE_TTL_SECONDS have passed
+    PROJECT_DETAILS_KEYSPACE_EVENTS: bool = True
+    CACHE_RECONNECT_SECONDS: float = 5
+    PERMISSION_CACHE_SIZE: int = 2048
+    # Used while keyspace notifications report every permission change, see PERMISSION_KEYSPACE_EVENTS
+    PERMISSION_CACHE_TTL_SECONDS: float = 300
+    # Used when they do not, 0 reads the permissions from Redis on every check so revocations apply at once
+    PERMISSION_CACHE_UNNOTIFIED_TTL_SECONDS: float = 0
+    USER_ROLE_CACHE_SIZE: int = 10000
+    # Role assignments live in Mongo and are changed by other services, only the TTL picks those changes up
+    USER_ROLE_CACHE_TTL_SECONDS: float = 60
+    # Carries "<project_id>__<role_id>" when a role's permissions change and "user:<user_id>" when a user's roles do.
+    # This service only listens, the user management services that edit roles and users have to publish here
+    PERMISSION_CHANGES_CHANNEL: str = "user_role_permission_updates"
+    # Also follows writes to the user role DB, needs notify-keyspace-events to include K and gh on Redis
+    PERMISSION_KEYSPACE_EVENTS: bool = True
+
+
 class _AzureCredentials(BaseSettings):
     azure_container_registry_url: str | None = Field(None, alias="PLUGINS_CONTAINER_REGISTRY_URL")
     azure_registry_username: str | None = Field(None, alias="PLUGINS_CONTAINER_REGISTRY_USERNAME")
@@ -97,6 +160,20 @@ class _MQTTConf(BaseSettings):
     publish_base_topic: str = "ilens/notifications"
 
 
+class _NotificationConf(BaseSettings):
+    NOTIFICATION_QUEUE_SIZE: int = 10000
+    NOTIFICATION_BATCH_SIZE: int = 50
+    # How long the dispatcher waits for more notifications before sending a partial batch
+    NOTIFICATION_BATCH_WAIT_SECONDS: float = 0.2
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BACKOFF_SECONDS: float = 1
+    NOTIFICATION_RETRY_BACKOFF_MAX_SECONDS: float = 60
+    # Publishes notifications the platform rejected straight to MQTT before retrying them
+    NOTIFICATION_MQTT_FALLBACK: bool = True
+    NOTIFICATION_PUBLISH_TIMEOUT_SECONDS: float = 10
+    NOTIFICATION_SHUTDOWN_TIMEOUT_SECONDS: float = 10
+
+
 class _VulnerabilityScanner(BaseSettings):
     VULNERABILITY_SCAN: bool = True
     VULNERABILITY_FOLDER_PATH: str = os.path.join(
@@ -111,6 +188,11 @@ class _VulnerabilityScanner(BaseSettings):
     )
     SONARQUBE_SCAN: bool = True
     ABSOLUTE_CODE_STORE_PATH: str = os.path.join(_BasePathConf().FOLDER_MOUNT_PATH, "code_store/pull_path")
+    SCAN_RESULT_CACHE: bool = True
+    SCAN_RESULT_CACHE_TTL_SECONDS: int = 86400
+    VULNERABILITY_SCAN_TIMEOUT: float = 900
+    ANTIVIRUS_SCAN_TIMEOUT: float = 900
+    SONARQUBE_SCAN_TIMEOUT: float = 1800
 
 
 class _ResourceConfig(BaseSettings):
@@ -145,6 +227,21 @@ class _MinioSettings(BaseSettings):
     MINIO_SECRET_KEY: str = "minio123"
     MINIO_SECURE: bool = False
     MINIO_BUCKET_NAME: str = "plugins"
+    MINIO_REGION: str | None = None
+    MINIO_MAX_POOL_CONNECTIONS: int = 20
+    MINIO_CONNECT_TIMEOUT: float = 10
+    MINIO_READ_TIMEOUT: float = 300
+    MINIO_PART_SIZE: int = 16 * 1024 * 1024
+    MINIO_PRESIGNED_URL_EXPIRY_SECONDS: int = 900
+
+
+class _UploadSessionConf(BaseSettings):
+    UPLOAD_SESSION_PREFIX: str = "uploads/sessions"
+    UPLOAD_SESSION_TTL_SECONDS: int = 86400
+    UPLOAD_SESSION_GC_INTERVAL_SECONDS: int = 3600
+    # MinIO only composes parts of at least 5 MiB, apart from the last one
+    UPLOAD_MIN_CHUNK_SIZE: int = 5 * 1024 * 1024
+    UPLOAD_MAX_CHUNK_SIZE: int = 100 * 1024 * 1024
 
 
 class _ContainerSigningSettings(BaseSettings):
@@ -159,10 +256,15 @@ class _ContainerSigningSettings(BaseSettings):
 
 class _DownloadDockerImage(BaseSettings):
     DOWNLOAD_IMAGE_ENABLED: bool = False
+    EXPORT_WORKERS: int = 2
+    EXPORT_PROGRESS_INTERVAL_SECONDS: float = 2
+    EXPORT_ARTIFACT_TTL_SECONDS: int = 7 * 86400
 
 
 class _KubeflowPortal(BaseSettings):
     IMAGE_PULL_SECRET: str = "kl-azregistry"
+    KUBEFLOW_INDEX_REFRESH_SECONDS: float = 30
+    KUBEFLOW_INDEX_REBUILD_SECONDS: float = 900
 
 
 Services = _Services()
@@ -170,12 +272,20 @@ Databases = _Databases()
 PathConf = _PathConf()
 Secrets = _Secrets()
 ExternalServices = _ExternalServices()
+HTTPClientConf = _HTTPClientConf()
+DeploymentTrackerConf = _DeploymentTrackerConf()
+GitMirrorConf = _GitMirrorConf()
+BuildCacheConf = _BuildCacheConf()
+QueryPlannerConf = _QueryPlannerConf()
+CacheConf = _CacheConf()
 MQTTConf = _MQTTConf()
+NotificationConf = _NotificationConf()
 AzureCredentials = _AzureCredentials()
 VulnerabilityScanner = _VulnerabilityScanner()
 ResourceConfig = _ResourceConfig()
 SonarQubeConfig = _SonarQubeConfig()
 MinioSettings = _MinioSettings()
+UploadSessionConf = _UploadSessionConf()
 ContainerSigningSettings = _ContainerSigningSettings()
 DownloadDockerImage = _DownloadDockerImage()
 KubeflowPortal = _KubeflowPortal()
@@ -186,12 +296,20 @@ __all__ = [
     "PathConf",
     "Secrets",
     "ExternalServices",
+    "HTTPClientConf",
+    "DeploymentTrackerConf",
+    "GitMirrorConf",
+    "BuildCacheConf",
+    "QueryPlannerConf",
+    "CacheConf",
     "MQTTConf",
+    "NotificationConf",
     "AzureCredentials",
     "VulnerabilityScanner",
     "ResourceConfig",
     "SonarQubeConfig",
     "MinioSettings",
+    "UploadSessionConf",
     "ContainerSigningSettings",
     "DownloadDockerImage",
     "KubeflowPortal",
@@ -21,6 +21,11 @@ class _APIEndPoints:
     plugin_env_config = "/plugin-env-config"
     plugin_bundle_upload = "/bundle-upload"
     plugin_v2_bundle_upload = "/v2/bundle-upload"
+    plugin_bundle_stream_upload = "/bundle-upload/stream"
+    upload_sessions = "/upload-sessions"
+    upload_session = f"{upload_sessions}/{{session_id}}"
+    upload_session_chunk = f"{upload_session}/chunks/{{index}}"
+    upload_session_complete = f"{upload_session}/complete"
     plugin_bundle_download = "/bundle-download"
     plugin_report_download = "/download-plugin-report"
     plugin_advance_config = "/plugin-advance-config"
@@ -37,9 +42,13 @@ class _APIEndPoints:
     get_dropdown_elements = "/get-dropdowns"
     get_dependant_dropdown_elements = "/get-dependant-dropdowns"
     update_dropdown_elements = "/update-dropdown"
+    cache_stats = "/cache-stats"
     plugin_securuty_check = "/plugin-security-check"
     download_docker_image = "/initiate-download"
     download_file = "/download-docker-file"
+    image_export_jobs = "/image-export-jobs"
+    image_export_job = f"{image_export_jobs}/{{job_id}}"
+    image_export_job_cancel = f"{image_export_job}/cancel"
     fetch_versions = "/fetch-versions"
 
     protocols_base = "/protocols"
@@ -65,6 +74,7 @@ class _ExternalAPI:
     delete_resources = "/delete-resource"
     status = "/status"
     deployment_status = "/deployment-status"
+    deployment_status_watch = "/deployment-status/watch"
     plugin_logs = "/plugin-logs"
     plugin_switch = "/plugin-switch"
     api_load_configurations = "widget/load_configuration"
@@ -14,6 +14,10 @@ class DatabaseConstants:
     collection_user_recent = "user_recent"
     collection_constants = "constants"
     collection_plugin_security_check = "security_checks"
+    collection_plugin_scan_cache = "scan_result_cache"
+    collection_upload_sessions = "upload_sessions"
+    collection_image_export_jobs = "image_export_jobs"
+    collection_notification_dead_letters = "notification_dead_letters"
 
     collection_plugin_meta = "plugin_meta"
     collection_deployed_plugin = "deployed_plugin"
@@ -32,7 +32,7 @@ class AGGridTableRequest(BaseModel):
 
 class ExternRequest(BaseModel):
     url: str
-    timeout: int
+    timeout: float
     cookies: Optional[Dict]
     params: Optional[Dict]
     auth: Optional[tuple]
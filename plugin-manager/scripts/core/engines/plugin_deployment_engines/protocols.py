@@ -8,6 +8,7 @@ import httpx
 from ut_security_util import create_token
 
 from scripts.config import ExternalServices, PathConf, Secrets
+from scripts.utils.http_client import http_pool
 
 from . import DeploymentEngineMixin
 
@@ -39,24 +40,24 @@ class DeploymentEngine(DeploymentEngineMixin):
                     token=Secrets.token,
                 )
             }
-            with httpx.Client() as client:
-                if call_type == "create":
-                    resp = client.post(
-                        url=f"{ExternalServices.DCP_URL}/ilens_config/create_plugin_protocol",
-                        cookies=cookies,
-                        headers={"project_id": user_details.project_id},
-                        json=data,
-                        timeout=httpx_timeout,
-                    )
-                else:
-                    resp = client.post(
-                        url=f"{ExternalServices.DCP_URL}/ilens_config/protocol_check",
-                        cookies=cookies,
-                        headers={"project_id": user_details.project_id},
-                        json=data,
-                        timeout=httpx_timeout,
-                    )
-                logging.info(f"Resp Code:{resp.status_code}")
+            client = http_pool.get_client()
+            if call_type == "create":
+                resp = client.post(
+                    url=f"{ExternalServices.DCP_URL}/ilens_config/create_plugin_protocol",
+                    cookies=cookies,
+                    headers={"project_id": user_details.project_id},
+                    json=data,
+                    timeout=httpx_timeout,
+                )
+            else:
+                resp = client.post(
+                    url=f"{ExternalServices.DCP_URL}/ilens_config/protocol_check",
+                    cookies=cookies,
+                    headers={"project_id": user_details.project_id},
+                    json=data,
+                    timeout=httpx_timeout,
+                )
+            logging.info(f"Resp Code:{resp.status_code}")
         except Exception as e:
             logging.exception(f"Exception occurred while connecting to server {e}")
         return resp
@@ -1,5 +1,10 @@
 from scripts.db.mongo.plugins.deployed_plugins import DeployedPlugins as DeployedPlugins
+from scripts.db.mongo.plugins.image_export_jobs import ImageExportJobs as ImageExportJobs
+from scripts.db.mongo.plugins.notification_dead_letters import NotificationDeadLetters as NotificationDeadLetters
+from scripts.db.mongo.plugins.plugin_meta import AsyncPluginMeta as AsyncPluginMeta
 from scripts.db.mongo.plugins.plugin_meta import PluginMeta as PluginMeta
+from scripts.db.mongo.plugins.plugin_scan_cache import ScanResultCache as ScanResultCache
+from scripts.db.mongo.plugins.upload_sessions import UploadSessions as UploadSessions
 from scripts.db.mongo.plugins.plugin_vulnerability_report import (
     VulnerablityScanReport as VulnerablityScanReport,
 )
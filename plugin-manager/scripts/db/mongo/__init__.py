@@ -9,6 +9,8 @@ mongo_client = mongo_obj()
 
 CollectionBaseClass = mongo_obj.get_base_class()
 
+AsyncCollectionBaseClass = mongo_obj.get_async_base_class()
+
 
 class MongoBaseSchema(BaseModel):
     pass
@@ -0,0 +1,72 @@
+import datetime
+import logging
+
+from scripts.constants.db_constants import DatabaseConstants
+from scripts.db.mongo import CollectionBaseClass, mongo_client
+
+from . import database
+
+collection_name = DatabaseConstants.collection_image_export_jobs
+
+ACTIVE_JOB_STATUSES = ["queued", "running"]
+FINISHED_ITEM_STATUSES = ["completed", "failed", "cancelled"]
+
+
+class ImageExportJobs(CollectionBaseClass):
+    def __init__(self, project_id=None):
+        super().__init__(
+            mongo_client,
+            database=database,
+            collection=collection_name,
+            project_id=project_id,
+        )
+
+    def create_job(self, job: dict):
+        self.insert_one(job)
+
+    def fetch_job(self, job_id: str) -> dict | None:
+        return self.find_one(query={"job_id": job_id}, filter_dict={"_id": 0})
+
+    def set_status(self, job_id: str, status: str, from_statuses: list | None = None) -> bool:
+        resp = self.update_one(
+            query={"job_id": job_id, "status": {"$in": from_statuses or ACTIVE_JOB_STATUSES}},
+            data={"status": status, "updated_on": datetime.datetime.now(datetime.timezone.utc)},
+        )
+        return resp.matched_count == 1
+
+    def update_item(self, job_id: str, index: int, data: dict) -> bool:
+        """
+        Sets fields of one item while both the job and the item are still in progress
+        :return: False once the job was cancelled or the item finished
+        """
+        resp = self.update_one(
+            query={
+                "job_id": job_id,
+                "status": {"$in": ACTIVE_JOB_STATUSES},
+                f"items.{index}.status": {"$nin": FINISHED_ITEM_STATUSES},
+            },
+            data={
+                **{f"items.{index}.{field}": value for field, value in data.items()},
+                "updated_on": datetime.datetime.now(datetime.timezone.utc),
+            },
+        )
+        return resp.matched_count == 1
+
+    def cancel_items(self, job_id: str) -> int:
+        """Marks every item of the job that has not finished yet as cancelled"""
+        try:
+            collection = self.client[self.database][self.collection]
+            resp = collection.update_one(
+                {"job_id": job_id},
+                {
+                    "$set": {
+                        "items.$[item].status": "cancelled",
+                        "updated_on": datetime.datetime.now(datetime.timezone.utc),
+                    }
+                },
+                array_filters=[{"item.status": {"$nin": FINISHED_ITEM_STATUSES}}],
+            )
+            return resp.modified_count
+        except Exception as e:
+            logging.error(str(e))
+            raise
@@ -0,0 +1,28 @@
+import datetime
+
+from scripts.constants.db_constants import DatabaseConstants
+from scripts.db.mongo import CollectionBaseClass, mongo_client
+
+from . import database
+
+collection_name = DatabaseConstants.collection_notification_dead_letters
+
+
+class NotificationDeadLetters(CollectionBaseClass):
+    """Notifications that could not be delivered, kept with their last error so they can be inspected or resent"""
+
+    def __init__(self, project_id=None):
+        super().__init__(
+            mongo_client,
+            database=database,
+            collection=collection_name,
+            project_id=project_id,
+        )
+
+    def store(self, notifications: list[dict]):
+        failed_on = datetime.datetime.now(datetime.timezone.utc)
+        self.insert_many([{**notification, "failed_on": failed_on} for notification in notifications])
+
+    def fetch_dead_letters(self, user_id: str | None = None, limit: int = 100) -> list[dict]:
+        query = {"user_id": user_id} if user_id else {}
+        return list(self.find(query=query, filter_dict={"_id": 0}, sort=[("failed_on", -1)], limit=limit))
@@ -1,10 +1,16 @@
+import logging
+import threading
+import time
+
 from pymongo.cursor import Cursor
 
+from scripts.config import QueryPlannerConf
 from scripts.constants.db_constants import DatabaseConstants
-from scripts.db.mongo import CollectionBaseClass, mongo_client
+from scripts.db.mongo import AsyncCollectionBaseClass, CollectionBaseClass, mongo_client, mongo_obj
 from scripts.db.schemas import PluginMetaDBSchema
 from scripts.utils.mongo_tools.pipelines import disabeled_actions_pipeline
 from scripts.utils.mongo_tools.query_buidler import AGGridMongoQueryUtil
+from scripts.utils.mongo_tools.query_planner import QueryPlanner
 
 from . import database
 
@@ -12,6 +18,38 @@ collection_name = DatabaseConstants.collection_plugin_meta
 match_aggregation = "$match"
 
 
+class _UnfilteredGridCounts:
+    """
+    Totals of unfiltered plugin grids per database and portal flag, an estimate that may lag behind by
+    GRID_UNFILTERED_COUNT_TTL_SECONDS. Plugins created or deleted through this process drop it right away.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._counts: dict[tuple[str, bool], tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, bool]) -> int | None:
+        with self._lock:
+            cached = self._counts.get(key)
+        if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+        return None
+
+    def set(self, key: tuple[str, bool], count: int):
+        if self.ttl_seconds > 0:
+            with self._lock:
+                self._counts[key] = (time.monotonic(), count)
+
+    def invalidate(self, database: str):
+        with self._lock:
+            for key in [key for key in self._counts if key[0] == database]:
+                del self._counts[key]
+
+
+unfiltered_grid_counts = _UnfilteredGridCounts(ttl_seconds=QueryPlannerConf.GRID_UNFILTERED_COUNT_TTL_SECONDS)
+
+
 class PluginMeta(CollectionBaseClass):
     def __init__(self, project_id=None):
         super().__init__(
@@ -26,23 +64,66 @@ class PluginMeta(CollectionBaseClass):
         if version:
             query["version"] = version
         self.update_one(query=query, data=data, upsert=True)
+        unfiltered_grid_counts.invalidate(self.database)
 
     def update_plugin(self, plugin_id: str, data: dict, version: str = None):
         query = {"plugin_id": plugin_id}
         if "version" in data:
             del data["version"]
+        # A full dump must not reset the revision, but every write moves it on, so buffered deployment writes
+        # computed against the previous state of the document notice this one
+        data.pop("revision", None)
         if version:
             query["version"] = version
-        resp = self.update_one(query=query, data=data)
+        update = {"$inc": {"revision": 1}}
+        if data:
+            update["$set"] = data
+        try:
+            resp = self.client[self.database][self.collection].update_one(query, update)
+        except Exception as e:
+            logging.error(str(e))
+            raise
         return resp.modified_count
 
+    def apply_changes(self, plugin_id: str, changes: dict, revision: int, version: str = None) -> bool:
+        """
+        Sets the given fields if the plugin document is still at the given revision, and moves it to the next one
+        :param plugin_id: Plugin ID
+        :param changes: Field paths and their new values
+        :param revision: Revision the changes were computed against
+        :param version: Plugin version
+        :return: False if the document was changed in the meantime
+        """
+        query = {"plugin_id": plugin_id, "revision": revision if revision else {"$in": [0, None]}}
+        if version:
+            query["version"] = version
+        try:
+            collection = self.client[self.database][self.collection]
+            resp = collection.update_one(query, {"$set": changes, "$inc": {"revision": 1}})
+            return resp.matched_count == 1
+        except Exception as e:
+            logging.error(str(e))
+            raise
+
+    def fetch_fields(self, plugin_id: str, fields: list, version: str = None) -> dict | None:
+        query = {"plugin_id": plugin_id}
+        if version:
+            query["version"] = version
+        return self.find_one(query=query, filter_dict={"_id": 0, "revision": 1, **dict.fromkeys(fields, 1)})
+
     def get_errors(self, plugin_id: str):
         return self.find_one(query={"plugin_id": plugin_id}, filter_dict={"_id": 0, "errors": 1, "plugin_id": 1})
 
     def delete_plugin(self, plugin_id: str) -> int:
         response = self.delete_many({"plugin_id": plugin_id})
+        unfiltered_grid_counts.invalidate(self.database)
         return response.deleted_count
 
+    def delete_plugins(self, plugin_ids: list) -> int:
+        response = self.delete_documents([{"plugin_id": plugin_id} for plugin_id in plugin_ids])
+        unfiltered_grid_counts.invalidate(self.database)
+        return response.deleted_count if response else 0
+
     def fetch_plugin(
         self, plugin_id: str, version: float | None = None, additional_filters: list | None = None
     ) -> PluginMetaDBSchema | None:
@@ -89,18 +170,45 @@ class PluginMeta(CollectionBaseClass):
         required_fields["_id"] = 0
         return self.find(query=filters or {}, skip=skip, limit=limit, filter_dict=required_fields)
 
-    def list_plugin_ag_grid(self, list_request, *, additional_projection: dict | None = None):
-        query_builder = AGGridMongoQueryUtil()
-        sort_stage = {"$sort": {"deployed_on": -1}}
-        query_builder.aggregation_pipeline = [disabeled_actions_pipeline, sort_stage]
+    def list_plugin_ag_grid(self, list_request, *, additional_projection: dict | None = None) -> tuple[list[dict], int]:
+        """
+        :return: Page of the grid, one row per plugin at its current version, and the number of plugins matching
+        the filters. Both come from a single aggregation, except for unfiltered grids whose total is still cached.
+        """
+        # Under a case-insensitive collation the count's $group would merge plugin ids differing only in case
+        planner = QueryPlanner.for_collection(self, collation_allowed=False)
+        query_builder = AGGridMongoQueryUtil(planner=planner)
         if additional_projection is None:
             additional_projection = {}
         additional_projection["current_version"] = 1
-        query = query_builder.build_query(list_request, additional_projection=additional_projection)
-        query.insert(0, self.get_portal_condition(portal=list_request.portal))
-        query.insert(1, {"$addFields": {"current_version": {"$ifNull": ["$current_version", "$version"]}}})
-        query.insert(2, {match_aggregation: {"$expr": {"$eq": ["$current_version", "$version"]}}})
-        return self.aggregate(query)
+        portal_condition = self.get_portal_condition(portal=list_request.portal)
+        row_stages = [
+            {"$addFields": {"current_version": {"$ifNull": ["$current_version", "$version"]}}},
+            {match_aggregation: {"$expr": {"$eq": ["$current_version", "$version"]}}},
+            disabeled_actions_pipeline,
+            {"$sort": {"deployed_on": -1}},
+        ]
+        filtered = bool(list_request.filters and list_request.filters.filter_model)
+        count_key = (self.database, bool(list_request.portal))
+        count = None if filtered else unfiltered_grid_counts.get(count_key)
+        if count is not None:
+            query_builder.aggregation_pipeline = [portal_condition, *row_stages]
+            query = query_builder.build_query(list_request, additional_projection=additional_projection)
+            return list(self.aggregate(query)), count
+
+        query = query_builder.build_facet_query(
+            list_request,
+            row_stages=row_stages,
+            count_stages=[{"$group": {"_id": "$plugin_id"}}],
+            additional_projection=additional_projection,
+        )
+        query = planner.plan([portal_condition, *query])
+        planner.explain(self, query)
+        result = next(iter(self.aggregate(query, **planner.aggregate_options())), None) or {}
+        count = result["count"][0]["count"] if result.get("count") else 0
+        if not filtered:
+            unfiltered_grid_counts.set(count_key, count)
+        return result.get("rows", []), count
 
     @staticmethod
     def get_portal_condition(portal: bool) -> dict:
@@ -109,18 +217,6 @@ class PluginMeta(CollectionBaseClass):
         else:
             return {match_aggregation: {"$or": [{"portal": portal}, {"portal": {"$exists": False}}]}}
 
-    def get_counts_ag_grid(self, list_request):
-        query_builder = AGGridMongoQueryUtil()
-        query = query_builder.build_query(list_request)
-        query.insert(0, self.get_portal_condition(portal=list_request.portal))
-        new_query = [each_stage for each_stage in query if "$skip" not in each_stage and "$limit" not in each_stage]
-        new_query.append({"$group": {"_id": "$plugin_id"}})
-        new_query.append({"$count": "count"})
-        count_data = list(self.aggregate(new_query))
-        if count_data and isinstance(count_data[0], dict):
-            return count_data[0].get("count")
-        return 0
-
     def get_all_count(self, filters: dict | None = None):
         return self.count_documents(filters)
 
@@ -131,6 +227,44 @@ class PluginMeta(CollectionBaseClass):
     def fetch_by_git_target(self, git_target_id: str):
         return self.find_one(query={"git_target_id": git_target_id}, filter_dict={"_id": 0, "plugin_id": 1})
 
+    def fetch_listing_states(self, plugin_ids: list) -> list:
+        """
+        Fetch the status fields of every version of the given plugins in a single round trip
+        :param plugin_ids: Plugin IDs present on the grid page
+        :return: List of documents with the fields needed to resolve listing status and disabled actions
+        """
+        if not plugin_ids:
+            return []
+        return list(
+            self.find(
+                query={"plugin_id": {"$in": list(plugin_ids)}},
+                filter_dict={
+                    "_id": 0,
+                    "plugin_id": 1,
+                    "version": 1,
+                    "status": 1,
+                    "deployment_status": 1,
+                    "plugin_type": 1,
+                    "current_version": 1,
+                },
+            )
+        )
+
     def fetch_plugin_versions(self, plugin_id: str) -> list:
         cursor = self.find(query={"plugin_id": plugin_id}, filter_dict={"_id": 0, "version": 1})
         return [doc["version"] for doc in cursor if "version" in doc]
+
+
+class AsyncPluginMeta(AsyncCollectionBaseClass):
+    """Reads of the plugin collection for async routes, so they do not block the event loop on Mongo"""
+
+    def __init__(self, project_id=None):
+        super().__init__(
+            mongo_obj.get_async_client(),
+            database=database,
+            collection=collection_name,
+            project_id=project_id,
+        )
+
+    async def get_errors(self, plugin_id: str):
+        return await self.find_one(query={"plugin_id": plugin_id}, filter_dict={"_id": 0, "errors": 1, "plugin_id": 1})
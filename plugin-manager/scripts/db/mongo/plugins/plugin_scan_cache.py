@@ -0,0 +1,33 @@
+import datetime
+
+from scripts.constants.db_constants import DatabaseConstants
+from scripts.db.mongo import CollectionBaseClass, mongo_client
+
+from . import database
+
+collection_name = DatabaseConstants.collection_plugin_scan_cache
+
+
+class ScanResultCache(CollectionBaseClass):
+    def __init__(self, project_id=None):
+        super().__init__(
+            mongo_client,
+            database=database,
+            collection=collection_name,
+            project_id=project_id,
+        )
+
+    def get_result(self, scanner: str, digest: str, max_age_seconds: int) -> dict | None:
+        oldest = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=max_age_seconds)
+        record = self.find_one(
+            query={"scanner": scanner, "digest": digest, "scanned_on": {"$gte": oldest}},
+            filter_dict={"_id": 0, "result": 1},
+        )
+        return record.get("result") if record else None
+
+    def save_result(self, scanner: str, digest: str, result):
+        self.update_one(
+            query={"scanner": scanner, "digest": digest},
+            data={"result": result, "scanned_on": datetime.datetime.now(datetime.timezone.utc)},
+            upsert=True,
+        )
@@ -0,0 +1,54 @@
+import datetime
+
+from scripts.constants.db_constants import DatabaseConstants
+from scripts.db.mongo import CollectionBaseClass, mongo_client
+
+from . import database
+
+collection_name = DatabaseConstants.collection_upload_sessions
+
+
+class UploadSessions(CollectionBaseClass):
+    def __init__(self, project_id=None):
+        super().__init__(
+            mongo_client,
+            database=database,
+            collection=collection_name,
+            project_id=project_id,
+        )
+
+    def create_session(self, session: dict):
+        self.insert_one(session)
+
+    def fetch_session(self, session_id: str) -> dict | None:
+        return self.find_one(query={"session_id": session_id}, filter_dict={"_id": 0})
+
+    def record_chunk(self, session_id: str, index: int, chunk: dict) -> bool:
+        """
+        Records a received chunk under its index, so chunks can arrive in any order and in parallel
+        :return: False if the session is no longer accepting chunks
+        """
+        resp = self.update_one(
+            query={"session_id": session_id, "status": "open"},
+            data={f"chunks.{index}": chunk, "updated_on": datetime.datetime.now(datetime.timezone.utc)},
+        )
+        return resp.matched_count == 1
+
+    def set_status(self, session_id: str, status: str, from_status: str = "open") -> bool:
+        resp = self.update_one(
+            query={"session_id": session_id, "status": from_status},
+            data={"status": status, "updated_on": datetime.datetime.now(datetime.timezone.utc)},
+        )
+        return resp.matched_count == 1
+
+    def fetch_abandoned(self, idle_seconds: int) -> list:
+        oldest = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=idle_seconds)
+        return list(
+            self.find(
+                query={"updated_on": {"$lt": oldest}},
+                filter_dict={"_id": 0, "session_id": 1, "status": 1, "chunks": 1},
+            )
+        )
+
+    def delete_session(self, session_id: str) -> int:
+        return self.delete_one({"session_id": session_id}).deleted_count
@@ -17,6 +17,19 @@ class SecurityChecks(BaseModel):
     sonarqube: bool | None = None
 
 
+class BuildStepMetrics(BaseModel):
+    instruction: str
+    cached: bool = False
+    duration_seconds: float = 0
+
+
+class BuildMetrics(BaseModel):
+    steps: list[BuildStepMetrics] = []
+    cache_hit_ratio: float = 0
+    duration_seconds: float = 0
+    cache_imported: bool = False
+
+
 class PluginMetaDBSchema(BaseModel):
     additional_fields: list = []
     base_executor: Literal["python"] = "python"
@@ -61,6 +74,8 @@ class PluginMetaDBSchema(BaseModel):
     security_checks: SecurityChecks | None = SecurityChecks()
     portal: bool = False
     current_version: str | float | None = None
+    build_metrics: BuildMetrics | None = None
+    revision: int = 0
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -47,6 +47,24 @@ class UserNotFound(ILensErrors):
     """
 
 
+class PluginWriteConflict(ILensErrors):
+    """
+    Raise when buffered plugin changes keep conflicting with concurrent writes
+    """
+
+
+class UploadSessionError(ILensErrors):
+    """
+    Raise when an upload session is unknown, closed or given an invalid chunk
+    """
+
+
+class ImageExportError(ILensErrors):
+    """
+    Raise when an image export job is unknown, already finished or cannot export a plugin
+    """
+
+
 class AlreadyDeployedError(ILensErrors):
     """
     Raise when its already deployed
@@ -83,6 +101,12 @@ class SonarqubeScanFailed(ILensErrors):
     """
 
 
+class VulnerabilityScanFailed(ILensErrors):
+    """
+    Raise when the image vulnerability scan fails or times out
+    """
+
+
 class KubeflowPipelineConfigNotFound(ILensErrors):
     """
     Raise when Kubeflow Pipeline Config is not found
@@ -105,3 +129,9 @@ class VerficiationError(ILensErrors):
     """
     Raise when verification fails
     """
+
+
+class CircuitOpenError(ILensErrors):
+    """
+    Raise when an external service is skipped because its circuit breaker is open
+    """
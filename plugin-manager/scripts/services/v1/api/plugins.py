@@ -13,7 +13,7 @@ from fastapi import (
     UploadFile,
     HTTPException,
 )
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse
 from ut_security_util import MetaInfoSchema, create_token
 from scripts.utils.rbac import RBAC
 
@@ -23,7 +23,7 @@ from scripts.core.engines.plugin_deployment_engines.widget import (
     DeploymentEngine as WidgetPlEngine,
 )
 from scripts.errors import ContentTypeError, ILensErrors, VerficiationError
-from scripts.services.v1.handler import DeploymentHandler, PluginHandler
+from scripts.services.v1.handler import DeploymentHandler, ImageExportHandler, PluginHandler, UploadSessionHandler
 from scripts.services.v1.schemas import (
     ConfigurationSave,
     DefaultFailureResponse,
@@ -35,6 +35,7 @@ from scripts.services.v1.schemas import (
     SwitchPluginState,
     DeletePlugins,
     PluginDownloadRequest,
+    UploadSessionCreate,
 )
 from scripts.utils.decorators import validate_deco
 
@@ -111,8 +112,7 @@ def delete_plugin(user_details: MetaInfoSchema, request_data: DeletePlugins, bg_
     handler = PluginHandler(user_details.project_id)
 
     try:
-        for plugin_id in plugin_ids:
-            data = handler.delete_plugin(plugin_id, bg_task=bg_task, user_details=user_details)
+        data = handler.delete_plugins(plugin_ids, bg_task=bg_task, user_details=user_details)
         return DefaultResponse(message="Plugin deleted successfully", data=data)
     except ILensErrors as ile:
         return DefaultFailureResponse(message=ile.message)
@@ -147,7 +147,7 @@ def save_configurations(user_details: MetaInfoSchema, configuration_req: Configu
     APIEndPoints.plugin_deploy,
     dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["create", "edit"]))],
 )
-#@validate_deco
+# @validate_deco
 def deploy_plugin(
     user_details: MetaInfoSchema,
     plugin_data: DeployPlugin,
@@ -236,14 +236,14 @@ def download_uploaded_files(user_details: MetaInfoSchema, plugin_id: str, file_n
 
 
 @router.get(APIEndPoints.get_errors, dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["view"]))])
-def get_errors(user_details: MetaInfoSchema, plugin_id: str):
+async def get_errors(user_details: MetaInfoSchema, plugin_id: str):
     """
     The get_errors function is used to fetch the errors of a plugin.
 
     """
     try:
         handler = PluginHandler(project_id=user_details.project_id)
-        data = handler.get_errors(plugin_id=plugin_id)
+        data = await handler.get_errors(plugin_id=plugin_id)
         return DefaultResponse(message="Errors fetched successfully", data=data)
     except ILensErrors as ile:
         return DefaultFailureResponse(message=ile.message)
@@ -497,13 +497,12 @@ def get_plugin_details(user_details: MetaInfoSchema, plugin_id: str):
 @router.get(
     APIEndPoints.plugin_env_config, dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["view"]))]
 )
-def get_plugin_env_config(user_details: MetaInfoSchema):
+async def get_plugin_env_config(user_details: MetaInfoSchema):
     """
     The get_plugin_env_config function fetches configurable environment variable types for a plugin.
     """
     try:
-        handler = PluginHandler(user_details.project_id)
-        data = handler.fetch_plugin_env_config()
+        data = await PluginHandler.fetch_plugin_env_config_async()
         return DefaultResponse(message="Plugin env config fetched successfully", data=data)
     except ILensErrors as ile:
         return DefaultFailureResponse(message=ile.message)
@@ -539,6 +538,107 @@ async def upload_bundle_v2(
         return DefaultFailureResponse(message="Failed", error=str(e))
 
 
+@router.post(
+    APIEndPoints.upload_sessions,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["create", "edit"]))],
+)
+def create_upload_session(user_details: MetaInfoSchema, request: UploadSessionCreate, bg_task: BackgroundTasks):
+    """
+    The create_upload_session function starts a resumable bundle upload, whose chunks can then be sent in any order.
+    """
+    try:
+        handler = UploadSessionHandler(project_id=user_details.project_id)
+        data = handler.create_session(request, user_details)
+        bg_task.add_task(handler.collect_abandoned_sessions_periodically)
+        return DefaultResponse(message="Upload session created", data=data)
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
+@router.put(
+    APIEndPoints.upload_session_chunk,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["create", "edit"]))],
+)
+def upload_session_chunk(
+    user_details: MetaInfoSchema,
+    session_id: str,
+    index: int,
+    files: UploadFile = File(...),
+    checksum: Annotated[str | None, Form()] = None,
+):
+    """
+    The upload_session_chunk function stores one chunk of an upload session; sending a chunk again replaces it.
+    """
+    try:
+        handler = UploadSessionHandler(project_id=user_details.project_id)
+        data = handler.save_chunk(session_id, index, files.file.read(), checksum=checksum)
+        return DefaultResponse(message="Chunk uploaded", data=data)
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
+@router.get(
+    APIEndPoints.upload_session,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["view"]))],
+)
+def get_upload_session(user_details: MetaInfoSchema, session_id: str):
+    """
+    The get_upload_session function reports the progress of an upload session, including the chunks still missing.
+    """
+    try:
+        handler = UploadSessionHandler(project_id=user_details.project_id)
+        return DefaultResponse(message="Upload session fetched", data=handler.get_status(session_id))
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
+@router.post(
+    APIEndPoints.upload_session_complete,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["create", "edit"]))],
+)
+def complete_upload_session(user_details: MetaInfoSchema, session_id: str):
+    """
+    The complete_upload_session function assembles the uploaded chunks into the plugin bundle in MinIO.
+    """
+    try:
+        handler = UploadSessionHandler(project_id=user_details.project_id)
+        path = handler.complete_session(session_id)
+        return DefaultResponse(message=Message.bundle_message, data={"path": path})
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
+@router.delete(
+    APIEndPoints.upload_session,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["create", "edit"]))],
+)
+def abort_upload_session(user_details: MetaInfoSchema, session_id: str):
+    """
+    The abort_upload_session function discards an upload session and the chunks received so far.
+    """
+    try:
+        handler = UploadSessionHandler(project_id=user_details.project_id)
+        handler.abort_session(session_id)
+        return DefaultResponse(message="Upload session aborted")
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
 @router.post(
     APIEndPoints.plugin_bundle_upload,
     dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["create", "edit"]))],
@@ -563,6 +663,32 @@ def upload_bundle(
         return DefaultFailureResponse(message="Failed", error=str(e))
 
 
+@router.put(
+    APIEndPoints.plugin_bundle_stream_upload,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["create", "edit"]))],
+)
+async def stream_bundle(user_details: MetaInfoSchema, request: Request, plugin_id: str, version: float, file_name: str):
+    """
+    The stream_bundle function uploads the raw request body as the bundle of a plugin for registration type Bundle
+    Upload, passing it on to MinIO while it is being received.
+    """
+    try:
+        handler = PluginHandler(project_id=user_details.project_id)
+        path = await handler.stream_bundle_to_minio(
+            plugin_id=plugin_id,
+            version=version,
+            file_name=file_name,
+            body=request.stream(),
+            user_details=user_details,
+        )
+        return DefaultResponse(message=Message.bundle_message, data={"path": path})
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
 @router.post("/finalize-upload/")
 def finalize_upload(user_details: MetaInfoSchema, file_name: str = Form(...), plugin_id: str = Form(...)):
     try:
@@ -581,22 +707,18 @@ def finalize_upload(user_details: MetaInfoSchema, file_name: str = Form(...), pl
     APIEndPoints.plugin_bundle_download,
     dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["view"]))],
 )
-def download_bundle(user_details: MetaInfoSchema, plugin_id: str):
+def download_bundle(user_details: MetaInfoSchema, plugin_id: str, version: float | None = None):
     """
-    The download_bundle function is used to download the uploaded bundle for a plugin.
+    The download_bundle function redirects to a short-lived presigned MinIO URL of the uploaded bundle for a plugin,
+    so the bundle is downloaded from MinIO directly.
     """
     try:
         handler = PluginHandler(project_id=user_details.project_id)
-        file_path = None
-        if file_path := handler.download_plugin_bundle(plugin_id=plugin_id):
-            return FileResponse(file_path, filename=file_path.split("/")[-1])
+        return RedirectResponse(handler.download_plugin_bundle(plugin_id=plugin_id, version=version))
     except ILensErrors as ile:
         return DefaultFailureResponse(message=ile.message)
     except Exception as e:
         return DefaultFailureResponse(message="Failed", error=str(e))
-    finally:
-        if file_path:
-            os.remove(file_path)
 
 
 @router.post(
@@ -606,31 +728,56 @@ def download_docker_image(
     user_details: MetaInfoSchema, request: PluginDownloadRequest, background_tasks: BackgroundTasks
 ):
     """
-    The download_docker_image function is used to download Docker images for plugins.
+    The download_docker_image function starts a job exporting the Docker images of the requested plugins.
+    Its progress is polled through the image export job endpoint.
     """
     try:
         if request.portal:
             DownloadDockerImage.DOWNLOAD_IMAGE_ENABLED = True
         if not DownloadDockerImage.DOWNLOAD_IMAGE_ENABLED:
             raise HTTPException(status_code=401, detail="Download Artifact is not allowed")
-        for plugin_id in request.plugin_ids:
-            handler = PluginHandler(user_details.project_id)
-            plugin_data = handler.get_plugin(plugin_id, request.version)
-            if not plugin_data:
-                raise HTTPException(status_code=404, detail=Message.plugin_not_found)
-
-            local_image_dir = PathConf.LOCAL_IMAGE_PATH / f"{plugin_data.name}"
-            local_image_path = local_image_dir / "plugin.tar"
-            if local_image_path.exists():
-                os.remove(local_image_path)
-                logging.info(f"Deleted existing tar file: {local_image_path}")
-
-            if plugin_data.plugin_type != "kubeflow":
-                background_tasks.add_task(handler.docker_image_download, plugin_data, plugin_id, user_details)
-            else:
-                background_tasks.add_task(handler.docker_image_download_kubeflow, plugin_data, plugin_id, user_details)
-
-        return DefaultResponse(message="Download in progress. You will be notified once it is complete.")
+        handler = ImageExportHandler(user_details.project_id)
+        job = handler.create_job(request, user_details)
+        background_tasks.add_task(handler.run_job, job["job_id"], user_details)
+        return DefaultResponse(
+            message="Download in progress. You will be notified once it is complete.", data={"job_id": job["job_id"]}
+        )
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
+@router.get(
+    APIEndPoints.image_export_job, dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["view"]))]
+)
+def get_image_export_job(user_details: MetaInfoSchema, job_id: str):
+    """
+    The get_image_export_job function returns the status and per plugin progress of an image export job.
+    """
+    try:
+        handler = ImageExportHandler(user_details.project_id)
+        return DefaultResponse(message="success", data=handler.get_job(job_id))
+    except ILensErrors as ile:
+        return DefaultFailureResponse(message=ile.message)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
+
+
+@router.post(
+    APIEndPoints.image_export_job_cancel,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["view"]))],
+)
+def cancel_image_export_job(user_details: MetaInfoSchema, job_id: str):
+    """
+    The cancel_image_export_job function cancels an image export job. Exports shared with other jobs keep running.
+    """
+    try:
+        handler = ImageExportHandler(user_details.project_id)
+        handler.cancel_job(job_id)
+        return DefaultResponse(message="Image export job cancelled")
     except ILensErrors as ile:
         return DefaultFailureResponse(message=ile.message)
     except Exception as e:
@@ -4,7 +4,8 @@ from typing import Annotated, Any
 from fastapi import APIRouter, Body, Depends
 from fastapi.responses import Response
 from ut_security_util import MetaInfoSchema
-from scripts.utils.rbac import RBAC
+from scripts.utils.db_name_util import db_prefix_cache
+from scripts.utils.rbac import RBAC, permission_cache, user_role_cache
 
 from scripts.constants import APIEndPoints
 from scripts.services.v1.handler import UIServiceHandler
@@ -70,3 +71,21 @@ def get_dependant_dropdown(user_details: MetaInfoSchema, parent: str, portal: bo
     except Exception as e:
         logging.exception(e)
         return DefaultFailureResponse(message="Failed", error=str(e))
+
+
+@router.get(
+    APIEndPoints.cache_stats,
+    dependencies=[Depends(RBAC(entity_name="developerPlugins", operation=["view"]))],
+    include_in_schema=False,
+)
+def get_cache_stats():
+    try:
+        data = {
+            "db_names": db_prefix_cache.stats(),
+            "permissions": permission_cache.stats(),
+            "user_roles": user_role_cache.stats(),
+        }
+        return DefaultResponse(message="Cache stats fetched successfully", data=data)
+    except Exception as e:
+        logging.exception(e)
+        return DefaultFailureResponse(message="Failed", error=str(e))
@@ -1,4 +1,6 @@
 from .deployment import DeploymentHandler
+from .image_exports import ImageExportHandler
 from .plugins import PluginHandler
 from .ui_service_handler import UIServiceHandler
+from .upload_sessions import UploadSessionHandler
 from scripts.utils.notification_util import push_notification
@@ -1,9 +1,9 @@
 import datetime
+import functools
 import json
 import logging
 import os
 import shutil
-import time
 import zipfile
 from importlib import import_module
 from pathlib import Path
@@ -20,6 +20,7 @@ import copy
 
 from scripts.config import (
     AzureCredentials,
+    DeploymentTrackerConf,
     ExternalServices,
     MinioSettings,
     PathConf,
@@ -36,7 +37,7 @@ from scripts.constants import (
 )
 from scripts.constants.api import ExternalAPI
 from scripts.core.engines.plugin_deployment_engines import DeploymentEngineMixin
-from scripts.db import PluginMeta, VulnerablityScanReport
+from scripts.db import PluginMeta, ScanResultCache, VulnerablityScanReport
 from scripts.db.mongo.ilens_configurations.collections.git_target import GitTarget
 from scripts.db.mongo.ilens_widget.widget_plugin import WidgetPlugins
 from scripts.db.schemas import PluginMetaDBSchema
@@ -47,17 +48,29 @@ from scripts.errors import (
     KubeflowPipelineConfigNotFound,
     ManifestError,
     PluginNotFoundError,
+    PluginWriteConflict,
     SonarqubeScanFailed,
     VerficiationError,
+    VulnerabilityScanFailed,
 )
 from scripts.services.v1.schemas import DefaultResourceConfig
 from scripts.services.v1.schemas import DeployPlugin as DeployPluginInputData
 from scripts.utils.common_util import hit_external_service
+from scripts.utils.deployment_tracker import deployment_tracker
 from scripts.utils.docker_util import DockerUtil
 from scripts.utils.external_services import deploy_plugin_request
 from scripts.utils.git_tools import pull_code_from_git
-from scripts.utils.minio_util import MinioUtility
+from scripts.utils.kubeflow_index import kubeflow_index
+from scripts.utils.minio_util import get_minio_utility
 from scripts.utils.notification_util import NotificationSchema, push_notification
+from scripts.utils.plugin_write_buffer import PluginWriteBuffer
+from scripts.utils.scan_orchestrator import (
+    ScanOrchestrator,
+    ScanOutcome,
+    image_digest,
+    scan_container_name,
+    source_tree_digest,
+)
 from scripts.utils.sonarqube_scan import SonarQubeScan
 from scripts.utils.common_util import extract_packages_and_image_from_yaml
 
@@ -65,6 +78,8 @@ PIPELINE_YML_FILENAME = "pipeline.yml"
 DEPLOYMENT_STARTED = "Deployment Started"
 DEPLOYMENT_FAILED = "Deployment Failed"
 SCANNING_PROGRESS = "Scanning in progress"
+VULNERABILITY_SCAN_FAILED = "Vulnerability Scan Failed"
+DEPLOYMENT_IN_PROGRESS = "Deployment in progress"
 
 
 class DeploymentHandler:
@@ -74,6 +89,17 @@ class DeploymentHandler:
         self.widget_db_conn = WidgetPlugins(project_id=project_id)
         self.docker = DockerUtil()
         self.git_target_conn = GitTarget(project_id=project_id)
+        self.scan_orchestrator = ScanOrchestrator(cache=ScanResultCache(project_id=project_id))
+        self._write_buffer: PluginWriteBuffer | None = None
+
+    @property
+    def plugin_writes(self):
+        """Receives the plugin changes of pipeline stages: buffered while a deployment runs, direct otherwise"""
+        return self._write_buffer or self.plugin_db_conn
+
+    def _flush_stage(self, stage: str):
+        if self._write_buffer:
+            self._write_buffer.flush(stage)
 
     def deploy_plugin(
         self,
@@ -95,6 +121,8 @@ class DeploymentHandler:
             logging.exception(msg)
             raise AlreadyDeployedError(msg)
         logging.debug("Redeploying Resources")
+        # Taken before the changes below, so that they are part of the first write of the deployment
+        write_buffer = PluginWriteBuffer(self.plugin_db_conn, db_data)
 
         db_data.deployed_by = plugin_data.deployed_by
         db_data.deployed_on = datetime.datetime.now().replace(tzinfo=ZoneInfo("UTC"))
@@ -104,6 +132,7 @@ class DeploymentHandler:
             self.deploy_and_register,
             plugin_data=db_data,
             user_details=user_details,
+            write_buffer=write_buffer,
         )
         if db_data.plugin_type in job_types and db_data.plugin_type != "kubeflow" and not plugin_data.portal:
             bg_task.add_task(
@@ -113,7 +142,13 @@ class DeploymentHandler:
                 user_details=user_details,
             )
 
-    def deploy_and_register(self, plugin_data: PluginMetaDBSchema, user_details: MetaInfoSchema):
+    def deploy_and_register(
+        self,
+        plugin_data: PluginMetaDBSchema,
+        user_details: MetaInfoSchema,
+        write_buffer: PluginWriteBuffer | None = None,
+    ):
+        self._write_buffer = write_buffer or PluginWriteBuffer(self.plugin_db_conn, plugin_data)
         notification = NotificationSchema(
             message=f"Plugin: {plugin_data.name} has been registered successfully",
             plugin_type=plugin_data.plugin_type,
@@ -159,9 +194,22 @@ class DeploymentHandler:
                 plugin_data.deployment_status = "failed"
             if any([plugin_data.plugin_type not in job_types, plugin_data.errors]):
                 push_notification(user_id=user_details.user_id, notification=notification, project_id=self.project_id)
-            self.plugin_db_conn.update_plugin(
-                plugin_id=plugin_data.plugin_id, data=plugin_data.model_dump(), version=plugin_data.version
-            )
+            try:
+                self.plugin_writes.update_plugin(
+                    plugin_id=plugin_data.plugin_id, data=plugin_data.model_dump(), version=plugin_data.version
+                )
+                self._flush_stage("register")
+            except (PluginWriteConflict, PluginNotFoundError) as e:
+                # Still record the outcome, the rest of the stage is lost with the buffer
+                logging.exception(f"Unable to write the registration of plugin {plugin_data.plugin_id}: {e}")
+                outcome = {"deployment_status": plugin_data.deployment_status, "errors": plugin_data.errors}
+                if plugin_data.errors:
+                    outcome["status"] = DEPLOYMENT_FAILED
+                self.plugin_db_conn.update_plugin(
+                    plugin_id=plugin_data.plugin_id, data=outcome, version=plugin_data.version
+                )
+            finally:
+                self._write_buffer = None
 
     def delete_kubeflow_local(self, plugin_data: PluginMetaDBSchema):
         local_image_dir = PathConf.LOCAL_IMAGE_PATH
@@ -276,12 +324,11 @@ class DeploymentHandler:
         elif plugin_data.plugin_type in ["custom_app", "formio_component"]:
             self.find_plugin_configuration(plugin_data.name, plugin_data.plugin_id, folder_path)
         plugin_data.deployment_status = "scanning"
-        self.plugin_db_conn.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
-        self.antivirus_scan(plugin_data)
-        self.sonarqube_scan(plugin_data)
+        self.plugin_writes.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self.scan_plugin_source(plugin_data, folder_path)
 
     def _handle_kubeflow_plugin_git(self, plugin_data, user_details, folder_path):
-        self.plugin_db_conn.update_plugin(
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id, {"status": DEPLOYMENT_STARTED}, version=plugin_data.version
         )
         if not plugin_data.portal and self.configure_kubeflow_pipeline(plugin_data, user_details, folder_path):
@@ -292,7 +339,7 @@ class DeploymentHandler:
                 output_file_path=folder_path / "kubeflow_requirements.txt",
                 name=plugin_data.name,
             )
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id, {"status": SCANNING_PROGRESS, "version": plugin_data.version}
             )
 
@@ -319,12 +366,7 @@ class DeploymentHandler:
             download_path = Path(PathConf.CODE_STORE_PATH / "pull_path")
             download_path.mkdir(parents=True, exist_ok=True)
             download_path = download_path / f"{plugin_data.name}/{plugin_data.plugin_id}/"
-            MinioUtility(
-                endpoint=MinioSettings.MINIO_ENDPOINT,
-                access_key=MinioSettings.MINIO_ACCESS_KEY,
-                secret_key=MinioSettings.MINIO_SECRET_KEY,
-                secure=MinioSettings.MINIO_SECURE,
-            ).download_object(
+            get_minio_utility().download_object(
                 bucket_name=MinioSettings.MINIO_BUCKET_NAME,
                 object_name=plugin_data.minio_file_path,
                 file_path=str(f"{download_path}/{file_name}"),
@@ -338,11 +380,11 @@ class DeploymentHandler:
                 )
                 return plugin_data
             if not self.docker.container_blob_verifying(f"{str(download_path)}/{zip_file_name}"):
-                self.plugin_db_conn.update_plugin(
+                self.plugin_writes.update_plugin(
                     plugin_data.plugin_id, {"status": "Verification Failed"}, version=plugin_data.version
                 )
                 raise VerficiationError("Blob verification failed")
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id, {"status": "Verification Success"}, version=plugin_data.version
             )
             new_image_name = f"{plugin_data.name}-{plugin_data.plugin_type}:{plugin_data.version}".lower().replace(
@@ -397,12 +439,7 @@ class DeploymentHandler:
         return download_path / f"{plugin_data.name}/{plugin_data.plugin_id}/"
 
     def _download_and_extract_file(self, plugin_data, file_name, download_path):
-        MinioUtility(
-            endpoint=MinioSettings.MINIO_ENDPOINT,
-            access_key=MinioSettings.MINIO_ACCESS_KEY,
-            secret_key=MinioSettings.MINIO_SECRET_KEY,
-            secure=MinioSettings.MINIO_SECURE,
-        ).download_object(
+        get_minio_utility().download_object(
             bucket_name=MinioSettings.MINIO_BUCKET_NAME,
             object_name=plugin_data.minio_file_path,
             file_path=str(f"{download_path}/{file_name}"),
@@ -422,23 +459,22 @@ class DeploymentHandler:
 
     def _handle_job_type_plugin(self, plugin_data, folder_path):
         plugin_data.deployment_status = "scanning"
-        self.plugin_db_conn.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self.plugin_writes.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
         if plugin_data.plugin_type == "widget":
             logging.info(f"Finding widget configuration {folder_path}")
             self.find_widget_configuration(plugin_data.name, plugin_data.plugin_id, folder_path)
         elif plugin_data.plugin_type in ["custom_app", "formio_component"]:
             self.find_plugin_configuration(plugin_data.name, plugin_data.plugin_id, folder_path)
-        self.antivirus_scan(plugin_data)
-        self.sonarqube_scan(plugin_data)
+        self.scan_plugin_source(plugin_data, folder_path)
 
     def _handle_kubeflow_plugin(self, plugin_data, user_details, folder_path):
-        self.plugin_db_conn.update_plugin(
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id, {"status": DEPLOYMENT_STARTED}, version=plugin_data.version
         )
         if not getattr(plugin_data, "portal", False):
             if plugin_data.registration_type == "plugin_artifact":
                 if not Path(f"{folder_path}/kubeflow.tar").exists():
-                    self.plugin_db_conn.update_plugin(
+                    self.plugin_writes.update_plugin(
                         plugin_data.plugin_id, {"status": DEPLOYMENT_FAILED}, version=plugin_data.version
                     )
                     raise HTTPException(status_code=400, detail="Missing required file: kubeflow.tar")
@@ -454,7 +490,7 @@ class DeploymentHandler:
                 output_file_path=folder_path / "kubeflow_requirements.txt",
                 name=plugin_data.name,
             )
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id, {"status": SCANNING_PROGRESS}, version=plugin_data.version
             )
 
@@ -496,12 +532,13 @@ class DeploymentHandler:
     def configure_offline_kubeflow_pipeline(
         self, plugin_data: PluginMetaDBSchema, folder_path, user_details: MetaInfoSchema
     ):
-        self.plugin_db_conn.update_plugin(
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id, {"status": DEPLOYMENT_STARTED}, version=plugin_data.version
         )
+        self._flush_stage("pipeline")
         try:
             if not self.docker.container_blob_verifying(f"{folder_path}", kubeflow=True):
-                self.plugin_db_conn.update_plugin(
+                self.plugin_writes.update_plugin(
                     plugin_data.plugin_id, {"status": "Verification Failed"}, version=plugin_data.version
                 )
                 raise VerficiationError("Blob verification failed")
@@ -522,7 +559,7 @@ class DeploymentHandler:
             )
 
         except Exception as e:
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id, {"status": DEPLOYMENT_FAILED}, version=plugin_data.version
             )
             logging.exception(f"Error occurred while configuring Kubeflow pipeline {e}")
@@ -657,11 +694,12 @@ class DeploymentHandler:
             return self.build_from_manifest(plugin_data, folder_path)
 
     def handle_plugin_artifact(self, plugin_data):
-        self.plugin_db_conn.update_plugin(
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id, {"status": DEPLOYMENT_STARTED}, version=plugin_data.version
         )
         plugin_data.deployment_status = "deploying"
-        self.plugin_db_conn.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self.plugin_writes.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self._flush_stage("build")
         image_tag = f"{plugin_data.name}-{plugin_data.plugin_type}:{plugin_data.version}".lower().replace(" ", "_")
         image_full_tag = self.docker.push_docker_image(
             image_tag=image_tag,
@@ -677,32 +715,19 @@ class DeploymentHandler:
     def build_from_dockerfile(self, plugin_data, folder_path):
         logging.info("Building from Dockerfile")
         plugin_data.deployment_status = "deploying"
-        self.plugin_db_conn.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self.plugin_writes.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self._flush_stage("build")
         image_tag = f"{plugin_data.name}-{plugin_data.plugin_type}:{plugin_data.version}".lower().replace(" ", "_")
-        self.docker.build_docker_image(
-            str(folder_path),
-            image_tag=image_tag,
-            container_registry_url=AzureCredentials.azure_container_registry_url,
-            build_args=Services.PLUGIN_BUILD_ARGS,
-        )
-        image_full_tag = self.docker.push_docker_image(
-            image_tag=image_tag,
-            container_registry_url=AzureCredentials.azure_container_registry_url,
-            container_registry_credentials={
-                "username": AzureCredentials.azure_registry_username,
-                "password": AzureCredentials.azure_registry_password,
-            },
-        )
-        self.docker.container_signing(image_full_tag)
-        return image_full_tag
+        return self._build_and_push_image(plugin_data, folder_path, image_tag)
 
     def build_from_manifest(self, plugin_data, folder_path):
         logging.info("Building from manifest")
-        self.plugin_db_conn.update_plugin(
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id, {"status": SCANNING_PROGRESS}, version=plugin_data.version
         )
         plugin_data.deployment_status = "deploying"
-        self.plugin_db_conn.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self.plugin_writes.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self._flush_stage("build")
         with open(folder_path / "manifest.json") as f:
             config = json.load(f)
         if os.path.exists(folder_path / "user_manual"):
@@ -710,23 +735,31 @@ class DeploymentHandler:
         else:
             self.docker.dockerfile_generator(folder_path, config)
         image_tag = f"{config['plugin_name']}-{config['plugin_type']}:{plugin_data.version}".lower().replace(" ", "_")
-        self.docker.build_docker_image(
+        return self._build_and_push_image(plugin_data, folder_path, image_tag)
+
+    def _build_and_push_image(self, plugin_data: PluginMetaDBSchema, folder_path, image_tag: str) -> str:
+        registry_credentials = {
+            "username": AzureCredentials.azure_registry_username,
+            "password": AzureCredentials.azure_registry_password,
+        }
+        plugin_data.build_metrics = self.docker.build_docker_image(
             str(folder_path),
             image_tag=image_tag,
             container_registry_url=AzureCredentials.azure_container_registry_url,
             build_args=Services.PLUGIN_BUILD_ARGS,
+            container_registry_credentials=registry_credentials,
         )
-        self.plugin_db_conn.update_plugin(
-            plugin_data.plugin_id, {"status": SCANNING_PROGRESS}, version=plugin_data.version
+        self.plugin_writes.update_plugin(
+            plugin_data.plugin_id,
+            {"build_metrics": plugin_data.build_metrics.model_dump()},
+            version=plugin_data.version,
         )
         image_full_tag = self.docker.push_docker_image(
             image_tag=image_tag,
             container_registry_url=AzureCredentials.azure_container_registry_url,
-            container_registry_credentials={
-                "username": AzureCredentials.azure_registry_username,
-                "password": AzureCredentials.azure_registry_password,
-            },
+            container_registry_credentials=registry_credentials,
         )
+        self.docker.export_build_cache(image_full_tag)
         self.docker.container_signing(image_full_tag)
         return image_full_tag
 
@@ -748,27 +781,45 @@ class DeploymentHandler:
             config_list.append({"key": "PORT", "value": port, "type": "text"})
         return config_list, port
 
-    def perform_vulnerability_scan(self, plugin_data, image_full_tag):
-        if VulnerabilityScanner.VULNERABILITY_SCAN and self.docker.scan_image(
+    def _run_image_scan(self, plugin_data, image_full_tag, container_name: str | None = None) -> dict | None:
+        if not self.docker.scan_image(
             image_full_tag,
             folder_path=f"/{plugin_data.name}-{plugin_data.plugin_id}",
             plugin_data=plugin_data,
+            container_name=container_name,
         ):
-            report = self.docker.scan_report_parser(folder_path=f"/{plugin_data.name}-{plugin_data.plugin_id}")
+            return None
+        return self.docker.scan_report_parser(folder_path=f"/{plugin_data.name}-{plugin_data.plugin_id}")
+
+    def perform_vulnerability_scan(self, plugin_data, image_full_tag):
+        report = None
+        if VulnerabilityScanner.VULNERABILITY_SCAN:
+            container_name = scan_container_name("trivy", plugin_data.plugin_id)
+            outcome = self.scan_orchestrator.run(
+                {"trivy": functools.partial(self._run_image_scan, plugin_data, image_full_tag, container_name)},
+                timeouts={"trivy": VulnerabilityScanner.VULNERABILITY_SCAN_TIMEOUT},
+                digest=image_digest(self.docker.docker_client, image_full_tag),
+                cancellations={"trivy": functools.partial(self.docker.stop_container, container_name)},
+            )["trivy"]
+            if outcome.status != "completed":
+                # The scan was enabled, so an image it could not vouch for is not deployed
+                self._fail_vulnerability_scan(plugin_data, outcome)
+            report = outcome.result
+        if report is not None:
             if report.get("vulnerabilities"):
                 vulnerability_report = VulnerablityScanReport(project_id=self.project_id)
                 vulnerability_report.update_record(plugin_data.plugin_id, report)
                 plugin_data.security_checks.vulnerabilities = False
-                self.plugin_db_conn.update_plugin(
+                self.plugin_writes.update_plugin(
                     plugin_data.plugin_id,
                     {
-                        "status": "Vulnerability Scan Failed",
+                        "status": VULNERABILITY_SCAN_FAILED,
                         "security_checks": plugin_data.security_checks.model_dump(),
                     },
                     version=plugin_data.version,
                 )
             plugin_data.security_checks.vulnerabilities = True
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id,
                 {
                     "status": SCANNING_PROGRESS,
@@ -777,15 +828,16 @@ class DeploymentHandler:
                 version=plugin_data.version,
             )
             if plugin_data.portal:
-                self.plugin_db_conn.update_plugin(
+                self.plugin_writes.update_plugin(
                     plugin_data.plugin_id, {"status": "Scan Successful"}, version=plugin_data.version
                 )
             if plugin_data.registration_type == "plugin_artifact":
                 self.security_check_plugin_artifact(plugin_data)
+            self._flush_stage("image scan")
         else:
-            logging.info("Skipping vulnerability scan")
+            logging.info("Vulnerability scan is disabled, skipping it")
             plugin_data.security_checks.vulnerabilities = True
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id,
                 {
                     "status": SCANNING_PROGRESS,
@@ -794,18 +846,32 @@ class DeploymentHandler:
                 version=plugin_data.version,
             )
             if plugin_data.portal:
-                self.plugin_db_conn.update_plugin(
+                self.plugin_writes.update_plugin(
                     plugin_data.plugin_id, {"status": "Scan Successful"}, version=plugin_data.version
                 )
             if plugin_data.registration_type == "plugin_artifact":
                 self.security_check_plugin_artifact(plugin_data)
+            self._flush_stage("image scan")
+
+    def _fail_vulnerability_scan(self, plugin_data: PluginMetaDBSchema, outcome: ScanOutcome):
+        reason = "timed out" if outcome.status == "timeout" else "failed"
+        logging.error(f"Vulnerability scan of {plugin_data.name} {reason}, the plugin is not deployed")
+        plugin_data.deployment_status = "failed"
+        plugin_data.security_checks.vulnerabilities = False
+        self.plugin_writes.update_plugin(
+            plugin_data.plugin_id,
+            {"status": VULNERABILITY_SCAN_FAILED, "security_checks": plugin_data.security_checks.model_dump()},
+            version=plugin_data.version,
+        )
+        self._flush_stage("image scan")
+        raise VulnerabilityScanFailed(f"Vulnerability scan {reason}")
 
     def security_check_plugin_artifact(self, plugin_data: PluginMetaDBSchema):
         if plugin_data.registration_type == "plugin_artifact" and plugin_data.security_checks.vulnerabilities:
             plugin_data.security_checks.sonarqube = True
             plugin_data.security_checks.antivirus = True
 
-        self.plugin_db_conn.update_plugin(
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id,
             {
                 "security_checks": plugin_data.security_checks.model_dump(),
@@ -834,7 +900,7 @@ class DeploymentHandler:
 
     def deploy_plugin_code(self, deploy_plugin_req, plugin_data, user_details):
         if plugin_data.portal:
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version
             )
             self._update_docker_image_field(plugin_data, deploy_plugin_req["image"])
@@ -845,7 +911,8 @@ class DeploymentHandler:
         proxy_path = resp.get("proxy-path")
         logging.info(f"Proxy path is {proxy_path}")
         plugin_data.proxy = proxy_path
-        self.plugin_db_conn.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self.plugin_writes.update_plugin(plugin_data.plugin_id, plugin_data.model_dump(), version=plugin_data.version)
+        self._flush_stage("deploy")
         self._update_docker_image_field(plugin_data, deploy_plugin_req["image"])
         return plugin_data
 
@@ -864,13 +931,6 @@ class DeploymentHandler:
         raise
 
     def update_deployment_status(self, plugin_id: str, version: float, user_details: MetaInfoSchema):
-        def check_deployment_status(payload):
-            resp = hit_external_service(
-                api_url=f"{ExternalServices.PROXY_MANAGER_URL}{ExternalAPI.deployment_status}",
-                payload=payload,
-            )
-            return resp
-
         plugin_data = self.plugin_db_conn.fetch_plugin(plugin_id=plugin_id, version=version)
         if plugin_data.deployment_status == "failed":
             logging.info("Deployment failed")
@@ -893,15 +953,21 @@ class DeploymentHandler:
                 logging.exception(f"Failed to delete plugin {e}")
                 return
 
-        payload = {"plugin_list": [f"{plugin_data.name}-{plugin_data.plugin_id}"]}
-        plugin_obj = PluginMeta(self.project_id)
-        time.sleep(5)
-        resp = check_deployment_status(payload)
-        while resp.get("data")[0].get("status") == "in_progress":
-            time.sleep(5)
-            resp = check_deployment_status(payload)
+        # The rollout is followed on the tracker loop, so this background task returns right away
+        return deployment_tracker.track(
+            f"{plugin_data.name}-{plugin_data.plugin_id}",
+            on_transition=functools.partial(self.apply_rollout_status, plugin_data, user_details),
+            timeout=DeploymentTrackerConf.ROLLOUT_TIMEOUT_SECONDS,
+            on_timeout=functools.partial(self.apply_rollout_timeout, plugin_data, user_details),
+        )
 
-        if resp.get("data")[0].get("status") == "completed":
+    def apply_rollout_status(self, plugin_data: PluginMetaDBSchema, user_details: MetaInfoSchema, status: dict):
+        plugin_obj = PluginMeta(self.project_id)
+        if status.get("status") == "in_progress":
+            plugin_obj.update_plugin(
+                plugin_data.plugin_id, {"status": DEPLOYMENT_IN_PROGRESS}, version=plugin_data.version
+            )
+        elif status.get("status") == "completed":
             logging.info("Deployment completed")
             plugin_obj.update_plugin(
                 plugin_data.plugin_id,
@@ -918,18 +984,17 @@ class DeploymentHandler:
                 project_id=self.project_id,
             )
             self.update_widget_plugin(plugin_data)
-        elif resp.get("data")[0].get("status") == "error":
-            for pods in resp.get("data")[0].get("pods"):
+        elif status.get("status") == "error":
+            for pods in status.get("pods"):
                 for container in pods.get("containers"):
                     if container.get("status") == "error":
                         plugin_data.errors.append(f'{container.get("reason")} {container.get("message")}')
 
             logging.info("Deployment failed")
             plugin_obj.update_plugin(
-                plugin_data.plugin_id, {"deployment_status": "failed"}, version=plugin_data.version
-            )
-            self.plugin_db_conn.update_plugin(
-                plugin_data.plugin_id, {"status": DEPLOYMENT_FAILED}, version=plugin_data.version
+                plugin_data.plugin_id,
+                {"deployment_status": "failed", "status": DEPLOYMENT_FAILED},
+                version=plugin_data.version,
             )
             push_notification(
                 user_id=user_details.user_id,
@@ -940,6 +1005,11 @@ class DeploymentHandler:
                 project_id=self.project_id,
             )
 
+    def apply_rollout_timeout(self, plugin_data: PluginMetaDBSchema, user_details: MetaInfoSchema):
+        logging.error(f"Deployment of plugin {plugin_data.name} did not complete in time")
+        plugin_data.errors.append("Deployment did not complete within the rollout timeout")
+        self.apply_rollout_status(plugin_data, user_details, {"status": "error", "pods": []})
+
     def update_widget_plugin(self, plugin_data: PluginMetaDBSchema):
         if self.widget_db_conn.fetch_widget_plugin(plugin_data.plugin_id):
             resp = hit_external_service(
@@ -976,6 +1046,7 @@ class DeploymentHandler:
             self.update_plugin_status,
             plugin_name=plugin_data.name,
             plugin_id=plugin_id,
+            version=plugin_data.version,
         )
         self.plugin_db_conn.update_plugin(
             plugin_id=plugin_id,
@@ -984,27 +1055,26 @@ class DeploymentHandler:
         )
         return f"Plugin {plugin_data.name} {plugin_data.deployment_status}"
 
-    def update_plugin_status(self, plugin_name: str, plugin_id: str):
-        payload = {"plugin_list": [f"{plugin_name}-{plugin_id}"]}
-        resp = hit_external_service(
-            api_url=f"{ExternalServices.PROXY_MANAGER_URL}{ExternalAPI.deployment_status}",
-            payload=payload,
+    def update_plugin_status(self, plugin_name: str, plugin_id: str, version: float | None = None):
+        return deployment_tracker.track(
+            f"{plugin_name}-{plugin_id}",
+            on_transition=functools.partial(self.apply_plugin_switch_status, plugin_id, version),
+            timeout=DeploymentTrackerConf.PLUGIN_SWITCH_TIMEOUT_SECONDS,
+        )
+
+    def apply_plugin_switch_status(self, plugin_id: str, version: float | None, status: dict):
+        """Records the state a started or stopped plugin actually settled in"""
+        if status.get("status") != "completed":
+            return
+        if (status.get("replicas") or 0) > 0:
+            logging.info("Plugin Started")
+            deployment_status = "running"
+        else:
+            logging.info("Plugin Stopped")
+            deployment_status = "stopped"
+        self.plugin_db_conn.update_plugin(
+            plugin_id=plugin_id, data={"deployment_status": deployment_status}, version=version
         )
-        if not resp.get("data"):
-            return None
-        while resp.get("data")[0].get("status") == "in_progress":
-            time.sleep(3)
-            resp = hit_external_service(
-                api_url=f"{ExternalServices.PROXY_MANAGER_URL}{ExternalAPI.deployment_status}",
-                payload=payload,
-            )
-        if resp.get("data")[0].get("status") == "completed":
-            if resp.get("data")[0].get("replicas") > 0:
-                logging.info("Plugin Started")
-                return "running"
-            elif resp.get("data")[0].get("replicas") == 0:
-                logging.info("Plugin Stopped")
-                return "stopped"
 
     @staticmethod
     def resource_allocation(bodycontent: list):  # NOSONAR
@@ -1038,141 +1108,200 @@ class DeploymentHandler:
             resources["cpu_request"] = "0"
         return resources
 
-    def antivirus_scan(self, plugin_data: PluginMetaDBSchema):
-        self.plugin_db_conn.update_plugin(
+    def scan_plugin_source(self, plugin_data: PluginMetaDBSchema, folder_path):
+        """
+        Runs the antivirus and SonarQube scans of the plugin source concurrently and applies both verdicts.
+        Both reports are recorded before the first failing verdict is raised.
+
+        :param plugin_data: Plugin being deployed
+        :param folder_path: Local checkout of the plugin source, used to key the scan result cache
+        """
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id, {"status": SCANNING_PROGRESS}, version=plugin_data.version
         )
+        self._flush_stage("scan")
+        scans, cancellations = {}, {}
+        for scanner, enabled, run_scan in (
+            ("antivirus", VulnerabilityScanner.ANTIVIRUS_SCAN, self._run_antivirus_scan),
+            ("sonarqube", VulnerabilityScanner.SONARQUBE_SCAN, self._run_sonarqube_scan),
+        ):
+            if enabled and self._is_source_scanned(plugin_data):
+                container_name = scan_container_name(scanner, plugin_data.plugin_id)
+                scans[scanner] = functools.partial(run_scan, plugin_data, container_name)
+                cancellations[scanner] = functools.partial(self.docker.stop_container, container_name)
+        digest = source_tree_digest(folder_path) if scans and VulnerabilityScanner.SCAN_RESULT_CACHE else None
+        outcomes = self.scan_orchestrator.run(
+            scans,
+            timeouts={
+                "antivirus": VulnerabilityScanner.ANTIVIRUS_SCAN_TIMEOUT,
+                "sonarqube": VulnerabilityScanner.SONARQUBE_SCAN_TIMEOUT,
+            },
+            digest=digest,
+            cancellations=cancellations,
+        )
+        failures = []
+        for scanner, apply_outcome in (
+            ("antivirus", self._apply_antivirus_outcome),
+            ("sonarqube", self._apply_sonarqube_outcome),
+        ):
+            try:
+                apply_outcome(plugin_data, outcomes.get(scanner, ScanOutcome(status="skipped")))
+            except (AntiVirusScanFailed, SonarqubeScanFailed) as e:
+                failures.append(e)
+        if failures:
+            raise failures[0]
+        return plugin_data
 
-        if (
-            VulnerabilityScanner.ANTIVIRUS_SCAN
-            and plugin_data.plugin_type in job_types
-            and plugin_data.plugin_type != "kubeflow"
-            and self.docker.clamav_antivirus_scan(
-                f"{VulnerabilityScanner.ABSOLUTE_CODE_STORE_PATH}/{plugin_data.name}/{plugin_data.plugin_id}",
-                plugin_data.name,
-                plugin_data.plugin_id,
-            )
+    @staticmethod
+    def _is_source_scanned(plugin_data: PluginMetaDBSchema) -> bool:
+        return plugin_data.plugin_type in job_types and plugin_data.plugin_type != "kubeflow"
+
+    def _run_antivirus_scan(self, plugin_data: PluginMetaDBSchema, container_name: str | None = None) -> dict | None:
+        if not self.docker.clamav_antivirus_scan(
+            f"{VulnerabilityScanner.ABSOLUTE_CODE_STORE_PATH}/{plugin_data.name}/{plugin_data.plugin_id}",
+            plugin_data.name,
+            plugin_data.plugin_id,
+            container_name=container_name,
         ):
-            logging.info("Antivirus scan complete")
-            result, data = self.docker.antivirus_report(folder_path=f"/{plugin_data.name}/{plugin_data.plugin_id}")
-            if result:
-                logging.info("Antivirus scan report generated")
-                if data.get("Infected files") != "0":
-                    plugin_data.errors.append("Infected files found in the plugin.")
-                    plugin_data.deployment_status = "failed"
-                    self.plugin_db_conn.update_plugin(
-                        plugin_data.plugin_id, {"status": "Antivirus Scan Failed"}, version=plugin_data.version
-                    )
-                    vulnerability_scan_report = VulnerablityScanReport(project_id=self.project_id)
-                    vulnerability_scan_report.update_record(plugin_data.plugin_id, {"antivirus": data})
-                else:
-                    logging.info("No infected files found")
-                    plugin_data.security_checks.antivirus = True
-                    self.plugin_db_conn.update_plugin(
-                        plugin_data.plugin_id,
-                        {
-                            "security_checks": plugin_data.security_checks.model_dump(),
-                            "status": SCANNING_PROGRESS,
-                        },
-                        version=plugin_data.version,
-                    )
-            else:
-                logging.info(antivirus_scan_failed)
-                plugin_data.errors.append(antivirus_scan_failed)
-                plugin_data.deployment_status = "failed"
-                plugin_data.security_checks.antivirus = False
-                self.plugin_db_conn.update_plugin(
-                    plugin_data.plugin_id, {"status": "Antivirus Scan Failed"}, version=plugin_data.version
-                )
-                raise AntiVirusScanFailed(antivirus_scan_failed)
-        else:
+            return None
+        logging.info("Antivirus scan complete")
+        result, data = self.docker.antivirus_report(folder_path=f"/{plugin_data.name}/{plugin_data.plugin_id}")
+        if not result:
+            raise AntiVirusScanFailed(antivirus_scan_failed)
+        logging.info("Antivirus scan report generated")
+        return data
+
+    def _apply_antivirus_outcome(self, plugin_data: PluginMetaDBSchema, outcome: ScanOutcome):
+        if outcome.status == "error" and not isinstance(outcome.exception, AntiVirusScanFailed):
+            raise outcome.exception
+        if outcome.status in ("error", "timeout"):
+            logging.info(antivirus_scan_failed)
+            plugin_data.errors.append(antivirus_scan_failed)
+            plugin_data.deployment_status = "failed"
+            plugin_data.security_checks.antivirus = False
+            self.plugin_writes.update_plugin(
+                plugin_data.plugin_id, {"status": "Antivirus Scan Failed"}, version=plugin_data.version
+            )
+            raise AntiVirusScanFailed(antivirus_scan_failed)
+        if outcome.status == "skipped":
             logging.info("Skipping antivirus scan")
             plugin_data.security_checks.antivirus = True
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id,
                 {"security_checks": plugin_data.security_checks.model_dump()},
                 version=plugin_data.version,
             )
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id, {"status": SCANNING_PROGRESS}, version=plugin_data.version
             )
+            return
+        data = outcome.result
+        if data.get("Infected files") != "0":
+            plugin_data.errors.append("Infected files found in the plugin.")
+            plugin_data.deployment_status = "failed"
+            self.plugin_writes.update_plugin(
+                plugin_data.plugin_id, {"status": "Antivirus Scan Failed"}, version=plugin_data.version
+            )
+            vulnerability_scan_report = VulnerablityScanReport(project_id=self.project_id)
+            vulnerability_scan_report.update_record(plugin_data.plugin_id, {"antivirus": data})
+        else:
+            logging.info("No infected files found")
+            plugin_data.security_checks.antivirus = True
+            self.plugin_writes.update_plugin(
+                plugin_data.plugin_id,
+                {
+                    "security_checks": plugin_data.security_checks.model_dump(),
+                    "status": SCANNING_PROGRESS,
+                },
+                version=plugin_data.version,
+            )
 
-    def sonarqube_scan(self, plugin_data: PluginMetaDBSchema):
-        self.plugin_db_conn.update_plugin(
-            plugin_data.plugin_id, {"status": SCANNING_PROGRESS}, version=plugin_data.version
+    @staticmethod
+    def _run_sonarqube_scan(plugin_data: PluginMetaDBSchema, container_name: str | None = None) -> dict:
+        logging.info("Sonarqube scan started")
+        sonarqube_scan = SonarQubeScan(project=plugin_data.name)
+        sonarqube_scan.initialize_project(
+            src_folder=f"{VulnerabilityScanner.ABSOLUTE_CODE_STORE_PATH}/{plugin_data.name}/{plugin_data.plugin_id}",
+            container_name=container_name,
         )
-        if (
-            VulnerabilityScanner.SONARQUBE_SCAN
-            and plugin_data.plugin_type in job_types
-            and plugin_data.plugin_type != "kubeflow"
-        ):
-            sonar_scan_report = []
-            logging.info("Sonarqube scan started")
-            sonarqube_scan = SonarQubeScan(project=plugin_data.name)
-            sonarqube_scan.initialize_project(
-                src_folder=f"{VulnerabilityScanner.ABSOLUTE_CODE_STORE_PATH}/{plugin_data.name}/{plugin_data.plugin_id}"
+        report = sonarqube_scan.get_values()
+        if report is None:
+            raise SonarqubeScanFailed("Unable to fetch the Sonarqube report")
+        return report
+
+    def _apply_sonarqube_outcome(self, plugin_data: PluginMetaDBSchema, outcome: ScanOutcome):
+        if outcome.status == "error" and not isinstance(outcome.exception, SonarqubeScanFailed):
+            raise outcome.exception
+        if outcome.status in ("error", "timeout"):
+            plugin_data.errors.append("Sonarqube scan failed")
+            plugin_data.deployment_status = "failed"
+            plugin_data.security_checks.sonarqube = False
+            self.plugin_writes.update_plugin(
+                plugin_data.plugin_id, {"status": "Sonarqube Scan Failed"}, version=plugin_data.version
             )
-            report = sonarqube_scan.get_values()
-
-            if report.get("code_smells").get("total") > SonarQubeConfig.code_smell_threshold:
-                plugin_data.errors.append("Code smells found in the plugin, exceeding threshold.")
-                logging.info("Code smells found in the plugin.")
-                sonar_scan_report.extend(sonarqube_scan.sonarqube_code_smells_report(report.get("code_smells")))
-
-            if report.get("vulnerabilities").get("total") > SonarQubeConfig.vulnerability_threshold:
-                plugin_data.errors.append("Vulnerabilities found in the plugin, exceeding threshold.")
-                logging.info("Vulnerabilities found in the plugin.")
-                sonar_scan_report.extend(sonarqube_scan.sonarqube_vulnerabilities_report(report.get("vulnerabilities")))
-                self.plugin_db_conn.update_plugin(
-                    plugin_data.plugin_id, {"status": "Sonarqube Scan Failed"}, version=plugin_data.version
-                )
-
-            if report.get("bug").get("total") > SonarQubeConfig.bug_threshold:
-                plugin_data.errors.append("Bugs found in the plugin, exceeding threshold.")
-                logging.info("Bugs found in the plugin.")
-                sonar_scan_report.extend(sonarqube_scan.sonarqube_bug_report(report.get("bug")))
-
-            if sonar_scan_report:
-                vulnerability_scan_report = VulnerablityScanReport(project_id=self.project_id)
-                vulnerability_scan_report.update_record(plugin_data.plugin_id, {"sonarqube": sonar_scan_report})
-                plugin_data.deployment_status = "failed"
-                plugin_data.security_checks.sonarqube = False
-                self.plugin_db_conn.update_plugin(
-                    plugin_data.plugin_id, {"status": "Sonarqube Scan Failed"}, version=plugin_data.version
-                )
-                raise SonarqubeScanFailed("Sonarqube scan failed")
-            else:
-                logging.info("No code smells, vulnerabilities or bugs found")
-                plugin_data.security_checks.sonarqube = True
-                self.plugin_db_conn.update_plugin(
-                    plugin_data.plugin_id,
-                    {"security_checks": plugin_data.security_checks.model_dump(), "status": SCANNING_PROGRESS},
-                    version=plugin_data.version,
-                )
-        else:
+            raise SonarqubeScanFailed("Sonarqube scan failed")
+        if outcome.status == "skipped":
             logging.info("Skipping sonarqube scan")
             plugin_data.security_checks.sonarqube = True
-            self.plugin_db_conn.update_plugin(
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id,
                 {"security_checks": plugin_data.security_checks.model_dump(), "status": SCANNING_PROGRESS},
                 version=plugin_data.version,
             )
+            return
+        report = outcome.result
+        sonar_scan_report = []
+        sonarqube_scan = SonarQubeScan(project=plugin_data.name)
+
+        if report.get("code_smells").get("total") > SonarQubeConfig.code_smell_threshold:
+            plugin_data.errors.append("Code smells found in the plugin, exceeding threshold.")
+            logging.info("Code smells found in the plugin.")
+            sonar_scan_report.extend(sonarqube_scan.sonarqube_code_smells_report(report.get("code_smells")))
+
+        if report.get("vulnerabilities").get("total") > SonarQubeConfig.vulnerability_threshold:
+            plugin_data.errors.append("Vulnerabilities found in the plugin, exceeding threshold.")
+            logging.info("Vulnerabilities found in the plugin.")
+            sonar_scan_report.extend(sonarqube_scan.sonarqube_vulnerabilities_report(report.get("vulnerabilities")))
+            self.plugin_writes.update_plugin(
+                plugin_data.plugin_id, {"status": "Sonarqube Scan Failed"}, version=plugin_data.version
+            )
 
-        return plugin_data
+        if report.get("bug").get("total") > SonarQubeConfig.bug_threshold:
+            plugin_data.errors.append("Bugs found in the plugin, exceeding threshold.")
+            logging.info("Bugs found in the plugin.")
+            sonar_scan_report.extend(sonarqube_scan.sonarqube_bug_report(report.get("bug")))
+
+        if sonar_scan_report:
+            vulnerability_scan_report = VulnerablityScanReport(project_id=self.project_id)
+            vulnerability_scan_report.update_record(plugin_data.plugin_id, {"sonarqube": sonar_scan_report})
+            plugin_data.deployment_status = "failed"
+            plugin_data.security_checks.sonarqube = False
+            self.plugin_writes.update_plugin(
+                plugin_data.plugin_id, {"status": "Sonarqube Scan Failed"}, version=plugin_data.version
+            )
+            raise SonarqubeScanFailed("Sonarqube scan failed")
+        logging.info("No code smells, vulnerabilities or bugs found")
+        plugin_data.security_checks.sonarqube = True
+        self.plugin_writes.update_plugin(
+            plugin_data.plugin_id,
+            {"security_checks": plugin_data.security_checks.model_dump(), "status": SCANNING_PROGRESS},
+            version=plugin_data.version,
+        )
 
     def configure_kubeflow_pipeline(  # NOSONAR
         self, plugin_data: PluginMetaDBSchema, user_details: MetaInfoSchema, folder_path
     ):
-        self.plugin_db_conn.update_plugin(
+        self.plugin_writes.update_plugin(
             plugin_data.plugin_id, {"status": DEPLOYMENT_STARTED}, version=plugin_data.version
         )
+        self._flush_stage("pipeline")
+        if Services.KUBEFLOW_MULTI_USER:
+            namespace = user_details.project_id.replace("_", "-")
+        else:
+            namespace = "kubeflow"
         try:
             if not Services.KUBEFLOW_URL:
                 raise KubeflowPipelineConfigNotFound(kubeflow_url_not_found)
-            if Services.KUBEFLOW_MULTI_USER:
-                namespace = user_details.project_id.replace("_", "-")
-            else:
-                namespace = "kubeflow"
             self.kubeflow_client = kfp.Client(
                 host=Services.KUBEFLOW_URL,
                 cookies=f"login-token={user_details.login_token}",
@@ -1216,6 +1345,7 @@ class DeploymentHandler:
                     namespace=namespace,
                 )
                 pipeline_id = pipeline.pipeline_id
+                kubeflow_index.record_pipeline(namespace, plugin_data.name, pipeline_id)
                 pipeline_version_id = (
                     self.kubeflow_client.list_pipeline_versions(pipeline_id=pipeline_id, page_size=100)
                     .pipeline_versions[0]
@@ -1270,6 +1400,7 @@ class DeploymentHandler:
                     version_id=pipeline_version_id,
                 )
                 run_id = response.recurring_run_id
+                kubeflow_index.record_recurring_run(namespace, pipeline_id, run_id, pipeline_version_id)
             else:
                 response = self.kubeflow_client.run_pipeline(
                     experiment.experiment_id,
@@ -1293,7 +1424,9 @@ class DeploymentHandler:
             return run_id
 
         except Exception as e:
-            self.plugin_db_conn.update_plugin(
+            # The failure may come from an id the index still holds for a pipeline deleted elsewhere
+            kubeflow_index.invalidate(namespace)
+            self.plugin_writes.update_plugin(
                 plugin_data.plugin_id, {"status": DEPLOYMENT_FAILED}, version=plugin_data.version
             )
             logging.error(f"Exception occurred in the configure_pipeline due to {str(e)}")
@@ -1327,34 +1460,7 @@ class DeploymentHandler:
 
     def get_kubeflow_pipeline_id(self, pipeline_name, kubeflow_client: kfp.Client, namespace):
         try:
-            all_pipelines = []
-
-            condition = {
-                "predicates": [
-                    {
-                        "operation": "EQUALS",
-                        "key": "display_name",
-                        "stringValue": pipeline_name,
-                    }
-                ]
-            }
-            page_token = ""
-            while True:
-                response = kubeflow_client.list_pipelines(
-                    namespace=namespace,
-                    page_token=page_token,
-                    filter=json.dumps(condition),
-                )
-
-                all_pipelines.extend(response.pipelines)
-
-                if response.next_page_token:
-                    page_token = response.next_page_token
-                else:
-                    break
-
-            pipeline_id = all_pipelines[0].pipeline_id or None
-            return pipeline_id
+            return kubeflow_index.pipeline_id(kubeflow_client, namespace, pipeline_name)
         except Exception as e:
             logging.exception(f"Unable to get the pipeline Id {e}")
 
@@ -1381,6 +1487,7 @@ class DeploymentHandler:
                 )
                 self.delete_pipeline_versions(self.kubeflow_client, pipeline_id, pipeline_version_id_list)
                 self.kubeflow_client.delete_pipeline(pipeline_id)
+                kubeflow_index.forget_pipeline(namespace, pipeline_name)
                 logging.info(f"Successfully deleted the pipeline - {pipeline_id}")
 
         except Exception as e:
@@ -1424,22 +1531,9 @@ class DeploymentHandler:
         pipeline_version_id_list,
         namespace: str,
     ):
-        all_recurring_runs = []
-        page_token = ""
-
-        while True:
-            recurring_runs = kubeflow_client.list_recurring_runs(namespace=namespace, page_token=page_token)
-            if recurring_runs.recurring_runs:
-                all_recurring_runs.extend(recurring_runs.recurring_runs)
-            if recurring_runs.next_page_token:
-                page_token = recurring_runs.next_page_token
-            else:
-                break
-
-        for each_recurring_run in all_recurring_runs:
-            if (
-                each_recurring_run.pipeline_version_reference.pipeline_id == pipeline_id
-                and each_recurring_run.pipeline_version_reference.pipeline_version_id in pipeline_version_id_list
-            ):
-                kubeflow_client.delete_recurring_run(recurring_run_id=each_recurring_run.recurring_run_id)
-                logging.info(f"Successfully deleted the recurring run - {each_recurring_run.recurring_run_id}")
+        recurring_runs = kubeflow_index.recurring_runs(kubeflow_client, namespace, pipeline_id)
+        for recurring_run_id, pipeline_version_id in recurring_runs.items():
+            if pipeline_version_id in pipeline_version_id_list:
+                kubeflow_client.delete_recurring_run(recurring_run_id=recurring_run_id)
+                kubeflow_index.forget_recurring_run(namespace, pipeline_id, recurring_run_id)
+                logging.info(f"Successfully deleted the recurring run - {recurring_run_id}")
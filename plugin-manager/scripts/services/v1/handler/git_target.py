@@ -9,6 +9,7 @@ from scripts.services.v1.schemas import (
 )
 from scripts.db.mongo.ilens_configurations.collections.git_target import GitTarget
 from scripts.utils.mongo_tools.query_builder_git_targets import NewQueryBuilder
+from scripts.utils.mongo_tools.query_planner import QueryPlanner
 from scripts.constants.ui_components import (
     git_target_list_table_actions,
     git_target_list_table_column_defs,
@@ -110,15 +111,16 @@ class GitTargetHandler:
             "_id": 0,
         }
 
-        query_builder = NewQueryBuilder()
+        query_builder = NewQueryBuilder(planner=QueryPlanner.for_collection(self.git_target))
         query_builder.project(required_fields)
         filters = list_request.filters.filter_model or {}
+        query_builder.planner.restrict_collation(filters, list_request.filters.sort_model)
         filter_conditions = []
 
         for field, filter_data in filters.items():
             if "filter" in filter_data:
                 db_field = self.key_mapping.get(field, field)
-                filter_conditions.append(self.build_column_query(filter_data, db_field))
+                filter_conditions.append(self.build_column_query(filter_data, db_field, query_builder))
 
         query_builder.match(filter_conditions)
         sort_model = list_request.filters.sort_model or []
@@ -127,7 +129,8 @@ class GitTargetHandler:
         limit = list_request.records
         query_builder.paginate(skip, limit)
         query_pipeline = query_builder.build()
-        git_targets = list(self.git_target.aggregate(query_pipeline))
+        query_builder.planner.explain(self.git_target, query_pipeline)
+        git_targets = list(self.git_target.aggregate(query_pipeline, **query_builder.aggregate_options()))
         body_content = [
             {
                 "targetId": record["git_target_id"],
@@ -141,8 +144,11 @@ class GitTargetHandler:
             }
             for record in git_targets
         ]
-        count_query = [{"$match": {"$and": filter_conditions}}] if filter_conditions else []
-        total_no_cursor = list(self.git_target.aggregate(count_query + [{"$count": "count"}]))
+        total_no_cursor = list(
+            self.git_target.aggregate(
+                query_builder.count_pipeline(filter_conditions), **query_builder.aggregate_options()
+            )
+        )
         total_count = total_no_cursor[0]["count"] if total_no_cursor else 0
         end_of_records = (skip + limit) >= total_count
         return {
@@ -164,15 +170,16 @@ class GitTargetHandler:
             "_id": 0,
         }
 
-        query_builder = NewQueryBuilder()
+        query_builder = NewQueryBuilder(planner=QueryPlanner.for_collection(self.git_target))
         query_builder.project(required_fields)
         filters = list_request.filters.filter_model or {}
+        query_builder.planner.restrict_collation(filters, list_request.filters.sort_model)
         filter_conditions = [{"portal": True}]  # Only list Git targets with portal set to True
 
         for field, filter_data in filters.items():
             if "filter" in filter_data:
                 db_field = self.key_mapping.get(field, field)
-                filter_conditions.append(self.build_column_query(filter_data, db_field))
+                filter_conditions.append(self.build_column_query(filter_data, db_field, query_builder))
 
         query_builder.match(filter_conditions)
         sort_model = list_request.filters.sort_model or []
@@ -181,7 +188,8 @@ class GitTargetHandler:
         limit = list_request.records
         query_builder.paginate(skip, limit)
         query_pipeline = query_builder.build()
-        git_targets = list(self.git_target.aggregate(query_pipeline))
+        query_builder.planner.explain(self.git_target, query_pipeline)
+        git_targets = list(self.git_target.aggregate(query_pipeline, **query_builder.aggregate_options()))
         body_content = [
             {
                 "targetId": record["git_target_id"],
@@ -195,8 +203,11 @@ class GitTargetHandler:
             }
             for record in git_targets
         ]
-        count_query = [{"$match": {"$and": filter_conditions}}] if filter_conditions else []
-        total_no_cursor = list(self.git_target.aggregate(count_query + [{"$count": "count"}]))
+        total_no_cursor = list(
+            self.git_target.aggregate(
+                query_builder.count_pipeline(filter_conditions), **query_builder.aggregate_options()
+            )
+        )
         total_count = total_no_cursor[0]["count"] if total_no_cursor else 0
         end_of_records = (skip + limit) >= total_count
         return {
@@ -205,7 +216,7 @@ class GitTargetHandler:
             "endOfRecords": end_of_records,
         }
 
-    def build_column_query(self, filter_obj, column):
+    def build_column_query(self, filter_obj, column, query_builder: Optional[NewQueryBuilder] = None):
         """
         Build individual column queries for filtering.
         """
@@ -213,7 +224,8 @@ class GitTargetHandler:
         filter_value = filter_obj.get("filter")
 
         if filter_type == "text":
-            return {column: {"$regex": filter_value, "$options": "i"}}
+            query_builder = query_builder or NewQueryBuilder()
+            return query_builder.text_condition(column, filter_value, filter_obj.get("type", "contains"))
         elif filter_type == "number":
             return {column: filter_value}
         elif filter_type == "date":
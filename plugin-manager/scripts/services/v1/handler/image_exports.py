@@ -0,0 +1,278 @@
+import datetime
+import functools
+import hashlib
+import itertools
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from ut_security_util import MetaInfoSchema
+
+from scripts.config import AzureCredentials, DownloadDockerImage, PathConf
+from scripts.constants import Message
+from scripts.db import ImageExportJobs, PluginMeta
+from scripts.db.mongo.plugins.image_export_jobs import FINISHED_ITEM_STATUSES
+from scripts.db.schemas import PluginMetaDBSchema
+from scripts.errors import ImageExportError, PluginNotFoundError
+from scripts.services.v1.handler.plugins import PluginHandler
+from scripts.services.v1.schemas import PluginDownloadRequest
+from scripts.utils.common_util import get_unique_id
+from scripts.utils.docker_util import IMAGE_CHUNK_SIZE, DockerUtil
+from scripts.utils.image_archive import partial_path, write_image_archive
+from scripts.utils.image_export import ExportCancelled, ExportSubscriber, ImageExportPool, tracked_chunks
+
+IMAGE_FILE_NAME = "plugin.tar"
+
+export_pool = ImageExportPool(max_workers=DownloadDockerImage.EXPORT_WORKERS)
+_artifact_cleanup_lock = threading.Lock()
+
+
+def registry_credentials() -> dict:
+    return {
+        "username": AzureCredentials.azure_registry_username,
+        "password": AzureCredentials.azure_registry_password,
+    }
+
+
+def export_key(image_digest: str, folder_name: str, extra_files: dict[str, Path]) -> str:
+    """Identity of an export archive: the image, the folder it is placed in and the files added next to it"""
+    key = hashlib.sha256(f"{image_digest}\0{folder_name}".encode())
+    for file_name, path in sorted(extra_files.items()):
+        key.update(f"\0{file_name}\0".encode())
+        key.update(path.read_bytes() if path.exists() else b"")
+    return key.hexdigest()
+
+
+class ImageExportHandler:
+    """
+    Bulk image exports as jobs. Every plugin of a job is one item whose progress is stored in Mongo. The exports
+    themselves run on the bounded export_pool, keyed by image digest, so plugins requested again while an export
+    is running, or whose archive was already produced, reuse it instead of saving the image once more.
+    """
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.plugin_db_conn = PluginMeta(project_id=project_id)
+        self.jobs = ImageExportJobs(project_id=project_id)
+
+    @staticmethod
+    def artifact_path(key: str) -> Path:
+        return PathConf.LOCAL_IMAGE_PATH / "exports" / f"{key}.zip"
+
+    @staticmethod
+    def download_path(plugin_name: str) -> Path:
+        return PathConf.LOCAL_IMAGE_PATH / f"{plugin_name}.zip"
+
+    def create_job(self, request: PluginDownloadRequest, user_details: MetaInfoSchema) -> dict:
+        plugin_ids = [request.plugin_ids] if isinstance(request.plugin_ids, str) else request.plugin_ids
+        if not plugin_ids:
+            raise ImageExportError("No plugins to export")
+        items = []
+        for plugin_id in dict.fromkeys(plugin_ids):
+            plugin_data = self.plugin_db_conn.fetch_plugin(plugin_id, version=request.version)
+            if not plugin_data:
+                raise PluginNotFoundError(Message.plugin_not_found)
+            items.append(
+                {
+                    "plugin_id": plugin_id,
+                    "version": plugin_data.version,
+                    "name": plugin_data.name,
+                    "status": "queued",
+                    "progress": 0,
+                    "export_key": None,
+                    "reused": False,
+                    "error": None,
+                }
+            )
+        now = datetime.datetime.now(datetime.timezone.utc)
+        job = {
+            "job_id": get_unique_id(),
+            "status": "queued",
+            "items": items,
+            "created_by": user_details.user_id,
+            "created_on": now,
+            "updated_on": now,
+        }
+        self.jobs.create_job(job)
+        job.pop("_id", None)
+        return job
+
+    def get_job(self, job_id: str) -> dict:
+        job = self.jobs.fetch_job(job_id)
+        if not job:
+            raise ImageExportError(f"Image export job {job_id} not found")
+        return job
+
+    def run_job(self, job_id: str, user_details: MetaInfoSchema):
+        """Starts the exports of a queued job, returning as soon as they are handed to the export pool"""
+        if not self.jobs.set_status(job_id, "running", from_statuses=["queued"]):
+            return
+        self.remove_expired_artifacts()
+        for index, item in enumerate(self.get_job(job_id)["items"]):
+            try:
+                self._start_item(job_id, index, item, user_details)
+            except Exception as e:
+                logging.exception(f"Unable to export plugin {item['plugin_id']}: {e}")
+                self._finish_item(job_id, index, "failed", error=str(e))
+
+    def cancel_job(self, job_id: str):
+        job = self.get_job(job_id)
+        if not self.jobs.set_status(job_id, "cancelled"):
+            raise ImageExportError(f"Image export job {job_id} is {job['status']}")
+        self.jobs.cancel_items(job_id)
+        for index, item in enumerate(job["items"]):
+            # Exports running in other worker processes stop at their next progress update instead
+            if item.get("export_key") and item["status"] not in FINISHED_ITEM_STATUSES:
+                export_pool.cancel(item["export_key"], self.subscriber_id(job_id, index))
+
+    @staticmethod
+    def subscriber_id(job_id: str, index: int) -> str:
+        return f"{job_id}:{index}"
+
+    def _start_item(self, job_id: str, index: int, item: dict, user_details: MetaInfoSchema):
+        plugin_data = self.plugin_db_conn.fetch_plugin(item["plugin_id"], version=item["version"])
+        if not plugin_data:
+            raise PluginNotFoundError(Message.plugin_not_found)
+        if plugin_data.plugin_type == "kubeflow":
+            # Kubeflow archives are produced by the offline deployment, there is no image to export
+            if not self.download_path(plugin_data.name).exists():
+                raise ImageExportError(f"Zip file for Kubeflow plugin {plugin_data.plugin_id} is not available")
+            self._complete_item(job_id, index, plugin_data, None, user_details)
+            return
+        image_tag = next(
+            (field["value"] for field in plugin_data.additional_fields if field["label"] == "Docker Image"), None
+        )
+        if not image_tag:
+            raise ImageExportError("Docker Image tag not found in the plugin's additional fields")
+        extra_files = {}
+        if plugin_data.plugin_type == "widget":
+            extra_files["widgetConfig.json"] = PathConf.LOCAL_IMAGE_PATH / f"{plugin_data.plugin_id}.json"
+        if plugin_data.plugin_type in ["custom_app", "formio_component"]:
+            extra_files["pluginConfig.json"] = PathConf.LOCAL_IMAGE_PATH / f"{plugin_data.plugin_id}.json"
+        digest = DockerUtil().registry_digest(
+            image_tag, AzureCredentials.azure_container_registry_url, registry_credentials()
+        )
+        key = export_key(digest, plugin_data.name, extra_files)
+        if not self.jobs.update_item(job_id, index, {"status": "running", "export_key": key, "digest": digest}):
+            return
+        artifact = self.artifact_path(key)
+        if artifact.exists():
+            logging.info(f"Reusing the exported archive of {image_tag}")
+            os.utime(artifact)
+            self._complete_item(job_id, index, plugin_data, artifact, user_details, reused=True)
+            return
+        subscriber = ExportSubscriber(
+            subscriber_id=self.subscriber_id(job_id, index),
+            on_progress=functools.partial(self._report_progress, job_id, index, key),
+            on_done=functools.partial(self._export_done, job_id, index, plugin_data, user_details),
+        )
+        export = functools.partial(self._export_image, image_tag, plugin_data.name, extra_files, artifact)
+        if export_pool.submit(key, export, subscriber):
+            self.jobs.update_item(job_id, index, {"reused": True})
+
+    @staticmethod
+    def _export_image(
+        image_tag: str, folder_name: str, extra_files: dict, artifact: Path, report, cancelled: threading.Event
+    ) -> str:
+        docker_util = DockerUtil()
+        logging.info(f"Image {image_tag} is being pulled from registry")
+        docker_util.pull_image(image_tag, AzureCredentials.azure_container_registry_url, registry_credentials())
+        if cancelled.is_set():
+            raise ExportCancelled
+        image = docker_util.docker_client.images.get(image_tag)
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        write_image_archive(
+            tracked_chunks(
+                image.save(chunk_size=IMAGE_CHUNK_SIZE, named=True),
+                image.attrs.get("Size") or 0,
+                report,
+                cancelled,
+                DownloadDockerImage.EXPORT_PROGRESS_INTERVAL_SECONDS,
+            ),
+            archive_path=artifact,
+            folder_name=folder_name,
+            image_file_name=IMAGE_FILE_NAME,
+            extra_files=extra_files,
+        )
+        return str(artifact)
+
+    def _report_progress(self, job_id: str, index: int, key: str, progress: float):
+        if not self.jobs.update_item(job_id, index, {"progress": round(progress * 100, 1)}):
+            # The job was cancelled, possibly through another worker process
+            export_pool.cancel(key, self.subscriber_id(job_id, index))
+
+    def _export_done(
+        self,
+        job_id: str,
+        index: int,
+        plugin_data: PluginMetaDBSchema,
+        user_details: MetaInfoSchema,
+        artifact: str | None,
+        error: BaseException | None,
+    ):
+        if error is None:
+            self._complete_item(job_id, index, plugin_data, Path(artifact), user_details)
+        elif isinstance(error, ExportCancelled):
+            self._finish_item(job_id, index, "cancelled")
+        else:
+            self._finish_item(job_id, index, "failed", error=str(error) or type(error).__name__)
+
+    def _complete_item(
+        self,
+        job_id: str,
+        index: int,
+        plugin_data: PluginMetaDBSchema,
+        artifact: Path | None,
+        user_details: MetaInfoSchema,
+        reused: bool = False,
+    ):
+        download_path = self.download_path(plugin_data.name)
+        if artifact:
+            self.publish(artifact, download_path)
+        if self._finish_item(job_id, index, "completed", progress=100, artifact=str(download_path), reused=reused):
+            PluginHandler.send_notification(plugin_data, plugin_data.plugin_id, user_details)
+
+    @staticmethod
+    def publish(artifact: Path, download_path: Path):
+        """Places the archive where the download endpoint serves it, as a hard link unless that is not possible"""
+        partial_download_path = partial_path(download_path)
+        try:
+            try:
+                os.link(artifact, partial_download_path)
+            except OSError:
+                shutil.copyfile(artifact, partial_download_path)
+            os.replace(partial_download_path, download_path)
+        except BaseException:
+            partial_download_path.unlink(missing_ok=True)
+            raise
+
+    def _finish_item(self, job_id: str, index: int, status: str, **fields) -> bool:
+        if not self.jobs.update_item(job_id, index, {"status": status, **fields}):
+            return False
+        items = self.get_job(job_id)["items"]
+        statuses = {item["status"] for item in items}
+        if statuses <= set(FINISHED_ITEM_STATUSES):
+            job_status = "failed" if "failed" in statuses else "completed" if "completed" in statuses else "cancelled"
+            self.jobs.set_status(job_id, job_status)
+        return True
+
+    @staticmethod
+    def remove_expired_artifacts():
+        """
+        Removes exported archives that were not produced or reused within EXPORT_ARTIFACT_TTL_SECONDS, and partial
+        archives as old, left behind by workers that stopped while writing them
+        """
+        export_path = PathConf.LOCAL_IMAGE_PATH / "exports"
+        if not export_path.exists() or not _artifact_cleanup_lock.acquire(blocking=False):
+            return
+        try:
+            oldest = time.time() - DownloadDockerImage.EXPORT_ARTIFACT_TTL_SECONDS
+            for artifact in itertools.chain(export_path.glob("*.zip"), export_path.glob("*.part")):
+                if artifact.stat().st_mtime < oldest:
+                    artifact.unlink(missing_ok=True)
+                    logging.info(f"Removed expired image export {artifact.name}")
+        finally:
+            _artifact_cleanup_lock.release()
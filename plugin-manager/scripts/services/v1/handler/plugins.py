@@ -1,3 +1,4 @@
+import functools
 import logging
 import os
 import pathlib
@@ -5,11 +6,11 @@ import shutil
 from copy import deepcopy
 from io import BytesIO
 from datetime import datetime
-from pathlib import Path
-from docker.errors import NotFound
+from typing import AsyncIterator
+import anyio.to_thread
 import numpy as np
 import pandas as pd
-from fastapi import BackgroundTasks, UploadFile, HTTPException
+from fastapi import BackgroundTasks, UploadFile
 from fastapi.responses import FileResponse, StreamingResponse
 from ut_security_util import MetaInfoSchema
 
@@ -29,7 +30,7 @@ from scripts.constants.ui_components import (
     plugin_list_table_actions_for_portal,
     plugin_list_table_header_for_portal,
 )
-from scripts.db import PluginMeta, VulnerablityScanReport
+from scripts.db import AsyncPluginMeta, PluginMeta, VulnerablityScanReport
 from scripts.db.mongo.ilens_asset_model.collections.industry_category import (
     IndustryCategory,
 )
@@ -43,10 +44,10 @@ from scripts.utils.docker_util import DockerUtil
 from scripts.errors import ContentTypeError, PluginAlreadyExistError, PluginNotFoundError
 from scripts.services.v1.handler.deployment import DeploymentHandler
 from scripts.services.v1.schemas import Plugin, PluginListRequest, DefaultResponse
-from scripts.utils.common_util import get_unique_id, hit_external_service
+from scripts.utils.common_util import get_unique_id, hit_external_service, hit_external_service_async
 from scripts.utils.external_services import delete_container
-from scripts.utils.minio_util import MinioUtility
-from scripts.config import AzureCredentials
+from scripts.utils.minio_util import get_minio_utility
+from scripts.utils.stream_util import AsyncIteratorReader
 from scripts.utils.notification_util import NotificationSchema, NotificationSchemaDownload
 
 DEPLOYED = "Deployed - Running"
@@ -118,14 +119,16 @@ class PluginHandler:
 
     def list_plugins(self, list_request: PluginListRequest) -> dict[str, list]:
         required_fields = self._get_required_fields(list_request.tz)
-        raw_data = list(self.plugin_db_conn.list_plugin_ag_grid(list_request, additional_projection=required_fields))
+        raw_data, total_no = self.plugin_db_conn.list_plugin_ag_grid(
+            list_request, additional_projection=required_fields
+        )
         plugin_records = self._group_plugins_by_id(raw_data)
         filtered_data = self._filter_plugin_records(plugin_records, list_request.records)
         data = self.data_formatter(filtered_data, portal=list_request.portal) if filtered_data else []
         end_of_records = len(filtered_data) < list_request.records
         return {
             "bodyContent": data,
-            "total_no": self.plugin_db_conn.get_counts_ag_grid(list_request),
+            "total_no": total_no,
             "endOfRecords": end_of_records,
         }
 
@@ -184,6 +187,12 @@ class PluginHandler:
                 {"deployment_status": 1, "plugin_type": 1, "_id": 0},
             )
 
+        return self._compute_disabled_actions(plugin)
+
+    @staticmethod
+    def _compute_disabled_actions(plugin: dict | None) -> list:
+        if not plugin or "deployment_status" not in plugin:
+            return []
         deployment_status = plugin["deployment_status"].lower()
         disabled_actions = []
         added_actions = set()
@@ -211,17 +220,43 @@ class PluginHandler:
 
         return disabled_actions
 
-    def determine_plugin_status(self, row, portal_key=False):
+    def resolve_listing_states(self, plugin_ids: list) -> tuple[dict, dict]:
+        """
+        Resolve the per-version status and the disabled actions of a whole grid page with one bulk fetch
+        :param plugin_ids: Plugin IDs present on the grid page
+        :return: Status lookup keyed by plugin ID then version, and disabled actions keyed by plugin ID
+        """
+        status_lookup = {}
+        plugin_versions = {}
+        for record in self.plugin_db_conn.fetch_listing_states(plugin_ids):
+            versions = plugin_versions.setdefault(record["plugin_id"], [])
+            versions.append(record)
+            status_lookup.setdefault(record["plugin_id"], {})[record.get("version")] = record.get("status")
+
+        disabled_actions_lookup = {}
+        for plugin_id, versions in plugin_versions.items():
+            plugin = versions[0]
+            if "deployment_status" in plugin and (current_version := plugin.get("current_version")):
+                plugin = next((record for record in versions if record.get("version") == current_version), None)
+            disabled_actions_lookup[plugin_id] = self._compute_disabled_actions(plugin)
+        return status_lookup, disabled_actions_lookup
+
+    def determine_plugin_status(self, row, portal_key=False, status_lookup: dict | None = None):
         current_version = row.get("version")
         if row["deployment_status"] == "Failed":
-            return self._handle_failed_status(row, portal_key, current_version)
+            return self._handle_failed_status(row, portal_key, current_version, status_lookup)
         elif row["deployment_status"] in ["Running", "Stopped"]:
             return self._handle_running_or_paused_status(row, portal_key)
         else:
-            return self._handle_other_status(row, current_version)
+            return self._handle_other_status(row, current_version, status_lookup)
+
+    def _resolve_status(self, plugin_id, current_version, status_lookup: dict | None = None):
+        if status_lookup is None:
+            return self.fetch_status_from_db(plugin_id, current_version)
+        return status_lookup.get(plugin_id, {}).get(current_version)
 
-    def _handle_failed_status(self, row, portal_key, current_version):
-        status = self.fetch_status_from_db(row["plugin_id"], current_version)
+    def _handle_failed_status(self, row, portal_key, current_version, status_lookup: dict | None = None):
+        status = self._resolve_status(row["plugin_id"], current_version, status_lookup)
         if portal_key:
             return {"color": "#ff0000", "status": "Scan Failed"}
         if status == "running":
@@ -235,8 +270,8 @@ class PluginHandler:
             return {"color": "#C3C4CA", "status": "Stopped"}
         return {"color": "#008000", "status": DEPLOYED}
 
-    def _handle_other_status(self, row, current_version):
-        status = self.fetch_status_from_db(row["plugin_id"], current_version)
+    def _handle_other_status(self, row, current_version, status_lookup: dict | None = None):
+        status = self._resolve_status(row["plugin_id"], current_version, status_lookup)
         if status == "Deployed":
             return {"status": DEPLOYED, "color": "#008000"}
         elif row["deployment_status"] == "Pending":
@@ -248,6 +283,7 @@ class PluginHandler:
 
     def data_formatter(self, _data, portal=False):
         data_df = pd.DataFrame.from_records(_data)
+        status_lookup, disabled_actions_lookup = self.resolve_listing_states(data_df["plugin_id"].unique().tolist())
         data_df["plugin_type"] = data_df["plugin_type"].apply(
             lambda x: " ".join([word.capitalize() for word in x.split("_")])
         )
@@ -256,14 +292,18 @@ class PluginHandler:
         data_df["deployment_status"] = data_df["deployment_status"].str.capitalize()
         data_df.loc[data_df["deployment_status"] == "Paused", "deployment_status"] = "Stopped"
 
-        data_df["plugin_status"] = data_df.apply(self.determine_plugin_status, axis=1, portal_key=portal)
+        data_df["plugin_status"] = data_df.apply(
+            self.determine_plugin_status, axis=1, portal_key=portal, status_lookup=status_lookup
+        )
         data_df["plugin_status_color"] = data_df["plugin_status"].apply(lambda x: x["color"])
         data_df["plugin_status"] = data_df["plugin_status"].apply(lambda x: x["status"])
 
         data_df["deployed_on"] = data_df.apply(
             lambda row: self.format_deployed_on(row["deployed_on"], row["plugin_status"]), axis=1
         )
-        data_df["disabledActions"] = data_df["plugin_id"].apply(self.determine_disabled_actions)
+        data_df["disabledActions"] = data_df["plugin_id"].apply(
+            lambda plugin_id: disabled_actions_lookup.get(plugin_id, [])
+        )
         data_df = data_df.replace({pd.NaT: None, np.nan: None})
 
         if portal:
@@ -359,13 +399,29 @@ class PluginHandler:
         if not (plugin_data := self.plugin_db_conn.fetch_plugin(plugin_id)):
             raise PluginNotFoundError(f"Plugin ID {plugin_id} not found")
         self.plugin_db_conn.delete_plugin(plugin_id=plugin_id)
+        self._remove_plugin_resources(plugin_data, user_details, bg_task)
+
+    def delete_plugins(self, plugin_ids: list, user_details: MetaInfoSchema, bg_task: BackgroundTasks):
+        """
+        Deletes several plugins with one bulk delete, archived by a single soft-delete merge.
+        Nothing is deleted unless all of them exist.
+        """
+        plugin_ids = list(dict.fromkeys(plugin_ids))
+        plugins = []
+        for plugin_id in plugin_ids:
+            if not (plugin_data := self.plugin_db_conn.fetch_plugin(plugin_id)):
+                raise PluginNotFoundError(f"Plugin ID {plugin_id} not found")
+            plugins.append(plugin_data)
+        self.plugin_db_conn.delete_plugins(plugin_ids=plugin_ids)
+        for plugin_data in plugins:
+            self._remove_plugin_resources(plugin_data, user_details, bg_task)
+
+    def _remove_plugin_resources(
+        self, plugin_data: PluginMetaDBSchema, user_details: MetaInfoSchema, bg_task: BackgroundTasks
+    ):
+        plugin_id = plugin_data.plugin_id
         if plugin_data.registration_type == "bundle_upload" and plugin_data.minio_file_path:
-            MinioUtility(
-                endpoint=MinioSettings.MINIO_ENDPOINT,
-                access_key=MinioSettings.MINIO_ACCESS_KEY,
-                secret_key=MinioSettings.MINIO_SECRET_KEY,
-                secure=MinioSettings.MINIO_SECURE,
-            ).delete_object(MinioSettings.MINIO_BUCKET_NAME, plugin_data.minio_file_path)
+            get_minio_utility().delete_object(MinioSettings.MINIO_BUCKET_NAME, plugin_data.minio_file_path)
 
         if plugin_data.plugin_type in delete_container_support:
             if plugin_data.plugin_type == "widget":
@@ -388,8 +444,8 @@ class PluginHandler:
                 user_details,
             )
 
-    def get_errors(self, plugin_id: str):
-        return self.plugin_db_conn.get_errors(plugin_id=plugin_id)
+    async def get_errors(self, plugin_id: str):
+        return await AsyncPluginMeta(project_id=self.project_id).get_errors(plugin_id=plugin_id)
 
     def get_info(self, plugin_id: str, version: float, host: str = "") -> dict:
         data = self.plugin_db_conn.fetch_plugin(plugin_id=plugin_id, version=version)
@@ -729,15 +785,27 @@ class PluginHandler:
         return widget_data
 
     def fetch_plugin_env_config(self):
-        options = [
-            {"label": "Text", "value": "text", "options": None},
-            {"label": "Secure", "value": "secure", "options": None},
-        ]
         kubernetes_secrets = hit_external_service(
             api_url=f"{ExternalServices.PROXY_MANAGER_URL}{ExternalAPI.secrets}",
             method="get",
         )
-        if kubernetes_secrets.get("data", None):
+        return self._plugin_env_config_options(kubernetes_secrets)
+
+    @staticmethod
+    async def fetch_plugin_env_config_async():
+        kubernetes_secrets = await hit_external_service_async(
+            api_url=f"{ExternalServices.PROXY_MANAGER_URL}{ExternalAPI.secrets}",
+            method="get",
+        )
+        return PluginHandler._plugin_env_config_options(kubernetes_secrets)
+
+    @staticmethod
+    def _plugin_env_config_options(kubernetes_secrets: dict | None) -> list:
+        options = [
+            {"label": "Text", "value": "text", "options": None},
+            {"label": "Secure", "value": "secure", "options": None},
+        ]
+        if kubernetes_secrets and kubernetes_secrets.get("data", None):
             options.append(
                 {
                     "label": "Kubernetes Secrets",
@@ -796,36 +864,29 @@ class PluginHandler:
                     is_update = True
         return request_config, is_update
 
+    @staticmethod
+    def bundle_content_type(file_name: str) -> str:
+        _, file_extension = os.path.splitext(file_name)
+        if file_extension.lower() not in [".zip", ".tar"]:
+            raise ContentTypeError(f"Invalid file extension: {file_extension}")
+        return "application/zip" if file_extension.lower() == ".zip" else "application/x-tar"
+
     def push_to_minio(self, plugin_id: str, file_name: str):
         try:
             plugin_data = self.plugin_db_conn.fetch_plugin(plugin_id=plugin_id)
             file_path = os.path.join(PathConf.TEMP_PATH, file_name)
-
-            _, file_extension = os.path.splitext(file_name)
-            if file_extension.lower() not in [".zip", ".tar"]:
-                content_type = "application/zip" if file_extension.lower() == ".zip" else "application/x-tar"
-            else:
-                raise ContentTypeError(f"Invalid file extension: {file_extension}")
-
+            content_type = self.bundle_content_type(file_name)
+            object_name = self.bundle_object_name(plugin_id, file_name)
             with open(file_path, "rb") as f:
-                MinioUtility(
-                    endpoint=MinioSettings.MINIO_ENDPOINT,
-                    access_key=MinioSettings.MINIO_ACCESS_KEY,
-                    secret_key=MinioSettings.MINIO_SECRET_KEY,
-                    secure=MinioSettings.MINIO_SECURE,
-                ).put_object(
-                    MinioSettings.MINIO_BUCKET_NAME,
-                    f"uploads/{plugin_id}/zip/{file_name}",
-                    data=f,
-                    length=os.path.getsize(file_path),
-                    content_type=content_type,
+                get_minio_utility().upload_stream(
+                    MinioSettings.MINIO_BUCKET_NAME, object_name, f, content_type=content_type
                 )
             os.remove(file_path)
-            plugin_data.minio_file_path = f"uploads/{plugin_id}/zip/{file_name}"
+            plugin_data.minio_file_path = object_name
             self.plugin_db_conn.update_plugin(plugin_id=plugin_id, data=plugin_data.model_dump())
-            return (
-                f"{MinioSettings.MINIO_ENDPOINT}/{MinioSettings.MINIO_BUCKET_NAME}/uploads/{plugin_id}/zip/{file_name}"
-            )
+            return f"{MinioSettings.MINIO_ENDPOINT}/{MinioSettings.MINIO_BUCKET_NAME}/{object_name}"
+        except ContentTypeError:
+            raise
         except Exception as e:
             logging.exception(f"Error occurred while uploading file to minio: {e}")
 
@@ -845,27 +906,22 @@ class PluginHandler:
         content = await file.read()
         background_tasks.add_task(self.save_chunk, file_name, content)
 
-    def upload_files_to_minio(self, plugin_id: str, file: UploadFile, version: float, user_details: MetaInfoSchema):
+    @staticmethod
+    def bundle_object_name(plugin_id: str, file_name: str) -> str:
+        return f"uploads/{plugin_id}/zip/{os.path.basename(file_name)}"
+
+    def _fetch_bundle_plugin(self, plugin_id: str, version: float | None = None) -> PluginMetaDBSchema:
         plugin_data = self.plugin_db_conn.fetch_plugin(plugin_id=plugin_id, version=version)
         if not plugin_data:
             raise PluginNotFoundError(f"Plugin ID {plugin_id} not found")
         elif plugin_data.plugin_type not in job_types:
             raise ValueError(f"Plugin type {plugin_data.plugin_type} not supported")
-        minio_util = MinioUtility(
-            endpoint=MinioSettings.MINIO_ENDPOINT,
-            access_key=MinioSettings.MINIO_ACCESS_KEY,
-            secret_key=MinioSettings.MINIO_SECRET_KEY,
-            secure=MinioSettings.MINIO_SECURE,
-        )
-        logging.info(f"Uploading file to minio for plugin ID: {plugin_id}")
-        minio_util.upload_object(
-            MinioSettings.MINIO_BUCKET_NAME,
-            f"uploads/{plugin_id}/zip/{file.filename}",
-            file.file,
-        )
-        plugin_data.minio_file_path = f"uploads/{plugin_id}/zip/{file.filename}"
+        return plugin_data
+
+    def _record_bundle(self, plugin_data: PluginMetaDBSchema, object_name: str, user_details: MetaInfoSchema) -> str:
+        plugin_data.minio_file_path = object_name
         self.plugin_db_conn.update_plugin(
-            plugin_id=plugin_id, data=plugin_data.model_dump(), version=plugin_data.version
+            plugin_id=plugin_data.plugin_id, data=plugin_data.model_dump(), version=plugin_data.version
         )
         notification = NotificationSchema(
             message=f"{plugin_data.name} uploaded Succesfully",
@@ -873,9 +929,65 @@ class PluginHandler:
         )
         push_notification(notification, user_id=user_details.user_id, project_id=self.project_id)
         logging.info(f"Notification: {notification.model_dump()}")
-        return (
-            f"{MinioSettings.MINIO_ENDPOINT}/{MinioSettings.MINIO_BUCKET_NAME}/uploads/{plugin_id}/zip/{file.filename}"
+        return f"{MinioSettings.MINIO_ENDPOINT}/{MinioSettings.MINIO_BUCKET_NAME}/{object_name}"
+
+    def upload_files_to_minio(self, plugin_id: str, file: UploadFile, version: float, user_details: MetaInfoSchema):
+        plugin_data = self._fetch_bundle_plugin(plugin_id, version=version)
+        object_name = self.bundle_object_name(plugin_id, file.filename)
+        logging.info(f"Uploading file to minio for plugin ID: {plugin_id}")
+        get_minio_utility().upload_stream(
+            MinioSettings.MINIO_BUCKET_NAME,
+            object_name,
+            file.file,
+            content_type=self.bundle_content_type(file.filename),
         )
+        return self._record_bundle(plugin_data, object_name, user_details)
+
+    async def stream_bundle_to_minio(
+        self,
+        plugin_id: str,
+        version: float,
+        file_name: str,
+        body: AsyncIterator[bytes],
+        user_details: MetaInfoSchema,
+    ) -> str:
+        """
+        Uploads a bundle sent as the raw request body to MinIO as it arrives. The body is passed on part by part
+        as a multipart upload, so it is neither spooled to disk nor held in memory by the plugin manager.
+        """
+        plugin_data = self._fetch_bundle_plugin(plugin_id, version=version)
+        content_type = self.bundle_content_type(file_name)
+        object_name = self.bundle_object_name(plugin_id, file_name)
+        reader = AsyncIteratorReader(body)
+        logging.info(f"Streaming bundle to minio for plugin ID: {plugin_id}")
+        await anyio.to_thread.run_sync(
+            functools.partial(
+                get_minio_utility().upload_stream,
+                MinioSettings.MINIO_BUCKET_NAME,
+                object_name,
+                reader,
+                content_type=content_type,
+            )
+        )
+        if not reader.bytes_read:
+            get_minio_utility().delete_object(MinioSettings.MINIO_BUCKET_NAME, object_name)
+            raise ValueError("Bundle is empty")
+        logging.info(f"Streamed {reader.bytes_read} bytes of bundle {object_name}")
+        return await anyio.to_thread.run_sync(self._record_bundle, plugin_data, object_name, user_details)
+
+    def download_plugin_bundle(self, plugin_id: str, version: float | None = None) -> str:
+        """
+        :return: Presigned URL the bundle is downloaded with straight from MinIO
+        """
+        plugin_data = self.plugin_db_conn.fetch_plugin(plugin_id=plugin_id, version=version)
+        if not plugin_data:
+            raise PluginNotFoundError(f"Plugin ID {plugin_id} not found")
+        minio_util = get_minio_utility()
+        if not plugin_data.minio_file_path or not minio_util.object_exists(
+            MinioSettings.MINIO_BUCKET_NAME, plugin_data.minio_file_path
+        ):
+            raise PluginNotFoundError(f"No bundle uploaded for plugin ID {plugin_id}")
+        return minio_util.presigned_download_url(MinioSettings.MINIO_BUCKET_NAME, plugin_data.minio_file_path)
 
     @staticmethod
     def send_notification(plugin_data, plugin_id, user_details: MetaInfoSchema):
@@ -900,91 +1012,6 @@ class PluginHandler:
         )
         return DefaultResponse(message=f"{plugin_data.name} is Ready Please download from the Notification Pane.")
 
-    def docker_image_download(self, plugin_data, plugin_id, user_details: MetaInfoSchema):
-        # Fetch the image tag from the database
-        image_tag = next(
-            (field["value"] for field in plugin_data.additional_fields if field["label"] == "Docker Image"), None
-        )
-        if not image_tag:
-            raise ValueError("Docker Image tag not found in the plugin's additional fields")
-        docker_util = DockerUtil()
-        local_image_dir = PathConf.LOCAL_IMAGE_PATH / f"{plugin_data.name}"
-        local_image_path = local_image_dir / "plugin.tar"
-
-        # Ensure the local directory exists
-        os.makedirs(local_image_dir, exist_ok=True)
-
-        # Check if the image t"{"ar file exists locally if yes then remove it
-        if os.path.exists(f"{local_image_dir}.zip"):
-            os.remove(f"{local_image_dir}.zip")
-            logging.info(f"Removed existing zip file: {local_image_path}")
-        logging.info(f"Image {image_tag} is being pulled from registry")
-        try:
-            # Pull the image from the registry
-            docker_util.pull_image(
-                image_tag=image_tag,
-                container_registry_url=AzureCredentials.azure_container_registry_url,
-                container_registry_credentials={
-                    "username": AzureCredentials.azure_registry_username,
-                    "password": AzureCredentials.azure_registry_password,
-                },
-            )
-            logging.info("Converting image to tar file and saving locally")
-            # Save the image to the local path
-            byte_stream = docker_util.save_image(image_tag)
-            with open(local_image_path, "wb") as f:
-                for chunk in byte_stream:
-                    f.write(chunk)
-            logging.info(f"Image {image_tag} saved locally as tar file: {local_image_path}")
-            if plugin_data.plugin_type == "widget":
-                shutil.copyfile(PathConf.LOCAL_IMAGE_PATH / f"{plugin_id}.json", local_image_dir / "widgetConfig.json")
-            if plugin_data.plugin_type in ["custom_app", "formio_component"]:
-                shutil.copyfile(PathConf.LOCAL_IMAGE_PATH / f"{plugin_id}.json", local_image_dir / "pluginConfig.json")
-            self.docker_util.container_blob_signing(local_image_path, local_image_dir)
-            source_dir = Path(local_image_dir)
-            destination_zip = Path(f"{local_image_dir}.zip")
-            shutil.make_archive(
-                str(destination_zip.with_suffix("")),
-                "zip",
-                str(source_dir.parent),
-                source_dir.name,
-            )
-            logging.info(f"Image and signature zipped as: {destination_zip}")
-            shutil.rmtree(local_image_dir)
-            # Send notification after saving the file
-            PluginHandler.send_notification(plugin_data, plugin_id, user_details)
-
-        except NotFound as e:
-            logging.error(f"Image {image_tag} not found in registry: {e}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"Docker image {image_tag} not found in registry",
-            ) from e
-        except Exception as e:
-            logging.error(f"Failed to create the tar file: {e}")
-            raise HTTPException(status_code=500, detail="Failed to create the tar file")
-
-    def docker_image_download_kubeflow(self, plugin_data, plugin_id, user_details: MetaInfoSchema):
-        """
-        Checks if the plugin_id is available and registration_type is kubeflow,
-        then checks if the zip file is present in LOCAL_IMAGE_PATH. If yes, sends a notification.
-
-        :param plugin_data: The plugin data.
-        :param plugin_id: The plugin ID.
-        :param user_details: The user details.
-        """
-        try:
-            if plugin_data.plugin_type == "kubeflow":
-                zip_file_path = PathConf.LOCAL_IMAGE_PATH / f"{plugin_data.name}.zip"
-                if zip_file_path.exists():
-                    self.send_notification(plugin_data, plugin_id, user_details)
-                else:
-                    logging.info(f"Zip file for Kubeflow plugin {plugin_id} is not available.")
-            else:
-                logging.info(f"Plugin {plugin_id} is not of type kubeflow.")
-        except Exception as e:
-            logging.error(f"Error checking plugin data or sending notification: {e}")
-
     def fetch_versions(self, plugin_id: str):
         data = self.plugin_db_conn.fetch_plugin_versions(plugin_id)
         sorted_versions = sorted(data, key=lambda x: float(x))
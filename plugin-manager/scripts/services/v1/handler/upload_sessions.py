@@ -0,0 +1,217 @@
+import datetime
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from minio.commonconfig import ComposeSource
+from ut_security_util import MetaInfoSchema
+
+from scripts.config import MinioSettings, UploadSessionConf
+from scripts.constants import job_types
+from scripts.db import PluginMeta, UploadSessions
+from scripts.errors import ContentTypeError, PluginNotFoundError, UploadSessionError
+from scripts.services.v1.schemas import UploadSessionCreate
+from scripts.utils.common_util import get_unique_id
+from scripts.utils.minio_util import get_minio_utility
+
+ALLOWED_BUNDLE_EXTENSIONS = (".zip", ".tar")
+# S3 multipart uploads, which compose_object is built on, take at most this many parts
+MAX_UPLOAD_CHUNKS = 10000
+
+_collection_lock = threading.Lock()
+_last_collection: float | None = None
+
+
+class UploadSessionHandler:
+    """
+    Resumable bundle uploads. Every chunk is stored in MinIO as its own object, recorded under its index with its
+    checksum, so chunks can arrive out of order, in parallel and again after a dropped connection. The bundle is
+    assembled on completion by MinIO itself, as a multipart upload copying each chunk object as a part.
+    """
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.plugin_db_conn = PluginMeta(project_id=project_id)
+        self.sessions = UploadSessions(project_id=project_id)
+        self.minio = get_minio_utility()
+
+    @staticmethod
+    def chunk_object_name(session_id: str, index: int, write_id: str | None = None) -> str:
+        name = f"{UploadSessionConf.UPLOAD_SESSION_PREFIX}/{session_id}/{index:05d}"
+        return f"{name}-{write_id}" if write_id else name
+
+    def _chunk_object(self, session_id: str, index: int, chunk: dict) -> str:
+        # Chunks recorded before every write had its own object are stored under the bare index
+        return chunk.get("object_name") or self.chunk_object_name(session_id, index)
+
+    @staticmethod
+    def bundle_object_name(plugin_id: str, file_name: str) -> str:
+        return f"uploads/{plugin_id}/zip/{file_name}"
+
+    def create_session(self, request: UploadSessionCreate, user_details: MetaInfoSchema) -> dict:
+        plugin_data = self.plugin_db_conn.fetch_plugin(plugin_id=request.plugin_id)
+        if not plugin_data:
+            raise PluginNotFoundError(f"Plugin ID {request.plugin_id} not found")
+        elif plugin_data.plugin_type not in job_types:
+            raise ValueError(f"Plugin type {plugin_data.plugin_type} not supported")
+        _, file_extension = os.path.splitext(request.file_name)
+        if file_extension.lower() not in ALLOWED_BUNDLE_EXTENSIONS:
+            raise ContentTypeError(f"Invalid file extension: {file_extension}")
+        if not 0 < request.total_chunks <= MAX_UPLOAD_CHUNKS:
+            raise UploadSessionError(f"An upload takes between 1 and {MAX_UPLOAD_CHUNKS} chunks")
+        # A single chunk is also the last part, which has no lower bound
+        min_chunk_size = UploadSessionConf.UPLOAD_MIN_CHUNK_SIZE if request.total_chunks > 1 else 1
+        if not min_chunk_size <= request.chunk_size <= UploadSessionConf.UPLOAD_MAX_CHUNK_SIZE:
+            raise UploadSessionError(
+                f"Chunks must be between {min_chunk_size} and " f"{UploadSessionConf.UPLOAD_MAX_CHUNK_SIZE} bytes"
+            )
+        now = datetime.datetime.now(datetime.timezone.utc)
+        session = {
+            "session_id": get_unique_id(),
+            "plugin_id": request.plugin_id,
+            "file_name": os.path.basename(request.file_name),
+            "total_chunks": request.total_chunks,
+            "chunk_size": request.chunk_size,
+            "chunks": {},
+            "status": "open",
+            "created_by": user_details.user_id,
+            "created_on": now,
+            "updated_on": now,
+        }
+        self.sessions.create_session(session)
+        return self.describe(session)
+
+    @staticmethod
+    def describe(session: dict) -> dict:
+        received = {int(index) for index in session.get("chunks", {})}
+        return {
+            "session_id": session["session_id"],
+            "status": session["status"],
+            "total_chunks": session["total_chunks"],
+            "chunk_size": session["chunk_size"],
+            "received_chunks": len(received),
+            "received_bytes": sum(chunk["size"] for chunk in session.get("chunks", {}).values()),
+            "missing_chunks": [index for index in range(session["total_chunks"]) if index not in received],
+        }
+
+    def _fetch_session(self, session_id: str) -> dict:
+        session = self.sessions.fetch_session(session_id)
+        if not session:
+            raise UploadSessionError(f"Upload session {session_id} not found")
+        return session
+
+    def get_status(self, session_id: str) -> dict:
+        return self.describe(self._fetch_session(session_id))
+
+    def save_chunk(self, session_id: str, index: int, content: bytes, checksum: str | None = None) -> dict:
+        """
+        Stores one chunk. Sending a chunk again replaces it, which is how a chunk lost to a dropped connection is
+        retried. Every write goes to a new object, so one racing the completion can not overwrite the chunk object
+        whose etag the compose pinned, and it is deleted again when the session no longer takes it.
+
+        :param session_id: Upload session ID
+        :param index: Zero-based position of the chunk in the bundle
+        :param content: Chunk bytes
+        :param checksum: SHA-256 of the chunk as computed by the client, verified before the chunk is stored
+        :return: Index and checksum of the stored chunk
+        """
+        session = self._fetch_session(session_id)
+        if session["status"] != "open":
+            raise UploadSessionError(f"Upload session {session_id} is {session['status']}")
+        total_chunks = session["total_chunks"]
+        if not 0 <= index < total_chunks:
+            raise UploadSessionError(f"Chunk index {index} is outside 0-{total_chunks - 1}")
+        last = index == total_chunks - 1
+        if not content or len(content) > session["chunk_size"] or (not last and len(content) != session["chunk_size"]):
+            raise UploadSessionError(f"Chunk {index} has {len(content)} bytes, expected {session['chunk_size']}")
+        digest = hashlib.sha256(content).hexdigest()
+        if checksum and checksum.lower() != digest:
+            raise UploadSessionError(f"Checksum mismatch for chunk {index}, please send it again")
+        # Hashing a large chunk takes a while, the session may have started completing meanwhile
+        session = self._fetch_session(session_id)
+        if session["status"] != "open":
+            raise UploadSessionError(f"Upload session {session_id} is {session['status']}")
+        bucket = MinioSettings.MINIO_BUCKET_NAME
+        object_name = self.chunk_object_name(session_id, index, get_unique_id())
+        etag = self.minio.put_bytes(bucket, object_name, content)
+        chunk = {"size": len(content), "sha256": digest, "etag": etag, "object_name": object_name}
+        if not self.sessions.record_chunk(session_id, index, chunk):
+            self.minio.delete_objects(bucket, [object_name])
+            raise UploadSessionError(f"Upload session {session_id} is no longer accepting chunks")
+        if replaced := session["chunks"].get(str(index)):
+            self.minio.delete_objects(bucket, [self._chunk_object(session_id, index, replaced)])
+        return {"index": index, "sha256": digest}
+
+    def complete_session(self, session_id: str) -> str:
+        session = self._fetch_session(session_id)
+        missing = self.describe(session)["missing_chunks"]
+        if missing:
+            raise UploadSessionError(f"Upload session {session_id} is missing chunks {missing[:50]}")
+        if not self.sessions.set_status(session_id, "completing"):
+            raise UploadSessionError(f"Upload session {session_id} is already being completed")
+        # Chunks recorded before the status change are all there is, re-read them in case a retry replaced one
+        session = self._fetch_session(session_id)
+        bucket = MinioSettings.MINIO_BUCKET_NAME
+        object_name = self.bundle_object_name(session["plugin_id"], session["file_name"])
+        sources = [
+            ComposeSource(
+                bucket,
+                self._chunk_object(session_id, index, session["chunks"][str(index)]),
+                match_etag=session["chunks"][str(index)]["etag"],
+            )
+            for index in range(session["total_chunks"])
+        ]
+        try:
+            self.minio.compose_object(bucket, object_name, sources)
+        except Exception:
+            self.sessions.set_status(session_id, "open", from_status="completing")
+            raise
+        self.sessions.set_status(session_id, "completed", from_status="completing")
+        self.plugin_db_conn.update_plugin(plugin_id=session["plugin_id"], data={"minio_file_path": object_name})
+        self._remove_chunks(session_id, session.get("chunks", {}))
+        return f"{MinioSettings.MINIO_ENDPOINT}/{bucket}/{object_name}"
+
+    def abort_session(self, session_id: str):
+        session = self._fetch_session(session_id)
+        if not self.sessions.set_status(session_id, "aborted"):
+            raise UploadSessionError(f"Upload session {session_id} is {session['status']}")
+        self._remove_chunks(session_id, session.get("chunks", {}))
+
+    def _remove_chunks(self, session_id: str, chunks: dict) -> bool:
+        if not chunks:
+            return True
+        return self.minio.delete_objects(
+            MinioSettings.MINIO_BUCKET_NAME,
+            [self._chunk_object(session_id, int(index), chunk) for index, chunk in chunks.items()],
+        )
+
+    def collect_abandoned_sessions(self) -> int:
+        """
+        Removes the chunks and records of sessions idle for longer than UPLOAD_SESSION_TTL_SECONDS
+        :return: Number of sessions removed
+        """
+        removed = 0
+        for session in self.sessions.fetch_abandoned(UploadSessionConf.UPLOAD_SESSION_TTL_SECONDS):
+            if self._remove_chunks(session["session_id"], session.get("chunks", {})):
+                self.sessions.delete_session(session["session_id"])
+                removed += 1
+        if removed:
+            logging.info(f"Removed {removed} abandoned upload sessions")
+        return removed
+
+    def collect_abandoned_sessions_periodically(self):
+        """Runs the collection at most once per UPLOAD_SESSION_GC_INTERVAL_SECONDS in this process"""
+        global _last_collection
+        with _collection_lock:
+            if (
+                _last_collection is not None
+                and time.monotonic() - _last_collection < UploadSessionConf.UPLOAD_SESSION_GC_INTERVAL_SECONDS
+            ):
+                return
+            _last_collection = time.monotonic()
+        try:
+            self.collect_abandoned_sessions()
+        except Exception as e:
+            logging.exception(f"Unable to collect abandoned upload sessions: {e}")
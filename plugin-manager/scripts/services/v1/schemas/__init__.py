@@ -223,6 +223,13 @@ class PluginDownloadRequest(BaseModel):
     version: str | float = 1.0
 
 
+class UploadSessionCreate(BaseModel):
+    plugin_id: str
+    file_name: str
+    total_chunks: int
+    chunk_size: int
+
+
 class GitTargetCreateUpdateSchema(BaseModel):
     git_target_id: Optional[str | None] = None
     git_target_name: str
@@ -0,0 +1,205 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded, thread safe in-process cache. Entries expire ttl_seconds after they were stored and the least
+    recently used one is evicted once maxsize is reached. Hits, misses, evictions and invalidations are counted.
+    Every invalidation bumps a version, so a value loaded while one happened is not stored over it.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._version = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value, version: int | None = None):
+        """:param version: Version the value was loaded at, the value is dropped if an invalidation came since"""
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]):
+        """Returns the cached value, or loads and caches it. Exceptions raised by the loader are not cached."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            with self._lock:
+                version = self._version
+            value = loader()
+            self.set(key, value, version=version)
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+            self.invalidations += removed
+            self._version += 1
+        return removed
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            self._version += 1
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._version += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def keyspace_events_enabled(redis_client, event_types: str) -> bool:
+    """
+    Whether Redis sends the keyspace notifications of the given event types, e.g. "gh" for hash writes and deletes.
+    They are off by default, and CONFIG may be disabled on managed Redis, which counts as off.
+    """
+    try:
+        flags = redis_client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+    except Exception as e:
+        logging.warning(f"Unable to read notify-keyspace-events, assuming keyspace notifications are off: {e}")
+        return False
+    if "A" in flags:
+        # A is the alias of g$lshzxet
+        flags += "g$lshzxet"
+    return "K" in flags and all(event_type in flags for event_type in event_types)
+
+
+class CacheInvalidationListener:
+    """
+    Subscribes to Redis channels in a background thread and hands every message to the handler registered for
+    its channel, so that every worker process drops its cached copies as soon as the source changes. Pattern
+    subscriptions cover keyspace notifications, whose handlers get the key that changed. Messages sent while the
+    subscription is down are lost, so the caches are reset whenever it is (re)established.
+    """
+
+    def __init__(self, redis_client, reconnect_seconds: float = 5):
+        self.redis_client = redis_client
+        self.reconnect_seconds = reconnect_seconds
+        self._channels: dict[str, Callable[[str], None]] = {}
+        self._patterns: dict[str, Callable[[str], None]] = {}
+        self._resets: list[Callable[[], None]] = []
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str, handler: Callable[[str], None], *, pattern: bool = False):
+        """Registers a handler, before start(). Keyspace channels are best subscribed as a pattern."""
+        (self._patterns if pattern else self._channels)[channel] = handler
+
+    def on_reset(self, reset: Callable[[], None]):
+        self._resets.append(reset)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Starts listening, once per process. Cheap enough to call on every cache lookup."""
+        if self.running or not (self._channels or self._patterns):
+            return
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _reset(self):
+        for reset in self._resets:
+            try:
+                reset()
+            except Exception as e:
+                logging.exception(f"Cache reset failed: {e}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                if self._channels:
+                    pubsub.subscribe(*self._channels)
+                if self._patterns:
+                    pubsub.psubscribe(*self._patterns)
+                self._reset()
+                while not self._stopped.is_set():
+                    if message := pubsub.get_message(timeout=1.0):
+                        self.dispatch(message)
+            except Exception as e:
+                logging.warning(f"Cache invalidation subscription lost, caches will be reset: {e}")
+            finally:
+                try:
+                    pubsub.close()
+                except Exception as e:
+                    logging.debug(f"Unable to close the invalidation subscription: {e}")
+            self._stopped.wait(self.reconnect_seconds)
+
+    def dispatch(self, message: dict):
+        if message.get("type") == "pmessage":
+            handler = self._patterns.get(message["pattern"])
+            # Keyspace channels are named __keyspace@<db>__:<key>, the payload is only the command
+            payload = message["channel"].split(":", 1)[-1]
+        elif message.get("type") == "message":
+            handler = self._channels.get(message["channel"])
+            payload = message["data"]
+        else:
+            return
+        if handler is None:
+            return
+        try:
+            handler(payload)
+        except Exception as e:
+            logging.exception(f"Cache invalidation for {payload} failed: {e}")
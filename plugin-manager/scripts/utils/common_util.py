@@ -1,3 +1,4 @@
+import asyncio
 import gzip
 import json
 import logging
@@ -24,8 +25,9 @@ from scripts.constants import STATUS
 from scripts.constants.schemas import ExternRequest
 from scripts.errors import AuthenticationError
 from scripts.utils.docker_util import DockerUtil
-from scripts.config import PathConf
+from scripts.config import HTTPClientConf, PathConf
 from scripts.db.schemas import PluginMetaDBSchema
+from scripts.utils.http_client import http_pool
 
 
 def timed_lru_cache(seconds: int = 10, maxsize: int = 128):
@@ -52,16 +54,55 @@ def get_unique_id():
     return shortuuid.uuid()
 
 
+_RETRY = object()
+
+
+def _external_request_kwargs(api_url, payload, request_cookies, timeout, params, auth, headers) -> dict:
+    payload_json = ExternRequest(
+        url=api_url,
+        timeout=http_pool.timeout_for(api_url, timeout),
+        cookies=request_cookies,
+        params=params,
+        auth=auth,
+        headers=headers,
+    )
+    payload_json = payload_json.model_dump(exclude_none=True)
+    if payload:
+        payload_json.update(json=payload)
+    return payload_json
+
+
+def _handle_external_response(resp, api_url, request_cookies, breaker):
+    logging.debug(f"Resp Code:{resp.status_code}")
+    # Any answer below 500 shows the target is up, whether or not the request itself was accepted
+    if resp.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if resp.status_code in STATUS.SUCCESS_CODES:
+        return resp.json()
+    elif resp.status_code == 404:
+        logging.error(f"Module not found: {api_url}")
+        raise ModuleNotFoundError
+    elif resp.status_code == 401:
+        logging.warning(f"Unauthorized to execute request on {api_url}")
+        raise AuthenticationError
+    logging.debug(f"Resp Message:{resp.status_code} \n Cookies: {request_cookies} \n Rest API: {api_url}")
+    return _RETRY
+
+
 def hit_external_service(
     api_url, payload=None, request_cookies=None, timeout=60, method="post", params=None, auth=None, headers=None
 ):
     """
-    The hit_external_service function is used to hit external services.
+    The hit_external_service function is used to hit external services through the shared pooled client.
+    Failed attempts are retried with jittered exponential backoff and requests are short-circuited while the
+    target's circuit breaker is open.
 
     :param api_url: Call the external service
     :param payload: Pass the data to be sent in the body of a post request
     :param request_cookies: Pass the cookies to the external service
-    :param timeout: Set the timeout of the request
+    :param timeout: Set the timeout of the request, unless the target has its own timeout configured
     :param method: Determine the type of request to be made
     :param params: Pass the query parameters to the api
     :param auth: Pass the authentication information to the external service
@@ -69,27 +110,60 @@ def hit_external_service(
     :return: A dictionary
     """
     try:
-        payload_json = ExternRequest(
-            url=api_url, timeout=timeout, cookies=request_cookies, params=params, auth=auth, headers=headers
-        )
-        payload_json = payload_json.model_dump(exclude_none=True)
-        if payload:
-            payload_json.update(json=payload)
-        with httpx.Client() as client:
-            for _ in range(3):
-                method_type = getattr(client, method)
-                resp = method_type(**payload_json)
-                logging.debug(f"Resp Code:{resp.status_code}")
-                if resp.status_code in STATUS.SUCCESS_CODES:
-                    return resp.json()
-                elif resp.status_code == 404:
-                    logging.error(f"Module not found: {api_url}")
-                    raise ModuleNotFoundError
-                elif resp.status_code == 401:
-                    logging.warning(f"Unauthorized to execute request on {api_url}")
-                    raise AuthenticationError
-                logging.debug(f"Resp Message:{resp.status_code} \n Cookies: {request_cookies} \n Rest API: {api_url}")
-            time.sleep(3)
+        request_kwargs = _external_request_kwargs(api_url, payload, request_cookies, timeout, params, auth, headers)
+        breaker = http_pool.ensure_closed_circuit(api_url)
+        client = http_pool.get_client()
+        for attempt in range(HTTPClientConf.RETRY_ATTEMPTS):
+            if attempt:
+                time.sleep(http_pool.backoff_delay(attempt - 1))
+            try:
+                resp = getattr(client, method)(**request_kwargs)
+            except httpx.TransportError:
+                breaker.record_failure()
+                if attempt == HTTPClientConf.RETRY_ATTEMPTS - 1:
+                    raise
+                continue
+            if (result := _handle_external_response(resp, api_url, request_cookies, breaker)) is not _RETRY:
+                return result
+        return None
+    except Exception as e:
+        logging.error(e)
+        raise
+
+
+async def hit_external_service_async(
+    api_url, payload=None, request_cookies=None, timeout=60, method="post", params=None, auth=None, headers=None
+):
+    """
+    Async variant of hit_external_service for use from FastAPI routes, backed by the shared pooled async client.
+
+    :param api_url: Call the external service
+    :param payload: Pass the data to be sent in the body of a post request
+    :param request_cookies: Pass the cookies to the external service
+    :param timeout: Set the timeout of the request, unless the target has its own timeout configured
+    :param method: Determine the type of request to be made
+    :param params: Pass the query parameters to the api
+    :param auth: Pass the authentication information to the external service
+    :param headers: Pass a dictionary of headers to the request
+    :return: A dictionary
+    """
+    try:
+        request_kwargs = _external_request_kwargs(api_url, payload, request_cookies, timeout, params, auth, headers)
+        breaker = http_pool.ensure_closed_circuit(api_url)
+        client = http_pool.get_async_client()
+        for attempt in range(HTTPClientConf.RETRY_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(http_pool.backoff_delay(attempt - 1))
+            try:
+                resp = await getattr(client, method)(**request_kwargs)
+            except httpx.TransportError:
+                breaker.record_failure()
+                if attempt == HTTPClientConf.RETRY_ATTEMPTS - 1:
+                    raise
+                continue
+            if (result := _handle_external_response(resp, api_url, request_cookies, breaker)) is not _RETRY:
+                return result
+        return None
     except Exception as e:
         logging.error(e)
         raise
@@ -392,36 +466,20 @@ def copy_contents_to_local_path(yaml_file_path, name: PluginMetaDBSchema):
 
 def convert_to_tar_file(new_image_tag, name):
     docker_util = DockerUtil()
-    byte_stream = docker_util.save_image(new_image_tag)
-    tar_file_path = os.path.join(PathConf.LOCAL_IMAGE_PATH, name, "kubeflow.tar")
-
-    with open(tar_file_path, "wb") as f:
-        for chunk in byte_stream:
-            f.write(chunk)
-
-    logging.info(f"Docker image saved to {tar_file_path}")
-
-    # Call container_blob_signing with the tar file path and the local image directory
-    local_image_dir = os.path.dirname(tar_file_path)
-    docker_util.container_blob_signing(tar_file_path, local_image_dir)
-
-    # Define the paths for the other files
-    pipeline_path = os.path.join(PathConf.LOCAL_IMAGE_PATH, name, "pipeline.yml")
-    signature_path = os.path.join(local_image_dir, "signature")
+    local_image_dir = os.path.join(PathConf.LOCAL_IMAGE_PATH, name)
+    pipeline_path = os.path.join(local_image_dir, "pipeline.yml")
 
-    # Ensure all files exist before zipping
-    if not all(os.path.exists(path) for path in [pipeline_path, signature_path, tar_file_path]):
+    if not os.path.exists(pipeline_path):
         logging.error("One or more files to be zipped are missing.")
         return
 
-    # Create a zip archive containing all the files
-    source_dir = Path(local_image_dir)
+    # Stream the saved image, its signature and the pipeline straight into the archive
     destination_zip = Path(f"{local_image_dir}.zip")
-    shutil.make_archive(
-        str(destination_zip.with_suffix("")),
-        "zip",
-        str(source_dir.parent),
-        source_dir.name,
+    docker_util.save_image_archive(
+        new_image_tag,
+        archive_path=destination_zip,
+        image_file_name="kubeflow.tar",
+        extra_files={"pipeline.yml": pipeline_path},
     )
     shutil.rmtree(local_image_dir)
 
@@ -1,20 +1,53 @@
 import logging
-from functools import lru_cache
 from typing import Tuple
 
 import ujson as json
 
+from scripts.config import CacheConf, Databases
 from scripts.db.redis_conn import project_details_db
+from scripts.utils.cache_util import CacheInvalidationListener, TTLCache, keyspace_events_enabled
+
+# Database prefix of each project, None for projects whose databases are not prefixed
+db_prefix_cache = TTLCache(
+    "db_names", maxsize=CacheConf.DB_NAME_CACHE_SIZE, ttl_seconds=CacheConf.DB_NAME_CACHE_TTL_SECONDS
+)
+project_details_listener = CacheInvalidationListener(
+    project_details_db, reconnect_seconds=CacheConf.CACHE_RECONNECT_SECONDS
+)
+# Project details are written by the project management services, Redis reports those writes to every worker
+if CacheConf.PROJECT_DETAILS_KEYSPACE_EVENTS:
+    project_details_listener.subscribe(
+        f"__keyspace@{Databases.REDIS_PROJECT_DB}__:*", db_prefix_cache.invalidate, pattern=True
+    )
+
+
+def reset_db_prefix_cache():
+    """Runs whenever the subscription is (re)established, changes made while it was down went unnoticed"""
+    if not keyspace_events_enabled(project_details_db, "g$"):
+        logging.warning(
+            "Keyspace notifications are off on the project Redis, "
+            "database names follow project changes after DB_NAME_CACHE_TTL_SECONDS only"
+        )
+    db_prefix_cache.clear()
+
+
+project_details_listener.on_reset(reset_db_prefix_cache)
 
 
-@lru_cache()
 def get_db_name(project_id: str, database: str, delimiter: str = "__") -> str:
+    project_details_listener.start()
+    prefix_name = db_prefix_cache.get_or_load(project_id, lambda: get_db_prefix(project_id))
+    if prefix_name:
+        return f"{prefix_name}{delimiter}{database}"
+    return database
+
+
+def get_db_prefix(project_id: str) -> str | None:
     prefix_condition, val = check_prefix_condition(project_id)
     if prefix_condition:
         # Get the prefix name from mongo or default to project_id
-        prefix_name = val.get("source_meta", {}).get("prefix") or project_id
-        return f"{prefix_name}{delimiter}{database}"
-    return database
+        return val.get("source_meta", {}).get("prefix") or project_id
+    return None
 
 
 def check_prefix_condition(project_id: str) -> Tuple[bool, dict]:
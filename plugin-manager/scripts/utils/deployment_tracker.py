@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+import httpx
+
+from scripts.config import DeploymentTrackerConf, ExternalServices
+from scripts.constants.api import ExternalAPI
+from scripts.utils.http_client import HTTPClientPool, http_pool
+
+IN_PROGRESS = "in_progress"
+SETTLED_STATUSES = ("completed", "error")
+REQUEST_TIMEOUT_MARGIN_SECONDS = 10
+
+
+class DeploymentStatusTracker:
+    """
+    Follows deployment rollouts on one background event loop instead of a sleeping worker thread per rollout.
+    Each tracked deployment long-polls the dynamic-proxies status watch, which answers as soon as the status
+    differs from the last one seen, and every transition is handed to a callback as it happens.
+    """
+
+    def __init__(
+        self,
+        watch_url: str,
+        watch_seconds: float = DeploymentTrackerConf.STATUS_WATCH_SECONDS,
+        retry_seconds: float = DeploymentTrackerConf.STATUS_RETRY_SECONDS,
+    ):
+        self.watch_url = watch_url
+        self.watch_seconds = watch_seconds
+        self.retry_seconds = retry_seconds
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="deployment-tracker", daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def track(
+        self,
+        deployment: str,
+        on_transition: Callable[[dict], None],
+        timeout: float,
+        on_timeout: Callable[[], None] | None = None,
+    ) -> Future:
+        """
+        Starts following a deployment and returns immediately.
+
+        :param deployment: Deployment name as known to dynamic-proxies, i.e. <plugin name>-<plugin id>
+        :param on_transition: Called with the status entry whenever the rollout status changes
+        :param timeout: Seconds after which the rollout is given up on
+        :param on_timeout: Called when the rollout has not settled within the timeout
+        :return: Future resolving to the final status entry, or None on timeout
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.follow(deployment, on_transition, timeout, on_timeout), self._ensure_loop()
+        )
+
+    async def _watch_status(self, deployment: str, last_status: str | None, wait: float) -> dict | None:
+        if self._client is None:
+            # Created on the tracker loop: an httpx.AsyncClient is bound to the loop it is first used on
+            self._client = httpx.AsyncClient(limits=HTTPClientPool._limits(), http2=http_pool.http2)
+        resp = await self._client.post(
+            self.watch_url,
+            json={"plugin_list": [deployment], "known": {deployment: last_status}, "timeout": wait},
+            timeout=wait + REQUEST_TIMEOUT_MARGIN_SECONDS,
+        )
+        resp.raise_for_status()
+        data = resp.json().get("data")
+        return data[0] if data else None
+
+    @staticmethod
+    def rollout_status(entry: dict) -> str | None:
+        """
+        Status of the rollout as far as the deployment is concerned. dynamic-proxies reports a deployment without
+        pods as completed, which right after it was created only means its pods are not scheduled yet.
+        """
+        if entry.get("status") == "completed" and entry.get("replicas") and not entry.get("pods"):
+            return IN_PROGRESS
+        return entry.get("status")
+
+    @staticmethod
+    async def _run_callback(callback: Callable, *args):
+        try:
+            await asyncio.to_thread(callback, *args)
+        except Exception as e:
+            logging.exception(f"Deployment status callback failed: {e}")
+
+    async def follow(
+        self,
+        deployment: str,
+        on_transition: Callable[[dict], None],
+        timeout: float,
+        on_timeout: Callable[[], None] | None = None,
+    ) -> dict | None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        last_status = known_status = None
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                entry = await self._watch_status(deployment, known_status, min(self.watch_seconds, remaining))
+            except Exception as e:
+                logging.warning(f"Unable to watch deployment status of {deployment}: {e}")
+                entry = None
+            if entry is None:
+                await asyncio.sleep(min(self.retry_seconds, max(deadline - loop.time(), 0)))
+                continue
+            status = self.rollout_status(entry)
+            if status != last_status:
+                last_status = status
+                logging.info(f"Deployment {deployment} is now {last_status}")
+                await self._run_callback(on_transition, {**entry, "status": status})
+            if status in SETTLED_STATUSES:
+                return entry
+            # A deployment the status cache has not seen yet is not_found, it is waited for like one in progress
+            if status == entry.get("status"):
+                known_status = status
+            else:
+                # The watch would not answer once the pods appear, as its status stays completed meanwhile
+                known_status = None
+                await asyncio.sleep(min(self.retry_seconds, max(deadline - loop.time(), 0)))
+        logging.warning(f"Deployment {deployment} did not settle within {timeout}s")
+        if on_timeout:
+            await self._run_callback(on_timeout)
+        return None
+
+    def shutdown(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=5)
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+        loop.close()
+
+
+deployment_tracker = DeploymentStatusTracker(
+    watch_url=f"{ExternalServices.PROXY_MANAGER_URL}{ExternalAPI.deployment_status_watch}"
+)
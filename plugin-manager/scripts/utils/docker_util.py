@@ -1,7 +1,9 @@
 import json
 import logging
 import os
+import re
 import shutil
+import time
 from pathlib import Path
 import subprocess
 import docker
@@ -11,13 +13,74 @@ from jinja2 import Environment, FileSystemLoader
 
 from scripts.config import (
     AzureCredentials,
+    BuildCacheConf,
     ContainerSigningSettings,
     Services,
     VulnerabilityScanner,
 )
 from scripts.db.schemas import VulnerabilityReportSchema
-from scripts.db.schemas import PluginMetaDBSchema
+from scripts.db.schemas import BuildMetrics, BuildStepMetrics, PluginMetaDBSchema
 from scripts.db.mongo.plugins.plugin_meta import PluginMeta
+from scripts.utils.image_archive import write_image_archive
+
+IMAGE_CHUNK_SIZE = 4 * 1024 * 1024
+BUILD_STEP_PATTERN = re.compile(r"^Step \d+/\d+ : (.*)")
+BUILD_CACHE_HIT = "---> Using cache"
+# Kept out of the build context so that they cannot invalidate COPY layers. The backend templates are replaced by
+# the frontend build, so they are excluded here rather than deleted in an extra layer.
+DOCKERIGNORE_ENTRIES = [
+    ".git",
+    "**/node_modules",
+    "**/__pycache__",
+    "**/*.pyc",
+    "frontend/build",
+    "user_manual/site",
+    "backend/scripts/templates",
+]
+
+
+def build_cache_ref(image_uri: str) -> str:
+    """Version-independent reference the build cache of an image repository is kept under"""
+    repository = image_uri.rsplit(":", 1)[0] if ":" in image_uri.rsplit("/", 1)[-1] else image_uri
+    return f"{repository}:{BuildCacheConf.BUILD_CACHE_TAG}"
+
+
+def collect_build_metrics(build_output, clock=time.monotonic) -> BuildMetrics:
+    """
+    Follows the decoded output of a build, timing each Dockerfile step and noting whether it was served from cache
+    :param build_output: Decoded build output stream
+    :param clock: Source of the step timestamps
+    :return: Metrics of the build
+    """
+    started = clock()
+    steps: list[BuildStepMetrics] = []
+    step_started = started
+    build_log = []
+    for line in build_output:
+        build_log.append(line)
+        if "error" in line:
+            raise BuildError(line["error"], build_log)
+        stream = line.get("stream", "")
+        if stream.strip():
+            logging.info(stream.strip())
+        if match := BUILD_STEP_PATTERN.match(stream):
+            now = clock()
+            if steps:
+                steps[-1].duration_seconds = round(now - step_started, 3)
+            steps.append(BuildStepMetrics(instruction=match.group(1).strip()))
+            step_started = now
+        elif BUILD_CACHE_HIT in stream and steps:
+            steps[-1].cached = True
+    finished = clock()
+    if steps:
+        steps[-1].duration_seconds = round(finished - step_started, 3)
+    # FROM only resolves the base image, it is never a cache candidate
+    cacheable = [step for step in steps if not step.instruction.upper().startswith("FROM ")]
+    return BuildMetrics(
+        steps=steps,
+        cache_hit_ratio=round(sum(step.cached for step in cacheable) / len(cacheable), 3) if cacheable else 0,
+        duration_seconds=round(finished - started, 3),
+    )
 
 
 class DockerUtil:
@@ -25,18 +88,40 @@ class DockerUtil:
         self.docker_client = docker.DockerClient(base_url=Services.DOCKER_HOST)
         self.plugin_db_conn = PluginMeta()
 
-    def build_docker_image(self, files_path: str, image_tag: str, container_registry_url: str, build_args: dict = None):
+    def build_docker_image(
+        self,
+        files_path: str,
+        image_tag: str,
+        container_registry_url: str,
+        build_args: dict = None,
+        container_registry_credentials: dict = None,
+    ) -> BuildMetrics:
         try:
             image_uri = f"{container_registry_url}/{image_tag}"
             logging.debug("In Build Docker image")
             logging.info(f"files_path {files_path}")
-            build_output = self.docker_client.images.build(
-                path=files_path, tag=image_uri, buildargs=build_args, network_mode="host"
+            cache_from = None
+            if BuildCacheConf.BUILD_CACHE_ENABLED and self.import_build_cache(
+                image_uri, container_registry_url, container_registry_credentials
+            ):
+                cache_from = [build_cache_ref(image_uri)]
+            build_output = self.docker_client.api.build(
+                path=files_path,
+                tag=image_uri,
+                buildargs=build_args,
+                network_mode="host",
+                cache_from=cache_from,
+                rm=True,
+                decode=True,
+            )
+            metrics = collect_build_metrics(build_output)
+            metrics.cache_imported = cache_from is not None
+            logging.info(
+                f"Built Docker image {image_uri} in {metrics.duration_seconds}s, "
+                f"{metrics.cache_hit_ratio:.0%} of the steps from cache"
             )
-            for line in build_output:
-                logging.info(f"{line}")
-            logging.debug("Built Docker image")
             shutil.rmtree(files_path)
+            return metrics
         except BuildError as build_error:
             logging.exception(build_error)
             raise build_error
@@ -45,6 +130,42 @@ class DockerUtil:
             logging.exception(e)
             raise
 
+    def import_build_cache(
+        self, image_uri: str, container_registry_url: str, container_registry_credentials: dict = None
+    ) -> bool:
+        """Pulls the build cache of the image repository so its layers can be reused, if one has been exported"""
+        try:
+            if container_registry_credentials:
+                self.docker_client.login(
+                    username=container_registry_credentials["username"],
+                    password=container_registry_credentials["password"],
+                    registry=container_registry_url,
+                )
+            self.docker_client.images.pull(build_cache_ref(image_uri))
+            return True
+        except docker.errors.APIError as e:
+            logging.info(f"No build cache imported for {image_uri}: {e}")
+            return False
+
+    def export_build_cache(self, image_uri: str) -> str | None:
+        """
+        Publishes a freshly pushed image as the build cache of its repository, for the next version to build from.
+        Must follow push_docker_image, which logs in to the registry.
+        """
+        if not BuildCacheConf.BUILD_CACHE_ENABLED:
+            return None
+        cache_ref = build_cache_ref(image_uri)
+        repository, tag = cache_ref.rsplit(":", 1)
+        try:
+            self.docker_client.images.get(image_uri).tag(repository, tag)
+            for line in self.docker_client.images.push(repository=repository, tag=tag, stream=True, decode=True):
+                if "error" in line:
+                    raise docker.errors.APIError(line["error"])
+            return cache_ref
+        except docker.errors.APIError as e:
+            logging.warning(f"Unable to export the build cache of {image_uri}: {e}")
+            return None
+
     def build_docker_image_for_kubeflow(self, files_path: str, image_tag: str, build_args: dict = None):
         try:
             image_uri = f"{image_tag}"
@@ -95,7 +216,7 @@ class DockerUtil:
                 registry=container_registry_url,
             )
             with open(docker_tar_file_path, "rb") as tar_file:
-                images = self.docker_client.images.load(tar_file.read())
+                images = self.docker_client.images.load(tar_file)
             image = images[0]
             image.tag(f"{container_registry_url}/{new_image_name}")
             return image
@@ -116,8 +237,24 @@ class DockerUtil:
         dockerfile = template.render(dockerfile_variables)
         with open(path / "Dockerfile", "w") as f:
             f.write(dockerfile)
+        with open(path / ".dockerignore", "w") as f:
+            f.write("\n".join(DOCKERIGNORE_ENTRIES) + "\n")
 
-    def scan_image(self, image: str, plugin_data: PluginMetaDBSchema = None, folder_path: str = "/"):
+    def stop_container(self, name: str):
+        """Kills a running container. Containers started with remove=True are then removed by Docker."""
+        try:
+            self.docker_client.containers.get(name).kill()
+            logging.info(f"Stopped container {name}")
+        except docker.errors.NotFound:
+            logging.debug(f"Container {name} is not running")
+
+    def scan_image(
+        self,
+        image: str,
+        plugin_data: PluginMetaDBSchema = None,
+        folder_path: str = "/",
+        container_name: str | None = None,
+    ):
         try:
             root_path = "/"
             temp_path = os.path.join(root_path, "tmp", "output")
@@ -141,6 +278,7 @@ class DockerUtil:
                 network_mode="host",
                 group_add=[2000],
                 remove=True,
+                name=container_name,
             )
 
             logging.info("Image scan complete")
@@ -188,7 +326,9 @@ class DockerUtil:
                 )
         return vulnerabilities
 
-    def clamav_antivirus_scan(self, folder_path: str = "/", plugin_name: str = "", plugin_id: str = ""):
+    def clamav_antivirus_scan(
+        self, folder_path: str = "/", plugin_name: str = "", plugin_id: str = "", container_name: str | None = None
+    ):
         try:
             logging.info("Scanning file for viruses")
             report_path = f"{VulnerabilityScanner.ANTIVIRUS_FOLDER_PATH}/{plugin_name}/{plugin_id}"
@@ -208,6 +348,7 @@ class DockerUtil:
                 volumes=volumes,
                 detach=False,
                 remove=True,
+                name=container_name,
             )
             return True
         except Exception as e:
@@ -316,9 +457,30 @@ class DockerUtil:
             logging.exception(f"Exception occurred during verification: {e}")
             return False
 
-    def save_image(self, image_tag):
+    def save_image(self, image_tag, chunk_size: int = IMAGE_CHUNK_SIZE):
         image = self.docker_client.images.get(image_tag)
-        return image.save(named=True)
+        return image.save(chunk_size=chunk_size, named=True)
+
+    def save_image_archive(
+        self, image_tag: str, archive_path: str | Path, image_file_name: str, extra_files: dict | None = None
+    ) -> str:
+        """
+        Streams the saved image straight into the signed download archive, without a tar staged on disk.
+
+        :param image_tag: Image to save
+        :param archive_path: Path of the zip archive, its stem is used as the folder inside the archive
+        :param image_file_name: File name of the image tarball inside the archive
+        :param extra_files: Archive file name mapped to a local file to add next to the image
+        :return: sha256 digest of the image tarball
+        """
+        archive_path = Path(archive_path)
+        return write_image_archive(
+            self.save_image(image_tag),
+            archive_path=archive_path,
+            folder_name=archive_path.stem,
+            image_file_name=image_file_name,
+            extra_files=extra_files,
+        )
 
     def pull_image(self, image_tag, container_registry_url, container_registry_credentials):
         self.docker_client.login(
@@ -327,3 +489,22 @@ class DockerUtil:
             registry=container_registry_url,
         )
         self.docker_client.images.pull(image_tag)
+
+    def registry_digest(self, image_tag, container_registry_url, container_registry_credentials) -> str:
+        """
+        Content digest of the image as published in the registry, looked up without pulling it. Falls back to the
+        local image id, and to the tag itself when neither is available.
+        """
+        try:
+            self.docker_client.login(
+                username=container_registry_credentials["username"],
+                password=container_registry_credentials["password"],
+                registry=container_registry_url,
+            )
+            return self.docker_client.images.get_registry_data(image_tag).id
+        except docker.errors.DockerException as e:
+            logging.warning(f"Unable to read the registry digest of {image_tag}: {e}")
+        try:
+            return self.docker_client.images.get(image_tag).id
+        except docker.errors.DockerException:
+            return image_tag
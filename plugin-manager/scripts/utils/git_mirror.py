@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import git
+
+from scripts.config import GitMirrorConf
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+COMMIT_SHA_PATTERN = re.compile(r"^[0-9a-f]{7,40}$")
+FETCH_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class GitMirrorCache:
+    """
+    Local cache of bare mirrors keyed by repository URL. A checkout fetches only the refs that changed since the
+    previous deploy and then makes a hardlinked local clone of the mirror, so a redeploy no longer transfers the
+    full history. Mirrors are evicted least recently used first once the repository count or size cap is exceeded.
+    """
+
+    def __init__(self, cache_path: str | Path, max_repos: int, max_size_mb: int):
+        self.cache_path = Path(cache_path)
+        self.max_repos = max_repos
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def public_url(git_url: str) -> str:
+        """Strips any credentials from the URL so they are never written to the mirror config."""
+        parts = urlsplit(git_url)
+        if not parts.netloc:
+            return git_url
+        return urlunsplit(parts._replace(netloc=parts.netloc.rsplit("@", 1)[-1]))
+
+    def repo_key(self, git_url: str) -> str:
+        normalised = self.public_url(git_url).rstrip("/").removesuffix(".git").lower()
+        return hashlib.sha256(normalised.encode()).hexdigest()[:24]
+
+    def mirror_path(self, git_url: str) -> Path:
+        return self.cache_path / f"{self.repo_key(git_url)}.git"
+
+    @contextmanager
+    def repo_lock(self, key: str, blocking: bool = True):
+        """
+        Serialises work on one mirror across threads and, where flock is available, across worker processes.
+        Yields False instead of waiting when blocking is disabled and the mirror is in use.
+        """
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(key, threading.Lock())
+        if not thread_lock.acquire(blocking):
+            yield False
+            return
+        try:
+            self.cache_path.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path / f"{key}.lock", "w") as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        yield False
+                        return
+                yield True
+        finally:
+            thread_lock.release()
+
+    def checkout(self, git_url: str, ref: str | None, dest: Path, fetch_url: str | None = None) -> git.Repo:
+        """
+        Checks out the requested branch, tag or commit of the repository into dest.
+
+        :param git_url: Repository URL, used as the cache key
+        :param ref: Branch, tag or commit to check out; the remote default branch when empty
+        :param dest: Directory to check the code out into, must not exist
+        :param fetch_url: URL used to talk to the remote, e.g. with an access token embedded
+        :return: The checked out repository
+        """
+        key = self.repo_key(git_url)
+        mirror_path = self.mirror_path(git_url)
+        with self.repo_lock(key):
+            self._update_mirror(mirror_path, git_url, fetch_url or git_url, ref)
+            repo = self._clone_from_mirror(mirror_path, dest, ref)
+            repo.remotes.origin.set_url(self.public_url(git_url))
+            os.utime(mirror_path)
+        self.evict(keep={key})
+        return repo
+
+    def _update_mirror(self, mirror_path: Path, git_url: str, fetch_url: str, ref: str | None):
+        if not mirror_path.exists():
+            logging.info(f"Creating git mirror for {self.public_url(git_url)}")
+            try:
+                mirror = git.Repo.clone_from(fetch_url, mirror_path, bare=True)
+                mirror.remotes.origin.set_url(self.public_url(git_url))
+            except Exception:
+                shutil.rmtree(mirror_path, ignore_errors=True)
+                raise
+            return
+        mirror = git.Repo(mirror_path)
+        if ref and COMMIT_SHA_PATTERN.match(ref) and self._has_commit(mirror, ref):
+            logging.debug(f"Commit {ref} already mirrored, skipping fetch")
+            return
+        logging.info(f"Fetching new refs into git mirror {mirror_path.name}")
+        mirror.git.fetch(fetch_url, *FETCH_REFSPECS, "--prune")
+
+    @staticmethod
+    def _has_commit(repo: git.Repo, ref: str) -> bool:
+        try:
+            repo.git.rev_parse("--verify", "--quiet", f"{ref}^{{commit}}")
+            return True
+        except git.exc.GitCommandError:
+            return False
+
+    def _clone_from_mirror(self, mirror_path: Path, dest: Path, ref: str | None) -> git.Repo:
+        mirror = git.Repo(mirror_path)
+        if not ref:
+            return git.Repo.clone_from(str(mirror_path), dest)
+        if f"refs/heads/{ref}" in {head.path for head in mirror.heads}:
+            return git.Repo.clone_from(str(mirror_path), dest, branch=ref)
+        if not self._has_commit(mirror, ref):
+            raise ValueError(f"Reference {ref} not found in repository")
+        repo = git.Repo.clone_from(str(mirror_path), dest, no_checkout=True)
+        repo.git.checkout(ref)
+        return repo
+
+    @staticmethod
+    def _directory_size(path: Path) -> int:
+        return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+    def evict(self, keep: set[str] | None = None):
+        """Removes least recently used mirrors until both the repository count and size caps are met."""
+        keep = keep or set()
+        if not self.cache_path.exists():
+            return
+        mirrors = sorted(self.cache_path.glob("*.git"), key=lambda path: path.stat().st_mtime)
+        sizes = {mirror: self._directory_size(mirror) for mirror in mirrors}
+        total_size = sum(sizes.values())
+        remaining = len(mirrors)
+        for mirror in mirrors:
+            if remaining <= self.max_repos and total_size <= self.max_size_bytes:
+                break
+            key = mirror.name.removesuffix(".git")
+            if key in keep:
+                continue
+            with self.repo_lock(key, blocking=False) as acquired:
+                if not acquired:
+                    continue
+                logging.info(f"Evicting git mirror {mirror.name}")
+                shutil.rmtree(mirror, ignore_errors=True)
+            remaining -= 1
+            total_size -= sizes[mirror]
+
+
+git_mirror_cache = GitMirrorCache(
+    cache_path=GitMirrorConf.MIRROR_CACHE_PATH,
+    max_repos=GitMirrorConf.MIRROR_CACHE_MAX_REPOS,
+    max_size_mb=GitMirrorConf.MIRROR_CACHE_MAX_SIZE_MB,
+)
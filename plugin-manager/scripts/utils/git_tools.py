@@ -7,6 +7,9 @@ import requests
 from requests.auth import HTTPBasicAuth
 import re
 
+from scripts.config import GitMirrorConf
+from scripts.utils.git_mirror import git_mirror_cache
+
 
 def pull_code_from_git(
     git_url: str, git_branch: str, git_username: str, git_access_token: str, pull_path: Path
@@ -16,7 +19,10 @@ def pull_code_from_git(
         if pull_path.exists():
             logging.warning(f"****DELETING EXISTING REPO {pull_path}")
             shutil.rmtree(pull_path)
-        git.Repo.clone_from(access_token_url, pull_path, branch=git_branch)
+        if GitMirrorConf.MIRROR_CACHE_ENABLED:
+            git_mirror_cache.checkout(git_url, git_branch, pull_path, fetch_url=access_token_url)
+        else:
+            git.Repo.clone_from(access_token_url, pull_path, branch=git_branch)
     except Exception as e:
         logging.exception(e)
         raise RuntimeError("Error occurred while pulling the code from git") from e
@@ -0,0 +1,137 @@
+import importlib.util
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from scripts.config import HTTPClientConf
+from scripts.errors import CircuitOpenError
+
+
+class CircuitBreaker:
+    """
+    Per-target circuit breaker. Opens after consecutive failures and lets a single trial request through
+    once the reset window has elapsed, and again every reset window until one of them succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_seconds:
+                # Also lets the next trial through once a trial request never reported back within the window
+                self.state = self.HALF_OPEN
+                self.opened_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class HTTPClientPool:
+    """
+    Process-wide pooled HTTP clients for inter-service calls. The sync and async clients are created lazily,
+    keep connections alive between calls and negotiate HTTP/2 when the h2 package is installed.
+    """
+
+    def __init__(self):
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.http2 = HTTPClientConf.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=HTTPClientConf.MAX_CONNECTIONS,
+            max_keepalive_connections=HTTPClientConf.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTPClientConf.KEEPALIVE_EXPIRY,
+        )
+
+    def get_client(self) -> httpx.Client:
+        if self._client is None or self._client.is_closed:
+            with self._lock:
+                if self._client is None or self._client.is_closed:
+                    self._client = httpx.Client(limits=self._limits(), http2=self.http2)
+        return self._client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            with self._lock:
+                if self._async_client is None or self._async_client.is_closed:
+                    self._async_client = httpx.AsyncClient(limits=self._limits(), http2=self.http2)
+        return self._async_client
+
+    @staticmethod
+    def target_of(url: str) -> str:
+        return urlsplit(url).netloc or url
+
+    def timeout_for(self, url: str, default: float) -> float:
+        return HTTPClientConf.TARGET_TIMEOUTS.get(self.target_of(url), default)
+
+    def breaker_for(self, url: str) -> CircuitBreaker:
+        target = self.target_of(url)
+        if target not in self._breakers:
+            with self._lock:
+                self._breakers.setdefault(
+                    target,
+                    CircuitBreaker(
+                        failure_threshold=HTTPClientConf.CIRCUIT_FAILURE_THRESHOLD,
+                        reset_seconds=HTTPClientConf.CIRCUIT_RESET_SECONDS,
+                    ),
+                )
+        return self._breakers[target]
+
+    def ensure_closed_circuit(self, url: str) -> CircuitBreaker:
+        breaker = self.breaker_for(url)
+        if not breaker.allow_request():
+            logging.warning(f"Circuit open for {self.target_of(url)}, skipping request to {url}")
+            raise CircuitOpenError(f"Service {self.target_of(url)} is temporarily unavailable")
+        return breaker
+
+    @staticmethod
+    def backoff_delay(attempt: int) -> float:
+        """Full-jitter exponential backoff for the given zero-based retry attempt."""
+        ceiling = min(HTTPClientConf.BACKOFF_MAX_SECONDS, HTTPClientConf.BACKOFF_BASE_SECONDS * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+http_pool = HTTPClientPool()
@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Iterable
+
+from scripts.config import ContainerSigningSettings
+
+SIGNATURE_FILE_NAME = "signature"
+SIGNING_TIMEOUT_SECONDS = 300
+
+
+class StreamingBlobSigner:
+    """
+    Feeds a blob to `cosign sign-blob` over stdin while it is being written elsewhere,
+    so the blob never has to be staged on disk just to be signed.
+    """
+
+    def __init__(self, enabled: bool | None = None):
+        self.enabled = ContainerSigningSettings.SIGNING_ENABLED if enabled is None else enabled
+        self.process = None
+        self._work_dir = None
+        self._stderr = None
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        # tempfile.tempdir is configured as a Path, which makes the default return type bytes
+        self._work_dir = tempfile.TemporaryDirectory(dir=tempfile.gettempdir())
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self.process = subprocess.Popen(
+                [
+                    "cosign",
+                    "sign-blob",
+                    f"--key={ContainerSigningSettings.SIGNING_KEY_PATH}",
+                    f"--output-signature={self.signature_path}",
+                    "-y",
+                    "-",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=self._stderr,
+            )
+        except OSError as e:
+            logging.exception(f"Unable to start blob signing: {e}")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        if self._stderr:
+            self._stderr.close()
+        if self._work_dir:
+            self._work_dir.cleanup()
+
+    @property
+    def signature_path(self) -> Path:
+        return Path(self._work_dir.name) / SIGNATURE_FILE_NAME
+
+    def update(self, chunk: bytes):
+        if not self.process:
+            return
+        try:
+            self.process.stdin.write(chunk)
+        except (BrokenPipeError, OSError) as e:
+            logging.error(f"Blob signing aborted: {e}")
+            self.process = None
+
+    def signature(self) -> bytes | None:
+        """Closes the blob stream and returns the signature, or None when signing is disabled or failed."""
+        if not self.process:
+            return None
+        try:
+            self.process.stdin.close()
+            return_code = self.process.wait(timeout=SIGNING_TIMEOUT_SECONDS)
+        except (BrokenPipeError, subprocess.TimeoutExpired) as e:
+            logging.error(f"Blob signing failed: {e}")
+            return None
+        if return_code != 0 or not self.signature_path.exists():
+            self._stderr.seek(0)
+            logging.error(f"Blob signing failed with return code {return_code}: {self._stderr.read().decode()}")
+            return None
+        return self.signature_path.read_bytes()
+
+
+def partial_path(path: Path) -> Path:
+    """
+    Name under which a file is written before it is renamed to path. It is unique to the writer, so processes
+    producing the same file at the same time never write into each other's partial file.
+    """
+    return path.with_name(f"{path.name}.{os.getpid()}-{uuid.uuid4().hex[:8]}.part")
+
+
+def write_image_archive(
+    chunks: Iterable[bytes],
+    archive_path: str | Path,
+    folder_name: str,
+    image_file_name: str,
+    extra_files: dict[str, str | Path] | None = None,
+) -> str:
+    """
+    Streams an image tarball into a zip archive in bounded memory, hashing and signing it on the way.
+    The archive keeps the layout of the previous make_archive output: every member sits under folder_name.
+    It is written next to its final path and renamed into place, so a partially written or unsigned archive is
+    never served.
+
+    :param chunks: Image tarball as produced by the Docker API, e.g. Image.save()
+    :param archive_path: Path of the zip archive to create
+    :param folder_name: Top level folder inside the archive
+    :param image_file_name: File name of the image tarball inside the archive
+    :param extra_files: Archive file name mapped to a local file to add next to the image
+    :return: Hex encoded sha256 digest of the image tarball
+    """
+    archive_path = Path(archive_path)
+    partial_archive_path = partial_path(archive_path)
+    digest = hashlib.sha256()
+    try:
+        with (
+            StreamingBlobSigner() as signer,
+            zipfile.ZipFile(partial_archive_path, "w", zipfile.ZIP_DEFLATED) as archive,
+        ):
+            with archive.open(f"{folder_name}/{image_file_name}", "w", force_zip64=True) as image_member:
+                for chunk in chunks:
+                    image_member.write(chunk)
+                    digest.update(chunk)
+                    signer.update(chunk)
+            signature = signer.signature()
+            if signer.enabled and signature is None:
+                raise RuntimeError(f"Unable to sign image archive {archive_path.name}")
+            if signature is not None:
+                archive.writestr(f"{folder_name}/{SIGNATURE_FILE_NAME}", signature)
+            for file_name, source_path in (extra_files or {}).items():
+                archive.write(source_path, f"{folder_name}/{file_name}")
+        os.replace(partial_archive_path, archive_path)
+    except BaseException:
+        partial_archive_path.unlink(missing_ok=True)
+        raise
+    logging.info(f"Image archived as {archive_path} with sha256 {digest.hexdigest()}")
+    return digest.hexdigest()
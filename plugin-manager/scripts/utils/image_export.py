@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator
+
+ProgressCallback = Callable[[float], None]
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export once every job waiting for it was cancelled"""
+
+
+@dataclass(eq=False)
+class ExportSubscriber:
+    """One job item waiting for an export, notified of its progress as a fraction and of its outcome"""
+
+    subscriber_id: str
+    on_progress: ProgressCallback
+    on_done: Callable[[str | None, BaseException | None], None]
+
+
+@dataclass(eq=False)
+class _Export:
+    key: str
+    subscribers: list[ExportSubscriber] = field(default_factory=list)
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    future: Future | None = None
+    progress: float = 0
+
+
+def tracked_chunks(
+    chunks: Iterable[bytes],
+    total_bytes: int,
+    report: ProgressCallback,
+    cancelled: threading.Event,
+    interval_seconds: float,
+) -> Iterator[bytes]:
+    """
+    Passes the chunks on while reporting the share of total_bytes seen at most once per interval, and stops the
+    stream as soon as the export is cancelled
+    """
+    seen = 0
+    last_report = time.monotonic()
+    for chunk in chunks:
+        if cancelled.is_set():
+            raise ExportCancelled
+        yield chunk
+        seen += len(chunk)
+        if total_bytes and time.monotonic() - last_report >= interval_seconds:
+            last_report = time.monotonic()
+            # The size is only an estimate of the saved tarball, the export is done once the stream ends
+            report(min(seen / total_bytes, 0.99))
+
+
+class ImageExportPool:
+    """
+    Runs image exports on a bounded number of worker threads. Exports are identified by a key derived from the
+    image digest, and a request for an export that is already queued or running subscribes to it instead of
+    starting another one. An export is only stopped once all of its subscribers have cancelled.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._exports: dict[str, _Export] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-export")
+        return self._executor
+
+    def submit(
+        self, key: str, export: Callable[[ProgressCallback, threading.Event], str], subscriber: ExportSubscriber
+    ) -> bool:
+        """
+        :param key: Identity of the export, identical exports share it
+        :param export: Produces the artifact and returns its path, given a progress callback and a cancel event
+        :param subscriber: Job item to notify
+        :return: True if the subscriber joined an export that was already queued or running
+        """
+        with self._lock:
+            running = self._exports.get(key)
+            joined = running is not None
+            if not joined:
+                running = self._exports[key] = _Export(key)
+            running.subscribers.append(subscriber)
+            progress = running.progress
+            if not joined:
+                running.future = self.executor.submit(self._run, running, export)
+        if joined:
+            logging.info(f"Export {key} is already in progress, {subscriber.subscriber_id} will reuse it")
+            self._notify(subscriber.on_progress, progress)
+        return joined
+
+    def cancel(self, key: str, subscriber_id: str) -> bool:
+        """
+        Unsubscribes a job item, and stops the export when nobody else waits for it
+        :return: False if the item was not waiting for the export
+        """
+        with self._lock:
+            running = self._exports.get(key)
+            remaining = [s for s in running.subscribers if s.subscriber_id != subscriber_id] if running else []
+            if not running or len(remaining) == len(running.subscribers):
+                return False
+            running.subscribers = remaining
+            if remaining:
+                return True
+            running.cancelled.set()
+            del self._exports[key]
+        if running.future.cancel():
+            logging.info(f"Export {key} was cancelled before it started")
+        return True
+
+    def _subscribers(self, running: _Export) -> list[ExportSubscriber]:
+        with self._lock:
+            return list(running.subscribers)
+
+    @staticmethod
+    def _notify(callback: Callable, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.exception(f"Export subscriber failed: {e}")
+
+    def _run(self, running: _Export, export: Callable[[ProgressCallback, threading.Event], str]):
+        def report(progress: float):
+            running.progress = progress
+            for subscriber in self._subscribers(running):
+                self._notify(subscriber.on_progress, progress)
+
+        artifact, error = None, None
+        try:
+            if running.cancelled.is_set():
+                raise ExportCancelled
+            artifact = export(report, running.cancelled)
+        except BaseException as e:
+            error = e
+            if not isinstance(e, ExportCancelled):
+                logging.exception(f"Export {running.key} failed: {e}")
+        with self._lock:
+            if self._exports.get(running.key) is running:
+                del self._exports[running.key]
+            subscribers = list(running.subscribers)
+        for subscriber in subscribers:
+            self._notify(subscriber.on_done, artifact, error)
@@ -0,0 +1,137 @@
+import datetime
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+import kfp
+
+from scripts.config import KubeflowPortal
+
+LIST_PAGE_SIZE = 100
+NEWEST_FIRST = "created_at desc"
+
+
+@dataclass
+class _NamespaceIndex:
+    pipelines: dict[str, str] = field(default_factory=dict)
+    # pipeline id -> recurring run id -> pipeline version id
+    recurring_runs: dict[str, dict[str, str]] = field(default_factory=dict)
+    pipelines_seen_until: datetime.datetime | None = None
+    recurring_runs_seen_until: datetime.datetime | None = None
+    refreshed_at: float = 0
+    rebuilt_at: float = 0
+
+
+class KubeflowIndex:
+    """
+    Per-namespace index of pipeline names to ids and of pipelines to their recurring runs, so that deploys and
+    deletes look them up without listing the whole Kubeflow installation. Refreshes only list what was created
+    since the previous one, newest first, and our own creates and deletes update the index directly. Objects
+    deleted outside the plugin manager are only noticed by the periodic rebuild, or by invalidating the namespace
+    after a call fails on a stale id. Each namespace has its own lock, so a refresh listing one namespace does not
+    hold up lookups in the others.
+    """
+
+    def __init__(self, refresh_seconds: float, rebuild_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._namespaces: dict[str, _NamespaceIndex] = {}
+        self._namespace_locks: dict[str, threading.RLock] = {}
+        # Only guards the creation of the namespace locks, never held across Kubeflow calls
+        self._lock = threading.Lock()
+
+    def _namespace_lock(self, namespace: str) -> threading.RLock:
+        with self._lock:
+            return self._namespace_locks.setdefault(namespace, threading.RLock())
+
+    def pipeline_id(self, kubeflow_client: kfp.Client, namespace: str, pipeline_name: str) -> str | None:
+        with self._namespace_lock(namespace):
+            index, refreshed = self._fresh(kubeflow_client, namespace)
+            if pipeline_name not in index.pipelines and not refreshed:
+                # May have been created outside the plugin manager since the last refresh
+                self._refresh(kubeflow_client, namespace, index)
+            return index.pipelines.get(pipeline_name)
+
+    def recurring_runs(self, kubeflow_client: kfp.Client, namespace: str, pipeline_id: str) -> dict[str, str]:
+        """:return: Recurring run ids of the pipeline mapped to the pipeline version they run"""
+        with self._namespace_lock(namespace):
+            index, _ = self._fresh(kubeflow_client, namespace)
+            return dict(index.recurring_runs.get(pipeline_id, {}))
+
+    def record_pipeline(self, namespace: str, pipeline_name: str, pipeline_id: str):
+        with self._namespace_lock(namespace):
+            self._namespaces.setdefault(namespace, _NamespaceIndex()).pipelines[pipeline_name] = pipeline_id
+
+    def forget_pipeline(self, namespace: str, pipeline_name: str):
+        with self._namespace_lock(namespace):
+            if index := self._namespaces.get(namespace):
+                if pipeline_id := index.pipelines.pop(pipeline_name, None):
+                    index.recurring_runs.pop(pipeline_id, None)
+
+    def record_recurring_run(self, namespace: str, pipeline_id: str, recurring_run_id: str, pipeline_version_id: str):
+        with self._namespace_lock(namespace):
+            index = self._namespaces.setdefault(namespace, _NamespaceIndex())
+            index.recurring_runs.setdefault(pipeline_id, {})[recurring_run_id] = pipeline_version_id
+
+    def forget_recurring_run(self, namespace: str, pipeline_id: str, recurring_run_id: str):
+        with self._namespace_lock(namespace):
+            if index := self._namespaces.get(namespace):
+                index.recurring_runs.get(pipeline_id, {}).pop(recurring_run_id, None)
+
+    def invalidate(self, namespace: str):
+        with self._namespace_lock(namespace):
+            self._namespaces.pop(namespace, None)
+
+    def _fresh(self, kubeflow_client: kfp.Client, namespace: str) -> tuple[_NamespaceIndex, bool]:
+        """:return: Index of the namespace and whether it was refreshed for this lookup"""
+        now = time.monotonic()
+        index = self._namespaces.get(namespace)
+        if index is None or now - index.rebuilt_at >= self.rebuild_seconds:
+            index = self._namespaces[namespace] = _NamespaceIndex(rebuilt_at=now)
+            logging.debug(f"Rebuilding the Kubeflow index of namespace {namespace}")
+        elif now - index.refreshed_at < self.refresh_seconds:
+            return index, False
+        self._refresh(kubeflow_client, namespace, index)
+        return index, True
+
+    def _refresh(self, kubeflow_client: kfp.Client, namespace: str, index: _NamespaceIndex):
+        listed = set()
+        for pipeline in self._created_since(
+            kubeflow_client.list_pipelines, "pipelines", index.pipelines_seen_until, namespace=namespace
+        ):
+            # Newest first, so a name reused after a delete maps to the pipeline that has it now
+            if pipeline.display_name not in listed:
+                listed.add(pipeline.display_name)
+                index.pipelines[pipeline.display_name] = pipeline.pipeline_id
+            index.pipelines_seen_until = max(filter(None, (index.pipelines_seen_until, pipeline.created_at)))
+        for run in self._created_since(
+            kubeflow_client.list_recurring_runs, "recurring_runs", index.recurring_runs_seen_until, namespace=namespace
+        ):
+            reference = run.pipeline_version_reference
+            if reference and reference.pipeline_id:
+                index.recurring_runs.setdefault(reference.pipeline_id, {})[
+                    run.recurring_run_id
+                ] = reference.pipeline_version_id
+            index.recurring_runs_seen_until = max(filter(None, (index.recurring_runs_seen_until, run.created_at)))
+        index.refreshed_at = time.monotonic()
+
+    @staticmethod
+    def _created_since(list_method, attribute: str, seen_until: datetime.datetime | None, **kwargs):
+        """Pages newest first and stops at the first object created before the previous refresh's newest one"""
+        page_token = ""
+        while True:
+            response = list_method(page_token=page_token, page_size=LIST_PAGE_SIZE, sort_by=NEWEST_FIRST, **kwargs)
+            for item in getattr(response, attribute) or []:
+                if seen_until and item.created_at and item.created_at < seen_until:
+                    return
+                yield item
+            if not response.next_page_token:
+                return
+            page_token = response.next_page_token
+
+
+kubeflow_index = KubeflowIndex(
+    refresh_seconds=KubeflowPortal.KUBEFLOW_INDEX_REFRESH_SECONDS,
+    rebuild_seconds=KubeflowPortal.KUBEFLOW_INDEX_REBUILD_SECONDS,
+)
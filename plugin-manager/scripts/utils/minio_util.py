@@ -1,12 +1,41 @@
+import datetime
+import functools
+import io
 import logging
+from typing import BinaryIO
 
+import certifi
+import urllib3
 from minio import Minio
+from minio.commonconfig import ComposeSource
+from minio.deleteobjects import DeleteObject
 from minio.error import MinioException
 
+from scripts.config import MinioSettings
+
+
+def build_http_client(max_connections: int, connect_timeout: float, read_timeout: float) -> urllib3.PoolManager:
+    """Connection pool shared by every request of a MinIO client, sized for the parallel parts of multipart uploads"""
+    return urllib3.PoolManager(
+        maxsize=max_connections,
+        block=True,
+        timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=certifi.where(),
+        retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
+
 
 class MinioUtility:
-    def __init__(self, endpoint, access_key, secret_key, secure=True):
-        self.minio_client = Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+    def __init__(self, endpoint, access_key, secret_key, secure=True, region=None, http_client=None):
+        self.minio_client = Minio(
+            endpoint,
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=secure,
+            region=region,
+            http_client=http_client,
+        )
 
     def create_bucket(self, bucket_name):
         try:
@@ -34,6 +63,81 @@ class MinioUtility:
             logging.error(f"Error uploading object '{object_name}' to bucket '{bucket_name}'.")
             raise
 
+    def upload_stream(
+        self,
+        bucket_name,
+        object_name,
+        stream: BinaryIO,
+        content_type: str = "application/octet-stream",
+        part_size: int = MinioSettings.MINIO_PART_SIZE,
+    ) -> str:
+        """
+        Uploads a stream of unknown length as a multipart upload, holding only the part being sent in memory
+        :return: ETag of the uploaded object
+        """
+        try:
+            result = self.minio_client.put_object(
+                bucket_name, object_name, stream, length=-1, part_size=part_size, content_type=content_type
+            )
+            logging.debug(f"Object '{object_name}' streamed successfully to bucket '{bucket_name}'.")
+            return result.etag
+        except MinioException:
+            logging.error(f"Error uploading object '{object_name}' to bucket '{bucket_name}'.")
+            raise
+
+    def presigned_download_url(
+        self,
+        bucket_name,
+        object_name,
+        expires_seconds: int = MinioSettings.MINIO_PRESIGNED_URL_EXPIRY_SECONDS,
+        file_name: str | None = None,
+    ) -> str:
+        """
+        URL the client downloads the object with directly from MinIO, valid for expires_seconds
+        :param file_name: Name the browser saves the object under, defaults to the last part of the object name
+        """
+        file_name = file_name or object_name.split("/")[-1]
+        return self.minio_client.presigned_get_object(
+            bucket_name,
+            object_name,
+            expires=datetime.timedelta(seconds=expires_seconds),
+            response_headers={"response-content-disposition": f'attachment; filename="{file_name}"'},
+        )
+
+    def object_exists(self, bucket_name, object_name) -> bool:
+        try:
+            self.minio_client.stat_object(bucket_name, object_name)
+            return True
+        except MinioException as e:
+            if getattr(e, "code", None) in ("NoSuchKey", "NoSuchBucket"):
+                return False
+            raise
+
+    def put_bytes(self, bucket_name, object_name, data: bytes) -> str:
+        try:
+            result = self.minio_client.put_object(bucket_name, object_name, io.BytesIO(data), length=len(data))
+            return result.etag
+        except MinioException:
+            logging.error(f"Error uploading object '{object_name}' to bucket '{bucket_name}'.")
+            raise
+
+    def compose_object(self, bucket_name, object_name, sources: list[ComposeSource]):
+        """Concatenates existing objects server side, through a multipart upload copying each source as a part"""
+        try:
+            self.minio_client.compose_object(bucket_name, object_name, sources)
+            logging.debug(f"Object '{object_name}' composed from {len(sources)} parts in bucket '{bucket_name}'.")
+        except MinioException as e:
+            logging.error(f"Error composing object '{object_name}' in bucket '{bucket_name}': {e}")
+            raise
+
+    def delete_objects(self, bucket_name, object_names: list[str]):
+        errors = list(
+            self.minio_client.remove_objects(bucket_name, (DeleteObject(object_name) for object_name in object_names))
+        )
+        for error in errors:
+            logging.error(f"Error deleting object '{error.name}' from bucket '{bucket_name}': {error.message}")
+        return not errors
+
     def download_object(self, bucket_name, object_name, file_path):
         try:
             self.minio_client.fget_object(bucket_name, object_name, file_path)
@@ -65,3 +169,23 @@ class MinioUtility:
         except MinioException as e:
             logging.error(f"Error deleting bucket '{bucket_name}': {e}")
             raise
+
+
+@functools.lru_cache(maxsize=1)
+def get_minio_utility() -> MinioUtility:
+    """
+    MinioUtility of the configured MinIO server, created once per process so that every caller shares its
+    connection pool. The underlying client is safe to use from several threads.
+    """
+    return MinioUtility(
+        endpoint=MinioSettings.MINIO_ENDPOINT,
+        access_key=MinioSettings.MINIO_ACCESS_KEY,
+        secret_key=MinioSettings.MINIO_SECRET_KEY,
+        secure=MinioSettings.MINIO_SECURE,
+        region=MinioSettings.MINIO_REGION,
+        http_client=build_http_client(
+            MinioSettings.MINIO_MAX_POOL_CONNECTIONS,
+            MinioSettings.MINIO_CONNECT_TIMEOUT,
+            MinioSettings.MINIO_READ_TIMEOUT,
+        ),
+    )
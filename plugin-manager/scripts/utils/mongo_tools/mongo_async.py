@@ -0,0 +1,195 @@
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCommandCursor, AsyncIOMotorCursor
+from pymongo import DeleteMany
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    InsertOneResult,
+    UpdateResult,
+)
+
+from ..db_name_util import get_db_name
+from .mongo_sync import BULK_BATCH_SIZE, META_SOFT_DEL, batched, soft_delete_pipeline, upsert_operations
+
+
+class AsyncMongoCollectionBaseClass:
+    """
+    Motor-backed twin of MongoCollectionBaseClass with the same interface, for use from async routes.
+    Methods performing I/O are coroutines; find and aggregate return cursors to be iterated with `async for`
+    or read with `to_list`.
+    """
+
+    def __init__(
+        self,
+        mongo_client: AsyncIOMotorClient,
+        database: str,
+        collection: str,
+        project_id: Optional[str],
+        soft_delete: bool = META_SOFT_DEL,
+    ) -> None:
+        self.client = mongo_client
+        self.database = database
+        self.collection = collection
+        self.soft_delete = soft_delete
+        if project_id:
+            self.database = get_db_name(project_id=project_id, database=self.database)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(database={self.database}, collection={self.collection})"
+
+    async def insert_one(self, data: Dict) -> InsertOneResult:
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.insert_one(data)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def insert_many(self, data: List) -> InsertManyResult:
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.insert_many(data)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    def find(
+        self,
+        query: dict,
+        filter_dict: Optional[dict] = None,
+        sort: Union[None, str, Sequence[Tuple[str, Union[int, str, Mapping[str, Any]]]]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> AsyncIOMotorCursor:
+        if sort is None:
+            sort = []
+        if filter_dict is None:
+            filter_dict = {"_id": 0}
+        try:
+            collection = self.client[self.database][self.collection]
+            cursor = collection.find(query, filter_dict)
+            if len(sort) > 0:
+                cursor = cursor.sort(sort)
+            cursor = cursor.skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
+            return cursor
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def find_one(self, query: dict, filter_dict: Optional[dict] = None) -> dict | None:
+        try:
+            if filter_dict is None:
+                filter_dict = {"_id": 0}
+            collection = self.client[self.database][self.collection]
+            return await collection.find_one(query, filter_dict)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def update_one(
+        self,
+        query: dict,
+        data: dict,
+        upsert: bool = False,
+        strategy: str = "$set",
+    ) -> UpdateResult:
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.update_one(query, {strategy: data}, upsert=upsert)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def update_many(self, query: dict, data: dict, upsert: bool = False) -> UpdateResult:
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.update_many(query, {"$set": data}, upsert=upsert)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def _archive(self, collection, query: dict):
+        if self.soft_delete:
+            await collection.aggregate(soft_delete_pipeline(query, self.database, self.collection)).to_list(None)
+
+    async def delete_many(self, query: dict) -> DeleteResult:
+        try:
+            collection = self.client[self.database][self.collection]
+            await self._archive(collection, query)
+            return await collection.delete_many(query)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def delete_one(self, query: dict) -> DeleteResult:
+        try:
+            collection = self.client[self.database][self.collection]
+            await self._archive(collection, query)
+            return await collection.delete_one(query)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def bulk_write(self, operations: List, ordered: bool = False) -> BulkWriteResult:
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.bulk_write(operations, ordered=ordered)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def upsert_many(
+        self,
+        documents: List[Dict],
+        key_fields: Sequence[str],
+        strategy: str = "$set",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> List[BulkWriteResult]:
+        operations = upsert_operations(documents, key_fields, strategy)
+        return [await self.bulk_write(batch) for batch in batched(operations, batch_size)]
+
+    async def delete_documents(self, queries: List[dict]) -> BulkWriteResult | None:
+        if not queries:
+            return None
+        try:
+            await self._archive(self.client[self.database][self.collection], {"$or": queries})
+        except Exception as e:
+            logging.exception(e)
+            raise
+        return await self.bulk_write([DeleteMany(query) for query in queries])
+
+    async def count_documents(self, query: dict | None = None):
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.count_documents(query or {})
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def distinct(self, query_key: str, filter_json: Optional[dict] = None) -> list:
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.distinct(query_key, filter_json)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    def aggregate(self, pipelines: list, **options) -> AsyncIOMotorCommandCursor:
+        try:
+            collection = self.client[self.database][self.collection]
+            return collection.aggregate(pipelines, **options)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    async def explain_aggregate(self, pipelines: list, **options) -> dict:
+        db = self.client[self.database]
+        return await db.command("aggregate", self.collection, pipeline=pipelines, explain=True, **options)
+
+    async def index_information(self) -> dict:
+        return await self.client[self.database][self.collection].index_information()
@@ -3,10 +3,11 @@ import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
-from pymongo import MongoClient
+from pymongo import DeleteMany, MongoClient, UpdateOne
 from pymongo.command_cursor import CommandCursor
 from pymongo.cursor import Cursor
 from pymongo.results import (
+    BulkWriteResult,
     DeleteResult,
     InsertManyResult,
     InsertOneResult,
@@ -16,6 +17,37 @@ from pymongo.results import (
 from ..db_name_util import get_db_name
 
 META_SOFT_DEL: bool = os.getenv("META_SOFT_DEL", True)
+BULK_BATCH_SIZE: int = 1000
+
+
+def soft_delete_pipeline(query: dict, database_name: str, collection_name: str) -> list:
+    """
+    Pipeline copying the documents matched by the query into the deleted__<database> archive collection.
+    """
+    return [
+        {"$match": query},
+        {"$addFields": {"deleted": {"on": datetime.now().replace(tzinfo=timezone.utc)}}},
+        {
+            "$merge": {
+                "into": {"db": f"deleted__{database_name}", "coll": collection_name},
+            }
+        },
+    ]
+
+
+def upsert_operations(documents: List[Dict], key_fields: Sequence[str], strategy: str = "$set") -> List[UpdateOne]:
+    """
+    Builds one upsert per document, matching existing documents on the given key fields.
+    """
+    return [
+        UpdateOne({key: document[key] for key in key_fields}, {strategy: document}, upsert=True)
+        for document in documents
+    ]
+
+
+def batched(items: List, batch_size: int):
+    for start in range(0, len(items), batch_size):
+        yield items[start : start + batch_size]
 
 
 class MongoCollectionBaseClass:
@@ -183,16 +215,7 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             if self.soft_delete:
-                soft_del_query = [
-                    {"$match": query},
-                    {"$addFields": {"deleted": {"on": datetime.now().replace(tzinfo=timezone.utc)}}},
-                    {
-                        "$merge": {
-                            "into": {"db": f"deleted__{database_name}", "coll": collection_name},
-                        }
-                    },
-                ]
-                collection.aggregate(soft_del_query)
+                collection.aggregate(soft_delete_pipeline(query, database_name, collection_name))
             return collection.delete_many(query)
         except Exception as e:
             logging.exception(e)
@@ -209,21 +232,60 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             if self.soft_delete:
-                soft_del_query = [
-                    {"$match": query},
-                    {"$addFields": {"deleted": {"on": datetime.now().replace(tzinfo=timezone.utc)}}},
-                    {
-                        "$merge": {
-                            "into": {"db": f"deleted__{database_name}", "coll": collection_name},
-                        }
-                    },
-                ]
-                collection.aggregate(soft_del_query)
+                collection.aggregate(soft_delete_pipeline(query, database_name, collection_name))
             return collection.delete_one(query)
         except Exception as e:
             logging.exception(e)
             raise
 
+    def bulk_write(self, operations: List, ordered: bool = False) -> BulkWriteResult:
+        """
+        The function is used to send a batch of write operations to a collection in a single round trip.
+        :param operations: pymongo write operations, e.g. UpdateOne, InsertOne, DeleteMany
+        :param ordered: Stop at the first failing operation instead of attempting all of them
+        :return: Bulk write result
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            return collection.bulk_write(operations, ordered=ordered)
+        except Exception as e:
+            logging.exception(e)
+            raise
+
+    def upsert_many(
+        self,
+        documents: List[Dict],
+        key_fields: Sequence[str],
+        strategy: str = "$set",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> List[BulkWriteResult]:
+        """
+        The function is used to upsert documents in unordered batches, matching existing ones on the key fields.
+        :param documents: Documents to be upserted
+        :param key_fields: Fields identifying a document, e.g. ["plugin_id", "version"]
+        :param strategy: Update operator applied to each document
+        :param batch_size: Number of operations sent per round trip
+        :return: Bulk write result of every batch
+        """
+        operations = upsert_operations(documents, key_fields, strategy)
+        return [self.bulk_write(batch) for batch in batched(operations, batch_size)]
+
+    def delete_documents(self, queries: List[dict]) -> BulkWriteResult | None:
+        """
+        The function is used to delete the documents matched by several queries, archiving all of them with a
+        single soft-delete merge instead of one merge per query.
+        :param queries: Queries selecting the documents to delete
+        :return: Bulk write result
+        """
+        if not queries:
+            return None
+        if self.soft_delete:
+            self.aggregate(soft_delete_pipeline({"$or": queries}, self.database, self.collection))
+        return self.bulk_write([DeleteMany(query) for query in queries])
+
     def count_documents(self, query: dict | None = None):
         try:
             database_name = self.database
@@ -251,16 +313,24 @@ class MongoCollectionBaseClass:
             logging.exception(e)
             raise
 
-    def aggregate(
-        self,
-        pipelines: list,
-    ) -> CommandCursor:
+    def aggregate(self, pipelines: list, **options) -> CommandCursor:
+        """
+        :param pipelines: Aggregation pipeline
+        :param options: Aggregate command options such as collation
+        """
         try:
             database_name = self.database
             collection_name = self.collection
             db = self.client[database_name]
             collection = db[collection_name]
-            return collection.aggregate(pipelines)
+            return collection.aggregate(pipelines, **options)
         except Exception as e:
             logging.exception(e)
             raise
+
+    def explain_aggregate(self, pipelines: list, **options) -> dict:
+        db = self.client[self.database]
+        return db.command("aggregate", self.collection, pipeline=pipelines, explain=True, **options)
+
+    def index_information(self) -> dict:
+        return self.client[self.database][self.collection].index_information()
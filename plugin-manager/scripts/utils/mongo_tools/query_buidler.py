@@ -1,6 +1,7 @@
 import logging
 
 from scripts.constants.schemas import AGGridTableRequest
+from scripts.utils.mongo_tools.query_planner import QueryPlanner
 
 MG_AGG_REGEX = "$regex"
 MG_AGG_PROJECT = "$project"
@@ -14,7 +15,8 @@ class QueryFormationError(Exception):
 
 
 class AGGridMongoQueryUtil:
-    def __init__(self) -> None:
+    def __init__(self, planner: QueryPlanner | None = None) -> None:
+        self.planner = planner or QueryPlanner()
         self.forced_filters = {}
         self.filter_query = []
         self.sort_query = {}
@@ -63,7 +65,36 @@ class AGGridMongoQueryUtil:
             logging.exception(e)
             raise QueryFormationError from e
 
+    def build_facet_query(
+        self,
+        req_body: AGGridTableRequest,
+        *,
+        row_stages: list[dict] | None = None,
+        count_stages: list[dict] | None = None,
+        additional_projection: dict | None = None,
+    ) -> list[dict]:
+        """
+        Pipeline returning a grid page and its total in one pass. The filters run once, then a $facet gives the page
+        as "rows" and the total as "count".
+        :param row_stages: Stages run on the filtered documents ahead of the sorting and pagination of the page
+        :param count_stages: Stages run on the filtered documents before they are counted
+        """
+        self.aggregation_pipeline = []
+        pipeline = self.build_query(req_body, additional_projection=additional_projection)
+        filter_stages = [stage for stage in (self.forced_filters, *self.filter_query) if stage]
+        page_stages = pipeline[len(filter_stages) :]
+        return [
+            *filter_stages,
+            {
+                "$facet": {
+                    "rows": [*(row_stages or []), *page_stages],
+                    "count": [*(count_stages or []), {"$count": "count"}],
+                }
+            },
+        ]
+
     def form_filter_query(self, sort_model: list, filter_model: dict, value_cols: list) -> None:
+        self.planner.restrict_collation(filter_model, sort_model)
         is_filtering = len(filter_model) > 0
         if is_filtering:
             for column, filter_obj in filter_model.items():
@@ -85,48 +116,23 @@ class AGGridMongoQueryUtil:
             _sort[sort_obj["colId"]] = order
         self.sort_query = {"$sort": _sort}
 
-    @staticmethod
-    def build_text_query(filter_obj, column) -> dict:
-        try:
-            filter_value = filter_obj["filter"]
-            # Check if the column is 'version' and convert the filter value to float
-            if column == "version":
-                try:
-                    filter_value = float(filter_value)
-                except ValueError:
-                    raise ValueError(f"Invalid filter value for version: {filter_value}")
-
-            query_map = {
-                "contains": (
-                    {column: {MG_AGG_REGEX: filter_value, MG_AGG_OPTIONS: "i"}}
-                    if isinstance(filter_value, str)
-                    else {column: filter_value}
-                ),
-                "equals": {column: filter_value},
-                "notEqual": {column: {"$ne": filter_value}},
-                "notContains": (
-                    {column: {"$not": {MG_AGG_REGEX: filter_value, MG_AGG_OPTIONS: "i"}}}
-                    if isinstance(filter_value, str)
-                    else {column: {"$ne": filter_value}}
-                ),
-                "startsWith": (
-                    {column: {MG_AGG_REGEX: "^" + filter_value, MG_AGG_OPTIONS: "i"}}
-                    if isinstance(filter_value, str)
-                    else {column: filter_value}
-                ),
-                "endsWith": (
-                    {column: {MG_AGG_REGEX: filter_value + "$", MG_AGG_OPTIONS: "i"}}
-                    if isinstance(filter_value, str)
-                    else {column: filter_value}
-                ),
-                "blank": {"$or": [{column: {MG_AGG_EMPTY: True, "$eq": ""}}, {column: {MG_AGG_EMPTY: False}}]},
-                "notBlank": {column: {"$exists": True, "$ne": ""}},
-                "false": {column: False},
-                "true": {column: True},
-            }
+    def build_text_query(self, filter_obj, column) -> dict:
+        query_map = {
+            "blank": {"$or": [{column: {MG_AGG_EMPTY: True, "$eq": ""}}, {column: {MG_AGG_EMPTY: False}}]},
+            "notBlank": {column: {"$exists": True, "$ne": ""}},
+            "false": {column: False},
+            "true": {column: True},
+        }
+        if filter_obj["type"] in query_map:
             return query_map[filter_obj["type"]]
-        except KeyError:
-            raise NotImplementedError(f'given text search is not supported: {filter_obj["type"]}')
+        filter_value = filter_obj["filter"]
+        # Check if the column is 'version' and convert the filter value to float
+        if column == "version":
+            try:
+                filter_value = float(filter_value)
+            except ValueError:
+                raise ValueError(f"Invalid filter value for version: {filter_value}")
+        return self.planner.text_condition(column, filter_obj["type"], filter_value)
 
     @staticmethod
     def build_number_query(filter_obj, column) -> dict:
@@ -138,7 +144,7 @@ class AGGridMongoQueryUtil:
                 "lessThanOrEqual": {column: {"$lte": filter_obj["filter"]}},
                 "greaterThan": {column: {"$gt": filter_obj["filter"]}},
                 "greaterThanOrEqual": {column: {"$gte": filter_obj["filter"]}},
-                "inRange": {column: {"$and": [{"$lt": filter_obj["filterTo"]}, {"$gt": filter_obj["filter"]}]}},
+                "inRange": {column: {"$gt": filter_obj["filter"], "$lt": filter_obj["filterTo"]}},
                 "blank": {"$or": [{column: {MG_AGG_EMPTY: True, "$eq": ""}}, {column: {MG_AGG_EMPTY: False}}]},
                 "notBlank": {column: {"$exists": True, "$ne": ""}},
                 "false": {column: False},
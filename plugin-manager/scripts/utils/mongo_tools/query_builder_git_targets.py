@@ -1,6 +1,10 @@
+from scripts.utils.mongo_tools.query_planner import QueryPlanner
+
+
 class NewQueryBuilder:
-    def __init__(self):
+    def __init__(self, planner: QueryPlanner | None = None):
         self.pipeline = []
+        self.planner = planner or QueryPlanner()
 
     def project(self, fields):
         self.pipeline.append({"$project": fields})
@@ -20,5 +24,15 @@ class NewQueryBuilder:
         self.pipeline.append({"$skip": skip})
         self.pipeline.append({"$limit": limit})
 
+    def text_condition(self, column, filter_value, filter_type="contains"):
+        return self.planner.text_condition(column, filter_type, filter_value)
+
+    def count_pipeline(self, conditions):
+        pipeline = [{"$match": {"$and": conditions}}] if conditions else []
+        return self.planner.plan(pipeline + [{"$count": "count"}])
+
+    def aggregate_options(self):
+        return self.planner.aggregate_options()
+
     def build(self):
-        return self.pipeline
+        return self.planner.plan(self.pipeline)
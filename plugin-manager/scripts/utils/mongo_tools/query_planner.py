@@ -0,0 +1,190 @@
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+from scripts.config import QueryPlannerConf, Services
+
+MG_AGG_REGEX = "$regex"
+MG_AGG_OPTIONS = "$options"
+# Collation strengths at which comparisons ignore case
+CASE_INSENSITIVE_STRENGTHS = (1, 2)
+# ICU sorts U+FFFF after every other character, so it closes a prefix range under any collation
+PREFIX_RANGE_END = "\uffff"
+
+
+@dataclass(frozen=True)
+class IndexCatalog:
+    """Fields of a collection that an index can serve, derived from index_information()"""
+
+    # Leading fields of case-insensitive indexes, with the collation a query must use to be served by them
+    collated_fields: dict[str, dict] = field(default_factory=dict)
+    text_fields: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_index_information(cls, indexes: dict) -> "IndexCatalog":
+        collated_fields, text_fields = {}, set()
+        for index in indexes.values():
+            keys = list(index.get("key", []))
+            if not keys:
+                continue
+            if "weights" in index or any(direction == "text" for _, direction in keys):
+                text_fields.update(index.get("weights", {}))
+                continue
+            collation = index.get("collation")
+            if collation and collation.get("strength") in CASE_INSENSITIVE_STRENGTHS:
+                collated_fields.setdefault(
+                    keys[0][0], {"locale": collation["locale"], "strength": collation["strength"]}
+                )
+        return cls(collated_fields, frozenset(text_fields))
+
+
+class _IndexCatalogCache:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._catalogs: dict[tuple[str, str], tuple[float, IndexCatalog]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection) -> IndexCatalog:
+        key = (collection.database, collection.collection)
+        with self._lock:
+            cached = self._catalogs.get(key)
+        if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+        try:
+            catalog = IndexCatalog.from_index_information(collection.index_information())
+        except Exception as e:
+            logging.warning(f"Unable to read the indexes of {collection.collection}, planning without them: {e}")
+            catalog = IndexCatalog()
+        with self._lock:
+            self._catalogs[key] = (time.monotonic(), catalog)
+        return catalog
+
+
+index_catalogs = _IndexCatalogCache(ttl_seconds=QueryPlannerConf.QUERY_PLANNER_INDEX_TTL_SECONDS)
+
+
+def has_case(value: str) -> bool:
+    return value.lower() != value.upper()
+
+
+class QueryPlanner:
+    """
+    Rewrites grid text filters into forms the indexes of the queried collection can serve. Prefixes become
+    anchored regexes, or ranges under a case-insensitive index's collation, equality uses such a collation when
+    there is one, and "contains" can narrow its candidates with the text index. User input is always escaped, the
+    grid filters on literal text. One planner is used per query, as a collation or text search it picks applies to
+    the whole aggregation. That is why a collation is only picked for a lone text filter of an unsorted grid, and
+    never for pipelines that compare other strings, such as a $group on an id.
+    """
+
+    def __init__(
+        self, catalog: IndexCatalog | None = None, text_search: bool | None = None, collation_allowed: bool = True
+    ):
+        self.catalog = catalog or IndexCatalog()
+        self.text_search_enabled = QueryPlannerConf.QUERY_PLANNER_TEXT_SEARCH if text_search is None else text_search
+        self.collation_allowed = collation_allowed
+        self.collation: dict | None = None
+        self.text_search: str | None = None
+
+    @classmethod
+    def for_collection(cls, collection, *, collation_allowed: bool = True) -> "QueryPlanner":
+        """
+        :param collection: MongoCollectionBaseClass the query runs against
+        :param collation_allowed: False when the pipeline has stages whose string comparisons must stay binary
+        """
+        return cls(index_catalogs.get(collection), collation_allowed=collation_allowed)
+
+    def restrict_collation(self, filter_model: dict | None, sort_model: list | None) -> None:
+        """
+        Called before the conditions of a grid are built. A collation would also make the other filters and the
+        sort of the grid case-insensitive, so it stays allowed only for a single filter and no sort.
+        """
+        self.collation_allowed = self.collation_allowed and len(filter_model or {}) == 1 and not sort_model
+
+    def _use_collation(self, column: str) -> bool:
+        collation = self.catalog.collated_fields.get(column)
+        if not self.collation_allowed or collation is None or self.collation not in (None, collation):
+            return False
+        self.collation = collation
+        return True
+
+    def text_condition(self, column: str, filter_type: str, value) -> dict:
+        """Condition of an AG Grid text filter. Non string values are compared as they are."""
+        if not isinstance(value, str):
+            return {column: {"$ne": value}} if filter_type in ("notEqual", "notContains") else {column: value}
+        escaped = re.escape(value)
+        if filter_type == "equals":
+            self._use_collation(column)
+            return {column: value}
+        if filter_type == "notEqual":
+            return {column: {"$ne": value}}
+        if filter_type == "startsWith":
+            if value and self._use_collation(column):
+                return {column: {"$gte": value, "$lt": value + PREFIX_RANGE_END}}
+            if not has_case(value):
+                # Nothing to ignore the case of, so the anchored regex gets tight index bounds
+                return {column: {MG_AGG_REGEX: f"^{escaped}"}}
+            # Case-insensitive, it still only has to scan the index keys instead of the documents
+            return {column: {MG_AGG_REGEX: f"^{escaped}", MG_AGG_OPTIONS: "i"}}
+        if filter_type == "endsWith":
+            return {column: {MG_AGG_REGEX: f"{escaped}$", MG_AGG_OPTIONS: "i"}}
+        if filter_type == "notContains":
+            return {column: {"$not": {MG_AGG_REGEX: escaped, MG_AGG_OPTIONS: "i"}}}
+        if filter_type == "contains":
+            if (
+                self.text_search_enabled
+                and self.text_search is None
+                and column in self.catalog.text_fields
+                and value.strip()
+            ):
+                # Only one $text is allowed per query, the regex keeps the substring semantics within its matches
+                self.text_search = '"' + value.replace('"', " ") + '"'
+            return {column: {MG_AGG_REGEX: escaped, MG_AGG_OPTIONS: "i"}}
+        raise NotImplementedError(f"given text search is not supported: {filter_type}")
+
+    def plan(self, pipeline: list[dict]) -> list[dict]:
+        """:return: The pipeline, led by the text search when one was chosen, as $text has to be the first stage"""
+        if self.text_search is None:
+            return pipeline
+        return [{"$match": {"$text": {"$search": self.text_search}}}, *pipeline]
+
+    def aggregate_options(self) -> dict:
+        return {"collation": self.collation} if self.collation else {}
+
+    def explain(self, collection, pipeline: list[dict]):
+        """Logs the winning plan of the pipeline when running in debug mode or with QUERY_PLANNER_EXPLAIN"""
+        if not (QueryPlannerConf.QUERY_PLANNER_EXPLAIN or Services.LOG_LEVEL == "DEBUG"):
+            return
+        try:
+            explained = collection.explain_aggregate(pipeline, **self.aggregate_options())
+            logging.info(f"Winning plan on {collection.collection}: {summarize_plan(explained)}")
+        except Exception as e:
+            logging.warning(f"Unable to explain the query on {collection.collection}: {e}")
+
+
+def winning_plan(explained: dict) -> dict:
+    if "queryPlanner" in explained:
+        planner = explained["queryPlanner"]
+    else:
+        # Pipelines not pushed down entirely report the find layer in their first stage
+        planner = next(
+            (stage["$cursor"]["queryPlanner"] for stage in explained.get("stages", []) if "$cursor" in stage), {}
+        )
+    plan = planner.get("winningPlan", {})
+    return plan.get("queryPlan", plan)
+
+
+def summarize_plan(explained: dict) -> str:
+    """:return: Stages of the winning plan from the root down, with the index each scan used, e.g. FETCH < IXSCAN(name_1)"""
+    stages = []
+    pending = [winning_plan(explained)]
+    while pending:
+        stage = pending.pop(0)
+        if not stage:
+            continue
+        name = stage.get("stage", "?")
+        stages.append(f"{name}({stage['indexName']})" if "indexName" in stage else name)
+        pending.extend([stage.get("inputStage")] + stage.get("inputStages", []))
+    return " < ".join(stages) or "unknown"
@@ -4,9 +4,10 @@ All definitions related to mongo db is defined in this module
 
 import logging
 
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 
-from .mongo_tools import mongo_sync
+from .mongo_tools import mongo_async, mongo_sync
 
 
 class MongoConnect:
@@ -14,6 +15,7 @@ class MongoConnect:
         try:
             self.uri = uri
             self.client = MongoClient(uri, connect=False)
+            self.async_client = None
         except Exception as e:
             logging.exception(e)
             raise
@@ -24,6 +26,12 @@ class MongoConnect:
     def get_client(self):
         return self.client
 
+    def get_async_client(self) -> AsyncIOMotorClient:
+        # Created on first use so the client binds to the running event loop of the app
+        if self.async_client is None:
+            self.async_client = AsyncIOMotorClient(self.uri)
+        return self.async_client
+
     def __repr__(self):
         return f"Mongo Client(uri:{self.uri}, server_info={self.client.server_info()})"
 
@@ -31,6 +39,10 @@ class MongoConnect:
     def get_base_class():
         return mongo_sync.MongoCollectionBaseClass
 
+    @staticmethod
+    def get_async_base_class():
+        return mongo_async.AsyncMongoCollectionBaseClass
+
 
 class MongoStageCreator:
     @staticmethod
@@ -0,0 +1,361 @@
+import datetime
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Protocol
+
+import paho.mqtt.client as mqtt
+from ut_notifications_util import PlatformNotificationHandler
+
+from scripts.config import MQTTConf, NotificationConf
+
+
+@dataclass
+class Notification:
+    """
+    One notification for one user. payload holds the arguments of the platform's send_notifications, mqtt_payload
+    the message the MQTT backup publishes on the user's topic.
+    """
+
+    project_id: str
+    user_id: str
+    payload: dict
+    mqtt_payload: str
+    attempts: int = 0
+    error: str | None = None
+    created_on: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+
+class NotificationTransport(Protocol):
+    def send_batch(self, batch: list[Notification]) -> list[Notification]:
+        """:return: The notifications that could not be delivered, with their error set"""
+
+    def close(self): ...
+
+
+class PlatformTransport:
+    """Sends through the platform notification service, keeping one handler, and with it its connection, per project"""
+
+    def __init__(self, handler_factory: Callable[[str], PlatformNotificationHandler] = PlatformNotificationHandler):
+        self.handler_factory = handler_factory
+        self._handlers: dict[str, PlatformNotificationHandler] = {}
+
+    def send_batch(self, batch: list[Notification]) -> list[Notification]:
+        failed = []
+        for notification in batch:
+            try:
+                handler = self._handlers.get(notification.project_id)
+                if handler is None:
+                    handler = self._handlers[notification.project_id] = self.handler_factory(notification.project_id)
+                if handler.send_notifications(**notification.payload) is False:
+                    raise RuntimeError("notification was rejected")
+            except Exception as e:
+                notification.error = f"platform: {e}"
+                # A handler whose connection broke is not reused
+                self._handlers.pop(notification.project_id, None)
+                failed.append(notification)
+        return failed
+
+    def close(self):
+        self._handlers.clear()
+
+
+class MQTTTransport:
+    """
+    Publishes on the users' notification topics over one MQTT connection. It is opened on first use and kept up by
+    paho's network loop, which also reconnects it, so a batch is published and then acknowledged as a whole.
+    Delivery is at least once: a message not acknowledged in time may still arrive after it was retried.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        base_topic: str,
+        publish_timeout: float = NotificationConf.NOTIFICATION_PUBLISH_TIMEOUT_SECONDS,
+        client_factory: Callable[[], mqtt.Client] = mqtt.Client,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.base_topic = base_topic
+        self.publish_timeout = publish_timeout
+        self.client_factory = client_factory
+        self._client: mqtt.Client | None = None
+        self._lock = threading.Lock()
+
+    def topic(self, user_id: str) -> str:
+        return f"{self.base_topic}/{user_id}/plugins"
+
+    @staticmethod
+    def _on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            logging.info(f"Publisher Connected with result code {str(rc)}")
+        else:
+            logging.error(f"Failed to connect, return code {str(rc)}")
+
+    @staticmethod
+    def _on_disconnect(client, userdata, rc):
+        if rc != 0:
+            logging.warning(f"Publisher disconnected unexpectedly, return code {str(rc)}, reconnecting")
+
+    def _connected_client(self) -> mqtt.Client:
+        with self._lock:
+            if self._client is None:
+                client = self.client_factory()
+                client.username_pw_set(self.username, self.password)
+                client.on_connect = self._on_connect
+                client.on_disconnect = self._on_disconnect
+                client.reconnect_delay_set(min_delay=1, max_delay=30)
+                client.connect(self.host, self.port, 30)
+                client.loop_start()
+                self._client = client
+            return self._client
+
+    def send_batch(self, batch: list[Notification]) -> list[Notification]:
+        try:
+            client = self._connected_client()
+        except Exception as e:
+            logging.exception(f"Exception at MQTT Publish: {e}")
+            for notification in batch:
+                notification.error = f"mqtt: {e}"
+            return list(batch)
+        failed, published = [], []
+        for notification in batch:
+            try:
+                message = client.publish(
+                    self.topic(notification.user_id), notification.mqtt_payload, retain=False, qos=1
+                )
+                published.append((notification, message))
+            except Exception as e:
+                notification.error = f"mqtt: {e}"
+                failed.append(notification)
+        deadline = time.monotonic() + self.publish_timeout
+        for notification, message in published:
+            try:
+                message.wait_for_publish(timeout=max(deadline - time.monotonic(), 0))
+                if not message.is_published():
+                    raise TimeoutError("not acknowledged in time")
+            except Exception as e:
+                notification.error = f"mqtt: {e}"
+                failed.append(notification)
+        if len(failed) < len(batch):
+            logging.debug("Notification message published")
+        return failed
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.loop_stop()
+            client.disconnect()
+
+
+def store_dead_letters(notifications: list[Notification]):
+    # Imported on use, so importing the dispatcher does not load the Mongo layer
+    from scripts.db import NotificationDeadLetters
+
+    by_project: dict[str, list[dict]] = {}
+    for notification in notifications:
+        by_project.setdefault(notification.project_id, []).append(asdict(notification))
+    for project_id, documents in by_project.items():
+        NotificationDeadLetters(project_id=project_id).store(documents)
+
+
+class NotificationDispatcher:
+    """
+    Delivers notifications from one background thread, so that handlers and long running flows only enqueue them.
+    The worker sends what is queued in batches of up to batch_size, waiting batch_wait_seconds for a batch to fill.
+    Notifications the transport fails on go to the fallback transport, if any, and are otherwise retried with
+    exponential backoff. After max_attempts, or when the queue is full or the dispatcher shuts down, they are stored
+    as dead letters.
+    """
+
+    def __init__(
+        self,
+        transport: NotificationTransport,
+        fallback: NotificationTransport | None = None,
+        dead_letters: Callable[[list[Notification]], None] = store_dead_letters,
+        queue_size: int = NotificationConf.NOTIFICATION_QUEUE_SIZE,
+        batch_size: int = NotificationConf.NOTIFICATION_BATCH_SIZE,
+        batch_wait_seconds: float = NotificationConf.NOTIFICATION_BATCH_WAIT_SECONDS,
+        max_attempts: int = NotificationConf.NOTIFICATION_MAX_ATTEMPTS,
+        backoff_seconds: float = NotificationConf.NOTIFICATION_RETRY_BACKOFF_SECONDS,
+        backoff_max_seconds: float = NotificationConf.NOTIFICATION_RETRY_BACKOFF_MAX_SECONDS,
+    ):
+        self.transport = transport
+        self.fallback = fallback
+        self.dead_letters = dead_letters
+        self.batch_size = max(batch_size, 1)
+        self.batch_wait_seconds = batch_wait_seconds
+        self.max_attempts = max(max_attempts, 1)
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        # A queued notification stays an unfinished task until it was delivered or dead lettered, retries included
+        self._queue: queue.Queue[Notification] = queue.Queue(maxsize=queue_size)
+        self._retries: list[tuple[float, int, Notification]] = []
+        self._sequence = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, notification: Notification) -> bool:
+        """
+        Hands a notification to the worker without waiting for it to be sent
+        :return: False if the queue was full and the notification was dead lettered instead
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(notification)
+            return True
+        except queue.Full:
+            notification.error = "notification queue is full"
+            logging.error(f"Notification queue is full, dead lettering the notification for {notification.user_id}")
+            self._dead_letter([notification])
+            return False
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until everything enqueued so far was delivered or dead lettered, :return: False on timeout"""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def shutdown(self, timeout: float = NotificationConf.NOTIFICATION_SHUTDOWN_TIMEOUT_SECONDS):
+        """Sends what is still queued once more, dead lettering what fails, and closes the transports"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        for transport in (self.transport, self.fallback):
+            if transport is None:
+                continue
+            try:
+                transport.close()
+            except Exception as e:
+                logging.warning(f"Unable to close the notification transport: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "retrying": len(self._retries),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self._deliver(batch)
+                except Exception as e:
+                    logging.exception(f"Notification batch could not be delivered: {e}")
+                    self._dead_letter(batch)
+                for _ in batch:
+                    self._queue.task_done()
+            elif self._stopped.is_set():
+                return
+
+    def _next_batch(self) -> list[Notification]:
+        stopping = self._stopped.is_set()
+        batch = []
+        now = time.monotonic()
+        while self._retries and len(batch) < self.batch_size and (stopping or self._retries[0][0] <= now):
+            batch.append(heapq.heappop(self._retries)[2])
+        if batch or stopping:
+            timeout = 0
+        elif self._retries:
+            timeout = min(self._retries[0][0] - now, 1.0)
+        else:
+            timeout = 1.0
+        deadline = time.monotonic() + (0 if stopping else self.batch_wait_seconds)
+        while len(batch) < self.batch_size:
+            try:
+                if timeout > 0:
+                    notification = self._queue.get(timeout=timeout)
+                else:
+                    notification = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(notification)
+            timeout = deadline - time.monotonic()
+        return batch
+
+    @staticmethod
+    def _send(transport: NotificationTransport, batch: list[Notification]) -> list[Notification]:
+        try:
+            return transport.send_batch(batch)
+        except Exception as e:
+            for notification in batch:
+                notification.error = str(e)
+            return list(batch)
+
+    def _deliver(self, batch: list[Notification]):
+        for notification in batch:
+            notification.attempts += 1
+        failed = self._send(self.transport, batch)
+        if failed and self.fallback is not None:
+            failed = self._send(self.fallback, failed)
+        self.sent += len(batch) - len(failed)
+        exhausted = []
+        for notification in failed:
+            if self._stopped.is_set() or notification.attempts >= self.max_attempts:
+                exhausted.append(notification)
+                continue
+            delay = min(self.backoff_seconds * 2 ** (notification.attempts - 1), self.backoff_max_seconds)
+            # Marked done with its batch, so the retry opens a task of its own for flush() to wait on
+            with self._queue.mutex:
+                self._queue.unfinished_tasks += 1
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._sequence), notification))
+            self.retried += 1
+        if exhausted:
+            self._dead_letter(exhausted)
+
+    def _dead_letter(self, notifications: list[Notification]):
+        for notification in notifications:
+            logging.error(
+                f"Notification for {notification.user_id} in {notification.project_id} dead lettered after "
+                f"{notification.attempts} attempts: {notification.error}"
+            )
+        self.dead_lettered += len(notifications)
+        try:
+            self.dead_letters(notifications)
+        except Exception as e:
+            logging.exception(f"Unable to store the dead lettered notifications: {e}")
+
+
+mqtt_transport = MQTTTransport(
+    host=MQTTConf.MQTT_URL,
+    port=MQTTConf.MQTT_PORT,
+    username=MQTTConf.MQTT_USERNAME,
+    password=MQTTConf.MQTT_PASSWORD,
+    base_topic=MQTTConf.publish_base_topic,
+)
+
+notification_dispatcher = NotificationDispatcher(
+    transport=PlatformTransport(),
+    fallback=mqtt_transport if NotificationConf.NOTIFICATION_MQTT_FALLBACK else None,
+)
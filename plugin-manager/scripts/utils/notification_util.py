@@ -1,10 +1,8 @@
 import logging
 
-import paho.mqtt.client as mqtt
 from pydantic import BaseModel, Field
-from ut_notifications_util import PlatformNotificationHandler
 
-from scripts.config import MQTTConf
+from scripts.utils.notification_dispatcher import Notification, mqtt_transport, notification_dispatcher
 
 
 class NotificationSchema(BaseModel):
@@ -28,80 +26,64 @@ class NotificationSchemaDownload(BaseModel):
     mark_as_read: bool = False
 
 
-def push_notification(notification: NotificationSchema, user_id, project_id):
+def push_notification(notification: NotificationSchema, user_id, project_id) -> bool:
+    """Queues the notification for the dispatcher, :return: False if it had to be dead lettered right away"""
     catalog_notification = True if project_id.startswith("space_") else False
-    PlatformNotificationHandler(project_id).send_notifications(
-        type_=notification.type,
-        status=notification.status,
-        main_msg=notification.message,
-        properties={
-            "plugin_type": notification.plugin_type,
-            "download_url": notification.download_url,
-            "plugin_id": notification.plugin_id,
-        },
-        users=user_id,
-        catalog_notification=catalog_notification,
+    return notification_dispatcher.enqueue(
+        Notification(
+            project_id=project_id,
+            user_id=user_id,
+            payload={
+                "type_": notification.type,
+                "status": notification.status,
+                "main_msg": notification.message,
+                "properties": {
+                    "plugin_type": notification.plugin_type,
+                    "download_url": notification.download_url,
+                    "plugin_id": notification.plugin_id,
+                },
+                "users": user_id,
+                "catalog_notification": catalog_notification,
+            },
+            mqtt_payload=notification.model_dump_json(),
+        )
     )
 
 
-def push_notification_docker_download(notification: NotificationSchemaDownload, user_id, project_id):
+def push_notification_docker_download(notification: NotificationSchemaDownload, user_id, project_id) -> bool:
     catalog_notification = True if project_id.startswith("space_") else False
-    PlatformNotificationHandler(project_id).send_notifications(
-        type_=notification.type,
-        status=notification.status,
-        main_msg=notification.message,
-        properties={
-            "type": notification.type,
-            "download_url": notification.download_url,
-            "download_link": notification.download_link,
-            "report_type": notification.report_type,
-        },
-        users=user_id,
-        catalog_notification=catalog_notification,
+    return notification_dispatcher.enqueue(
+        Notification(
+            project_id=project_id,
+            user_id=user_id,
+            payload={
+                "type_": notification.type,
+                "status": notification.status,
+                "main_msg": notification.message,
+                "properties": {
+                    "type": notification.type,
+                    "download_url": notification.download_url,
+                    "download_link": notification.download_link,
+                    "report_type": notification.report_type,
+                },
+                "users": user_id,
+                "catalog_notification": catalog_notification,
+            },
+            mqtt_payload=notification.model_dump_json(),
+        )
     )
 
 
+def _publish_bkp(notification: BaseModel, user_id):
+    """Publishes straight to MQTT on the shared connection, waiting for the broker to acknowledge it"""
+    message = Notification(project_id="", user_id=user_id, payload={}, mqtt_payload=notification.model_dump_json())
+    if mqtt_transport.send_batch([message]):
+        logging.error(f"Exception at MQTT Publish: {message.error}")
+
+
 def push_notification_bkp(notification: NotificationSchema, user_id):
-    def on_connect(rc):
-        if rc == 0:
-            logging.info(f"Publisher Connected with result code {str(rc)}")
-        else:
-            logging.error(f"Failed to connect, return code {str(rc)}")
-
-    def on_publish(mid):
-        logging.info(f"Message {mid} published.")
-
-    client = mqtt.Client()
-    client.username_pw_set(MQTTConf.MQTT_USERNAME, MQTTConf.MQTT_PASSWORD)
-    client.on_connect = on_connect
-    client.on_publish = on_publish
-    try:
-        client.connect(MQTTConf.MQTT_URL, MQTTConf.MQTT_PORT, 30)
-        topic = f"{MQTTConf.publish_base_topic}/{user_id}/plugins"
-        client.publish(topic, notification.model_dump_json(), retain=False, qos=1)
-        logging.debug("Notification message published")
-    except Exception as e:
-        logging.exception(f"Exception at MQTT Publish: {e}")
+    _publish_bkp(notification, user_id)
 
 
 def push_notification_docker_download_bkp(notification: NotificationSchemaDownload, user_id):
-    def on_connect(rc):
-        if rc == 0:
-            logging.info(f"Publisher Connected with result code {str(rc)}")
-        else:
-            logging.error(f"Failed to connect, return code {str(rc)}")
-
-    def on_publish(mid):
-        logging.info(f"Message {mid} published.")
-
-    client = mqtt.Client()
-    client.username_pw_set(MQTTConf.MQTT_USERNAME, MQTTConf.MQTT_PASSWORD)
-    client.on_connect = on_connect
-    client.on_publish = on_publish
-    try:
-        client.connect(MQTTConf.MQTT_URL, MQTTConf.MQTT_PORT, 30)
-        topic = f"{MQTTConf.publish_base_topic}/{user_id}/plugins"
-        client.publish(topic, notification.model_dump_json(), retain=False, qos=1)
-        logging.debug("Notification message published")
-    except Exception as e:
-        logging.exception(f"Exception at MQTT Publish: {e}")
+    _publish_bkp(notification, user_id)
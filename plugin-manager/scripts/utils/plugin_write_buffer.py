@@ -0,0 +1,107 @@
+import copy
+import logging
+
+from scripts.db.schemas import PluginMetaDBSchema
+from scripts.errors import PluginNotFoundError, PluginWriteConflict
+
+MAX_FLUSH_ATTEMPTS = 3
+# Identify the document rather than describe it, so they are never part of a delta
+UNBUFFERED_FIELDS = ("version", "revision")
+_MISSING = object()
+
+
+def _descendable(before: dict, after: dict) -> bool:
+    # Sub-fields can only be set individually when none are removed and every key is usable as a path segment
+    return set(before) <= set(after) and all(
+        isinstance(key, str) and key and "." not in key and not key.startswith("$") for key in after
+    )
+
+
+def field_deltas(before: dict, after: dict, prefix: str = "") -> dict:
+    """
+    Dotted field paths and values that turn the stored document into the changed one
+    :param before: Stored values of the fields
+    :param after: Changed values of the fields
+    :param prefix: Path of the embedded document being compared
+    :return: Only the leaves that differ, as accepted by $set
+    """
+    changes = {}
+    for key, value in after.items():
+        path = f"{prefix}{key}"
+        previous = before.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict) and value and _descendable(previous, value):
+            changes.update(field_deltas(previous, value, prefix=f"{path}."))
+        elif previous is _MISSING or previous != value:
+            changes[path] = value
+    return changes
+
+
+class PluginWriteBuffer:
+    """
+    Unit of work for one deployment of a plugin version. Pipeline stages record their changes through
+    update_plugin, exactly as they would against PluginMeta, and each stage flush writes only the fields that differ
+    from the stored document as a single $set. Flushes are guarded by the document revision, which every write to the
+    plugin moves on: when the document has moved on, the touched fields are re-read and the delta recomputed against
+    them before retrying.
+    """
+
+    def __init__(self, plugin_db_conn, plugin_data: PluginMetaDBSchema, max_attempts: int = MAX_FLUSH_ATTEMPTS):
+        self.plugin_db_conn = plugin_db_conn
+        self.plugin_id = plugin_data.plugin_id
+        self.version = plugin_data.version
+        self.revision = plugin_data.revision
+        self.max_attempts = max_attempts
+        self._stored = plugin_data.model_dump(exclude=set(UNBUFFERED_FIELDS))
+        self._changes = {}
+
+    def update_plugin(self, plugin_id: str, data: dict, version: str | float = None):
+        if plugin_id != self.plugin_id or (version and version != self.version):
+            return self.plugin_db_conn.update_plugin(plugin_id, data, version=version)
+        for field, value in data.items():
+            if field not in UNBUFFERED_FIELDS:
+                self._changes[field] = copy.deepcopy(value)
+
+    @property
+    def pending(self) -> dict:
+        return field_deltas(self._stored, self._changes)
+
+    def flush(self, stage: str) -> int:
+        """
+        Writes the changes recorded since the last flush
+        :param stage: Pipeline stage the changes belong to, for logging
+        :return: Number of field paths written
+        """
+        for _ in range(self.max_attempts):
+            changes = self.pending
+            if not changes:
+                if self._changes and (stored := self._fetch_stored()).get("revision", 0) != self.revision:
+                    # Values equal to a stale copy may still differ from what was written directly since
+                    self._rebase(stage, stored)
+                    continue
+                self._changes.clear()
+                return 0
+            if self.plugin_db_conn.apply_changes(self.plugin_id, changes, self.revision, version=self.version):
+                self.revision += 1
+                self._stored.update(self._changes)
+                self._changes = {}
+                logging.debug(f"Wrote {len(changes)} changed fields of plugin {self.plugin_id} after {stage}")
+                return len(changes)
+            self._rebase(stage)
+        raise PluginWriteConflict(f"Plugin {self.plugin_id} kept changing while writing the {stage} stage")
+
+    def _fetch_stored(self) -> dict:
+        stored = self.plugin_db_conn.fetch_fields(self.plugin_id, list(self._changes), version=self.version)
+        if stored is None:
+            raise PluginNotFoundError(f"Plugin {self.plugin_id} not found")
+        return stored
+
+    def _rebase(self, stage: str, stored: dict | None = None):
+        if stored is None:
+            stored = self._fetch_stored()
+        logging.warning(f"Plugin {self.plugin_id} was changed concurrently before the {stage} write, rebasing")
+        self.revision = stored.pop("revision", 0)
+        for field in self._changes:
+            if field in stored:
+                self._stored[field] = stored[field]
+            else:
+                self._stored.pop(field, None)
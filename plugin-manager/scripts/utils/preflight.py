@@ -3,7 +3,7 @@ import logging
 from scripts.config import MinioSettings
 from scripts.constants.ui_components import plugin_registration_types
 from scripts.db.mongo.ilens_configurations.collections.constants import Constants
-from scripts.utils.minio_util import MinioUtility
+from scripts.utils.minio_util import get_minio_utility
 
 plugin_types = {
     "data": [
@@ -130,12 +130,7 @@ def run():
             update_only_if_not_exist=True,
         )
         logging.info(f"{MinioSettings.MINIO_ENDPOINT} bucket creation")
-        MinioUtility(
-            endpoint=MinioSettings.MINIO_ENDPOINT,
-            access_key=MinioSettings.MINIO_ACCESS_KEY,
-            secret_key=MinioSettings.MINIO_SECRET_KEY,
-            secure=MinioSettings.MINIO_SECURE,
-        ).create_bucket(MinioSettings.MINIO_BUCKET_NAME)
+        get_minio_utility().create_bucket(MinioSettings.MINIO_BUCKET_NAME)
     except Exception as e:
         logging.exception(e)
     finally:
@@ -1,40 +1,84 @@
 import logging
-from datetime import datetime, timedelta, timezone
-from functools import lru_cache, wraps
 
 import orjson as json
 from fastapi import HTTPException, Request, status
 from ut_mongo_util import mongo_client
 
+from scripts.config import CacheConf, Databases
 from scripts.db.mongo.catalog_meta.collections.user import User as SpaceUser
 from scripts.db.mongo.catalog_meta.collections.user_space import UserSpace
 from scripts.db.mongo.ilens_configurations.collections.user import User
 from scripts.db.mongo.ilens_configurations.collections.user_project import UserProject
 from scripts.db.redis_conn import user_role_permissions_redis
+from scripts.utils.cache_util import CacheInvalidationListener, TTLCache, keyspace_events_enabled
+
+USER_CHANGE_PREFIX = "user:"
+
+# Role of a user in a project or space, keyed by (user_id, project_id)
+user_role_cache = TTLCache(
+    "user_roles", maxsize=CacheConf.USER_ROLE_CACHE_SIZE, ttl_seconds=CacheConf.USER_ROLE_CACHE_TTL_SECONDS
+)
+# Permissions of a role per entity, keyed like the Redis hash they come from: <project_id>__<role_id>. Kept for
+# the full TTL only once keyspace notifications are known to report changes to them, see reset_permission_cache
+permission_cache = TTLCache(
+    "permissions",
+    maxsize=CacheConf.PERMISSION_CACHE_SIZE,
+    ttl_seconds=CacheConf.PERMISSION_CACHE_UNNOTIFIED_TTL_SECONDS,
+)
+
+
+def invalidate_permissions(change: str):
+    """
+    Roles and permissions are written by the user management services, not by this one. They announce changes on
+    PERMISSION_CHANGES_CHANNEL, and keyspace notifications cover writes to the permission hashes themselves.
+    :param change: <project_id>__<role_id> for a role whose permissions changed, user:<user_id> for a user"""
+    if change.startswith(USER_CHANGE_PREFIX):
+        user_id = change.removeprefix(USER_CHANGE_PREFIX)
+        user_role_cache.invalidate_where(lambda key: key[0] == user_id)
+    else:
+        permission_cache.invalidate(change)
+
+
+permission_listener = CacheInvalidationListener(
+    user_role_permissions_redis, reconnect_seconds=CacheConf.CACHE_RECONNECT_SECONDS
+)
+permission_listener.subscribe(CacheConf.PERMISSION_CHANGES_CHANNEL, invalidate_permissions)
+if CacheConf.PERMISSION_KEYSPACE_EVENTS:
+    permission_listener.subscribe(
+        f"__keyspace@{Databases.REDIS_USER_ROLE_DB}__:*", permission_cache.invalidate, pattern=True
+    )
+
+
+def reset_permission_cache():
+    """
+    Runs whenever the subscription is (re)established. Without keyspace notifications for hash writes nothing
+    reports a revoked permission, so the short unnotified TTL is used instead of PERMISSION_CACHE_TTL_SECONDS.
+    """
+    notified = CacheConf.PERMISSION_KEYSPACE_EVENTS and keyspace_events_enabled(user_role_permissions_redis, "gh")
+    if not notified:
+        logging.warning(
+            "Keyspace notifications are off on the user role Redis, "
+            "permissions are cached for PERMISSION_CACHE_UNNOTIFIED_TTL_SECONDS only"
+        )
+    permission_cache.ttl_seconds = (
+        CacheConf.PERMISSION_CACHE_TTL_SECONDS if notified else CacheConf.PERMISSION_CACHE_UNNOTIFIED_TTL_SECONDS
+    )
+    permission_cache.clear()
+
+
+permission_listener.on_reset(reset_permission_cache)
+permission_listener.on_reset(user_role_cache.clear)
 
 
-def timed_lru_cache(seconds: int = 10, maxsize: int = 128):
-    def wrapper_cache(func):
-        func = lru_cache(maxsize=maxsize)(func)
-        func.lifetime = timedelta(seconds=seconds)
-        func.expiration = datetime.now(timezone.utc) + func.lifetime
-
-        @wraps(func)
-        def wrapped_func(*args, **kwargs):
-            if datetime.now(timezone.utc) >= func.expiration:
-                logging.debug("Cache Expired")
-                func.cache_clear()
-                func.expiration = datetime.now(timezone.utc) + func.lifetime
-
-            return func(*args, **kwargs)
+def get_user_role_id_space(user_id, space_id):
+    return user_role_cache.get_or_load((user_id, space_id), lambda: fetch_user_role_id_space(user_id, space_id))
 
-        return wrapped_func
 
-    return wrapper_cache
+def get_user_role_id_projects(user_id, project_id):
+    return user_role_cache.get_or_load((user_id, project_id), lambda: fetch_user_role_id_projects(user_id, project_id))
 
 
-@timed_lru_cache(seconds=60, maxsize=1000)
-def get_user_role_id_space(user_id, space_id):
+def fetch_user_role_id_space(user_id, space_id):
     logging.debug("Fetching user role from DB")
     user_conn = SpaceUser(mongo_client=mongo_client)  # user collection from catalog_meta DB
     if user_role := user_conn.find_user_role_for_user_id(user_id=user_id, space_id=space_id):
@@ -45,9 +89,7 @@ def get_user_role_id_space(user_id, space_id):
         return user_role["userrole"][0]
 
 
-@timed_lru_cache(seconds=60, maxsize=1000)
-def get_user_role_id_projects(user_id, project_id):
-    """"""
+def fetch_user_role_id_projects(user_id, project_id):
     logging.debug("Fetching user role from DB")
     user_conn = User()  # user collection from ilens_configuration DB
     if user_role := user_conn.find_user_by_project_id_user_role(user_id=user_id, project_id=project_id):
@@ -58,6 +100,31 @@ def get_user_role_id_projects(user_id, project_id):
         return user_role["userrole"][0] if user_role.get("userrole") else None
 
 
+def get_role_permissions(r_key: str) -> dict[str, dict]:
+    """
+    Permissions of a role for every entity. The whole hash is read from Redis once and kept in process until a
+    change notification or the TTL drops it, so checks for any entity of the role skip the round trip.
+    """
+
+    def load() -> dict[str, dict]:
+        records = user_role_permissions_redis.hgetall(r_key)
+        return {entity: json.loads(record) if record else {} for entity, record in records.items()}
+
+    return permission_cache.get_or_load(r_key, load)
+
+
+def get_entity_permissions(r_key: str, entity_name: str) -> dict:
+    """
+    Permissions of a role for one entity. While permissions are not cached, see reset_permission_cache, only the
+    entity's field is read instead of the whole hash.
+    """
+    permission_listener.start()
+    if permission_cache.ttl_seconds <= 0:
+        record = user_role_permissions_redis.hget(r_key, entity_name)
+        return json.loads(record) if record else {}
+    return get_role_permissions(r_key).get(entity_name) or {}
+
+
 class RBAC:
     def __init__(self, entity_name: str, operation: list[str]):
         self.entity_name = entity_name
@@ -71,11 +138,10 @@ class RBAC:
         if not user_role_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User role not found!")
         r_key = f"{project_id}__{user_role_id}"  # eg: space_100__user_role_100
-        user_role_rec = user_role_permissions_redis.hget(r_key, self.entity_name)
+        user_role_rec = get_entity_permissions(r_key, self.entity_name)
         if not user_role_rec:
             logging.error("user role not found in redis")
             return {}
-        user_role_rec = json.loads(user_role_rec)
         if permission_dict := {i: True for i in self.operation if user_role_rec.get(i)}:
             return permission_dict
         else:
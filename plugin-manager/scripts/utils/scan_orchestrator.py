@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+import docker.errors
+from pydantic import BaseModel, ConfigDict
+
+from scripts.config import VulnerabilityScanner
+from scripts.db import ScanResultCache
+
+SKIPPED_DIRECTORIES = {".git"}
+# How long a timed out scanner gets to wind down once cancelled, so it does not report after its verdict
+CANCEL_GRACE_SECONDS = 30
+
+
+class ScanOutcome(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    status: Literal["completed", "skipped", "timeout", "error"]
+    result: Any = None
+    cached: bool = False
+    exception: Exception | None = None
+
+
+def source_tree_digest(folder_path: str | Path) -> str:
+    """
+    Content digest of a source tree: relative paths and file contents in a stable order, VCS metadata excluded.
+
+    :param folder_path: Root of the source tree
+    :return: Hex encoded sha256 digest
+    """
+    root = Path(folder_path)
+    digest = hashlib.sha256()
+    files = sorted(
+        path
+        for path in root.rglob("*")
+        if path.is_file() and not SKIPPED_DIRECTORIES.intersection(path.relative_to(root).parts)
+    )
+    for path in files:
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def image_digest(docker_client, image: str) -> str | None:
+    try:
+        return docker_client.images.get(image).id
+    except docker.errors.DockerException as e:
+        logging.warning(f"Unable to resolve digest of image {image}: {e}")
+        return None
+
+
+def scan_container_name(scanner: str, plugin_id: str) -> str:
+    """Unique name of a scanner container, by which it can be stopped when the scan times out"""
+    return f"plugin-scan-{scanner}-{plugin_id}-{uuid.uuid4().hex[:8]}".lower()
+
+
+class ScanOrchestrator:
+    """
+    Runs independent scanners concurrently with a per-scanner timeout. Completed results are stored against the
+    content digest of the scanned artifact, so an unchanged source tree or image is not scanned again.
+    A scanner returns its raw report, or None when it did not run; only raw reports are cached, verdicts are
+    derived by the caller so threshold changes take effect without invalidating the cache.
+    """
+
+    def __init__(self, cache: ScanResultCache | None = None):
+        self.cache = cache
+
+    def _cached_result(self, scanner: str, digest: str | None):
+        if not (self.cache and digest and VulnerabilityScanner.SCAN_RESULT_CACHE):
+            return None
+        try:
+            return self.cache.get_result(scanner, digest, VulnerabilityScanner.SCAN_RESULT_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logging.warning(f"Scan result cache lookup failed for {scanner}: {e}")
+            return None
+
+    def _store_result(self, scanner: str, digest: str | None, result):
+        if not (self.cache and digest and VulnerabilityScanner.SCAN_RESULT_CACHE):
+            return
+        try:
+            self.cache.save_result(scanner, digest, result)
+        except Exception as e:
+            logging.warning(f"Unable to cache {scanner} scan result: {e}")
+
+    @staticmethod
+    def _cancel(scanner: str, future: Future, cancel: Callable[[], None] | None):
+        if future.cancel():
+            return
+        if cancel is None:
+            logging.warning(f"{scanner} scan cannot be cancelled and keeps running in the background")
+            return
+        try:
+            cancel()
+            future.exception(timeout=CANCEL_GRACE_SECONDS)
+        except FutureTimeoutError:
+            logging.error(f"{scanner} scan did not stop within {CANCEL_GRACE_SECONDS}s of being cancelled")
+        except Exception as e:
+            logging.exception(f"Unable to cancel the {scanner} scan: {e}")
+
+    def run(
+        self,
+        scans: dict[str, Callable[[], Any]],
+        timeouts: dict[str, float],
+        digest: str | None = None,
+        cancellations: dict[str, Callable[[], None]] | None = None,
+    ) -> dict[str, ScanOutcome]:
+        """
+        :param scans: Scanner name mapped to a callable returning the raw report
+        :param timeouts: Scanner name mapped to its timeout in seconds
+        :param digest: Content digest of the scanned artifact, caching is skipped when empty
+        :param cancellations: Scanner name mapped to a callable stopping its scan, e.g. its container, on timeout
+        :return: Scanner name mapped to its outcome
+        """
+        outcomes = {}
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=max(len(scans), 1), thread_name_prefix="plugin-scan")
+        try:
+            for scanner, scan in scans.items():
+                cached = self._cached_result(scanner, digest)
+                if cached is not None:
+                    logging.info(f"Reusing cached {scanner} scan result for digest {digest}")
+                    outcomes[scanner] = ScanOutcome(status="completed", result=cached, cached=True)
+                    continue
+                pending[scanner] = executor.submit(scan)
+            started = time.monotonic()
+            for scanner, future in pending.items():
+                remaining = max(timeouts.get(scanner, 0) - (time.monotonic() - started), 0)
+                try:
+                    result = future.result(timeout=remaining)
+                except FutureTimeoutError:
+                    logging.error(f"{scanner} scan timed out after {timeouts.get(scanner)}s")
+                    self._cancel(scanner, future, (cancellations or {}).get(scanner))
+                    outcomes[scanner] = ScanOutcome(status="timeout")
+                    continue
+                except Exception as e:
+                    logging.exception(f"{scanner} scan failed: {e}")
+                    outcomes[scanner] = ScanOutcome(status="error", exception=e)
+                    continue
+                if result is None:
+                    outcomes[scanner] = ScanOutcome(status="skipped")
+                    continue
+                outcomes[scanner] = ScanOutcome(status="completed", result=result)
+                self._store_result(scanner, digest, result)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return outcomes
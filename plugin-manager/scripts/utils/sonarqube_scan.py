@@ -19,7 +19,7 @@ class SonarQubeScan:
             f"https://{self.sonarqube_user}:{self.sonarqube_password}@{SonarQubeConfig.sonarqube_url}/api/issues/search"
         )
 
-    def initialize_project(self, src_folder: str):
+    def initialize_project(self, src_folder: str, container_name: str | None = None):
         docker_util = DockerUtil()
         docker_util.docker_client.containers.run(
             image="sonarsource/sonar-scanner-cli:5",
@@ -29,6 +29,7 @@ class SonarQubeScan:
             group_add=[2000],
             user=1000,
             remove=True,
+            name=container_name,
         )
 
     def get_values(self):
@@ -0,0 +1,35 @@
+from typing import AsyncIterator
+
+import anyio.from_thread
+
+
+class AsyncIteratorReader:
+    """
+    Blocking, file-like view of an async byte iterator such as a request body, for code running in a worker thread
+    started with anyio.to_thread. Only the bytes asked for by the pending read are buffered.
+    """
+
+    def __init__(self, iterator: AsyncIterator[bytes]):
+        self._iterator = iterator
+        self._buffer = bytearray()
+        self._exhausted = False
+        self.bytes_read = 0
+
+    async def _next_chunk(self) -> bytes | None:
+        try:
+            return await self._iterator.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._exhausted and (size < 0 or len(self._buffer) < size):
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if chunk is None:
+                self._exhausted = True
+            else:
+                self._buffer.extend(chunk)
+        size = len(self._buffer) if size < 0 else min(size, len(self._buffer))
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.bytes_read += len(data)
+        return data
@@ -0,0 +1,21 @@
+import pytest
+
+_results: list[str] = []
+
+
+@pytest.fixture
+def benchmark_report(record_property):
+    """Records a measurement, listed in the terminal summary and kept as a property in the JUnit XML report"""
+
+    def report(name: str, measurement: str):
+        record_property(name, measurement)
+        _results.append(f"{name}: {measurement}")
+
+    return report
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _results:
+        terminalreporter.write_sep("-", "benchmark results")
+        for line in _results:
+            terminalreporter.write_line(line)
@@ -0,0 +1,98 @@
+"""
+Microbenchmarks of the sync and async Mongo collection base classes against a real server.
+Timings are reported, not asserted, so a busy machine cannot fail them.
+
+Run with:
+    MONGO_BENCHMARK_URI=mongodb://localhost:27017 pytest tests/benchmarks
+"""
+
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from scripts.db.mongo import AsyncCollectionBaseClass, CollectionBaseClass
+
+BENCHMARK_URI = os.getenv("MONGO_BENCHMARK_URI")
+DOCUMENTS = int(os.getenv("MONGO_BENCHMARK_DOCUMENTS", "500"))
+
+pytestmark = pytest.mark.skipif(not BENCHMARK_URI, reason="set MONGO_BENCHMARK_URI to run the Mongo microbenchmarks")
+
+
+def measurement(seconds: float, documents: int) -> str:
+    return f"{seconds * 1000:.1f} ms for {documents} documents ({documents / seconds:.0f} ops/s)"
+
+
+def timed(func, *args, **kwargs) -> float:
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+@pytest.fixture
+def database_name():
+    name = f"plugin_manager_benchmark_{uuid.uuid4().hex[:8]}"
+    yield name
+    client = MongoClient(BENCHMARK_URI)
+    client.drop_database(name)
+    client.drop_database(f"deleted__{name}")
+    client.close()
+
+
+@pytest.fixture
+def sync_collection(database_name):
+    client = MongoClient(BENCHMARK_URI)
+    collection = CollectionBaseClass(client, database_name, "plugin_meta", None)
+    collection.insert_many([{"plugin_id": str(index), "status": "pending"} for index in range(DOCUMENTS)])
+    yield collection
+    client.close()
+
+
+def test_batched_upsert_against_single_upserts(sync_collection, benchmark_report):
+    single = timed(
+        lambda: [
+            sync_collection.update_one({"plugin_id": str(index)}, {"status": "running"}, upsert=True)
+            for index in range(DOCUMENTS)
+        ]
+    )
+    bulk = timed(
+        sync_collection.upsert_many,
+        [{"plugin_id": str(index), "status": "stopped"} for index in range(DOCUMENTS * 2)],
+        key_fields=["plugin_id"],
+    )
+    benchmark_report("sync upsert via update_one per document", measurement(single, DOCUMENTS))
+    benchmark_report("sync upsert_many", measurement(bulk, DOCUMENTS * 2))
+    assert sync_collection.count_documents({"status": "stopped"}) == DOCUMENTS * 2
+
+
+def test_batched_delete_against_single_deletes(sync_collection, benchmark_report):
+    half = DOCUMENTS // 2
+    single = timed(lambda: [sync_collection.delete_one({"plugin_id": str(index)}) for index in range(half)])
+    bulk = timed(sync_collection.delete_documents, [{"plugin_id": str(index)} for index in range(half, DOCUMENTS)])
+    benchmark_report("sync soft delete_one per document", measurement(single, half))
+    benchmark_report("sync delete_documents", measurement(bulk, DOCUMENTS - half))
+    assert sync_collection.count_documents() == 0
+
+
+def test_sync_reads_against_concurrent_async_reads(sync_collection, database_name, benchmark_report):
+    sync_reads = timed(lambda: [sync_collection.find_one({"plugin_id": str(index)}) for index in range(DOCUMENTS)])
+
+    async def async_reads() -> tuple[float, list]:
+        client = AsyncIOMotorClient(BENCHMARK_URI)
+        collection = AsyncCollectionBaseClass(client, database_name, "plugin_meta", None)
+        started = time.perf_counter()
+        documents = await asyncio.gather(
+            *(collection.find_one({"plugin_id": str(index)}) for index in range(DOCUMENTS))
+        )
+        elapsed = time.perf_counter() - started
+        client.close()
+        return elapsed, documents
+
+    concurrent_reads, documents = asyncio.run(async_reads())
+    benchmark_report("sync find_one, sequential", measurement(sync_reads, DOCUMENTS))
+    benchmark_report("async find_one, concurrent", measurement(concurrent_reads, DOCUMENTS))
+    assert all(documents)
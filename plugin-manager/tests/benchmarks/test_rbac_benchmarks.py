@@ -0,0 +1,78 @@
+"""
+Per-request permission check overhead against a real Redis, with a Redis round trip on every request as before
+and with RBAC as configured, both with the default settings and keyspace notifications off, where permissions
+are not cached, and with notifications on, where they are.
+
+Run with:
+    RBAC_BENCHMARK_REDIS_URI=redis://localhost:6379/15 pytest tests/benchmarks/test_rbac_benchmarks.py
+
+The timings are listed in the terminal summary. They are reported, not asserted on, as they depend on the machine.
+"""
+
+import os
+import time
+import uuid
+from unittest.mock import patch
+
+import orjson as json
+import pytest
+import redis
+
+from scripts.config import CacheConf
+from scripts.utils import rbac
+from scripts.utils.rbac import RBAC
+
+BENCHMARK_URI = os.getenv("RBAC_BENCHMARK_REDIS_URI")
+REQUESTS = int(os.getenv("RBAC_BENCHMARK_REQUESTS", "2000"))
+
+pytestmark = pytest.mark.skipif(not BENCHMARK_URI, reason="set RBAC_BENCHMARK_REDIS_URI to run the RBAC benchmarks")
+
+
+def per_request(seconds: float) -> str:
+    return f"{seconds / REQUESTS * 1e6:.1f} us per request ({REQUESTS / seconds:.0f} checks/s)"
+
+
+@pytest.fixture(params=["unnotified", "notified"])
+def redis_client(request):
+    client = redis.Redis.from_url(BENCHMARK_URI, decode_responses=True)
+    project_id = f"project_{uuid.uuid4().hex[:8]}"
+    r_key = f"{project_id}__user_role_100"
+    client.hset(r_key, mapping={"developerPlugins": json.dumps({"view": True, "edit": True}).decode()})
+    rbac.permission_cache.clear()
+    # What reset_permission_cache picks with keyspace notifications off, the Redis default, or on
+    rbac.permission_cache.ttl_seconds = (
+        CacheConf.PERMISSION_CACHE_TTL_SECONDS
+        if request.param == "notified"
+        else CacheConf.PERMISSION_CACHE_UNNOTIFIED_TTL_SECONDS
+    )
+    with (
+        patch.object(rbac, "user_role_permissions_redis", client),
+        patch.object(rbac.permission_listener, "start"),
+        patch.object(rbac, "get_user_role_id_projects", return_value="user_role_100"),
+    ):
+        yield client, project_id, r_key, request.param
+    rbac.permission_cache.ttl_seconds = CacheConf.PERMISSION_CACHE_UNNOTIFIED_TTL_SECONDS
+    client.delete(r_key)
+    client.close()
+
+
+def test_permission_checks_against_a_redis_round_trip_per_request(redis_client, benchmark_report):
+    client, project_id, r_key, mode = redis_client
+    checker = RBAC(entity_name="developerPlugins", operation=["view", "edit"])
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        # What every request did before: one hget and a parse of the role's record
+        record = json.loads(client.hget(r_key, "developerPlugins"))
+        assert {operation: True for operation in checker.operation if record.get(operation)}
+    round_trip = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        assert checker.check_permissions(user_id="user_1", project_id=project_id)
+    checked = time.perf_counter() - started
+
+    benchmark_report(f"hget per request ({mode})", per_request(round_trip))
+    benchmark_report(
+        f"RBAC.check_permissions ({mode}, TTL {rbac.permission_cache.ttl_seconds:g}s)", per_request(checked)
+    )
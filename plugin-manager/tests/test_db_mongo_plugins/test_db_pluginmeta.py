@@ -1,7 +1,8 @@
 import pytest
-from unittest.mock import patch, MagicMock
-from scripts.db.mongo.plugins.plugin_meta import PluginMeta
+from unittest.mock import AsyncMock, patch, MagicMock
+from scripts.db.mongo.plugins.plugin_meta import AsyncPluginMeta, PluginMeta, unfiltered_grid_counts
 from scripts.db.schemas import PluginMetaDBSchema
+from scripts.services.v1.schemas import PluginListRequest
 
 PLUGIN_ID = "test_plugin_id"
 PLUGIN_ID_1 = "test_plugin_id_1"
@@ -47,12 +48,23 @@ def test_create_plugin(plugin_meta_instance):
 
 
 def test_update_plugin(plugin_meta_instance):
-    with patch.object(plugin_meta_instance, "update_one") as mock_update_one:
-        mock_update_one.return_value.modified_count = 1
-        data = {"status": "inactive"}
-        plugin_meta_instance.update_plugin(PLUGIN_ID, data)
-        mock_update_one.assert_called_once_with(query={"plugin_id": PLUGIN_ID}, data=data)
-        assert mock_update_one.return_value.modified_count == 1
+    collection = plugin_meta_instance.client[plugin_meta_instance.database][plugin_meta_instance.collection]
+    collection.update_one.return_value.modified_count = 1
+    data = {"status": "inactive", "revision": 0}
+    assert plugin_meta_instance.update_plugin(PLUGIN_ID, data) == 1
+    collection.update_one.assert_called_once_with(
+        {"plugin_id": PLUGIN_ID}, {"$inc": {"revision": 1}, "$set": {"status": "inactive"}}
+    )
+
+
+def test_apply_changes_is_guarded_by_revision(plugin_meta_instance):
+    collection = plugin_meta_instance.client[plugin_meta_instance.database][plugin_meta_instance.collection]
+    collection.update_one.return_value.matched_count = 0
+    assert not plugin_meta_instance.apply_changes(PLUGIN_ID, {"status": STATUS_RUNNING}, revision=3, version=1.0)
+    collection.update_one.assert_called_once_with(
+        {"plugin_id": PLUGIN_ID, "revision": 3, "version": 1.0},
+        {"$set": {"status": STATUS_RUNNING}, "$inc": {"revision": 1}},
+    )
 
 
 def test_get_errors(plugin_meta_instance):
@@ -73,6 +85,26 @@ def test_delete_plugin(plugin_meta_instance):
         mock_delete_many.assert_called_once_with({"plugin_id": PLUGIN_ID})
 
 
+def test_delete_plugins_in_one_bulk_delete(plugin_meta_instance):
+    with patch.object(
+        plugin_meta_instance, "delete_documents", return_value=MagicMock(deleted_count=3)
+    ) as mock_delete_documents:
+        assert plugin_meta_instance.delete_plugins([PLUGIN_ID_1, PLUGIN_ID_2]) == 3
+        mock_delete_documents.assert_called_once_with([{"plugin_id": PLUGIN_ID_1}, {"plugin_id": PLUGIN_ID_2}])
+
+
+async def test_async_get_errors():
+    with patch("scripts.db.mongo.plugins.plugin_meta.mongo_obj"):
+        async_plugin_meta = AsyncPluginMeta()
+    with patch.object(
+        async_plugin_meta, "find_one", AsyncMock(return_value={"errors": ERROR_MESSAGE, "plugin_id": PLUGIN_ID})
+    ) as mock_find_one:
+        assert await async_plugin_meta.get_errors(PLUGIN_ID) == {"errors": ERROR_MESSAGE, "plugin_id": PLUGIN_ID}
+        mock_find_one.assert_awaited_once_with(
+            query={"plugin_id": PLUGIN_ID}, filter_dict={"_id": 0, "errors": 1, "plugin_id": 1}
+        )
+
+
 def test_get_all_count(plugin_meta_instance):
     with patch.object(plugin_meta_instance, "count_documents", return_value=10) as mock_count_documents:
         filters = {"status": STATUS_RUNNING}
@@ -89,3 +121,38 @@ def test_get_plugins_dict(plugin_meta_instance):
         assert PLUGIN_ID_1 in plugins_dict
         assert PLUGIN_ID_2 in plugins_dict
         mock_find.assert_called_once_with(query={"plugin_id": {"$in": plugin_id_list}, "status": STATUS_RUNNING})
+
+
+def test_list_plugin_ag_grid_returns_page_and_count_in_one_aggregation(plugin_meta_instance):
+    list_request = PluginListRequest(
+        tz="UTC", filters={"filterModel": {"name": {"filterType": "text", "type": "contains", "filter": "test"}}}
+    )
+    rows = [{"plugin_id": PLUGIN_ID, "name": "Test Plugin"}]
+    with (
+        patch.object(plugin_meta_instance, "index_information", return_value={}),
+        patch.object(
+            plugin_meta_instance, "aggregate", return_value=iter([{"rows": rows, "count": [{"count": 7}]}])
+        ) as mock_aggregate,
+    ):
+        assert plugin_meta_instance.list_plugin_ag_grid(list_request) == (rows, 7)
+    mock_aggregate.assert_called_once()
+    pipeline = mock_aggregate.call_args.args[0]
+    assert {"$match": {"name": {"$regex": "test", "$options": "i"}}} in pipeline
+    assert set(pipeline[-1]["$facet"]) == {"rows", "count"}
+
+
+def test_list_plugin_ag_grid_reuses_the_unfiltered_count(plugin_meta_instance):
+    list_request = PluginListRequest(tz="UTC")
+    unfiltered_grid_counts.invalidate(plugin_meta_instance.database)
+    with (
+        patch.object(plugin_meta_instance, "index_information", return_value={}),
+        patch.object(plugin_meta_instance, "aggregate") as mock_aggregate,
+    ):
+        mock_aggregate.return_value = iter([{"rows": [], "count": [{"count": 3}]}])
+        assert plugin_meta_instance.list_plugin_ag_grid(list_request) == ([], 3)
+        mock_aggregate.return_value = iter([])
+        assert plugin_meta_instance.list_plugin_ag_grid(list_request) == ([], 3)
+        assert "$facet" not in mock_aggregate.call_args.args[0][-1]
+    with patch.object(plugin_meta_instance, "delete_many", return_value=MagicMock(deleted_count=1)):
+        plugin_meta_instance.delete_plugin(PLUGIN_ID)
+    assert unfiltered_grid_counts.get((plugin_meta_instance.database, False)) is None
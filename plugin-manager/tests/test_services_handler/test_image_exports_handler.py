@@ -0,0 +1,116 @@
+import copy
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts.db.mongo.plugins.image_export_jobs import ACTIVE_JOB_STATUSES, FINISHED_ITEM_STATUSES
+from scripts.errors import ImageExportError
+from scripts.services.v1.handler import image_exports
+from scripts.services.v1.handler.image_exports import ImageExportHandler
+from scripts.services.v1.schemas import PluginDownloadRequest
+
+PLUGIN_ID = "test_plugin_id"
+
+
+class InMemoryImageExportJobs:
+    def __init__(self, project_id=None):
+        self.jobs = {}
+
+    def create_job(self, job):
+        self.jobs[job["job_id"]] = copy.deepcopy(job)
+
+    def fetch_job(self, job_id):
+        return copy.deepcopy(self.jobs.get(job_id))
+
+    def set_status(self, job_id, status, from_statuses=None):
+        job = self.jobs.get(job_id)
+        if not job or job["status"] not in (from_statuses or ACTIVE_JOB_STATUSES):
+            return False
+        job["status"] = status
+        return True
+
+    def update_item(self, job_id, index, data):
+        job = self.jobs.get(job_id)
+        if job["status"] not in ACTIVE_JOB_STATUSES or job["items"][index]["status"] in FINISHED_ITEM_STATUSES:
+            return False
+        job["items"][index].update(data)
+        return True
+
+    def cancel_items(self, job_id):
+        for item in self.jobs[job_id]["items"]:
+            if item["status"] not in FINISHED_ITEM_STATUSES:
+                item["status"] = "cancelled"
+
+
+@pytest.fixture
+def handler(tmp_path):
+    with (
+        patch("scripts.services.v1.handler.image_exports.PluginMeta"),
+        patch("scripts.services.v1.handler.image_exports.ImageExportJobs", InMemoryImageExportJobs),
+    ):
+        handler = ImageExportHandler(project_id="test_project")
+    handler.plugin_db_conn.fetch_plugin.return_value = MagicMock(
+        plugin_id=PLUGIN_ID,
+        version=1.0,
+        plugin_type="microservice",
+        additional_fields=[{"label": "Docker Image", "value": "registry/plugin:1.0"}],
+    )
+    handler.plugin_db_conn.fetch_plugin.return_value.name = "plugin"
+    with (
+        patch.object(image_exports.PathConf, "LOCAL_IMAGE_PATH", tmp_path),
+        patch("scripts.services.v1.handler.image_exports.DockerUtil") as docker_util,
+        patch("scripts.services.v1.handler.image_exports.PluginHandler") as plugin_handler,
+    ):
+        docker_util.return_value.registry_digest.return_value = "sha256:digest"
+        handler.notifications = plugin_handler.send_notification
+        yield handler
+
+
+def test_existing_artifact_is_reused(handler, tmp_path):
+    job = handler.create_job(PluginDownloadRequest(plugin_ids=[PLUGIN_ID]), MagicMock(user_id="test_user"))
+    key = image_exports.export_key("sha256:digest", "plugin", {})
+    artifact = handler.artifact_path(key)
+    artifact.parent.mkdir(parents=True)
+    artifact.write_bytes(b"archive")
+    with patch.object(image_exports.export_pool, "submit") as submit:
+        handler.run_job(job["job_id"], MagicMock(user_id="test_user"))
+    submit.assert_not_called()
+    stored = handler.get_job(job["job_id"])
+    assert stored["status"] == "completed"
+    assert stored["items"][0]["reused"] is True
+    assert (tmp_path / "plugin.zip").read_bytes() == b"archive"
+    handler.notifications.assert_called_once()
+
+
+def test_cancel_unsubscribes_running_exports(handler):
+    job = handler.create_job(PluginDownloadRequest(plugin_ids=[PLUGIN_ID]), MagicMock(user_id="test_user"))
+    with patch.object(image_exports.export_pool, "submit", return_value=False):
+        handler.run_job(job["job_id"], MagicMock(user_id="test_user"))
+    assert handler.get_job(job["job_id"])["items"][0]["status"] == "running"
+    with patch.object(image_exports.export_pool, "cancel") as cancel:
+        handler.cancel_job(job["job_id"])
+    key = image_exports.export_key("sha256:digest", "plugin", {})
+    cancel.assert_called_once_with(key, f"{job['job_id']}:0")
+    stored = handler.get_job(job["job_id"])
+    assert stored["status"] == "cancelled"
+    assert stored["items"][0]["status"] == "cancelled"
+    with pytest.raises(ImageExportError, match="is cancelled"):
+        handler.cancel_job(job["job_id"])
+
+
+def test_expired_artifacts_and_abandoned_partial_files_are_removed(handler, tmp_path):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    expired = time.time() - image_exports.DownloadDockerImage.EXPORT_ARTIFACT_TTL_SECONDS - 60
+    for name in ("old.zip", "old.zip.123-abcd1234.part", "fresh.zip", "fresh.zip.456-abcd1234.part"):
+        (exports / name).write_bytes(b"archive")
+        if name.startswith("old"):
+            os.utime(exports / name, (expired, expired))
+    handler.remove_expired_artifacts()
+    assert sorted(path.name for path in exports.iterdir()) == ["fresh.zip", "fresh.zip.456-abcd1234.part"]
+
+    handler.publish(exports / "fresh.zip", tmp_path / "plugin.zip")
+    assert (tmp_path / "plugin.zip").read_bytes() == b"archive"
+    assert list(tmp_path.glob("*.part")) == []
@@ -3,7 +3,7 @@ from unittest.mock import MagicMock
 from fastapi import BackgroundTasks
 from ut_security_util import MetaInfoSchema
 
-from scripts.errors import PluginAlreadyExistError
+from scripts.errors import PluginAlreadyExistError, PluginNotFoundError
 from scripts.services.v1.handler.plugins import PluginHandler
 from scripts.db.schemas import PluginFetchResponse, PluginMetaDBSchema
 from scripts.services.v1.schemas import PluginListRequest, Plugin, AdvanceConfig
@@ -118,8 +118,7 @@ def test_get_plugin_security_check(plugin_handler):
 
 def test_plugin_coverage_listing(plugin_handler):
     list_request = PluginListRequest(records=10, tz="UTC")
-    plugin_handler.plugin_db_conn.list_plugin_ag_grid = MagicMock(return_value=[])
-    plugin_handler.plugin_db_conn.get_counts_ag_grid = MagicMock(return_value=0)
+    plugin_handler.plugin_db_conn.list_plugin_ag_grid = MagicMock(return_value=([], 0))
     result = plugin_handler.list_plugins(list_request)
     assert result["bodyContent"] == []
     assert result["total_no"] == 0
@@ -139,6 +138,22 @@ def test_plugin_coverage_deletion(plugin_handler):
     plugin_handler.plugin_db_conn.delete_plugin.assert_called_once_with(plugin_id=plugin_id)
 
 
+def test_delete_plugins_checks_all_of_them_before_deleting(plugin_handler):
+    user_details = MetaInfoSchema(project_id="project_139")
+    plugin_handler.plugin_db_conn.fetch_plugin = MagicMock(side_effect=[create_plugin_db_data(), None])
+    plugin_handler.plugin_db_conn.delete_plugins = MagicMock()
+    with pytest.raises(PluginNotFoundError):
+        plugin_handler.delete_plugins(["plugin_1", "plugin_2"], user_details, BackgroundTasks())
+    plugin_handler.plugin_db_conn.delete_plugins.assert_not_called()
+
+    plugin_handler.plugin_db_conn.fetch_plugin = MagicMock(return_value=create_plugin_db_data())
+    plugin_handler.widget_plugins.remove_widget_plugin = MagicMock()
+    plugin_handler.custom_app_db_conn.remove_custom_app_plugin = MagicMock()
+    plugin_handler.formio_component_db_conn.remove_formio_component_plugin = MagicMock()
+    plugin_handler.delete_plugins(["plugin_1", "plugin_2", "plugin_1"], user_details, BackgroundTasks())
+    plugin_handler.plugin_db_conn.delete_plugins.assert_called_once_with(plugin_ids=["plugin_1", "plugin_2"])
+
+
 def test_create_plugin(plugin_handler, bg_task, rbac_permissions):
     plugin_data = create_plugin_data()
     plugin_handler._name_validation = MagicMock(return_value=False)
@@ -161,3 +176,48 @@ def test_get_plugin_logs(plugin_handler):
     logs = plugin_handler.get_plugin_logs(plugin_id)
     assert logs is not None
     assert isinstance(logs, str)
+
+
+def test_data_formatter_resolves_page_in_one_fetch(plugin_handler):
+    plugin_handler.plugin_db_conn.fetch_listing_states = MagicMock(
+        return_value=[
+            {
+                "plugin_id": "p1",
+                "version": "1.0",
+                "status": "Deployed",
+                "deployment_status": "running",
+                "plugin_type": "widget",
+                "current_version": "1.0",
+            },
+            {
+                "plugin_id": "p2",
+                "version": "2.0",
+                "status": "Scanning",
+                "deployment_status": "scanning",
+                "plugin_type": "custom_app",
+            },
+        ]
+    )
+    plugin_handler.plugin_db_conn.find_one = MagicMock()
+    rows = [
+        {
+            "plugin_id": "p1",
+            "version": "1.0",
+            "plugin_type": "widget",
+            "deployment_status": "running",
+            "deployed_on": "01/01/2024 10:00:00",
+        },
+        {
+            "plugin_id": "p2",
+            "version": "2.0",
+            "plugin_type": "custom_app",
+            "deployment_status": "scanning",
+            "deployed_on": None,
+        },
+    ]
+    result = plugin_handler.data_formatter(rows)
+    plugin_handler.plugin_db_conn.fetch_listing_states.assert_called_once_with(["p1", "p2"])
+    plugin_handler.plugin_db_conn.find_one.assert_not_called()
+    assert result[0]["disabledActions"] == ["start"]
+    assert result[1]["plugin_status"] == "Scanning"
+    assert result[1]["disabledActions"] == ["artifact_download", "start", "pause"]
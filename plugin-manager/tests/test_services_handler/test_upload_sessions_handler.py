@@ -0,0 +1,152 @@
+import copy
+import hashlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts.config import MinioSettings
+from scripts.errors import UploadSessionError
+from scripts.services.v1.handler.upload_sessions import UploadSessionHandler
+from scripts.services.v1.schemas import UploadSessionCreate
+
+PLUGIN_ID = "test_plugin_id"
+CHUNK_SIZE = 5 * 1024 * 1024
+
+
+class InMemoryUploadSessions:
+    def __init__(self):
+        self.sessions = {}
+
+    def create_session(self, session):
+        self.sessions[session["session_id"]] = copy.deepcopy(session)
+
+    def fetch_session(self, session_id):
+        return copy.deepcopy(self.sessions.get(session_id))
+
+    def record_chunk(self, session_id, index, chunk):
+        session = self.sessions.get(session_id)
+        if not session or session["status"] != "open":
+            return False
+        session["chunks"][str(index)] = chunk
+        return True
+
+    def set_status(self, session_id, status, from_status="open"):
+        session = self.sessions.get(session_id)
+        if not session or session["status"] != from_status:
+            return False
+        session["status"] = status
+        return True
+
+
+@pytest.fixture
+def handler():
+    with (
+        patch("scripts.services.v1.handler.upload_sessions.PluginMeta"),
+        patch("scripts.services.v1.handler.upload_sessions.UploadSessions"),
+        patch("scripts.services.v1.handler.upload_sessions.get_minio_utility"),
+    ):
+        handler = UploadSessionHandler(project_id="test_project")
+    handler.plugin_db_conn.fetch_plugin.return_value = MagicMock(plugin_type="widget")
+    handler.sessions = InMemoryUploadSessions()
+    handler.minio.put_bytes.side_effect = lambda bucket, name, data: hashlib.md5(data).hexdigest()
+    return handler
+
+
+def start_session(handler, total_chunks=3):
+    request = UploadSessionCreate(
+        plugin_id=PLUGIN_ID, file_name="bundle.zip", total_chunks=total_chunks, chunk_size=CHUNK_SIZE
+    )
+    return handler.create_session(request, MagicMock(user_id="test_user"))["session_id"]
+
+
+def test_chunks_are_accepted_out_of_order_and_missing_ones_reported(handler):
+    session_id = start_session(handler)
+    handler.save_chunk(session_id, 2, b"c" * 10)
+    handler.save_chunk(session_id, 0, b"a" * CHUNK_SIZE)
+    status = handler.get_status(session_id)
+    assert status["missing_chunks"] == [1]
+    assert status["received_bytes"] == CHUNK_SIZE + 10
+    with pytest.raises(UploadSessionError, match="missing chunks \\[1\\]"):
+        handler.complete_session(session_id)
+
+
+def test_chunk_with_wrong_checksum_is_rejected(handler):
+    session_id = start_session(handler)
+    with pytest.raises(UploadSessionError, match="Checksum mismatch"):
+        handler.save_chunk(session_id, 0, b"a" * CHUNK_SIZE, checksum="0" * 64)
+    handler.minio.put_bytes.assert_not_called()
+    assert handler.get_status(session_id)["missing_chunks"] == [0, 1, 2]
+
+
+def test_short_chunk_is_only_accepted_last(handler):
+    session_id = start_session(handler)
+    with pytest.raises(UploadSessionError, match="expected"):
+        handler.save_chunk(session_id, 1, b"b" * 10)
+
+
+def test_complete_composes_chunks_in_index_order(handler):
+    session_id = start_session(handler, total_chunks=2)
+    handler.save_chunk(session_id, 1, b"b", checksum=hashlib.sha256(b"b").hexdigest())
+    handler.save_chunk(session_id, 0, b"a" * CHUNK_SIZE)
+    handler.complete_session(session_id)
+    bucket, object_name, sources = handler.minio.compose_object.call_args.args
+    assert object_name == f"uploads/{PLUGIN_ID}/zip/bundle.zip"
+    chunks = handler.sessions.sessions[session_id]["chunks"]
+    assert [source.object_name for source in sources] == [chunks["0"]["object_name"], chunks["1"]["object_name"]]
+    assert handler.sessions.sessions[session_id]["status"] == "completed"
+    handler.plugin_db_conn.update_plugin.assert_called_once_with(
+        plugin_id=PLUGIN_ID, data={"minio_file_path": object_name}
+    )
+    handler.minio.delete_objects.assert_called_once()
+
+
+def test_failed_compose_reopens_the_session(handler):
+    session_id = start_session(handler, total_chunks=1)
+    handler.save_chunk(session_id, 0, b"a")
+    handler.minio.compose_object.side_effect = Exception("part too small")
+    with pytest.raises(Exception, match="part too small"):
+        handler.complete_session(session_id)
+    assert handler.sessions.sessions[session_id]["status"] == "open"
+
+
+def test_resent_chunk_replaces_the_previous_object(handler):
+    session_id = start_session(handler, total_chunks=1)
+    handler.save_chunk(session_id, 0, b"a")
+    first = handler.sessions.sessions[session_id]["chunks"]["0"]["object_name"]
+    handler.save_chunk(session_id, 0, b"b")
+    second = handler.sessions.sessions[session_id]["chunks"]["0"]["object_name"]
+    assert second != first
+    handler.minio.delete_objects.assert_called_once_with(MinioSettings.MINIO_BUCKET_NAME, [first])
+
+
+def test_chunk_is_not_written_once_the_session_completes(handler):
+    session_id = start_session(handler, total_chunks=1)
+    fetch_session = handler.sessions.fetch_session
+
+    def completing_after_the_first_fetch(fetched_id):
+        session = fetch_session(fetched_id)
+        handler.sessions.sessions[fetched_id]["status"] = "completing"
+        return session
+
+    handler.sessions.fetch_session = completing_after_the_first_fetch
+    with pytest.raises(UploadSessionError, match="is completing"):
+        handler.save_chunk(session_id, 0, b"a")
+    handler.minio.put_bytes.assert_not_called()
+
+
+def test_chunk_written_while_completing_is_deleted_again(handler):
+    session_id = start_session(handler, total_chunks=1)
+    handler.save_chunk(session_id, 0, b"a")
+    pinned = handler.sessions.sessions[session_id]["chunks"]["0"]["object_name"]
+
+    def put_bytes(bucket, name, data):
+        handler.sessions.set_status(session_id, "completing")
+        return hashlib.md5(data).hexdigest()
+
+    handler.minio.put_bytes.side_effect = put_bytes
+    with pytest.raises(UploadSessionError, match="no longer accepting chunks"):
+        handler.save_chunk(session_id, 0, b"a")
+    written = handler.minio.put_bytes.call_args.args[1]
+    assert written != pinned
+    handler.minio.delete_objects.assert_called_once_with(MinioSettings.MINIO_BUCKET_NAME, [written])
+    assert handler.sessions.sessions[session_id]["chunks"]["0"]["object_name"] == pinned
@@ -1,8 +1,15 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from scripts.services.v1.handler.deployment import DeploymentHandler
-from scripts.errors import PluginNotFoundError, AlreadyDeployedError
+from scripts.errors import (
+    PluginNotFoundError,
+    PluginWriteConflict,
+    AlreadyDeployedError,
+    AntiVirusScanFailed,
+    VulnerabilityScanFailed,
+)
 from scripts.services.v1.schemas import DeployPlugin as DeployPluginInputData
+from scripts.utils.scan_orchestrator import ScanOrchestrator, ScanOutcome
 
 # Define reusable test variables
 TEST_USER = "test_user"
@@ -73,3 +80,78 @@ def test_deploy_plugin_already_deployed(deployment_handler):
 
     with pytest.raises(AlreadyDeployedError):
         deployment_handler.deploy_plugin(plugin_data, user_details, MagicMock())
+
+
+def test_scan_plugin_source_applies_both_verdicts_before_raising(deployment_handler, tmp_path):
+    plugin_data = MagicMock(plugin_type="microservice", plugin_id=TEST_PLUGIN_ID, errors=[])
+    deployment_handler.scan_orchestrator = ScanOrchestrator()
+    clean_report = {"code_smells": {"total": 0}, "vulnerabilities": {"total": 0}, "bug": {"total": 0}}
+    with (
+        patch.object(deployment_handler, "_run_antivirus_scan", side_effect=AntiVirusScanFailed("report missing")),
+        patch.object(deployment_handler, "_run_sonarqube_scan", return_value=clean_report),
+    ):
+        with pytest.raises(AntiVirusScanFailed):
+            deployment_handler.scan_plugin_source(plugin_data, tmp_path)
+    assert plugin_data.security_checks.antivirus is False
+    assert plugin_data.security_checks.sonarqube is True
+
+
+def test_vulnerability_scan_timeout_fails_the_deployment(deployment_handler):
+    plugin_data = MagicMock(plugin_id=TEST_PLUGIN_ID, errors=[])
+    deployment_handler.scan_orchestrator = MagicMock()
+    deployment_handler.scan_orchestrator.run.return_value = {"trivy": ScanOutcome(status="timeout")}
+    with patch("scripts.services.v1.handler.deployment.VulnerabilityScanner.VULNERABILITY_SCAN", True):
+        with pytest.raises(VulnerabilityScanFailed):
+            deployment_handler.perform_vulnerability_scan(plugin_data, "registry/plugin:1.0")
+    assert plugin_data.deployment_status == "failed"
+    assert plugin_data.security_checks.vulnerabilities is False
+    update = deployment_handler.plugin_db_conn.update_plugin.call_args.args[1]
+    assert update["status"] == "Vulnerability Scan Failed"
+    # The trivy container is stopped when the scan times out
+    deployment_handler.scan_orchestrator.run.call_args.kwargs["cancellations"]["trivy"]()
+    deployment_handler.docker.stop_container.assert_called_once()
+
+
+@pytest.mark.parametrize(("replicas", "deployment_status"), [(2, "running"), (0, "stopped")])
+def test_plugin_switch_records_the_settled_state(deployment_handler, replicas, deployment_status):
+    deployment_handler.apply_plugin_switch_status(TEST_PLUGIN_ID, 1.0, {"status": "in_progress"})
+    deployment_handler.plugin_db_conn.update_plugin.assert_not_called()
+    deployment_handler.apply_plugin_switch_status(TEST_PLUGIN_ID, 1.0, {"status": "completed", "replicas": replicas})
+    deployment_handler.plugin_db_conn.update_plugin.assert_called_once_with(
+        plugin_id=TEST_PLUGIN_ID, data={"deployment_status": deployment_status}, version=1.0
+    )
+
+
+@pytest.mark.parametrize(
+    ("flush_error", "registration_error", "outcome"),
+    [
+        (PluginWriteConflict("conflict"), None, {"deployment_status": "deploying", "errors": []}),
+        (
+            PluginNotFoundError("deleted"),
+            ValueError("bad manifest"),
+            {"deployment_status": "failed", "errors": ["bad manifest"], "status": "Deployment Failed"},
+        ),
+    ],
+)
+def test_register_outcome_is_written_when_the_stage_flush_fails(
+    deployment_handler, flush_error, registration_error, outcome
+):
+    plugin_data = MagicMock(
+        plugin_id=TEST_PLUGIN_ID,
+        version=1.0,
+        plugin_type="microservice",
+        registration_type="project_upload",
+        portal=True,
+    )
+    write_buffer = MagicMock()
+    write_buffer.flush.side_effect = flush_error
+    deployment_handler.create_project_upload_plugin = MagicMock(
+        side_effect=registration_error, return_value=plugin_data
+    )
+    with patch("scripts.services.v1.handler.deployment.push_notification"):
+        deployment_handler.deploy_and_register(plugin_data, MagicMock(user_id=TEST_USER_ID), write_buffer=write_buffer)
+    write_buffer.flush.assert_called_once_with("register")
+    deployment_handler.plugin_db_conn.update_plugin.assert_called_once_with(
+        plugin_id=TEST_PLUGIN_ID, data=outcome, version=1.0
+    )
+    assert deployment_handler._write_buffer is None
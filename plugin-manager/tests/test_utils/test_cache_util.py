@@ -0,0 +1,178 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts.config import Databases
+from scripts.db.mongo.plugins.plugin_meta import PluginMeta
+from scripts.utils import db_name_util
+from scripts.utils.cache_util import CacheInvalidationListener, TTLCache, keyspace_events_enabled
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakePubSub:
+    """Hands out the queued messages, then reports nothing until the listener stops"""
+
+    def __init__(self, messages, delivered: threading.Event):
+        self.messages = list(messages)
+        self.delivered = delivered
+        self.channels = []
+        self.patterns = []
+        self.closed = False
+
+    def subscribe(self, *channels):
+        self.channels.extend(channels)
+
+    def psubscribe(self, *patterns):
+        self.patterns.extend(patterns)
+
+    def get_message(self, timeout=None):
+        if self.messages:
+            return self.messages.pop(0)
+        self.delivered.set()
+        threading.Event().wait(0.01)
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self, messages):
+        self.delivered = threading.Event()
+        self.pubsub_instance = FakePubSub(messages, self.delivered)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self.pubsub_instance
+
+
+@pytest.fixture
+def clock():
+    fake_clock = FakeClock()
+    with patch("scripts.utils.cache_util.time.monotonic", fake_clock):
+        yield fake_clock
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used(clock):
+    cache = TTLCache("test", maxsize=2, ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    clock.now += 10
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "size": 1,
+        "maxsize": 2,
+        "ttl_seconds": 10,
+        "hits": 1,
+        "misses": 2,
+        "hit_ratio": 0.3333,
+        "evictions": 1,
+        "invalidations": 0,
+    }
+
+
+def test_get_or_load_caches_values_but_not_errors(clock):
+    cache = TTLCache("test", maxsize=10, ttl_seconds=10)
+    loads = []
+
+    def failing_loader():
+        loads.append("failed")
+        raise ValueError("unknown project")
+
+    with pytest.raises(ValueError):
+        cache.get_or_load("project", failing_loader)
+    assert cache.get_or_load("project", lambda: loads.append("loaded") or None) is None
+    assert cache.get_or_load("project", lambda: loads.append("loaded again")) is None
+    assert loads == ["failed", "loaded"]
+
+
+def test_invalidation_during_a_load_is_not_overwritten(clock):
+    cache = TTLCache("test", maxsize=10, ttl_seconds=10)
+
+    def stale_loader():
+        # The source changes and its invalidation arrives while the old value is still being read
+        cache.invalidate("role")
+        return "revoked permission"
+
+    assert cache.get_or_load("role", stale_loader) == "revoked permission"
+    assert cache.get_or_load("role", lambda: "current permission") == "current permission"
+    assert cache.get("role") == "current permission"
+
+
+def test_keyspace_events_need_the_keyspace_flag_and_the_event_types():
+    redis_client = MagicMock()
+    for flags, enabled in (("", False), ("Egh", False), ("Kh", False), ("Kgh", True), ("KA", True)):
+        redis_client.config_get.return_value = {"notify-keyspace-events": flags}
+        assert keyspace_events_enabled(redis_client, "gh") is enabled
+    redis_client.config_get.side_effect = Exception("unknown command 'CONFIG'")
+    assert keyspace_events_enabled(redis_client, "gh") is False
+
+
+def test_listener_dispatches_channel_and_keyspace_messages():
+    cache = TTLCache("test", maxsize=10, ttl_seconds=60)
+    for key in ("project_1", "project_2", "project_3"):
+        cache.set(key, key)
+    redis_client = FakeRedis(
+        [
+            {"type": "message", "channel": "updates", "pattern": None, "data": "project_1"},
+            {"type": "pmessage", "channel": "__keyspace@18__:project_2", "pattern": "__keyspace@18__:*", "data": "set"},
+        ]
+    )
+    listener = CacheInvalidationListener(redis_client, reconnect_seconds=0)
+    listener.subscribe("updates", cache.invalidate)
+    listener.subscribe("__keyspace@18__:*", cache.invalidate, pattern=True)
+    resets = []
+    listener.on_reset(lambda: resets.append(True))
+
+    listener.start()
+    try:
+        assert redis_client.delivered.wait(5)
+    finally:
+        listener.stop()
+
+    assert resets == [True]
+    assert redis_client.pubsub_instance.channels == ["updates"]
+    assert redis_client.pubsub_instance.patterns == ["__keyspace@18__:*"]
+    assert redis_client.pubsub_instance.closed
+    assert cache.get("project_1") is None
+    assert cache.get("project_2") is None
+    assert cache.get("project_3") == "project_3"
+
+
+def test_get_db_name_is_cached_until_the_project_changes():
+    db_name_util.db_prefix_cache.clear()
+    with (
+        patch.object(db_name_util.project_details_listener, "start"),
+        patch.object(db_name_util, "check_prefix_condition", return_value=(True, {})) as mock_check,
+    ):
+        assert PluginMeta(project_id="project_100").database.startswith("project_100__")
+        assert db_name_util.get_db_name("project_100", "other_db") == "project_100__other_db"
+        assert mock_check.call_count == 1
+
+        pattern = f"__keyspace@{Databases.REDIS_PROJECT_DB}__:*"
+        db_name_util.project_details_listener.dispatch(
+            {"type": "pmessage", "pattern": pattern, "channel": pattern.replace("*", "project_100"), "data": "set"}
+        )
+        mock_check.return_value = (False, {})
+        assert db_name_util.get_db_name("project_100", "ilens_plugin") == "ilens_plugin"
+        assert mock_check.call_count == 2
+
+
+def test_db_prefix_cache_reset_warns_without_keyspace_notifications(caplog):
+    db_name_util.db_prefix_cache.set("project_100", "project_100")
+    with patch.object(db_name_util, "keyspace_events_enabled", return_value=False):
+        db_name_util.reset_db_prefix_cache()
+
+    assert db_name_util.db_prefix_cache.get("project_100") is None
+    assert "DB_NAME_CACHE_TTL_SECONDS" in caplog.text
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from scripts.utils.deployment_tracker import DeploymentStatusTracker
+
+
+class ScriptedTracker(DeploymentStatusTracker):
+    def __init__(self, responses, **kwargs):
+        super().__init__(watch_url="http://dynamic-proxies/deployment-status/watch", **kwargs)
+        self.responses = list(responses)
+        self.requests = []
+
+    async def _watch_status(self, deployment, last_status, wait):
+        self.requests.append((deployment, last_status))
+        response = self.responses.pop(0) if self.responses else {"status": last_status}
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def tracker_factory():
+    trackers = []
+
+    def factory(responses, **kwargs):
+        tracker = ScriptedTracker(responses, **kwargs)
+        trackers.append(tracker)
+        return tracker
+
+    yield factory
+    for tracker in trackers:
+        tracker.shutdown()
+
+
+def test_track_reports_each_transition_and_stops_when_settled(tracker_factory):
+    tracker = tracker_factory([{"status": "in_progress"}, {"status": "in_progress"}, {"status": "completed"}])
+    transitions = []
+    final = tracker.track("app-id1", on_transition=lambda entry: transitions.append(entry["status"]), timeout=5)
+    assert final.result(timeout=5) == {"status": "completed"}
+    assert transitions == ["in_progress", "completed"]
+    assert tracker.requests == [("app-id1", None), ("app-id1", "in_progress"), ("app-id1", "in_progress")]
+
+
+def test_track_does_not_hold_the_calling_thread(tracker_factory):
+    release = threading.Event()
+    tracker = tracker_factory([{"status": "completed"}])
+    final = tracker.track("app-id1", on_transition=lambda entry: release.wait(5), timeout=5)
+    assert not final.done()
+    release.set()
+    assert final.result(timeout=5)["status"] == "completed"
+
+
+def test_track_retries_after_watch_failure(tracker_factory):
+    tracker = tracker_factory([ConnectionError("refused"), {"status": "error", "pods": []}], retry_seconds=0)
+    transitions = []
+    final = tracker.track("app-id1", on_transition=lambda entry: transitions.append(entry["status"]), timeout=5)
+    assert final.result(timeout=5)["status"] == "error"
+    assert transitions == ["error"]
+
+
+def test_track_gives_up_after_timeout(tracker_factory):
+    tracker = tracker_factory([{"status": "in_progress"}], watch_seconds=0.01)
+    timed_out = threading.Event()
+    final = tracker.track("app-id1", on_transition=lambda entry: None, timeout=0.1, on_timeout=timed_out.set)
+    assert final.result(timeout=5) is None
+    assert timed_out.is_set()
+
+
+def test_track_waits_for_a_new_deployment_and_its_pods(tracker_factory):
+    running = {"status": "completed", "replicas": 1, "pods": [{"pod_name": "app-id1-0", "containers": []}]}
+    tracker = tracker_factory(
+        [{"status": "not_found"}, {"status": "completed", "replicas": 1, "pods": []}, running], retry_seconds=0
+    )
+    transitions = []
+    final = tracker.track("app-id1", on_transition=lambda entry: transitions.append(entry["status"]), timeout=5)
+    assert final.result(timeout=5) == running
+    assert transitions == ["not_found", "in_progress", "completed"]
+    assert tracker.requests == [("app-id1", None), ("app-id1", "not_found"), ("app-id1", None)]
+
+
+def test_track_keeps_waiting_on_not_found_until_timeout(tracker_factory):
+    tracker = tracker_factory([{"status": "not_found"}], watch_seconds=0.01)
+    timed_out = threading.Event()
+    final = tracker.track("app-id1", on_transition=lambda entry: None, timeout=0.1, on_timeout=timed_out.set)
+    assert final.result(timeout=5) is None
+    assert timed_out.is_set()
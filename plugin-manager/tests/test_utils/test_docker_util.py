@@ -3,7 +3,8 @@ from pathlib import Path
 
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
-from scripts.utils.docker_util import DockerUtil
+from docker.errors import BuildError
+from scripts.utils.docker_util import DockerUtil, build_cache_ref
 
 builtins_open = "builtins.open"
 docker_container_run = "docker.models.containers.ContainerCollection.run"
@@ -20,16 +21,40 @@ def docker_credentials():
 
 
 def test_build_docker_image_success(docker_util):
-    with patch("docker.models.images.ImageCollection.build", return_value=[{"stream": "Successfully built"}]):
-        with patch("shutil.rmtree"):
-            result = docker_util.build_docker_image("test_path", "test_image", "test_registry")
-    assert result is None  # Assuming the function does not return anything
+    build_output = [
+        {"stream": "Step 1/3 : FROM python:3.10.10-slim"},
+        {"stream": "Step 2/3 : RUN pip install -r requirements.txt"},
+        {"stream": " ---> Using cache"},
+        {"stream": "Step 3/3 : COPY backend/ /code/"},
+        {"stream": "Successfully built"},
+    ]
+    with patch("docker.api.build.BuildApiMixin.build", return_value=iter(build_output)) as mock_build:
+        with patch.object(docker_util, "import_build_cache", return_value=True), patch("shutil.rmtree"):
+            result = docker_util.build_docker_image("test_path", "test_image:1.0", "test_registry")
+    assert mock_build.call_args.kwargs["cache_from"] == ["test_registry/test_image:buildcache"]
+    assert [step.cached for step in result.steps] == [False, True, False]
+    assert result.cache_hit_ratio == 0.5
+    assert result.cache_imported
 
 
 def test_build_docker_image_failure(docker_util):
-    with patch("docker.models.images.ImageCollection.build", side_effect=Exception("Build error")):
-        with pytest.raises(Exception, match="Build error"):
-            docker_util.build_docker_image("test_path", "test_image", "test_registry")
+    with patch("docker.api.build.BuildApiMixin.build", side_effect=Exception("Build error")):
+        with patch.object(docker_util, "import_build_cache", return_value=False):
+            with pytest.raises(Exception, match="Build error"):
+                docker_util.build_docker_image("test_path", "test_image", "test_registry")
+
+
+def test_build_docker_image_raises_build_error_from_output(docker_util):
+    build_output = [{"stream": "Step 1/2 : FROM python:3.10.10-slim"}, {"error": "pip install failed"}]
+    with patch("docker.api.build.BuildApiMixin.build", return_value=iter(build_output)):
+        with patch.object(docker_util, "import_build_cache", return_value=False):
+            with pytest.raises(BuildError, match="pip install failed"):
+                docker_util.build_docker_image("test_path", "test_image", "test_registry")
+
+
+def test_build_cache_ref_is_independent_of_version():
+    assert build_cache_ref("registry:5000/plugin-widget:1.2") == "registry:5000/plugin-widget:buildcache"
+    assert build_cache_ref("registry:5000/plugin-widget") == "registry:5000/plugin-widget:buildcache"
 
 
 def test_push_docker_image_success(docker_util, docker_credentials):
@@ -0,0 +1,94 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from scripts.errors import CircuitOpenError
+from scripts.utils.common_util import hit_external_service, hit_external_service_async
+from scripts.utils.http_client import CircuitBreaker, HTTPClientPool
+
+example_url = "https://pooled.example.com/api"
+httpx_post = "httpx.Client.post"
+no_sleep = "scripts.utils.common_util.time"
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    pool = HTTPClientPool()
+    with patch("scripts.utils.common_util.http_pool", pool):
+        yield pool
+    pool.close()
+
+
+def test_client_is_reused_across_calls(fresh_pool):
+    assert fresh_pool.get_client() is fresh_pool.get_client()
+
+
+def test_retries_server_errors_with_backoff():
+    responses = [MagicMock(status_code=503), MagicMock(status_code=200, json=lambda: {"ok": True})]
+    with patch(httpx_post, side_effect=responses) as mock_post, patch(no_sleep) as mock_time:
+        assert hit_external_service(example_url) == {"ok": True}
+    assert mock_post.call_count == 2
+    mock_time.sleep.assert_called_once()
+
+
+def test_retries_transport_errors_then_raises():
+    with patch(httpx_post, side_effect=httpx.ConnectError("refused")) as mock_post, patch(no_sleep):
+        with pytest.raises(httpx.ConnectError):
+            hit_external_service(example_url)
+    assert mock_post.call_count == 3
+
+
+def test_open_circuit_short_circuits_requests(fresh_pool):
+    breaker = fresh_pool.breaker_for(example_url)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    with patch(httpx_post) as mock_post:
+        with pytest.raises(CircuitOpenError):
+            hit_external_service(example_url)
+    mock_post.assert_not_called()
+
+
+def test_circuit_half_opens_after_reset_window():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unresolved_trial_request_does_not_keep_the_circuit_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    with patch("scripts.utils.http_client.time.monotonic", return_value=breaker.opened_at + 60):
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+    with patch("scripts.utils.http_client.time.monotonic", return_value=breaker.opened_at + 60):
+        assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_client_errors_close_a_half_open_circuit(fresh_pool):
+    breaker = fresh_pool.breaker_for(example_url)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.reset_seconds
+    with patch(httpx_post, return_value=MagicMock(status_code=422)), patch(no_sleep):
+        assert hit_external_service(example_url) is None
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= HTTPClientPool.backoff_delay(attempt) <= 8
+
+
+async def test_async_variant_uses_pooled_async_client(fresh_pool):
+    response = MagicMock(status_code=200, json=lambda: {"data": ["secret"]})
+    with patch("httpx.AsyncClient.get", new=AsyncMock(return_value=response)) as mock_get:
+        result = await hit_external_service_async(example_url, method="get")
+    assert result == {"data": ["secret"]}
+    mock_get.assert_awaited_once()
+    await fresh_pool.aclose()
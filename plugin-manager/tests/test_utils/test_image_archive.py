@@ -0,0 +1,89 @@
+import hashlib
+import threading
+import zipfile
+
+import pytest
+
+from scripts.utils.image_archive import write_image_archive
+
+IMAGE_CHUNKS = [b"layer-one" * 1024, b"layer-two" * 1024]
+
+FAKE_COSIGN = """#!/bin/sh
+for arg in "$@"; do
+  case "$arg" in
+    --output-signature=*) signature="${arg#--output-signature=}" ;;
+  esac
+done
+sha256sum | cut -d' ' -f1 > "$signature"
+"""
+
+
+@pytest.fixture
+def fake_cosign(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    cosign = bin_dir / "cosign"
+    cosign.write_text(FAKE_COSIGN)
+    cosign.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:/usr/bin:/bin")
+    return cosign
+
+
+def test_write_image_archive_without_signing(tmp_path):
+    config = tmp_path / "config.json"
+    config.write_text("{}")
+    archive_path = tmp_path / "my_plugin.zip"
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("scripts.utils.image_archive.ContainerSigningSettings.SIGNING_ENABLED", False)
+        digest = write_image_archive(
+            iter(IMAGE_CHUNKS), archive_path, "my_plugin", "plugin.tar", extra_files={"widgetConfig.json": config}
+        )
+    assert digest == hashlib.sha256(b"".join(IMAGE_CHUNKS)).hexdigest()
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == ["my_plugin/plugin.tar", "my_plugin/widgetConfig.json"]
+        assert archive.read("my_plugin/plugin.tar") == b"".join(IMAGE_CHUNKS)
+    assert list(tmp_path.glob("*.part")) == []
+
+
+def test_write_image_archive_signs_streamed_image(tmp_path, fake_cosign, monkeypatch):
+    monkeypatch.setattr("scripts.utils.image_archive.ContainerSigningSettings.SIGNING_ENABLED", True)
+    archive_path = tmp_path / "my_plugin.zip"
+    digest = write_image_archive(iter(IMAGE_CHUNKS), archive_path, "my_plugin", "kubeflow.tar")
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.read("my_plugin/signature").decode().strip() == digest
+
+
+def test_write_image_archive_discards_unsigned_archive(tmp_path, fake_cosign, monkeypatch):
+    monkeypatch.setattr("scripts.utils.image_archive.ContainerSigningSettings.SIGNING_ENABLED", True)
+    fake_cosign.write_text("#!/bin/sh\ncat > /dev/null\nexit 1\n")
+    archive_path = tmp_path / "my_plugin.zip"
+    with pytest.raises(RuntimeError):
+        write_image_archive(iter(IMAGE_CHUNKS), archive_path, "my_plugin", "plugin.tar")
+    assert not archive_path.exists()
+    assert list(tmp_path.glob("*.part")) == []
+
+
+def test_concurrent_writers_of_one_archive_do_not_share_a_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("scripts.utils.image_archive.ContainerSigningSettings.SIGNING_ENABLED", False)
+    archive_path = tmp_path / "my_plugin.zip"
+    started = threading.Barrier(2)
+    partial_files = []
+
+    def chunks():
+        partial_files.extend(tmp_path.glob("*.part"))
+        started.wait(5)
+        yield from IMAGE_CHUNKS
+
+    writers = [
+        threading.Thread(target=write_image_archive, args=(chunks(), archive_path, "my_plugin", "plugin.tar"))
+        for _ in range(2)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(10)
+    assert len(set(partial_files)) == 2
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        assert archive.read("my_plugin/plugin.tar") == b"".join(IMAGE_CHUNKS)
+    assert list(tmp_path.glob("*.part")) == []
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from scripts.utils.image_export import ExportCancelled, ExportSubscriber, ImageExportPool, tracked_chunks
+
+
+class RecordingSubscriber(ExportSubscriber):
+    def __init__(self, subscriber_id):
+        self.progress = []
+        self.outcomes = []
+        self.done = threading.Event()
+        super().__init__(subscriber_id, self.progress.append, self._done)
+
+    def _done(self, artifact, error):
+        self.outcomes.append((artifact, error))
+        self.done.set()
+
+
+class BlockingExport:
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, report, cancelled):
+        self.calls += 1
+        self.started.set()
+        report(0.5)
+        while not self.release.wait(0.01):
+            if cancelled.is_set():
+                raise ExportCancelled
+        return "/exports/key.zip"
+
+
+@pytest.fixture
+def pool():
+    return ImageExportPool(max_workers=1)
+
+
+def test_identical_exports_run_once(pool):
+    export = BlockingExport()
+    first, second = RecordingSubscriber("job-1:0"), RecordingSubscriber("job-2:0")
+    assert pool.submit("digest", export, first) is False
+    export.started.wait(1)
+    assert pool.submit("digest", export, second) is True
+    export.release.set()
+    assert first.done.wait(1) and second.done.wait(1)
+    assert export.calls == 1
+    assert first.outcomes == second.outcomes == [("/exports/key.zip", None)]
+    assert second.progress[-1] == 0.5
+
+
+def test_export_stops_only_when_every_subscriber_cancelled(pool):
+    export = BlockingExport()
+    first, second = RecordingSubscriber("job-1:0"), RecordingSubscriber("job-2:0")
+    pool.submit("digest", export, first)
+    pool.submit("digest", export, second)
+    export.started.wait(1)
+    assert pool.cancel("digest", "job-1:0") is True
+    export.release.set()
+    assert second.done.wait(1)
+    assert second.outcomes == [("/exports/key.zip", None)]
+    assert first.outcomes == []
+
+
+def test_cancelled_export_is_not_reused(pool):
+    export = BlockingExport()
+    pool.submit("digest", export, RecordingSubscriber("job-1:0"))
+    export.started.wait(1)
+    pool.cancel("digest", "job-1:0")
+    later, export = RecordingSubscriber("job-2:0"), BlockingExport()
+    assert pool.submit("digest", export, later) is False
+    export.release.set()
+    assert later.done.wait(1)
+    assert later.outcomes == [("/exports/key.zip", None)]
+
+
+def test_queued_export_is_dropped_on_cancel(pool):
+    blocking = BlockingExport()
+    pool.submit("other", blocking, RecordingSubscriber("job-1:0"))
+    queued = BlockingExport()
+    pool.submit("digest", queued, RecordingSubscriber("job-2:0"))
+    pool.cancel("digest", "job-2:0")
+    blocking.release.set()
+    pool.executor.shutdown(wait=True)
+    assert queued.calls == 0
+
+
+def test_tracked_chunks_reports_progress_and_stops_when_cancelled():
+    progress = []
+    cancelled = threading.Event()
+    chunks = tracked_chunks([b"a" * 5, b"b" * 5, b"c" * 5], 10, progress.append, cancelled, interval_seconds=0)
+    assert next(chunks) == b"a" * 5
+    assert next(chunks) == b"b" * 5
+    assert progress == [0.5]
+    cancelled.set()
+    with pytest.raises(ExportCancelled):
+        next(chunks)
@@ -0,0 +1,116 @@
+import datetime
+import threading
+from types import SimpleNamespace
+
+from scripts.utils.kubeflow_index import KubeflowIndex
+
+NAMESPACE = "test-project"
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakeKubeflowClient:
+    """Lists newest first in pages of two, like the Kubeflow API sorted by created_at desc"""
+
+    def __init__(self):
+        self.pipelines = []
+        self.recurring_runs = []
+        self.listed = 0
+
+    def add_pipeline(self, name, pipeline_id):
+        created_at = START + datetime.timedelta(minutes=len(self.pipelines))
+        self.pipelines.append(SimpleNamespace(display_name=name, pipeline_id=pipeline_id, created_at=created_at))
+
+    def add_recurring_run(self, run_id, pipeline_id, version_id):
+        created_at = START + datetime.timedelta(minutes=len(self.recurring_runs))
+        reference = SimpleNamespace(pipeline_id=pipeline_id, pipeline_version_id=version_id)
+        self.recurring_runs.append(
+            SimpleNamespace(recurring_run_id=run_id, pipeline_version_reference=reference, created_at=created_at)
+        )
+
+    def _page(self, items, attribute, page_token):
+        self.listed += 1
+        start = int(page_token or 0)
+        newest_first = sorted(items, key=lambda item: item.created_at, reverse=True)
+        next_token = str(start + 2) if start + 2 < len(newest_first) else ""
+        return SimpleNamespace(**{attribute: newest_first[start : start + 2], "next_page_token": next_token})
+
+    def list_pipelines(self, page_token="", page_size=10, sort_by="", namespace=None):
+        assert sort_by == "created_at desc"
+        return self._page(self.pipelines, "pipelines", page_token)
+
+    def list_recurring_runs(self, page_token="", page_size=10, sort_by="", namespace=None):
+        return self._page(self.recurring_runs, "recurring_runs", page_token)
+
+
+def test_lookups_within_the_refresh_interval_do_not_call_kubeflow():
+    client = FakeKubeflowClient()
+    for number in range(5):
+        client.add_pipeline(f"pipeline-{number}", f"id-{number}")
+    index = KubeflowIndex(refresh_seconds=60, rebuild_seconds=600)
+    assert index.pipeline_id(client, NAMESPACE, "pipeline-0") == "id-0"
+    listed = client.listed
+    assert index.pipeline_id(client, NAMESPACE, "pipeline-3") == "id-3"
+    assert client.listed == listed
+
+
+def test_refresh_only_lists_what_was_created_since_the_last_one():
+    client = FakeKubeflowClient()
+    for number in range(6):
+        client.add_pipeline(f"pipeline-{number}", f"id-{number}")
+    index = KubeflowIndex(refresh_seconds=0, rebuild_seconds=600)
+    index.pipeline_id(client, NAMESPACE, "pipeline-0")
+    client.add_pipeline("pipeline-new", "id-new")
+    client.listed = 0
+    assert index.pipeline_id(client, NAMESPACE, "pipeline-new") == "id-new"
+    # Two pages of pipelines reach the ones older than the previously newest, plus the recurring run listing
+    assert client.listed == 3
+
+
+def test_missing_pipeline_triggers_a_refresh():
+    client = FakeKubeflowClient()
+    index = KubeflowIndex(refresh_seconds=60, rebuild_seconds=600)
+    assert index.pipeline_id(client, NAMESPACE, "pipeline") is None
+    client.add_pipeline("pipeline", "id")
+    assert index.pipeline_id(client, NAMESPACE, "pipeline") == "id"
+
+
+def test_own_creates_and_deletes_update_the_index():
+    client = FakeKubeflowClient()
+    client.add_pipeline("pipeline", "id")
+    client.add_recurring_run("run-1", "id", "version-1")
+    index = KubeflowIndex(refresh_seconds=60, rebuild_seconds=600)
+    assert index.recurring_runs(client, NAMESPACE, "id") == {"run-1": "version-1"}
+    index.record_recurring_run(NAMESPACE, "id", "run-2", "version-2")
+    client.recurring_runs.clear()
+    index.forget_recurring_run(NAMESPACE, "id", "run-1")
+    assert index.recurring_runs(client, NAMESPACE, "id") == {"run-2": "version-2"}
+    index.forget_pipeline(NAMESPACE, "pipeline")
+    client.pipelines.clear()
+    assert index.pipeline_id(client, NAMESPACE, "pipeline") is None
+    assert index.recurring_runs(client, NAMESPACE, "id") == {}
+
+
+def test_a_slow_listing_does_not_block_other_namespaces():
+    listing, release = threading.Event(), threading.Event()
+
+    class SlowKubeflowClient(FakeKubeflowClient):
+        def list_pipelines(self, page_token="", page_size=10, sort_by="", namespace=None):
+            listing.set()
+            release.wait(timeout=5)
+            return super().list_pipelines(page_token, page_size, sort_by, namespace)
+
+    client = FakeKubeflowClient()
+    client.add_pipeline("pipeline", "id")
+    index = KubeflowIndex(refresh_seconds=60, rebuild_seconds=600)
+    slow = threading.Thread(target=index.pipeline_id, args=(SlowKubeflowClient(), "slow-project", "pipeline"))
+    slow.start()
+    found = []
+    fast = threading.Thread(target=lambda: found.append(index.pipeline_id(client, NAMESPACE, "pipeline")))
+    try:
+        assert listing.wait(timeout=5)
+        fast.start()
+        fast.join(timeout=2)
+        assert found == ["id"]
+    finally:
+        release.set()
+        slow.join(timeout=5)
@@ -1,9 +1,11 @@
+import io
+
 import pytest
 from unittest.mock import patch, MagicMock
 
 from minio.error import MinioException
 
-from scripts.utils.minio_util import MinioUtility
+from scripts.utils.minio_util import MinioUtility, get_minio_utility
 
 logging_error = "logging.error"
 
@@ -13,6 +15,42 @@ def minio_utility():
     return MinioUtility(endpoint="localhost:9000", access_key="access_key", secret_key="secret_key")
 
 
+def test_shared_minio_utility_is_created_once():
+    get_minio_utility.cache_clear()
+    try:
+        first = get_minio_utility()
+        assert get_minio_utility() is first
+        assert first.minio_client._http.connection_pool_kw["maxsize"] == 20
+    finally:
+        get_minio_utility.cache_clear()
+
+
+def test_upload_stream_sends_parts_without_knowing_the_length(minio_utility):
+    received = []
+
+    def put_object(bucket_name, object_name, data, length, part_size, content_type):
+        while part := data.read(part_size):
+            received.append(part)
+        return MagicMock(etag="etag")
+
+    stream = io.BytesIO(b"a" * 10 + b"b" * 5)
+    with patch.object(minio_utility.minio_client, "put_object", side_effect=put_object) as mock_put_object:
+        etag = minio_utility.upload_stream("test-bucket", "test-object", stream, part_size=10)
+    assert etag == "etag"
+    assert mock_put_object.call_args.kwargs["length"] == -1
+    assert received == [b"a" * 10, b"b" * 5]
+
+
+def test_presigned_download_url_is_signed_for_the_object():
+    utility = MinioUtility(
+        endpoint="localhost:9000", access_key="access_key", secret_key="secret_key", secure=False, region="us-east-1"
+    )
+    url = utility.presigned_download_url("test-bucket", "uploads/plugin/zip/bundle.zip", expires_seconds=60)
+    assert url.startswith("http://localhost:9000/test-bucket/uploads/plugin/zip/bundle.zip?")
+    assert "X-Amz-Expires=60" in url
+    assert "bundle.zip%22" in url and "X-Amz-Signature=" in url
+
+
 def test_create_bucket_successfully(minio_utility):
     with (
         patch.object(minio_utility.minio_client, "bucket_exists", return_value=False),
@@ -0,0 +1,87 @@
+import inspect
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo import DeleteMany, UpdateOne
+from pymongo.results import BulkWriteResult, UpdateResult
+
+from scripts.utils.mongo_tools.mongo_async import AsyncMongoCollectionBaseClass
+from scripts.utils.mongo_tools.mongo_sync import MongoCollectionBaseClass
+
+
+@pytest.fixture
+def motor_collection():
+    return MagicMock()
+
+
+@pytest.fixture
+def mongo_collection(motor_collection):
+    client = MagicMock()
+    client.__getitem__.return_value.__getitem__.return_value = motor_collection
+    return AsyncMongoCollectionBaseClass(client, "test_db", "test_collection", None)
+
+
+async def test_finds_single_document_with_query(mongo_collection, motor_collection):
+    motor_collection.find_one = AsyncMock(return_value={"key": "value"})
+    assert await mongo_collection.find_one({"key": "value"}) == {"key": "value"}
+    motor_collection.find_one.assert_awaited_once_with({"key": "value"}, {"_id": 0})
+
+
+async def test_updates_single_document(mongo_collection, motor_collection):
+    motor_collection.update_one = AsyncMock(return_value=UpdateResult({"n": 1, "nModified": 1}, True))
+    result = await mongo_collection.update_one({"key": "value"}, {"key": "new_value"}, upsert=True)
+    assert result.modified_count == 1
+    motor_collection.update_one.assert_awaited_once_with({"key": "value"}, {"$set": {"key": "new_value"}}, upsert=True)
+
+
+def test_find_returns_cursor_with_sort_skip_and_limit(mongo_collection, motor_collection):
+    cursor = mongo_collection.find({"key": "value"}, sort=[("created_on", -1)], skip=5, limit=10)
+    motor_collection.find.assert_called_once_with({"key": "value"}, {"_id": 0})
+    motor_collection.find.return_value.sort.assert_called_once_with([("created_on", -1)])
+    assert cursor is motor_collection.find.return_value.sort.return_value.skip.return_value.limit.return_value
+
+
+async def test_upserts_documents_in_batches(mongo_collection, motor_collection):
+    motor_collection.bulk_write = AsyncMock(return_value=BulkWriteResult({"nUpserted": 1}, True))
+    documents = [{"plugin_id": "1", "name": "a"}, {"plugin_id": "2", "name": "b"}, {"plugin_id": "3", "name": "c"}]
+    results = await mongo_collection.upsert_many(documents, key_fields=["plugin_id"], batch_size=2)
+    assert len(results) == 2
+    assert motor_collection.bulk_write.await_args_list[1].args[0] == [
+        UpdateOne({"plugin_id": "3"}, {"$set": documents[2]}, upsert=True)
+    ]
+
+
+async def test_deletes_documents_with_a_single_soft_delete_merge(mongo_collection, motor_collection):
+    motor_collection.aggregate.return_value.to_list = AsyncMock(return_value=[])
+    motor_collection.bulk_write = AsyncMock(return_value=BulkWriteResult({"nRemoved": 2}, True))
+    queries = [{"plugin_id": "1"}, {"plugin_id": "2"}]
+    result = await mongo_collection.delete_documents(queries)
+    assert result.deleted_count == 2
+    assert motor_collection.aggregate.call_args.args[0][0] == {"$match": {"$or": queries}}
+    motor_collection.bulk_write.assert_awaited_once_with([DeleteMany(query) for query in queries], ordered=False)
+
+
+def test_aggregate_passes_options_through(mongo_collection, motor_collection):
+    pipeline = [{"$match": {"status": "running"}}]
+    cursor = mongo_collection.aggregate(pipeline, collation={"locale": "en", "strength": 2})
+    motor_collection.aggregate.assert_called_once_with(pipeline, collation={"locale": "en", "strength": 2})
+    assert cursor is motor_collection.aggregate.return_value
+
+
+async def test_explains_aggregate_and_reads_indexes(mongo_collection, motor_collection):
+    database = mongo_collection.client["test_db"]
+    database.command = AsyncMock(return_value={"stages": []})
+    motor_collection.index_information = AsyncMock(return_value={"_id_": {"key": [("_id", 1)]}})
+    pipeline = [{"$match": {"status": "running"}}]
+    assert await mongo_collection.explain_aggregate(pipeline) == {"stages": []}
+    database.command.assert_awaited_once_with("aggregate", "test_collection", pipeline=pipeline, explain=True)
+    assert await mongo_collection.index_information() == {"_id_": {"key": [("_id", 1)]}}
+
+
+def test_has_the_same_interface_as_the_sync_base_class():
+    def public_methods(cls):
+        return {name: inspect.signature(member) for name, member in vars(cls).items() if not name.startswith("_")}
+
+    assert public_methods(AsyncMongoCollectionBaseClass).keys() == public_methods(MongoCollectionBaseClass).keys()
+    for name, signature in public_methods(MongoCollectionBaseClass).items():
+        assert list(public_methods(AsyncMongoCollectionBaseClass)[name].parameters) == list(signature.parameters)
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult
+from pymongo import DeleteMany, UpdateOne
+from pymongo.results import BulkWriteResult, InsertOneResult, InsertManyResult, UpdateResult, DeleteResult
 from scripts.utils.mongo_tools.mongo_sync import MongoCollectionBaseClass
 
 
@@ -122,3 +123,44 @@ def test_aggregates_documents_successfully(mongo_collection):
         result = mongo_collection.aggregate(pipelines)
         assert result is not None
         mock_aggregate.assert_called_once_with(pipelines)
+
+
+def test_bulk_writes_unordered_by_default(mongo_collection):
+    operations = [UpdateOne({"key": "value"}, {"$set": {"key": "new_value"}})]
+    with patch.object(
+        mongo_collection.client[mongo_collection.database][mongo_collection.collection],
+        "bulk_write",
+        return_value=BulkWriteResult({"nModified": 1}, True),
+    ) as mock_bulk_write:
+        result = mongo_collection.bulk_write(operations)
+        assert result.modified_count == 1
+        mock_bulk_write.assert_called_once_with(operations, ordered=False)
+
+
+def test_upserts_documents_in_batches(mongo_collection):
+    documents = [{"plugin_id": str(index), "version": 1.0, "name": f"plugin {index}"} for index in range(5)]
+    with patch.object(
+        mongo_collection.client[mongo_collection.database][mongo_collection.collection],
+        "bulk_write",
+        return_value=BulkWriteResult({"nUpserted": 2}, True),
+    ) as mock_bulk_write:
+        results = mongo_collection.upsert_many(documents, key_fields=["plugin_id", "version"], batch_size=2)
+        assert len(results) == 3
+        first_batch = mock_bulk_write.call_args_list[0].args[0]
+        assert first_batch[0] == UpdateOne({"plugin_id": "0", "version": 1.0}, {"$set": documents[0]}, upsert=True)
+        assert [len(call.args[0]) for call in mock_bulk_write.call_args_list] == [2, 2, 1]
+        assert all(call.kwargs == {"ordered": False} for call in mock_bulk_write.call_args_list)
+
+
+def test_deletes_documents_with_a_single_soft_delete_merge(mongo_collection):
+    queries = [{"plugin_id": "1"}, {"plugin_id": "2"}]
+    collection = mongo_collection.client[mongo_collection.database][mongo_collection.collection]
+    with (
+        patch.object(collection, "aggregate") as mock_aggregate,
+        patch.object(collection, "bulk_write", return_value=BulkWriteResult({"nRemoved": 2}, True)) as mock_bulk_write,
+    ):
+        result = mongo_collection.delete_documents(queries)
+        assert result.deleted_count == 2
+        mock_aggregate.assert_called_once()
+        assert mock_aggregate.call_args.args[0][0] == {"$match": {"$or": queries}}
+        mock_bulk_write.assert_called_once_with([DeleteMany(query) for query in queries], ordered=False)
@@ -1,6 +1,48 @@
+import threading
+from unittest.mock import MagicMock, patch
+
 import pytest
-from unittest.mock import patch
-from scripts.utils.notification_util import push_notification, NotificationSchema
+
+from scripts.utils.notification_dispatcher import MQTTTransport, Notification, NotificationDispatcher, PlatformTransport
+from scripts.utils.notification_util import NotificationSchema, push_notification
+
+
+class FakeTransport:
+    """Records every batch and fails the notifications of the users in failing, until they are removed"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+        self.closed = False
+        # Cleared to hold the worker inside send_batch, sending tells that it got there
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def send_batch(self, batch):
+        self.sending.set()
+        self.release.wait(5)
+        self.batches.append(list(batch))
+        failed = [notification for notification in batch if notification.user_id in self.failing]
+        for notification in failed:
+            notification.error = "unavailable"
+        return failed
+
+    def close(self):
+        self.closed = True
+
+    def users(self):
+        return [[notification.user_id for notification in batch] for batch in self.batches]
+
+
+def make_notification(user_id="user_id", project_id="project_id"):
+    return Notification(project_id=project_id, user_id=user_id, payload={"main_msg": "Test"}, mqtt_payload="{}")
+
+
+def make_dispatcher(transport, **kwargs):
+    dead_letters = []
+    options = {"batch_wait_seconds": 0.05, "backoff_seconds": 0, **kwargs}
+    return NotificationDispatcher(transport, dead_letters=dead_letters.extend, **options), dead_letters
 
 
 @pytest.fixture
@@ -15,13 +57,18 @@ def test_push_notification_successfully(notification):
         patch("paho.mqtt.client.Client.connect") as mock_connect,
         patch("paho.mqtt.client.Client.publish") as mock_publish,
         patch("paho.mqtt.client.Client.username_pw_set") as mock_username_pw_set,
+        patch("paho.mqtt.client.Client.loop_start") as mock_loop_start,
         patch("logging.debug") as mock_logging,
     ):
-        push_notification(notification, "user_id", "project_id")
+        transport = MQTTTransport("localhost", 1883, "user", "password", "ilens/notifications")
+        failed = transport.send_batch([make_notification("user_1"), make_notification("user_2")])
         mock_connect.assert_called_once()
-        mock_publish.assert_called_once()
+        mock_loop_start.assert_called_once()
+        assert mock_publish.call_count == 2
+        assert mock_publish.call_args.args[0] == "ilens/notifications/user_2/plugins"
         mock_username_pw_set.assert_called_once()
         mock_logging.assert_called_with("Notification message published")
+        assert failed == []
 
 
 def test_push_notification_handles_connection_error(notification):
@@ -29,5 +76,87 @@ def test_push_notification_handles_connection_error(notification):
         patch("paho.mqtt.client.Client.connect", side_effect=Exception("Connection Error")),
         patch("logging.exception") as mock_logging,
     ):
-        push_notification(notification, "user_id", "project_id")
+        transport = MQTTTransport("localhost", 1883, "user", "password", "ilens/notifications")
+        failed = transport.send_batch([make_notification()])
         mock_logging.assert_called_with("Exception at MQTT Publish: Connection Error")
+        assert failed[0].error == "mqtt: Connection Error"
+
+
+def test_push_notification_only_enqueues(notification):
+    transport = FakeTransport()
+    transport.release.clear()
+    dispatcher, _ = make_dispatcher(transport)
+    with patch("scripts.utils.notification_util.notification_dispatcher", dispatcher):
+        assert push_notification(notification, "user_id", "space_1")
+    assert transport.batches == []
+    transport.release.set()
+    assert dispatcher.flush(timeout=5)
+    dispatcher.shutdown()
+
+    sent = transport.batches[0][0]
+    assert sent.payload["catalog_notification"] is True
+    assert sent.payload["properties"]["plugin_id"] == "1234"
+    assert sent.mqtt_payload == notification.model_dump_json()
+
+
+def test_queued_notifications_are_sent_in_batches():
+    transport = FakeTransport()
+    transport.release.clear()
+    dispatcher, dead_letters = make_dispatcher(transport, batch_size=3)
+    dispatcher.enqueue(make_notification("user_0"))
+    assert transport.sending.wait(5)
+    for index in range(1, 5):
+        dispatcher.enqueue(make_notification(f"user_{index}"))
+    transport.release.set()
+
+    assert dispatcher.flush(timeout=5)
+    dispatcher.shutdown()
+
+    assert transport.users() == [["user_0"], ["user_1", "user_2", "user_3"], ["user_4"]]
+    assert dead_letters == []
+    assert transport.closed
+
+
+def test_failures_go_to_the_fallback_then_retry_then_dead_letter():
+    transport = FakeTransport(failing={"user_1", "user_2"})
+    fallback = FakeTransport(failing={"user_2"})
+    dispatcher, dead_letters = make_dispatcher(transport, fallback=fallback, max_attempts=3)
+    for index in range(3):
+        dispatcher.enqueue(make_notification(f"user_{index}"))
+
+    assert dispatcher.flush(timeout=5)
+    dispatcher.shutdown()
+
+    assert [notification.user_id for notification in dead_letters] == ["user_2"]
+    assert dead_letters[0].attempts == 3
+    assert dead_letters[0].error == "unavailable"
+    assert dispatcher.stats() == {"queued": 0, "retrying": 0, "sent": 2, "retried": 2, "dead_lettered": 1}
+
+
+def test_full_queue_and_shutdown_dead_letter_instead_of_blocking():
+    transport = FakeTransport(failing={"user_1"})
+    transport.release.clear()
+    dispatcher, dead_letters = make_dispatcher(transport, queue_size=1, backoff_seconds=60)
+    dispatcher.enqueue(make_notification("user_0"))
+    assert transport.sending.wait(5)
+    assert dispatcher.enqueue(make_notification("user_1"))
+    assert not dispatcher.enqueue(make_notification("user_2"))
+    assert [notification.user_id for notification in dead_letters] == ["user_2"]
+
+    transport.release.set()
+    dispatcher.shutdown()
+
+    # user_1 is not retried a minute later, shutting down dead letters it
+    assert [notification.user_id for notification in dead_letters] == ["user_2", "user_1"]
+    assert transport.closed
+
+
+def test_platform_handler_is_reused_per_project():
+    handler_factory = MagicMock()
+    transport = PlatformTransport(handler_factory=handler_factory)
+    failed = transport.send_batch([make_notification("user_1"), make_notification("user_2")])
+
+    handler_factory.assert_called_once_with("project_id")
+    assert handler_factory.return_value.send_notifications.call_count == 2
+    handler_factory.return_value.send_notifications.assert_called_with(main_msg="Test")
+    assert failed == []
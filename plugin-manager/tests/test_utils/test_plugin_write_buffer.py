@@ -0,0 +1,116 @@
+import copy
+
+import pytest
+
+from scripts.db.schemas import PluginMetaDBSchema
+from scripts.errors import PluginWriteConflict
+from scripts.utils.plugin_write_buffer import PluginWriteBuffer, field_deltas
+
+PLUGIN_ID = "test_plugin_id"
+
+
+class InMemoryPluginMeta:
+    def __init__(self, document: dict):
+        self.document = copy.deepcopy(document)
+        self.writes = []
+        self.direct_writes = []
+
+    def apply_changes(self, plugin_id, changes, revision, version=None):
+        if self.document.get("revision", 0) != revision:
+            return False
+        for path, value in changes.items():
+            target = self.document
+            *parents, leaf = path.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = copy.deepcopy(value)
+        self.document["revision"] = revision + 1
+        self.writes.append(changes)
+        return True
+
+    def fetch_fields(self, plugin_id, fields, version=None):
+        return {field: copy.deepcopy(self.document[field]) for field in [*fields, "revision"] if field in self.document}
+
+    def update_plugin(self, plugin_id, data, version=None):
+        self.direct_writes.append((plugin_id, data))
+        if plugin_id == self.document["plugin_id"]:
+            self.document.update(copy.deepcopy(data))
+            self.document["revision"] = self.document.get("revision", 0) + 1
+
+
+@pytest.fixture
+def plugin_data():
+    return PluginMetaDBSchema(
+        plugin_id=PLUGIN_ID,
+        name="Test Plugin",
+        plugin_type="widget",
+        registration_type="git",
+        industry=["test_industry"],
+        information={"key": "value"},
+    )
+
+
+@pytest.fixture
+def db(plugin_data):
+    return InMemoryPluginMeta(plugin_data.model_dump())
+
+
+def test_field_deltas_only_descends_while_no_keys_are_removed():
+    before = {"security_checks": {"antivirus": None, "sonarqube": None}, "configurations": {"A": 1, "B": 2}}
+    after = {"security_checks": {"antivirus": True, "sonarqube": None}, "configurations": {"A": 1}}
+    assert field_deltas(before, after) == {"security_checks.antivirus": True, "configurations": {"A": 1}}
+
+
+def test_stage_writes_are_coalesced_into_one_delta(db, plugin_data):
+    writes = PluginWriteBuffer(db, plugin_data)
+    writes.update_plugin(PLUGIN_ID, {"status": "Deployment Started"}, version=plugin_data.version)
+    plugin_data.deployment_status = "deploying"
+    writes.update_plugin(PLUGIN_ID, plugin_data.model_dump(), version=plugin_data.version)
+    writes.update_plugin(PLUGIN_ID, {"status": "Scanning in progress"}, version=plugin_data.version)
+    assert writes.flush("build") == 2
+    assert db.writes == [{"status": "Scanning in progress", "deployment_status": "deploying"}]
+    assert writes.flush("build") == 0
+    assert len(db.writes) == 1
+
+
+def test_flush_rebases_on_concurrent_change(db, plugin_data):
+    writes = PluginWriteBuffer(db, plugin_data)
+    db.document.update(status="running", revision=1)
+    writes.update_plugin(PLUGIN_ID, {"status": "running", "proxy": "/plugin/test"})
+    assert writes.flush("deploy") == 1
+    assert db.writes == [{"proxy": "/plugin/test"}]
+    assert writes.revision == 2
+
+
+def test_direct_writes_are_not_hidden_by_a_stale_copy(db, plugin_data):
+    writes = PluginWriteBuffer(db, plugin_data)
+    writes.update_plugin(PLUGIN_ID, {"status": "Scanning in progress"})
+    assert writes.flush("build") == 1
+    db.update_plugin(PLUGIN_ID, {"status": "Vulnerability Scan Failed"})
+
+    writes.update_plugin(PLUGIN_ID, {"status": "Scanning in progress"})
+    assert writes.flush("scan") == 1
+    assert db.document["status"] == "Scanning in progress"
+    assert writes.flush("scan") == 0
+
+
+def test_flush_gives_up_when_the_document_keeps_changing(db, plugin_data):
+    class BusyPluginMeta(InMemoryPluginMeta):
+        def fetch_fields(self, plugin_id, fields, version=None):
+            stored = super().fetch_fields(plugin_id, fields, version)
+            self.document["revision"] = self.document.get("revision", 0) + 1
+            return stored
+
+    busy = BusyPluginMeta(db.document)
+    writes = PluginWriteBuffer(busy, plugin_data)
+    busy.document["revision"] = 1
+    writes.update_plugin(PLUGIN_ID, {"status": "running"})
+    with pytest.raises(PluginWriteConflict):
+        writes.flush("deploy")
+
+
+def test_writes_of_other_plugins_are_not_buffered(db, plugin_data):
+    writes = PluginWriteBuffer(db, plugin_data)
+    writes.update_plugin("other_plugin_id", {"status": "running"})
+    assert db.direct_writes == [("other_plugin_id", {"status": "running"})]
+    assert writes.pending == {}
@@ -0,0 +1,105 @@
+from scripts.constants.schemas import AGGridFilterModel, AGGridTableRequest
+from scripts.utils.mongo_tools.query_buidler import AGGridMongoQueryUtil
+from scripts.utils.mongo_tools.query_builder_git_targets import NewQueryBuilder
+from scripts.utils.mongo_tools.query_planner import IndexCatalog, QueryPlanner, summarize_plan
+
+CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+INDEXES = {
+    "_id_": {"key": [("_id", 1)]},
+    "name_ci": {"key": [("name", 1), ("version", 1)], "collation": {**CASE_INSENSITIVE, "caseLevel": False}},
+    "plugin_type_1": {"key": [("plugin_type", 1)]},
+    "search_text": {"key": [("_fts", "text"), ("_ftsx", 1)], "weights": {"information": 1, "name": 2}},
+}
+
+
+def grid_request(filter_model: dict) -> AGGridTableRequest:
+    return AGGridTableRequest(filters=AGGridFilterModel(filterModel=filter_model), startRow=0, endRow=10)
+
+
+def test_catalog_reads_collations_and_text_fields():
+    catalog = IndexCatalog.from_index_information(INDEXES)
+
+    assert catalog.collated_fields == {"name": CASE_INSENSITIVE}
+    assert catalog.text_fields == {"information", "name"}
+
+
+def test_prefix_filters_become_index_friendly():
+    planner = QueryPlanner(IndexCatalog.from_index_information(INDEXES))
+
+    assert planner.text_condition("name", "startsWith", "Ab") == {"name": {"$gte": "Ab", "$lt": "Ab\uffff"}}
+    assert planner.aggregate_options() == {"collation": CASE_INSENSITIVE}
+    assert planner.text_condition("plugin_type", "startsWith", "1.2") == {"plugin_type": {"$regex": "^1\\.2"}}
+    assert planner.text_condition("plugin_type", "startsWith", "wid") == {
+        "plugin_type": {"$regex": "^wid", "$options": "i"}
+    }
+
+
+def test_collation_is_kept_to_a_lone_filter_of_an_unsorted_grid():
+    name_filter = {"filterType": "text", "type": "equals", "filter": "Widget"}
+    lone = QueryPlanner(IndexCatalog.from_index_information(INDEXES))
+    AGGridMongoQueryUtil(planner=lone).build_query(grid_request({"name": name_filter}))
+    assert lone.aggregate_options() == {"collation": CASE_INSENSITIVE}
+
+    combined = QueryPlanner(IndexCatalog.from_index_information(INDEXES))
+    pipeline = AGGridMongoQueryUtil(planner=combined).build_query(
+        grid_request({"name": name_filter, "plugin_type": {"filterType": "text", "type": "equals", "filter": "App"}})
+    )
+    assert combined.aggregate_options() == {}
+    assert {"$match": {"plugin_type": "App"}} in pipeline
+
+    sorted_grid = QueryPlanner(IndexCatalog.from_index_information(INDEXES))
+    request = grid_request({"name": {"filterType": "text", "type": "startsWith", "filter": "Wid"}})
+    request.filters.sort_model = [{"colId": "name", "sort": "asc"}]
+    pipeline = AGGridMongoQueryUtil(planner=sorted_grid).build_query(request)
+    assert sorted_grid.aggregate_options() == {}
+    assert {"$match": {"name": {"$regex": "^Wid", "$options": "i"}}} in pipeline
+
+
+def test_collation_is_not_used_when_the_pipeline_disallows_it():
+    planner = QueryPlanner(IndexCatalog.from_index_information(INDEXES), collation_allowed=False)
+    planner.restrict_collation({"name": {}}, [])
+
+    assert planner.text_condition("name", "equals", "Widget") == {"name": "Widget"}
+    assert planner.aggregate_options() == {}
+
+
+def test_contains_escapes_input_and_uses_the_text_index_when_enabled():
+    planner = QueryPlanner(IndexCatalog.from_index_information(INDEXES), text_search=True)
+    query_builder = AGGridMongoQueryUtil(planner=planner)
+
+    pipeline = planner.plan(
+        query_builder.build_query(grid_request({"name": {"filterType": "text", "type": "contains", "filter": "a+b"}}))
+    )
+
+    assert pipeline[0] == {"$match": {"$text": {"$search": '"a+b"'}}}
+    assert {"$match": {"name": {"$regex": "a\\+b", "$options": "i"}}} in pipeline
+
+
+def test_git_target_builder_leads_with_the_text_search():
+    planner = QueryPlanner(IndexCatalog(text_fields=frozenset({"git_target_name"})), text_search=True)
+    query_builder = NewQueryBuilder(planner=planner)
+    query_builder.project({"git_target_name": 1})
+    query_builder.match([query_builder.text_condition("git_target_name", "main")])
+
+    assert query_builder.build()[0] == {"$match": {"$text": {"$search": '"main"'}}}
+    assert query_builder.count_pipeline([])[0] == {"$match": {"$text": {"$search": '"main"'}}}
+
+
+def test_summarize_plan_of_a_pushed_down_pipeline():
+    explained = {
+        "stages": [
+            {
+                "$cursor": {
+                    "queryPlanner": {
+                        "winningPlan": {
+                            "stage": "FETCH",
+                            "inputStage": {"stage": "IXSCAN", "indexName": "name_ci"},
+                        }
+                    }
+                }
+            },
+            {"$sort": {"sortKey": {"name": 1}}},
+        ]
+    }
+
+    assert summarize_plan(explained) == "FETCH < IXSCAN(name_ci)"
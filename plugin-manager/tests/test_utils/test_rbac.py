@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock, patch
+
+import orjson as json
+import pytest
+from fastapi import HTTPException
+
+from scripts.utils import rbac
+from scripts.utils.rbac import RBAC
+
+PROJECT_ID = "project_100"
+ROLE_ID = "user_role_100"
+R_KEY = f"{PROJECT_ID}__{ROLE_ID}"
+
+
+@pytest.fixture
+def permissions_redis():
+    rbac.permission_cache.clear()
+    rbac.user_role_cache.clear()
+    redis_client = MagicMock()
+    redis_client.config_get.return_value = {"notify-keyspace-events": "Kgh"}
+    redis_client.hgetall.return_value = {
+        "developerPlugins": json.dumps({"view": True, "edit": True}),
+        "plugins": json.dumps({"view": True}),
+    }
+    with (
+        patch.object(rbac, "user_role_permissions_redis", redis_client),
+        patch.object(rbac.permission_listener, "start"),
+        patch.object(rbac, "fetch_user_role_id_projects", return_value=ROLE_ID) as fetch_role,
+    ):
+        redis_client.fetch_role = fetch_role
+        rbac.reset_permission_cache()
+        yield redis_client
+    rbac.permission_cache.ttl_seconds = rbac.CacheConf.PERMISSION_CACHE_UNNOTIFIED_TTL_SECONDS
+
+
+def test_permissions_are_read_from_redis_once_per_role(permissions_redis):
+    assert RBAC("developerPlugins", ["view", "edit"]).check_permissions("user_1", PROJECT_ID) == {
+        "view": True,
+        "edit": True,
+    }
+    assert RBAC("plugins", ["view"]).check_permissions("user_2", PROJECT_ID) == {"view": True}
+    assert RBAC("developerPlugins", ["view"]).check_permissions("user_1", PROJECT_ID) == {"view": True}
+
+    permissions_redis.hgetall.assert_called_once_with(R_KEY)
+    permissions_redis.hget.assert_not_called()
+    assert permissions_redis.fetch_role.call_count == 2
+
+
+def test_role_change_notification_revokes_immediately(permissions_redis):
+    RBAC("developerPlugins", ["edit"]).check_permissions("user_1", PROJECT_ID)
+    permissions_redis.hgetall.return_value = {"developerPlugins": json.dumps({"view": True})}
+
+    rbac.permission_listener.dispatch(
+        {"type": "pmessage", "pattern": "__keyspace@21__:*", "channel": f"__keyspace@21__:{R_KEY}", "data": "hset"}
+    )
+
+    with pytest.raises(HTTPException):
+        RBAC("developerPlugins", ["edit"]).check_permissions("user_1", PROJECT_ID)
+
+
+def test_user_change_drops_only_that_users_roles(permissions_redis):
+    rbac.get_user_role_id_projects("user_1", PROJECT_ID)
+    rbac.get_user_role_id_projects("user_2", PROJECT_ID)
+
+    rbac.invalidate_permissions("user:user_1")
+    rbac.get_user_role_id_projects("user_1", PROJECT_ID)
+    rbac.get_user_role_id_projects("user_2", PROJECT_ID)
+
+    assert permissions_redis.fetch_role.call_count == 3
+
+
+def test_permissions_are_not_cached_without_keyspace_notifications(permissions_redis):
+    permissions_redis.config_get.return_value = {"notify-keyspace-events": ""}
+    rbac.reset_permission_cache()
+    permissions_redis.hget.return_value = json.dumps({"view": True, "edit": True})
+
+    RBAC("developerPlugins", ["edit"]).check_permissions("user_1", PROJECT_ID)
+    permissions_redis.hget.return_value = json.dumps({"view": True})
+
+    with pytest.raises(HTTPException):
+        RBAC("developerPlugins", ["edit"]).check_permissions("user_1", PROJECT_ID)
+    assert permissions_redis.hget.call_count == 2
+    permissions_redis.hget.assert_called_with(R_KEY, "developerPlugins")
+    permissions_redis.hgetall.assert_not_called()
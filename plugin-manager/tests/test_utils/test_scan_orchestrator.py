@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from scripts.utils.scan_orchestrator import ScanOrchestrator, source_tree_digest
+
+TIMEOUTS = {"antivirus": 5, "sonarqube": 5}
+
+
+class FakeScanCache:
+    def __init__(self, results=None):
+        self.results = results or {}
+
+    def get_result(self, scanner, digest, max_age_seconds):
+        return self.results.get((scanner, digest))
+
+    def save_result(self, scanner, digest, result):
+        self.results[(scanner, digest)] = result
+
+
+@pytest.fixture
+def source_tree(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "main.py").write_text("print('hello')")
+    (tmp_path / "Dockerfile").write_text("FROM python:3.11")
+    return tmp_path
+
+
+def test_source_tree_digest_tracks_content_and_ignores_git(source_tree):
+    digest = source_tree_digest(source_tree)
+    (source_tree / ".git").mkdir()
+    (source_tree / ".git" / "HEAD").write_text("ref: refs/heads/main")
+    assert source_tree_digest(source_tree) == digest
+    (source_tree / "app" / "main.py").write_text("print('changed')")
+    assert source_tree_digest(source_tree) != digest
+
+
+def test_run_executes_scans_concurrently():
+    orchestrator = ScanOrchestrator()
+
+    def slow_scan():
+        time.sleep(0.3)
+        return {"total": 0}
+
+    started = time.monotonic()
+    outcomes = orchestrator.run({"antivirus": slow_scan, "sonarqube": slow_scan}, TIMEOUTS)
+    assert time.monotonic() - started < 0.55
+    assert {outcome.status for outcome in outcomes.values()} == {"completed"}
+
+
+def test_run_reports_timeout_and_errors():
+    orchestrator = ScanOrchestrator()
+
+    def failing_scan():
+        raise ValueError("scanner unavailable")
+
+    outcomes = orchestrator.run(
+        {"antivirus": lambda: time.sleep(1), "sonarqube": failing_scan}, {"antivirus": 0.1, "sonarqube": 5}
+    )
+    assert outcomes["antivirus"].status == "timeout"
+    assert outcomes["sonarqube"].status == "error"
+    assert isinstance(outcomes["sonarqube"].exception, ValueError)
+
+
+def test_run_caches_completed_results_by_digest():
+    cache = FakeScanCache()
+    orchestrator = ScanOrchestrator(cache=cache)
+    calls = []
+
+    def scan():
+        calls.append(1)
+        return {"Infected files": "0"}
+
+    first = orchestrator.run({"antivirus": scan, "sonarqube": lambda: None}, TIMEOUTS, digest="abc")
+    second = orchestrator.run({"antivirus": scan}, TIMEOUTS, digest="abc")
+    assert len(calls) == 1
+    assert first["sonarqube"].status == "skipped"
+    assert ("sonarqube", "abc") not in cache.results
+    assert second["antivirus"].cached
+    assert second["antivirus"].result == {"Infected files": "0"}
+
+
+def test_run_without_digest_skips_cache():
+    cache = FakeScanCache({("antivirus", None): {"Infected files": "1"}})
+    outcomes = ScanOrchestrator(cache=cache).run({"antivirus": lambda: {"Infected files": "0"}}, TIMEOUTS)
+    assert outcomes["antivirus"].result == {"Infected files": "0"}
+    assert not outcomes["antivirus"].cached
+
+
+def test_run_cancels_timed_out_scans_and_waits_for_them_to_stop():
+    stopped = threading.Event()
+    reports = []
+
+    def stuck_scan():
+        stopped.wait(5)
+        reports.append("late status")
+
+    outcomes = ScanOrchestrator().run({"trivy": stuck_scan}, {"trivy": 0.1}, cancellations={"trivy": stopped.set})
+    assert outcomes["trivy"].status == "timeout"
+    assert stopped.is_set()
+    # The scan wound down before its verdict was returned, so it cannot report after it
+    assert reports == ["late status"]
@@ -0,0 +1,29 @@
+import anyio
+import anyio.to_thread
+
+from scripts.utils.stream_util import AsyncIteratorReader
+
+
+async def body():
+    for chunk in (b"abc", b"", b"defg", b"h"):
+        yield chunk
+
+
+def test_reader_returns_the_body_in_the_requested_sizes():
+    async def read_all():
+        reader = AsyncIteratorReader(body())
+        parts = []
+        while part := await anyio.to_thread.run_sync(reader.read, 3):
+            parts.append(part)
+        return parts, reader.bytes_read
+
+    parts, bytes_read = anyio.run(read_all)
+    assert parts == [b"abc", b"def", b"gh"]
+    assert bytes_read == 8
+
+
+def test_reader_reads_everything_without_a_size():
+    async def read_all():
+        return await anyio.to_thread.run_sync(AsyncIteratorReader(body()).read)
+
+    assert anyio.run(read_all) == b"abcdefgh"
@@ -1,5 +1,19 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from scripts.utils.mongo_utils import close_mongo_client
+from scripts.utils.postgres_utils import close_postgres_pools, open_postgres_pools
+from scripts.utils.redis_utils import close_async_redis_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_postgres_pools()
+    try:
+        yield
+    finally:
+        await close_postgres_pools()
+        await close_async_redis_client()
+        close_mongo_client()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="UPI Transaction API")
+    app = FastAPI(title="UPI Transaction API", lifespan=lifespan)
     return app
@@ -0,0 +1,99 @@
+"""
+Latency percentiles of concurrent searches through the shared async pool, against one fresh connection per search.
+
+Run from postgres_system with the service's .env:
+    python -m benchmarks.search_p99 --searches 500 --concurrency 50
+
+Every search filters on a different minimum amount, so none of them is answered from the Redis cache.
+"""
+import argparse
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+import psycopg
+from psycopg.rows import dict_row
+from constants.app_configuration import config
+from scripts.handler import postgres_handler
+from scripts.utils.postgres_utils import async_postgres_pool, close_postgres_pools, open_postgres_pools, pool_metrics
+from scripts.utils.redis_utils import close_async_redis_client
+
+@asynccontextmanager
+async def fresh_connection():
+    async with await psycopg.AsyncConnection.connect(config.DATABASE_URL, row_factory=dict_row) as conn:
+        yield conn
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def search_bodies(count: int, index_type: str, page_size: int) -> list:
+    return [
+        {
+            "index_type": index_type,
+            "filter": {"min_amount": round(random.uniform(0, 10), 6)},
+            "pagination": {"page": 1, "page_size": page_size},
+            "count": "approximate",
+        }
+        for _ in range(count)
+    ]
+
+async def run_searches(searches: list, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def search(body: dict):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            result = await postgres_handler.fetch_upi_data_postgres(body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if "error" in result:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(search(body) for body in searches))
+    elapsed = time.perf_counter() - started
+    return {
+        "searches": len(searches),
+        "errors": errors,
+        "throughput_per_s": round(len(searches) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "max_ms": round(max(latencies), 1),
+    }
+
+async def main(args: argparse.Namespace):
+    await open_postgres_pools()
+    try:
+        # Fills the pool up front, so the pooled run measures borrowing connections rather than opening them
+        await async_postgres_pool.wait()
+        results = {}
+        if args.mode in ("pooled", "both"):
+            searches = search_bodies(args.searches, args.index_type, args.page_size)
+            results["pooled"] = await run_searches(searches, args.concurrency)
+            results["pooled"]["pool"] = pool_metrics(async_postgres_pool)
+        if args.mode in ("fresh", "both"):
+            searches = search_bodies(args.searches, args.index_type, args.page_size)
+            pooled_connection = postgres_handler.get_async_postgres_connection
+            postgres_handler.get_async_postgres_connection = fresh_connection
+            try:
+                results["fresh"] = await run_searches(searches, args.concurrency)
+            finally:
+                postgres_handler.get_async_postgres_connection = pooled_connection
+        for mode, result in results.items():
+            print(mode, result)
+    finally:
+        await close_postgres_pools()
+        await close_async_redis_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--index-type", choices=["indexed", "unindexed"], default="indexed")
+    parser.add_argument("--mode", choices=["pooled", "fresh", "both"], default="both")
+    asyncio.run(main(parser.parse_args()))
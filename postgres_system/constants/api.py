@@ -2,4 +2,6 @@ class Endpoints:
     READ_TRANSACTIONS = "/postgres/transactions/read"
     READ_TRANSACTIONS_MONGO = "/mongo/transactions/read"
     BULK_UPLOAD = "/mongo/upload"
-    BULK_UPLOAD_MONGO = "/postgres/upload"
\ No newline at end of file
+    BULK_UPLOAD_MONGO = "/postgres/upload"
+    BULK_UPLOAD_PROGRESS = "/postgres/upload/progress"
+    POOL_METRICS = "/metrics/pools"
@@ -7,6 +7,15 @@ class AppConfig(BaseSettings):
     MONGODB_COLLECTION_UNINDEXED: str
     MONGODB_COLLECTION_INDEXED: str
     UPSTASH_REDIS_REST_URL: str
+    PG_POOL_MIN_SIZE: int = 2
+    PG_POOL_MAX_SIZE: int = 10
+    PG_POOL_TIMEOUT: float = 30
+    PG_POOL_MAX_IDLE: float = 300
+    MONGODB_MAX_POOL_SIZE: int = 50
+    # "atlas" uses the Atlas Search index, "local" a text index or regexes on a plain mongod
+    MONGODB_SEARCH_BACKEND: str = "atlas"
+    MONGODB_SEARCH_INDEX: str = "default"
+    MONGODB_SEARCH_WORKERS: int = 8
 
     class Config:
         env_file = ".env"
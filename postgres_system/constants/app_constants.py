@@ -15,3 +15,15 @@ ALLOWED_SORT_FIELDS = [
 
 DEFAULT_SORT_FIELD = "timestamp"
 DEFAULT_SORT_ORDER = "desc"
+KEYSET_TIEBREAKER_FIELD = "transaction_id"
+POSTGRES_COUNT_MODES = ["exact", "approximate", "none"]
+
+MONGO_SEARCH_FIELDS = ["sender_bank", "sender_state", "transaction_status"]
+MONGO_SUGGESTION_LIMIT = 5
+MONGO_TEXT_INDEX_CHECK_TTL = 300
+
+INGEST_SAMPLE_ROWS = 1000
+INGEST_CHUNK_ROWS = 50000
+INGEST_REJECT_DIR = "rejects"
+INGEST_PROGRESS_KEY_PREFIX = "upi_pg_ingest:"
+INGEST_PROGRESS_TTL = 86400
@@ -1,12 +1,27 @@
 from scripts.utils.mongo_utils import get_mongo_db
-from scripts.utils.redis_utils import get_cache, set_cache
+from scripts.utils.redis_utils import get_cache, set_cache, get_table_version, bump_table_version
 from constants.app_configuration import config
-from constants.app_constants import DEFAULT_PAGE, DEFAULT_PAGE_SIZE
+from constants.app_constants import (
+    DEFAULT_PAGE,
+    DEFAULT_PAGE_SIZE,
+    MONGO_SEARCH_FIELDS,
+    MONGO_SUGGESTION_LIMIT,
+    MONGO_TEXT_INDEX_CHECK_TTL
+)
+from bson import json_util
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import UploadFile
+import base64
 import json
 import csv
 import io
 import hashlib
+import re
+import time
+
+# The suggestion, page and count pipelines of a search are independent, so they run side by side
+search_executor = ThreadPoolExecutor(max_workers=config.MONGODB_SEARCH_WORKERS, thread_name_prefix="mongo-search")
+_text_index_checked = {}
 
 def serialize_doc(doc):
     doc["_id"] = str(doc["_id"])
@@ -37,11 +52,94 @@ def handle_mongo_upload(collection_name: str, file: UploadFile) -> dict:
             return {"error": "No valid documents to insert."}
 
         result = collection.insert_many(documents)
+        bump_table_version(collection_name)
         return {"inserted_count": len(result.inserted_ids)}
 
     except Exception as e:
         return {"error": str(e)}
 
+def has_text_index(collection) -> bool:
+    checked = _text_index_checked.get(collection.name)
+    if checked and time.monotonic() - checked[0] < MONGO_TEXT_INDEX_CHECK_TTL:
+        return checked[1]
+    found = any(
+        "text" in dict(index["key"]).values() for index in collection.index_information().values()
+    )
+    _text_index_checked[collection.name] = (time.monotonic(), found)
+    return found
+
+def build_text_search_stage(collection, query_text: str) -> dict:
+    if config.MONGODB_SEARCH_BACKEND == "atlas":
+        return {
+            "$search": {
+                "index": config.MONGODB_SEARCH_INDEX,
+                "text": {"query": query_text, "path": MONGO_SEARCH_FIELDS}
+            }
+        }
+    # A plain mongod has no $search, a text index is the closest match and regexes work without one
+    if has_text_index(collection):
+        return {"$match": {"$text": {"$search": query_text}}}
+    pattern = re.escape(query_text)
+    return {"$match": {"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in MONGO_SEARCH_FIELDS]}}
+
+def build_suggestion_pipeline(field: str, query_text: str) -> list:
+    if config.MONGODB_SEARCH_BACKEND == "atlas":
+        return [
+            {
+                "$search": {
+                    "index": config.MONGODB_SEARCH_INDEX,
+                    "autocomplete": {
+                        "query": query_text,
+                        "path": field,
+                        "fuzzy": { "maxEdits": 1 }
+                    }
+                }
+            },
+            {"$limit": MONGO_SUGGESTION_LIMIT},
+            {"$project": { "_id": 0, field: 1 }}
+        ]
+    return [
+        {"$match": {field: {"$regex": f"^{re.escape(query_text)}", "$options": "i"}}},
+        {"$group": {"_id": f"${field}"}},
+        {"$limit": MONGO_SUGGESTION_LIMIT},
+        {"$project": {"_id": 0, field: "$_id"}}
+    ]
+
+def fetch_suggestions(collection, query_text: str) -> dict:
+    futures = [
+        search_executor.submit(lambda f=field: list(collection.aggregate(build_suggestion_pipeline(f, query_text))))
+        for field in MONGO_SEARCH_FIELDS
+    ]
+
+    unique_suggestions = {}
+    for future in futures:
+        for item in future.result():
+            for field, value in item.items():
+                if field not in unique_suggestions:
+                    unique_suggestions[field] = set()
+                unique_suggestions[field].add(value)
+
+    return {
+        field: list(values) for field, values in unique_suggestions.items()
+    }
+
+def encode_mongo_cursor(doc: dict, fields: list) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps([doc.get(field) for field in fields]).encode()).decode()
+
+def decode_mongo_cursor(cursor: str, fields: list) -> list:
+    values = json_util.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError("Invalid pagination cursor.")
+    return values
+
+def build_mongo_keyset_match(sort_fields: dict, values: list) -> dict:
+    clauses = []
+    for i, (field, direction) in enumerate(sort_fields.items()):
+        clause = {prev_field: values[j] for j, prev_field in enumerate(list(sort_fields)[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
 def fetch_upi_data_mongo(search: dict):
     filters = search.get("filter", {})
     pagination = search.get("pagination", {})
@@ -49,55 +147,30 @@ def fetch_upi_data_mongo(search: dict):
     query_text = search.get("query", "")
     index_type = search.get("index_type", "indexed")
     suggest = search.get("suggest", False)
+    include_facets = search.get("facets", False)
+    count_mode = search.get("count", "exact")
 
     try:
+        if index_type == "indexed":
+            collection_name = config.MONGODB_COLLECTION_INDEXED
+        else:
+            collection_name = config.MONGODB_COLLECTION_UNINDEXED
+
         cache_key_raw = json.dumps(search, sort_keys=True)
-        cache_key = "upi_mongo_cache:" + hashlib.sha256(cache_key_raw.encode()).hexdigest()
+        cache_key = (
+            f"upi_mongo_cache:{collection_name}:v{get_table_version(collection_name)}:"
+            + hashlib.sha256(cache_key_raw.encode()).hexdigest()
+        )
 
         cached_result = get_cache(cache_key)
         if cached_result:
             return cached_result
 
         db = get_mongo_db()
-        if index_type == "indexed":
-            collection_name = config.MONGODB_COLLECTION_INDEXED
-        else:
-            collection_name = config.MONGODB_COLLECTION_UNINDEXED
         collection = db[collection_name]
 
         if suggest and query_text:
-            suggestion_fields = ["sender_bank", "sender_state", "transaction_status"]
-            suggestions = []
-
-            for field in suggestion_fields:
-                pipeline = [
-                    {
-                        "$search": {
-                            "index": "default",
-                            "autocomplete": {
-                                "query": query_text,
-                                "path": field,
-                                "fuzzy": { "maxEdits": 1 }
-                            }
-                        }
-                    },
-                    {"$limit": 5},
-                    {"$project": { "_id": 0, field: 1 }}
-                ]
-                results = list(collection.aggregate(pipeline))
-                suggestions.extend(results)
-
-            unique_suggestions = {}
-            for item in suggestions:
-                for field, value in item.items():
-                    if field not in unique_suggestions:
-                        unique_suggestions[field] = set()
-                    unique_suggestions[field].add(value)
-
-            flat_suggestions = {
-                field: list(values) for field, values in unique_suggestions.items()
-            }
-
+            flat_suggestions = fetch_suggestions(collection, query_text)
             set_cache(cache_key, {"suggestions": flat_suggestions})
             return {"suggestions": flat_suggestions}
 
@@ -117,50 +190,73 @@ def fetch_upi_data_mongo(search: dict):
         if amount_range:
             query["amount_inr"] = amount_range
 
-        pipeline = []
-
+        match_pipeline = []
         if query_text:
-            pipeline.append({
-                "$search": {
-                    "index": "default",
-                    "text": {
-                        "query": query_text,
-                        "path": ["sender_bank", "sender_state", "transaction_status"]
-                    }
-                }
-            })
-
+            match_pipeline.append(build_text_search_stage(collection, query_text))
         if query:
-            pipeline.append({ "$match": query })
+            match_pipeline.append({ "$match": query })
 
         sort_fields = {}
         for rule in sorting:
             field = rule.get("field")
             order = rule.get("order", "asc")
-            if field:
+            if field and field != "_id":
                 sort_fields[field] = 1 if order == "asc" else -1
-        if sort_fields:
-            pipeline.append({ "$sort": sort_fields })
+        # _id makes the order total, so a cursor always resumes right after the last document it saw
+        sort_fields["_id"] = list(sort_fields.values())[-1] if sort_fields else 1
 
         limit = pagination.get("page_size", DEFAULT_PAGE_SIZE)
         page = pagination.get("page", DEFAULT_PAGE)
-        skip = (page - 1) * limit
+        cursor = pagination.get("cursor")
+
+        page_pipeline = list(match_pipeline)
+        if cursor:
+            cursor_values = decode_mongo_cursor(cursor, list(sort_fields))
+            page_pipeline.append({"$match": build_mongo_keyset_match(sort_fields, cursor_values)})
+        page_pipeline.append({ "$sort": sort_fields })
+        if not cursor:
+            page_pipeline.append({ "$skip": (page - 1) * limit })
+        page_pipeline.append({ "$limit": limit + 1 })
 
-        pipeline.extend([
-            { "$skip": skip },
-            { "$limit": limit }
-        ])
+        # Count and facets share one pass over the matches, next to the page query
+        meta_stages = {}
+        if count_mode != "none":
+            meta_stages["count"] = [{"$count": "count"}]
+        if include_facets:
+            for facet_field in MONGO_SEARCH_FIELDS:
+                meta_stages[facet_field] = [{"$sortByCount": f"${facet_field}"}]
 
-        results = list(collection.aggregate(pipeline))
-        count = collection.count_documents(query)
+        page_future = search_executor.submit(lambda: list(collection.aggregate(page_pipeline)))
+        meta_future = None
+        if meta_stages:
+            meta_future = search_executor.submit(
+                lambda: next(collection.aggregate(match_pipeline + [{"$facet": meta_stages}]), {})
+            )
+
+        results = page_future.result()
+        meta = meta_future.result() if meta_future else {}
+
+        next_cursor = encode_mongo_cursor(results[limit - 1], list(sort_fields)) if len(results) > limit else None
+        count = None
+        if count_mode != "none":
+            count = meta["count"][0]["count"] if meta.get("count") else 0
 
         final_result = {
-            "data": [serialize_doc(doc) for doc in results],
+            "data": [serialize_doc(doc) for doc in results[:limit]],
             "count": count,
-            "page": page,
-            "page_size": limit
+            "page": None if cursor else page,
+            "page_size": limit,
+            "next_cursor": next_cursor
         }
 
+        if include_facets:
+            final_result["facets"] = {
+                facet_field: [
+                    {facet_field: row["_id"], "count": row["count"]} for row in meta.get(facet_field, [])
+                ]
+                for facet_field in MONGO_SEARCH_FIELDS
+            }
+
         set_cache(cache_key, final_result)
         return final_result
 
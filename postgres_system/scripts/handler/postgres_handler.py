@@ -1,13 +1,26 @@
+import base64
+import codecs
 import hashlib
+import itertools
 import json
 import csv
-import io
+import os
 import re
+import time
+import uuid
 from decimal import Decimal
 from datetime import datetime
+import psycopg
+from psycopg import sql
 from fastapi import UploadFile
-from scripts.utils.postgres_utils import get_postgres_connection
-from scripts.utils.redis_utils import get_cache, set_cache
+from scripts.utils.postgres_utils import get_async_postgres_connection, get_postgres_connection
+from scripts.utils.redis_utils import (
+    bump_table_version,
+    get_cache_async,
+    get_table_version_async,
+    set_cache,
+    set_cache_async,
+)
 from constants.app_constants import (
     INDEXED_TABLE_NAME,
     TABLE_NAME,
@@ -15,7 +28,14 @@ from constants.app_constants import (
     DEFAULT_PAGE_SIZE,
     ALLOWED_SORT_FIELDS,
     DEFAULT_SORT_FIELD,
-    DEFAULT_SORT_ORDER
+    DEFAULT_SORT_ORDER,
+    INGEST_SAMPLE_ROWS,
+    INGEST_CHUNK_ROWS,
+    INGEST_REJECT_DIR,
+    INGEST_PROGRESS_KEY_PREFIX,
+    INGEST_PROGRESS_TTL,
+    KEYSET_TIEBREAKER_FIELD,
+    POSTGRES_COUNT_MODES
 )
 
 def serialize_postgres_row(row):
@@ -67,68 +87,241 @@ def infer_type(values):
 
     return "TEXT"
 
+INTEGER_RANGE = (-2**31, 2**31 - 1)
+
+def convert_integer(val):
+    number = int(val)
+    if not INTEGER_RANGE[0] <= number <= INTEGER_RANGE[1]:
+        raise ValueError(f"integer out of range: {val}")
+    return number
+
+def convert_boolean(val):
+    lowered = val.lower()
+    if lowered not in ("true", "false"):
+        raise ValueError(f"invalid boolean: {val}")
+    return lowered == "true"
+
+TYPE_CONVERTERS = {
+    "INTEGER": convert_integer,
+    "FLOAT": float,
+    "BOOLEAN": convert_boolean,
+    "TIMESTAMP": datetime.fromisoformat,
+    "TEXT": str,
+}
+
+def convert_row(row, converters):
+    if len(row) != len(converters):
+        raise ValueError(f"expected {len(converters)} columns, found {len(row)}")
+    values = []
+    for val, converter in zip(row, converters):
+        if converter is str:
+            values.append(val)
+        elif val.strip() == "":
+            values.append(None)
+        else:
+            values.append(converter(val.strip()))
+    return values
+
+class RejectWriter:
+    def __init__(self, table_name: str):
+        # Unique per writer, so uploads into the same table within the same second keep their own rejects
+        self.path = os.path.join(
+            INGEST_REJECT_DIR,
+            f"{table_name}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{os.getpid()}-{uuid.uuid4().hex[:8]}.csv",
+        )
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line_number: int, row, reason: str):
+        if self._writer is None:
+            os.makedirs(INGEST_REJECT_DIR, exist_ok=True)
+            self._file = open(self.path, "x", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["line_number", "error", "row"])
+        self._writer.writerow([line_number, reason, json.dumps(row)])
+        self.count += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+def report_ingest_progress(table_name: str, progress: dict):
+    print(f"Ingest into {table_name}: {progress['inserted_rows']} rows loaded, {progress['rejected_rows']} rejected")
+    try:
+        set_cache(f"{INGEST_PROGRESS_KEY_PREFIX}{table_name}", progress, ttl=INGEST_PROGRESS_TTL)
+    except Exception as e:
+        print("Failed to publish ingest progress:", str(e))
+
+def copy_chunk(conn, copy_sql, insert_sql, chunk, rejects: RejectWriter) -> int:
+    try:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                with cur.copy(copy_sql) as copy:
+                    for _, _, values in chunk:
+                        copy.write_row(values)
+        return len(chunk)
+    except psycopg.Error:
+        pass
+
+    # The server rejected something the client side checks let through: retry the chunk row by row
+    inserted = 0
+    with conn.cursor() as cur:
+        for line_number, row, values in chunk:
+            try:
+                with conn.transaction():
+                    cur.execute(insert_sql, values)
+                inserted += 1
+            except psycopg.Error as e:
+                rejects.write(line_number, row, str(e).strip())
+    return inserted
+
 def handle_postgres_bulk_upload_auto_infer(table_name: str, file: UploadFile) -> dict:
+    rejects = RejectWriter(table_name)
     try:
-        content = file.file.read().decode("utf-8")
-        reader = csv.reader(io.StringIO(content))
-        rows = list(reader)
+        started = time.monotonic()
+        # SpooledTemporaryFile has no readable() before Python 3.11, so it cannot be wrapped in a TextIOWrapper
+        reader = csv.reader(codecs.iterdecode(file.file, "utf-8"))
+        raw_headers = next(reader, None)
+        sample_rows = list(itertools.islice(reader, INGEST_SAMPLE_ROWS))
 
-        if not rows or len(rows) < 2:
+        if not raw_headers or not sample_rows:
             return {"error": "CSV must have header and data rows."}
 
-        raw_headers = rows[0]
-        data_rows = rows[1:]
         column_names = [standardize_column_name(h) for h in raw_headers]
-
-        columns_data = list(zip(*data_rows))
-        sample_limit = min(100, len(data_rows))
-
-        inferred_types = [
-            infer_type(col[:sample_limit]) for col in columns_data
-        ]
-
-        column_defs = ", ".join(
-            f"{name} {dtype}" for name, dtype in zip(column_names, inferred_types)
+        columns_data = list(zip(*(row for row in sample_rows if len(row) == len(column_names))))
+        inferred_types = [infer_type(col) for col in columns_data] if columns_data else ["TEXT"] * len(column_names)
+        converters = [TYPE_CONVERTERS[dtype] for dtype in inferred_types]
+
+        table = sql.Identifier(table_name)
+        columns = sql.SQL(", ").join(sql.Identifier(name) for name in column_names)
+        column_defs = sql.SQL(", ").join(
+            sql.SQL("{} {}").format(sql.Identifier(name), sql.SQL(dtype))
+            for name, dtype in zip(column_names, inferred_types)
+        )
+        create_table_sql = sql.SQL("CREATE TABLE IF NOT EXISTS {} ({})").format(table, column_defs)
+        copy_sql = sql.SQL("COPY {} ({}) FROM STDIN").format(table, columns)
+        insert_sql = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
+            table, columns, sql.SQL(", ").join(sql.Placeholder() * len(column_names))
         )
 
-        create_table_sql = f"CREATE TABLE IF NOT EXISTS {table_name} ({column_defs});"
-        placeholders = ", ".join(["%s"] * len(column_names))
-        insert_sql = f"INSERT INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders})"
-
-        conn = get_postgres_connection()
-        cur = conn.cursor()
-
-        cur.execute(create_table_sql)
-        cur.executemany(insert_sql, data_rows)
-
-        conn.commit()
-        conn.close()
+        inserted_rows = 0
+        try:
+            with get_postgres_connection() as conn:
+                with conn.transaction():
+                    conn.execute(create_table_sql)
+
+                chunk = []
+                for line_number, row in enumerate(itertools.chain(sample_rows, reader), start=2):
+                    try:
+                        chunk.append((line_number, row, convert_row(row, converters)))
+                    except ValueError as e:
+                        rejects.write(line_number, row, str(e))
+                        continue
+                    if len(chunk) >= INGEST_CHUNK_ROWS:
+                        inserted_rows += copy_chunk(conn, copy_sql, insert_sql, chunk, rejects)
+                        chunk = []
+                        report_ingest_progress(
+                            table_name,
+                            {"status": "loading", "inserted_rows": inserted_rows, "rejected_rows": rejects.count}
+                        )
+                if chunk:
+                    inserted_rows += copy_chunk(conn, copy_sql, insert_sql, chunk, rejects)
+        finally:
+            if inserted_rows:
+                bump_table_version(table_name)
 
-        return {
+        result = {
             "message": "Bulk upload successful.",
             "table": table_name,
             "columns": [
                 {"name": n, "type": t} for n, t in zip(column_names, inferred_types)
             ],
-            "inserted_rows": len(data_rows)
+            "inserted_rows": inserted_rows,
+            "rejected_rows": rejects.count,
+            "reject_file": rejects.path if rejects.count else None,
+            "duration_seconds": round(time.monotonic() - started, 2)
         }
+        report_ingest_progress(table_name, {"status": "completed", **result})
+        return result
 
     except Exception as e:
+        report_ingest_progress(table_name, {"status": "failed", "error": str(e), "rejected_rows": rejects.count})
         return {"error": str(e)}
-
-def fetch_upi_data_postgres(search: dict):
+    finally:
+        rejects.close()
+
+async def get_postgres_bulk_upload_progress(table_name: str) -> dict:
+    progress = await get_cache_async(f"{INGEST_PROGRESS_KEY_PREFIX}{table_name}")
+    return progress or {"error": f"No upload in progress for table {table_name}."}
+
+def encode_cursor(row: dict, fields: list) -> str:
+    # Values travel as text so Postgres casts them back to the column type, keeping numerics exact
+    values = [
+        row[field] if row[field] is None or isinstance(row[field], (int, str)) else str(row[field])
+        for field in fields
+    ]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor: str, fields: list) -> list:
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError("Invalid pagination cursor.")
+    return values
+
+def build_sort_rules(sorting: list) -> list:
+    sort_rules = [
+        (rule["field"], "ASC" if rule.get("order", "asc") == "asc" else "DESC")
+        for rule in sorting if rule.get("field") in ALLOWED_SORT_FIELDS
+    ] or [(DEFAULT_SORT_FIELD, DEFAULT_SORT_ORDER.upper())]
+    # The tiebreaker makes the order total, so a cursor always resumes right after the last row it saw
+    sort_rules = [rule for rule in sort_rules if rule[0] != KEYSET_TIEBREAKER_FIELD]
+    sort_rules.append((KEYSET_TIEBREAKER_FIELD, sort_rules[-1][1] if sort_rules else "ASC"))
+    return sort_rules
+
+def build_keyset_clause(sort_rules: list, values: list):
+    # A single row comparison can use a composite index when every column sorts the same way
+    if len({direction for _, direction in sort_rules}) == 1:
+        fields = ", ".join(field for field, _ in sort_rules)
+        placeholders = ", ".join(["%s"] * len(sort_rules))
+        operator = ">" if sort_rules[0][1] == "ASC" else "<"
+        return f"({fields}) {operator} ({placeholders})", list(values)
+
+    clauses = []
+    params = []
+    for i, (field, direction) in enumerate(sort_rules):
+        equal_prefix = [f"{prev_field} = %s" for prev_field, _ in sort_rules[:i]]
+        comparison = f"{field} {'>' if direction == 'ASC' else '<'} %s"
+        clauses.append("(" + " AND ".join(equal_prefix + [comparison]) + ")")
+        params += list(values[:i]) + [values[i]]
+    return "(" + " OR ".join(clauses) + ")", params
+
+async def estimate_count(cur, table_name: str, where_sql: str, params: list) -> int:
+    await cur.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table_name} {where_sql}", params)
+    plan = (await cur.fetchone())["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def fetch_upi_data_postgres(search: dict):
     filters = search.get("filter", {})
     pagination = search.get("pagination", {})
     sorting = search.get("sort", [])
     index_type = search.get("index_type", "indexed")
     include_facets = search.get("facets", False)
     query_text = search.get("query", "")
+    count_mode = search.get("count", "exact")
+    if count_mode not in POSTGRES_COUNT_MODES:
+        return {"error": f"Invalid count mode {count_mode!r}, expected one of: {', '.join(POSTGRES_COUNT_MODES)}."}
 
     table_name = INDEXED_TABLE_NAME if index_type == "indexed" else TABLE_NAME
 
     cache_key_raw = json.dumps(search, sort_keys=True)
-    cache_key = "upi_pg_cache:" + hashlib.sha256(cache_key_raw.encode()).hexdigest()
-    cached = get_cache(cache_key)
+    cache_key = (
+        f"upi_pg_cache:{table_name}:v{await get_table_version_async(table_name)}:"
+        + hashlib.sha256(cache_key_raw.encode()).hexdigest()
+    )
+    cached = await get_cache_async(cache_key)
     if cached:
         return cached
 
@@ -163,58 +356,71 @@ def fetch_upi_data_postgres(search: dict):
 
     limit = pagination.get("page_size", DEFAULT_PAGE_SIZE)
     page = pagination.get("page", DEFAULT_PAGE)
+    cursor = pagination.get("cursor")
     offset = (page - 1) * limit
 
-    sort_clause = "ORDER BY " + ", ".join(
-        f"{rule['field']} {'ASC' if rule.get('order', 'asc') == 'asc' else 'DESC'}"
-        for rule in sorting if rule.get("field") in ALLOWED_SORT_FIELDS
-    ) if sorting else f"ORDER BY {DEFAULT_SORT_FIELD} {DEFAULT_SORT_ORDER.upper()}"
-
-    query = f"""
-        SELECT * FROM {table_name}
-        {where_sql}
-        {sort_clause}
-        LIMIT %s OFFSET %s
-    """
-    params += [limit, offset]
+    sort_rules = build_sort_rules(sorting)
+    sort_fields = [field for field, _ in sort_rules]
+    sort_clause = "ORDER BY " + ", ".join(f"{field} {direction}" for field, direction in sort_rules)
 
     try:
-        conn = get_postgres_connection()
-        cur = conn.cursor()
-
-        cur.execute(query, params)
-        data = [serialize_postgres_row(dict(row)) for row in cur.fetchall()]
-
-        count_query = f"SELECT COUNT(*) FROM {table_name} {where_sql}"
-        cur.execute(count_query, params[:-2])  # Exclude limit & offset
-        count = cur.fetchone()["count"]
-
-        facets = {}
-        if include_facets:
-            for facet_field in ["sender_state", "sender_bank", "transaction_status"]:
-                facet_query = f"""
-                    SELECT {facet_field}, COUNT(*) as count
-                    FROM {table_name}
-                    {where_sql}
-                    GROUP BY {facet_field}
-                    ORDER BY count DESC
-                """
-                cur.execute(facet_query, params[:-2])
-                facets[facet_field] = [dict(row) for row in cur.fetchall()]
-
-        conn.close()
+        page_where_sql = where_sql
+        page_params = list(params)
+        if cursor:
+            keyset_sql, keyset_params = build_keyset_clause(sort_rules, decode_cursor(cursor, sort_fields))
+            page_where_sql = f"{where_sql} AND {keyset_sql}" if where_sql else f"WHERE {keyset_sql}"
+            page_params += keyset_params
+            offset = 0
+
+        query = f"""
+            SELECT * FROM {table_name}
+            {page_where_sql}
+            {sort_clause}
+            LIMIT %s OFFSET %s
+        """
+        page_params += [limit + 1, offset]
+
+        # The search statements only vary with the filters used, so they are prepared once per pooled connection
+        async with get_async_postgres_connection() as conn, conn.cursor() as cur:
+            await cur.execute(query, page_params, prepare=True)
+            rows = await cur.fetchall()
+            next_cursor = encode_cursor(rows[limit - 1], sort_fields) if len(rows) > limit else None
+            data = [serialize_postgres_row(dict(row)) for row in rows[:limit]]
+
+            count = None
+            if count_mode == "approximate":
+                count = await estimate_count(cur, table_name, where_sql, params)
+            elif count_mode != "none":
+                count_query = f"SELECT COUNT(*) FROM {table_name} {where_sql}"
+                await cur.execute(count_query, params, prepare=True)
+                count = (await cur.fetchone())["count"]
+
+            facets = {}
+            if include_facets:
+                for facet_field in ["sender_state", "sender_bank", "transaction_status"]:
+                    facet_query = f"""
+                        SELECT {facet_field}, COUNT(*) as count
+                        FROM {table_name}
+                        {where_sql}
+                        GROUP BY {facet_field}
+                        ORDER BY count DESC
+                    """
+                    await cur.execute(facet_query, params, prepare=True)
+                    facets[facet_field] = [dict(row) for row in await cur.fetchall()]
 
         result = {
             "data": data,
             "count": count,
-            "page": page,
-            "page_size": limit
+            "count_type": count_mode,
+            "page": None if cursor else page,
+            "page_size": limit,
+            "next_cursor": next_cursor
         }
 
         if include_facets:
             result["facets"] = facets
 
-        set_cache(cache_key, result)
+        await set_cache_async(cache_key, result)
         return result
 
     except Exception as e:
@@ -7,7 +7,7 @@ from constants.api import Endpoints
 router = APIRouter()
 
 @router.post(Endpoints.READ_TRANSACTIONS_MONGO)
-async def read_upi_transactions_mongo(
+def read_upi_transactions_mongo(
     search: Annotated[str, Form()]
 ):
     try:
@@ -18,7 +18,7 @@ async def read_upi_transactions_mongo(
     return fetch_upi_data_mongo(search_dict)
 
 @router.post(Endpoints.BULK_UPLOAD_MONGO)
-async def upload_to_mongo(
+def upload_to_mongo(
     index_type: str = Form(...),
     file: UploadFile = File(...)
 ):
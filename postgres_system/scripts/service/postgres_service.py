@@ -2,7 +2,13 @@ from fastapi import APIRouter, Form, UploadFile, File
 from typing import Annotated
 import json
 from constants.api import Endpoints
-from scripts.handler.postgres_handler import handle_postgres_bulk_upload_auto_infer, fetch_upi_data_postgres
+from scripts.utils.mongo_utils import mongo_pool_metrics
+from scripts.utils.postgres_utils import async_postgres_pool, pool_metrics, postgres_pool
+from scripts.handler.postgres_handler import (
+    handle_postgres_bulk_upload_auto_infer,
+    get_postgres_bulk_upload_progress,
+    fetch_upi_data_postgres
+)
 
 router = APIRouter()
 
@@ -15,11 +21,23 @@ async def read_upi_transactions(
     except json.JSONDecodeError:
         return {"error": "Invalid JSON format in 'search' field."}
 
-    return fetch_upi_data_postgres(search_dict)
+    return await fetch_upi_data_postgres(search_dict)
 
 @router.post(Endpoints.BULK_UPLOAD)
-async def bulk_upload_postgres(
+def bulk_upload_postgres(
     table_name: str = Form(...),
     file: UploadFile = File(...)
 ):
     return handle_postgres_bulk_upload_auto_infer(table_name, file)
+
+@router.get(Endpoints.BULK_UPLOAD_PROGRESS)
+async def bulk_upload_postgres_progress(table_name: str):
+    return await get_postgres_bulk_upload_progress(table_name)
+
+@router.get(Endpoints.POOL_METRICS)
+async def connection_pool_metrics():
+    return {
+        "postgres": pool_metrics(postgres_pool),
+        "postgres_async": pool_metrics(async_postgres_pool),
+        "mongo": mongo_pool_metrics(),
+    }
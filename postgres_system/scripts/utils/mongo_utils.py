@@ -1,6 +1,90 @@
-from pymongo import MongoClient
+import threading
+import time
+from pymongo import MongoClient, monitoring
 from constants.app_configuration import config
 
+class MongoPoolStats(monitoring.ConnectionPoolListener):
+    """Counts connection checkouts of the shared client, to report pool saturation and wait time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.failed = 0
+        self.wait_ms_total = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        waited_ms = (time.monotonic() - getattr(self._local, "started", time.monotonic())) * 1000
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.checkouts += 1
+            self.wait_ms_total += waited_ms
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.failed += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def metrics(self, max_size: int) -> dict:
+        with self._lock:
+            return {
+                "pool_max": max_size,
+                "in_use": self.in_use,
+                "saturation": round(self.in_use / max_size, 3),
+                "requests_waiting": self.waiting,
+                "requests": self.checkouts,
+                "requests_timed_out": self.failed,
+                "wait_ms_total": round(self.wait_ms_total, 2),
+                "wait_ms_avg": round(self.wait_ms_total / self.checkouts, 2) if self.checkouts else 0,
+            }
+
+mongo_pool_stats = MongoPoolStats()
+# One client per process: it is thread safe and keeps its own connection pool
+mongo_client = MongoClient(
+    config.MONGODB_URI,
+    maxPoolSize=config.MONGODB_MAX_POOL_SIZE,
+    event_listeners=[mongo_pool_stats],
+    connect=False,
+)
+
 def get_mongo_db():
-    client = MongoClient(config.MONGODB_URI)
-    return client[config.MONGODB_DB]
+    return mongo_client[config.MONGODB_DB]
+
+def close_mongo_client():
+    mongo_client.close()
+
+def mongo_pool_metrics() -> dict:
+    return mongo_pool_stats.metrics(config.MONGODB_MAX_POOL_SIZE)
@@ -1,15 +1,53 @@
-import psycopg
 from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 from constants.app_configuration import config
 
+# Opened and closed by the application lifespan, each worker keeps its connections for its whole life
+POOL_SETTINGS = {
+    "min_size": config.PG_POOL_MIN_SIZE,
+    "max_size": config.PG_POOL_MAX_SIZE,
+    "timeout": config.PG_POOL_TIMEOUT,
+    "max_idle": config.PG_POOL_MAX_IDLE,
+    "kwargs": {"row_factory": dict_row},
+    "open": False,
+}
+
+postgres_pool = ConnectionPool(config.DATABASE_URL, name="postgres-sync", **POOL_SETTINGS)
+async_postgres_pool = AsyncConnectionPool(config.DATABASE_URL, name="postgres-async", **POOL_SETTINGS)
+
 def get_postgres_connection():
+    """Borrows a connection from the shared pool, to be used as a context manager that gives it back"""
+    return postgres_pool.connection()
+
+def get_async_postgres_connection():
+    return async_postgres_pool.connection()
+
+async def open_postgres_pools():
     try:
-        conn = psycopg.connect(
-            config.DATABASE_URL,
-            row_factory=dict_row
-        )
-        return conn
+        postgres_pool.open()
+        await async_postgres_pool.open()
     except Exception as e:
-        print("Failed to connect to PostgreSQL:", str(e))
+        print("Failed to open the PostgreSQL connection pools:", str(e))
         raise
 
+async def close_postgres_pools():
+    postgres_pool.close()
+    await async_postgres_pool.close()
+
+def pool_metrics(pool) -> dict:
+    stats = pool.get_stats()
+    in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    return {
+        "pool_size": stats.get("pool_size", 0),
+        "pool_max": pool.max_size,
+        "in_use": in_use,
+        "saturation": round(in_use / pool.max_size, 3),
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_timed_out": stats.get("requests_errors", 0),
+        "wait_ms_total": stats.get("requests_wait_ms", 0),
+        "wait_ms_avg": round(stats.get("requests_wait_ms", 0) / requests, 2) if requests else 0,
+        "usage_ms_total": stats.get("usage_ms", 0),
+    }
@@ -1,8 +1,11 @@
 import redis
+import redis.asyncio
 import json
 from constants.app_configuration import config
 
 redis_client = redis.Redis.from_url(config.UPSTASH_REDIS_REST_URL, decode_responses=True)
+# Used by the async routes, so a cache round trip does not block the event loop
+async_redis_client = redis.asyncio.Redis.from_url(config.UPSTASH_REDIS_REST_URL, decode_responses=True)
 
 def get_cache(key: str):
     cached = redis_client.get(key)
@@ -10,3 +13,22 @@ def get_cache(key: str):
 
 def set_cache(key: str, value: dict, ttl: int = 3600):
     redis_client.setex(key, ttl, json.dumps(value))
+
+def get_table_version(table_name: str) -> int:
+    return int(redis_client.get(f"table_version:{table_name}") or 0)
+
+def bump_table_version(table_name: str) -> int:
+    return redis_client.incr(f"table_version:{table_name}")
+
+async def get_cache_async(key: str):
+    cached = await async_redis_client.get(key)
+    return json.loads(cached) if cached else None
+
+async def set_cache_async(key: str, value: dict, ttl: int = 3600):
+    await async_redis_client.setex(key, ttl, json.dumps(value))
+
+async def get_table_version_async(table_name: str) -> int:
+    return int(await async_redis_client.get(f"table_version:{table_name}") or 0)
+
+async def close_async_redis_client():
+    await async_redis_client.aclose()
@@ -0,0 +1,9 @@
+import os
+
+# The settings are read when the app modules are imported, the tests never reach these servers
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/upi")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "upi")
+os.environ.setdefault("MONGODB_COLLECTION_UNINDEXED", "transactions")
+os.environ.setdefault("MONGODB_COLLECTION_INDEXED", "transactions_indexed")
+os.environ.setdefault("UPSTASH_REDIS_REST_URL", "redis://localhost:6379/0")
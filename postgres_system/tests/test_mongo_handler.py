@@ -0,0 +1,145 @@
+import datetime
+from unittest.mock import patch
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from constants.app_configuration import config
+from scripts.handler import mongo_handler
+from scripts.handler.mongo_handler import (
+    build_mongo_keyset_match,
+    build_text_search_stage,
+    decode_mongo_cursor,
+    encode_mongo_cursor,
+    fetch_suggestions,
+    fetch_upi_data_mongo,
+)
+
+BANKS = ["SBI", "HDFC", "ICICI"]
+STATES = ["Kerala", "Karnataka"]
+
+
+@pytest.fixture
+def collection():
+    db = mongomock.MongoClient()[config.MONGODB_DB]
+    collection = db[config.MONGODB_COLLECTION_INDEXED]
+    collection.insert_many(
+        [
+            {
+                "sender_bank": BANKS[index % 3],
+                "sender_state": STATES[index % 2],
+                "transaction_status": "SUCCESS" if index % 4 else "FAILED",
+                # Repeated amounts, so pages have to break ties on _id
+                "amount_inr": (index % 5) * 100,
+            }
+            for index in range(23)
+        ]
+    )
+    mongo_handler._text_index_checked.clear()
+    with (
+        patch.object(mongo_handler, "get_mongo_db", return_value=db),
+        patch.object(mongo_handler, "get_cache", return_value=None),
+        patch.object(mongo_handler, "set_cache"),
+        patch.object(mongo_handler, "get_table_version", return_value=0),
+        patch.object(config, "MONGODB_SEARCH_BACKEND", "local"),
+    ):
+        yield collection
+
+
+def sorted_ids(collection, sort_fields: dict, query: dict | None = None) -> list:
+    return [doc["_id"] for doc in collection.find(query or {}).sort(list(sort_fields.items()))]
+
+
+def walk_pages(search: dict) -> list:
+    ids = []
+    cursor = None
+    while True:
+        search["pagination"] = {"page_size": 4, **({"cursor": cursor} if cursor else {})}
+        result = fetch_upi_data_mongo(search)
+        assert "error" not in result
+        ids += [ObjectId(doc["_id"]) for doc in result["data"]]
+        if not (cursor := result["next_cursor"]):
+            return ids
+
+
+def test_cursor_round_trips_bson_values():
+    doc = {"_id": ObjectId(), "timestamp": datetime.datetime(2024, 5, 1, 10, 30), "amount_inr": 12.5, "bank": None}
+    fields = ["timestamp", "amount_inr", "bank", "_id"]
+    assert decode_mongo_cursor(encode_mongo_cursor(doc, fields), fields) == [doc[field] for field in fields]
+
+
+def test_cursor_for_other_sort_fields_is_rejected():
+    cursor = encode_mongo_cursor({"amount_inr": 100, "_id": ObjectId()}, ["amount_inr", "_id"])
+    with pytest.raises(ValueError):
+        decode_mongo_cursor(cursor, ["amount_inr", "sender_bank", "_id"])
+
+
+def test_keyset_match_follows_each_sort_direction():
+    assert build_mongo_keyset_match({"amount_inr": -1, "_id": 1}, [300, "id"]) == {
+        "$or": [{"amount_inr": {"$lt": 300}}, {"amount_inr": 300, "_id": {"$gt": "id"}}]
+    }
+
+
+@pytest.mark.parametrize("sort_fields", [{"amount_inr": 1, "_id": 1}, {"amount_inr": -1, "sender_bank": 1, "_id": 1}])
+def test_keyset_match_resumes_right_after_the_cursor(collection, sort_fields):
+    ordered = sorted_ids(collection, sort_fields)
+    last_seen = collection.find_one({"_id": ordered[9]})
+    match = build_mongo_keyset_match(sort_fields, [last_seen[field] for field in sort_fields])
+    assert sorted_ids(collection, sort_fields, match) == ordered[10:]
+
+
+def test_cursor_pages_cover_every_document_once(collection):
+    search = {"sort": [{"field": "amount_inr", "order": "desc"}], "count": "none"}
+    assert walk_pages(search) == sorted_ids(collection, {"amount_inr": -1, "_id": -1})
+
+
+def test_regex_fallback_without_a_text_index(collection):
+    stage = build_text_search_stage(collection, "hdfc")
+    assert stage == {
+        "$match": {"$or": [{field: {"$regex": "hdfc", "$options": "i"}} for field in mongo_handler.MONGO_SEARCH_FIELDS]}
+    }
+    ids = walk_pages({"query": "hdfc", "sort": [{"field": "amount_inr", "order": "asc"}], "count": "none"})
+    assert ids == sorted_ids(collection, {"amount_inr": 1, "_id": 1}, {"sender_bank": "HDFC"})
+
+
+def test_regex_fallback_escapes_the_query(collection):
+    collection.insert_one({"sender_bank": "A.B (Coop)", "sender_state": "Goa", "transaction_status": "SUCCESS"})
+    result = fetch_upi_data_mongo({"query": "a.b (coop", "count": "none"})
+    assert [doc["sender_bank"] for doc in result["data"]] == ["A.B (Coop)"]
+    assert fetch_upi_data_mongo({"query": "a*b", "count": "none"})["data"] == []
+
+
+def test_text_index_is_used_when_present(collection):
+    collection.create_index([("sender_bank", "text"), ("sender_state", "text")])
+    assert build_text_search_stage(collection, "sbi kerala") == {"$match": {"$text": {"$search": "sbi kerala"}}}
+
+
+def test_text_index_lookup_is_cached(collection):
+    assert "$or" in build_text_search_stage(collection, "sbi")["$match"]
+    collection.create_index([("sender_bank", "text")])
+    # Still within MONGO_TEXT_INDEX_CHECK_TTL, the new index is picked up on the next check
+    assert "$or" in build_text_search_stage(collection, "sbi")["$match"]
+    mongo_handler._text_index_checked.clear()
+    assert "$text" in build_text_search_stage(collection, "sbi")["$match"]
+
+
+def test_atlas_backend_uses_search(collection):
+    with patch.object(config, "MONGODB_SEARCH_BACKEND", "atlas"):
+        assert "$search" in build_text_search_stage(collection, "sbi")
+
+
+def test_local_suggestions_match_prefixes(collection):
+    suggestions = fetch_suggestions(collection, "k")
+    assert {field: sorted(values) for field, values in suggestions.items()} == {
+        "sender_state": ["Karnataka", "Kerala"]
+    }
+
+
+def test_count_ignores_the_cursor(collection):
+    first = fetch_upi_data_mongo({"filter": {"sender_state": "Kerala"}, "pagination": {"page_size": 5}})
+    second = fetch_upi_data_mongo(
+        {"filter": {"sender_state": "Kerala"}, "pagination": {"page_size": 5, "cursor": first["next_cursor"]}}
+    )
+    assert first["count"] == second["count"] == collection.count_documents({"sender_state": "Kerala"})
+    assert second["page"] is None
@@ -0,0 +1,185 @@
+import asyncio
+import csv
+import re
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import psycopg
+import pytest
+
+from scripts.handler import postgres_handler
+from scripts.handler.postgres_handler import (
+    TYPE_CONVERTERS,
+    RejectWriter,
+    build_keyset_clause,
+    build_sort_rules,
+    convert_integer,
+    convert_row,
+    copy_chunk,
+    decode_cursor,
+    encode_cursor,
+    fetch_upi_data_postgres,
+)
+
+CONVERTERS = [TYPE_CONVERTERS[dtype] for dtype in ["INTEGER", "FLOAT", "BOOLEAN", "TIMESTAMP", "TEXT"]]
+
+
+class FakeConnection:
+    """Accepts rows like Postgres would, except those whose first value is listed in invalid"""
+
+    def __init__(self, invalid=(), copy_fails=False):
+        self.invalid = set(invalid)
+        self.copy_fails = copy_fails
+        self.copied = []
+        self.inserted = []
+
+    def transaction(self):
+        return nullcontext()
+
+    def cursor(self):
+        return nullcontext(self)
+
+    def copy(self, copy_sql):
+        return nullcontext(self)
+
+    def write_row(self, values):
+        if self.copy_fails:
+            raise psycopg.errors.DataError("COPY rejected a row")
+        self.copied.append(values)
+
+    def execute(self, insert_sql, values):
+        if values[0] in self.invalid:
+            raise psycopg.errors.CheckViolation(f"row {values[0]} violates a check constraint")
+        self.inserted.append(values)
+
+
+@pytest.fixture
+def rejects(tmp_path):
+    with patch.object(postgres_handler, "INGEST_REJECT_DIR", str(tmp_path)):
+        writer = RejectWriter("upi")
+        yield writer
+    writer.close()
+
+
+def read_rejects(writer: RejectWriter) -> list:
+    writer.close()
+    with open(writer.path, newline="", encoding="utf-8") as file:
+        return list(csv.reader(file))[1:]
+
+
+def test_row_values_are_converted_to_the_inferred_types():
+    assert convert_row(["7", "2.5", "TRUE", "2024-01-31T10:00:00", " text "], CONVERTERS) == [
+        7,
+        2.5,
+        True,
+        datetime(2024, 1, 31, 10),
+        " text ",
+    ]
+    assert convert_row([" ", "", " ", "", ""], CONVERTERS) == [None, None, None, None, ""]
+
+
+@pytest.mark.parametrize(
+    "row, message",
+    [
+        (["1", "2.5", "yes", "2024-01-31", "a"], "invalid boolean: yes"),
+        (["1", "2.5", "true"], "expected 5 columns, found 3"),
+        (["one", "2.5", "true", "2024-01-31", "a"], "invalid literal for int()"),
+    ],
+)
+def test_rows_that_do_not_convert_are_rejected(row, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        convert_row(row, CONVERTERS)
+
+
+def test_integers_are_bounded_to_the_postgres_integer_range():
+    assert convert_integer(str(2**31 - 1)) == 2**31 - 1
+    assert convert_integer(str(-(2**31))) == -(2**31)
+    with pytest.raises(ValueError, match="integer out of range"):
+        convert_integer(str(2**31))
+    with pytest.raises(ValueError, match="integer out of range"):
+        convert_integer(str(-(2**31) - 1))
+
+
+def test_reject_writers_for_the_same_table_never_share_a_file(rejects):
+    other = RejectWriter("upi")
+    assert other.path != rejects.path
+    rejects.write(2, ["a"], "first upload")
+    other.write(2, ["b"], "second upload")
+    assert read_rejects(rejects) == [["2", "first upload", '["a"]']]
+    assert read_rejects(other) == [["2", "second upload", '["b"]']]
+
+
+def test_chunk_is_copied_in_one_go_when_the_server_accepts_it(rejects):
+    conn = FakeConnection()
+    chunk = [(2, ["1"], [1]), (3, ["2"], [2])]
+    assert copy_chunk(conn, "COPY", "INSERT", chunk, rejects) == 2
+    assert conn.copied == [[1], [2]]
+    assert conn.inserted == []
+    assert rejects.count == 0
+
+
+def test_rejected_chunk_is_retried_row_by_row(rejects):
+    conn = FakeConnection(invalid={2}, copy_fails=True)
+    chunk = [(2, ["1"], [1]), (3, ["2"], [2]), (4, ["3"], [3])]
+    assert copy_chunk(conn, "COPY", "INSERT", chunk, rejects) == 2
+    assert conn.inserted == [[1], [3]]
+    assert rejects.count == 1
+    assert read_rejects(rejects) == [["3", "row 2 violates a check constraint", '["2"]']]
+
+
+def test_unknown_count_mode_is_rejected_before_any_query():
+    with (
+        patch.object(postgres_handler, "get_cache_async") as get_cache,
+        patch.object(postgres_handler, "get_async_postgres_connection") as get_connection,
+    ):
+        result = asyncio.run(fetch_upi_data_postgres({"count": "estimate"}))
+    assert result == {"error": "Invalid count mode 'estimate', expected one of: exact, approximate, none."}
+    get_cache.assert_not_called()
+    get_connection.assert_not_called()
+
+
+def test_sort_rules_end_with_the_tiebreaker_in_the_last_direction():
+    assert build_sort_rules([]) == [("timestamp", "DESC"), ("transaction_id", "DESC")]
+    assert build_sort_rules(
+        [{"field": "amount_inr", "order": "desc"}, {"field": "unknown"}, {"field": "sender_bank"}]
+    ) == [("amount_inr", "DESC"), ("sender_bank", "ASC"), ("transaction_id", "ASC")]
+
+
+def test_keyset_clause_is_a_single_row_comparison_for_one_direction():
+    sort_rules = [("amount_inr", "DESC"), ("transaction_id", "DESC")]
+    assert build_keyset_clause(sort_rules, ["12.50", "t9"]) == (
+        "(amount_inr, transaction_id) < (%s, %s)",
+        ["12.50", "t9"],
+    )
+
+
+def test_keyset_clause_expands_mixed_directions():
+    sort_rules = [("amount_inr", "DESC"), ("sender_bank", "ASC"), ("transaction_id", "ASC")]
+    clause, params = build_keyset_clause(sort_rules, ["12.50", "SBI", "t9"])
+    assert clause == (
+        "((amount_inr < %s) OR (amount_inr = %s AND sender_bank > %s) "
+        "OR (amount_inr = %s AND sender_bank = %s AND transaction_id > %s))"
+    )
+    assert params == ["12.50", "12.50", "SBI", "12.50", "SBI", "t9"]
+
+
+def test_cursor_round_trips_datetimes_and_decimals_exactly():
+    row = {
+        "timestamp": datetime(2024, 1, 31, 10, 15, 30, 123456),
+        "amount_inr": Decimal("1234567.890123"),
+        "transaction_id": "t9",
+        "sender_bank": None,
+    }
+    fields = ["timestamp", "amount_inr", "sender_bank", "transaction_id"]
+    values = decode_cursor(encode_cursor(row, fields), fields)
+    assert datetime.fromisoformat(values[0]) == row["timestamp"]
+    assert Decimal(values[1]) == row["amount_inr"]
+    assert values[2:] == [None, "t9"]
+
+
+def test_cursor_for_other_sort_fields_is_rejected():
+    cursor = encode_cursor({"timestamp": "2024-01-31", "transaction_id": "t9"}, ["timestamp", "transaction_id"])
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(cursor, ["amount_inr", "sender_bank", "transaction_id"])
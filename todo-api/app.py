@@ -1,4 +1,13 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from scripts.utils.mongo_util import create_mongo_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One client per process: its connection pool is shared by every request
+    app.state.mongo_client = create_mongo_client()
+    yield
+    app.state.mongo_client.close()
 
 def create_app() -> FastAPI:
-    return FastAPI(title="Task Manager API")
+    return FastAPI(title="Task Manager API", lifespan=lifespan)
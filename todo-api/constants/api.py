@@ -6,3 +6,6 @@ class TaskAPIEndpoints:
     UPDATE_TASK = "/tasks/{task_id}/update"
     DELETE_TASK = "/tasks/{task_id}/delete"
     ANALYTICS = "/analytics"
+
+class HealthAPIEndpoints:
+    READY = "/health/ready"
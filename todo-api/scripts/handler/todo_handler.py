@@ -1,34 +1,33 @@
 from datetime import datetime
 from bson import ObjectId
-from scripts.utils.mongo_util import get_tasks_collection
+from pymongo.collection import Collection
 
-def create_task(task: dict):
+def create_task(collection: Collection, task: dict):
     task["created_at"] = datetime.utcnow()
     task["updated_at"] = datetime.utcnow()
     task["completed"] = False
-    return get_tasks_collection().insert_one(task)
+    return collection.insert_one(task)
 
-def list_tasks(limit: int = 10, offset: int = 0):
-    return list(get_tasks_collection().find().skip(offset).limit(limit))
+def list_tasks(collection: Collection, limit: int = 10, offset: int = 0):
+    return list(collection.find().skip(offset).limit(limit))
 
-def get_task_by_id(task_id: str):
-    return get_tasks_collection().find_one({"_id": ObjectId(task_id)})
+def get_task_by_id(collection: Collection, task_id: str):
+    return collection.find_one({"_id": ObjectId(task_id)})
 
-def update_task(task_id: str, update_data: dict):
+def update_task(collection: Collection, task_id: str, update_data: dict):
     update_data["updated_at"] = datetime.utcnow()
-    return get_tasks_collection().update_one(
+    return collection.update_one(
         {"_id": ObjectId(task_id)}, {"$set": update_data}
     )
 
-def delete_task(task_id: str):
-    return get_tasks_collection().delete_one({"_id": ObjectId(task_id)})
+def delete_task(collection: Collection, task_id: str):
+    return collection.delete_one({"_id": ObjectId(task_id)})
 
-def get_analytics():
-    col = get_tasks_collection()
-    total = col.count_documents({})
-    completed = col.count_documents({"completed": True})
+def get_analytics(collection: Collection):
+    total = collection.count_documents({})
+    completed = collection.count_documents({"completed": True})
     pending = total - completed
-    last = col.find().sort("created_at", -1).limit(1)
+    last = collection.find().sort("created_at", -1).limit(1)
     return {
         "total_tasks": total,
         "completed_tasks": completed,
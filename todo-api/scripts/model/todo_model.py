@@ -10,12 +10,12 @@ class TaskCreateRequest(BaseModel):
     tags: Optional[List[str]] = []
 
 class TaskUpdateRequest(BaseModel):
-    title: Optional[str]
-    description: Optional[str]
-    due_date: Optional[datetime]
-    priority: Optional[str]
-    tags: Optional[List[str]]
-    completed: Optional[bool]
+    title: Optional[str] = None
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    priority: Optional[str] = None
+    tags: Optional[List[str]] = None
+    completed: Optional[bool] = None
 
 class TaskResponse(BaseModel):
     id: str
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from pymongo import MongoClient
+from constants.api import HealthAPIEndpoints
+from scripts.utils.mongo_util import get_mongo_client, ping_mongo
+
+router = APIRouter()
+
+@router.get(HealthAPIEndpoints.READY)
+def readiness(client: MongoClient = Depends(get_mongo_client)):
+    if not ping_mongo(client):
+        return JSONResponse(status_code=503, content={"status": "unavailable", "mongo": "unreachable"})
+    return {"status": "ready", "mongo": "ok"}
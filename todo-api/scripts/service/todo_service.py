@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from pymongo.collection import Collection
 from constants.api import TaskAPIEndpoints
 from scripts.handler import todo_handler
 from scripts.model.todo_model import (
@@ -8,21 +9,22 @@ from scripts.model.todo_model import (
     TaskListResponse,
     AnalyticsResponse,
 )
+from scripts.utils.mongo_util import get_tasks_collection
 
 router = APIRouter()
 
 @router.get(TaskAPIEndpoints.ANALYTICS, response_model=AnalyticsResponse)
-async def get_analytics():
-    return todo_handler.get_analytics()
+def get_analytics(collection: Collection = Depends(get_tasks_collection)):
+    return todo_handler.get_analytics(collection)
 
 @router.post(TaskAPIEndpoints.CREATE_TASK)
-async def create_task(payload: TaskCreateRequest):
-    result = todo_handler.create_task(payload.dict())
+def create_task(payload: TaskCreateRequest, collection: Collection = Depends(get_tasks_collection)):
+    result = todo_handler.create_task(collection, payload.dict())
     return {"message": "Task created", "task_id": str(result.inserted_id)}
 
 @router.get(TaskAPIEndpoints.LIST_TASKS, response_model=TaskListResponse)
-async def list_tasks(limit: int = 10, offset: int = 0):
-    tasks = todo_handler.list_tasks(limit, offset)
+def list_tasks(limit: int = 10, offset: int = 0, collection: Collection = Depends(get_tasks_collection)):
+    tasks = todo_handler.list_tasks(collection, limit, offset)
     return {
         "tasks": [
             TaskResponse(
@@ -40,8 +42,8 @@ async def list_tasks(limit: int = 10, offset: int = 0):
     }
 
 @router.get(TaskAPIEndpoints.GET_TASK, response_model=TaskResponse)
-async def get_task(task_id: str):
-    task = todo_handler.get_task_by_id(task_id)
+def get_task(task_id: str, collection: Collection = Depends(get_tasks_collection)):
+    task = todo_handler.get_task_by_id(collection, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return TaskResponse(
@@ -57,15 +59,15 @@ async def get_task(task_id: str):
     )
 
 @router.patch(TaskAPIEndpoints.UPDATE_TASK)
-async def update_task(task_id: str, payload: TaskUpdateRequest):
-    result = todo_handler.update_task(task_id, payload.dict(exclude_unset=True))
+def update_task(task_id: str, payload: TaskUpdateRequest, collection: Collection = Depends(get_tasks_collection)):
+    result = todo_handler.update_task(collection, task_id, payload.dict(exclude_unset=True))
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Task not found or nothing to update")
     return {"message": "Task updated"}
 
 @router.delete(TaskAPIEndpoints.DELETE_TASK)
-async def delete_task(task_id: str):
-    result = todo_handler.delete_task(task_id)
+def delete_task(task_id: str, collection: Collection = Depends(get_tasks_collection)):
+    result = todo_handler.delete_task(collection, task_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Task not found")
     return {"message": "Task deleted"}
@@ -0,0 +1,6 @@
+import os
+
+# The settings are read when the app modules are imported, the tests never reach this server
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGO_DB_NAME", "tasks")
+os.environ.setdefault("MONGO_COLLECTION_NAME", "tasks")
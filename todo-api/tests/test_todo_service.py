@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo.errors import ServerSelectionTimeoutError
+
+from main import app
+from scripts.utils.mongo_util import get_mongo_client, get_tasks_collection
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient()["tasks"]["tasks"]
+
+
+@pytest.fixture
+def client(collection):
+    app.dependency_overrides[get_tasks_collection] = lambda: collection
+    app.dependency_overrides[get_mongo_client] = lambda: collection.database.client
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def create_task(client, **fields) -> str:
+    task = {"title": "Write report", "description": "Quarterly", "due_date": None, "tags": ["work"], **fields}
+    response = client.post("/tasks/create", json=task)
+    assert response.status_code == 200
+    return response.json()["task_id"]
+
+
+def test_created_task_can_be_read_back(client, collection):
+    task_id = create_task(client, priority="high")
+    assert collection.count_documents({}) == 1
+
+    task = client.get(f"/tasks/{task_id}/list").json()
+    assert task["id"] == task_id
+    assert (task["title"], task["priority"], task["tags"], task["completed"]) == (
+        "Write report",
+        "high",
+        ["work"],
+        False,
+    )
+
+
+def test_missing_task_is_not_found(client):
+    assert client.get(f"/tasks/{ObjectId()}/list").status_code == 404
+
+
+def test_tasks_are_listed_with_limit_and_offset(client):
+    for index in range(3):
+        create_task(client, title=f"Task {index}")
+
+    assert len(client.get("/tasks/list").json()["tasks"]) == 3
+    page = client.get("/tasks/list", params={"limit": 1, "offset": 2}).json()["tasks"]
+    assert [task["title"] for task in page] == ["Task 2"]
+
+
+def test_update_changes_only_the_given_fields(client):
+    task_id = create_task(client)
+
+    response = client.patch(f"/tasks/{task_id}/update", json={"completed": True})
+    assert response.status_code == 200
+    task = client.get(f"/tasks/{task_id}/list").json()
+    assert (task["title"], task["description"], task["completed"]) == ("Write report", "Quarterly", True)
+
+    assert client.patch(f"/tasks/{ObjectId()}/update", json={"completed": True}).status_code == 404
+
+
+def test_delete_removes_the_task(client, collection):
+    task_id = create_task(client)
+
+    assert client.delete(f"/tasks/{task_id}/delete").status_code == 200
+    assert collection.count_documents({}) == 0
+    assert client.delete(f"/tasks/{task_id}/delete").status_code == 404
+
+
+def test_analytics_count_completed_and_pending_tasks(client):
+    create_task(client)
+    task_id = create_task(client)
+    client.patch(f"/tasks/{task_id}/update", json={"completed": True})
+
+    analytics = client.get("/analytics").json()
+    assert (analytics["total_tasks"], analytics["completed_tasks"], analytics["pending_tasks"]) == (2, 1, 1)
+    assert analytics["latest_created_at"] == client.get(f"/tasks/{task_id}/list").json()["created_at"]
+
+
+def test_ready_when_mongo_answers(client):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "mongo": "ok"}
+
+
+def test_not_ready_when_mongo_ping_fails(client):
+    unreachable = MagicMock()
+    unreachable.admin.command.side_effect = ServerSelectionTimeoutError("no servers")
+    app.dependency_overrides[get_mongo_client] = lambda: unreachable
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable", "mongo": "unreachable"}
+    unreachable.admin.command.assert_called_once_with("ping")